@@ -0,0 +1,84 @@
+"""Benchmark BoLamSach trên bài dài (~50 KB HTML).
+
+So sánh với cách cũ: ``loai_bo_html`` (3 regex + gộp khoảng trắng), 7 lần
+``str.replace``, 10 lần ``re.sub`` mẫu quảng cáo chưa biên dịch, rồi ``tom_tat``
+làm sạch lại toàn bộ.
+
+Chạy: python benchmarks/bench_cleaner.py [--so-bai 50] [--kich-thuoc 50000]
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import re
+import sys
+import timeit
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from news_ingestor.processing.cleaner import KY_TU_LOI, MAU_QUANG_CAO, BoLamSach  # noqa: E402
+from news_ingestor.utils.text_utils import (  # noqa: E402
+    chuan_hoa_khoang_trang,
+    loai_bo_html,
+    rut_gon_noi_dung,
+)
+
+_DOAN = [
+    "<p>Tập đoàn <strong>Hòa Phát</strong> công bố lợi nhuận quý 3 tăng 30%.</p>",
+    "<div class=\"ad\">Quảng cáo</div>",
+    "<p>Ngân hàng Nhà nước giữ nguyên lãi suất&nbsp;điều hành &amp; tỷ giá.</p>",
+    "<a href=\"https://cafef.vn\">Xem thêm: https://cafef.vn/tin-moi.chn</a>",
+    "<p>Khối ngoại mua ròng\u200b 500 tỷ đồng trên HOSE.</p>\r\n",
+    "<span>&#8220;VN-Index&#8221; vượt 1.300 điểm</span>",
+]
+
+
+def _sinh_bai(rng: random.Random, kich_thuoc: int) -> str:
+    phan = []
+    while sum(map(len, phan)) < kich_thuoc:
+        phan.append(rng.choice(_DOAN))
+    return "\n".join(phan)
+
+
+def _lam_sach_cu(text: str) -> str:
+    text = loai_bo_html(text)
+    for ky_tu, thay_the in KY_TU_LOI.items():
+        text = text.replace(ky_tu, thay_the)
+    for mau in MAU_QUANG_CAO:
+        text = re.sub(mau, "", text)
+    return chuan_hoa_khoang_trang(text).strip()
+
+
+def _cu(text: str) -> tuple[str, str]:
+    sach = _lam_sach_cu(text)
+    return sach, rut_gon_noi_dung(_lam_sach_cu(text))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--so-bai", type=int, default=50)
+    parser.add_argument("--kich-thuoc", type=int, default=50_000)
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    ds_bai = [_sinh_bai(rng, args.kich_thuoc) for _ in range(args.so_bai)]
+    lam_sach = BoLamSach()
+
+    def moi(text: str) -> tuple[str, str]:
+        sach = lam_sach.lam_sach(text)
+        return sach, lam_sach.tom_tat(sach, da_lam_sach=True)
+
+    t_cu = min(timeit.repeat(lambda: [_cu(b) for b in ds_bai], number=1, repeat=3))
+    t_moi = min(timeit.repeat(lambda: [moi(b) for b in ds_bai], number=1, repeat=3))
+    tong_mb = sum(map(len, ds_bai)) / 1e6
+
+    print(f"{args.so_bai} bài x ~{args.kich_thuoc // 1000} KB")
+    print(f"Cũ  (làm sạch + tóm tắt): {t_cu * 1000:8.1f} ms  ({tong_mb / t_cu:6.1f} MB/s)")
+    print(f"Mới (làm sạch + tóm tắt): {t_moi * 1000:8.1f} ms  ({tong_mb / t_moi:6.1f} MB/s)")
+    print(f"Tăng tốc: x{t_cu / t_moi:.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""Benchmark backend embedding: torch (float32) so với onnx (int8).
+
+Mỗi backend chạy trong một tiến trình con riêng để RSS đo được không lẫn nhau.
+Đo:
+- thời gian tải model, throughput encode (bài/s), RSS đỉnh của tiến trình
+- độ lệch cosine giữa vector int8 và vector float32 trên cùng văn bản
+
+Cần model ONNX đã xuất: news-ingestor export-onnx
+Chạy: python benchmarks/bench_embedding_backend.py [--so-bai 512] [--threads 4]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+_CAU = [
+    "Ngân hàng Nhà nước giữ nguyên lãi suất điều hành",
+    "FPT báo lãi kỷ lục quý 3, doanh thu tăng 20%",
+    "Giá thép xây dựng tiếp tục giảm do nhu cầu yếu",
+    "Khối ngoại bán ròng hơn 500 tỷ đồng trên HOSE",
+    "Tỷ giá USD/VND tăng mạnh trên thị trường tự do",
+    "Vinhomes khởi công dự án khu đô thị mới tại Hưng Yên",
+    "Lạm phát tháng 9 ở mức 3,5% so với cùng kỳ",
+    "Cổ phiếu ngân hàng dẫn dắt VN-Index vượt 1.300 điểm",
+]
+
+
+def _sinh_bai(so_bai: int) -> list[str]:
+    rng = random.Random(42)
+    return [". ".join(rng.choices(_CAU, k=rng.randint(2, 12))) for _ in range(so_bai)]
+
+
+def _chay_backend(backend: str, so_bai: int, threads: int, file_vector: str) -> None:
+    """Tiến trình con: tải một backend, encode, ghi vector + số đo ra stdout (JSON)."""
+    import os
+
+    os.environ["EMBEDDING_THREADS"] = str(threads)
+    from news_ingestor.processing.embeddings import BoTaoEmbeddings
+
+    ds_bai = _sinh_bai(so_bai)
+    bo_tao = BoTaoEmbeddings(backend=backend)
+    bat_dau = time.perf_counter()
+    bo_tao.tao_embedding("khởi động")
+    tai_s = time.perf_counter() - bat_dau
+
+    bat_dau = time.perf_counter()
+    vector = np.asarray(bo_tao.tao_nhieu_embedding(ds_bai), dtype=np.float32)
+    encode_s = time.perf_counter() - bat_dau
+    np.save(file_vector, vector)
+
+    print(json.dumps({
+        "tai_s": tai_s,
+        "bai_moi_giay": so_bai / encode_s,
+        "rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    }))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--so-bai", type=int, default=512)
+    parser.add_argument("--threads", type=int, default=0, help="EMBEDDING_THREADS (0 = mặc định)")
+    parser.add_argument("--backend", choices=["torch", "onnx"], help=argparse.SUPPRESS)
+    parser.add_argument("--file-vector", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.backend:
+        _chay_backend(args.backend, args.so_bai, args.threads, args.file_vector)
+        return
+
+    ket_qua: dict[str, dict] = {}
+    vector: dict[str, np.ndarray] = {}
+    with tempfile.TemporaryDirectory() as thu_muc:
+        for backend in ("torch", "onnx"):
+            file_vector = str(Path(thu_muc) / f"{backend}.npy")
+            dau_ra = subprocess.run(
+                [
+                    sys.executable, __file__,
+                    "--backend", backend,
+                    "--so-bai", str(args.so_bai),
+                    "--threads", str(args.threads),
+                    "--file-vector", file_vector,
+                ],
+                capture_output=True, text=True, check=True,
+            ).stdout
+            ket_qua[backend] = json.loads(dau_ra.strip().splitlines()[-1])
+            vector[backend] = np.load(file_vector)
+
+    # Vector đã chuẩn hóa L2 nên cosine = tích vô hướng
+    cosine = (vector["torch"] * vector["onnx"]).sum(axis=1)
+    print(f"{'backend':8} {'tải (s)':>8} {'bài/s':>8} {'RSS (MB)':>9}")
+    for backend, so_do in ket_qua.items():
+        print(
+            f"{backend:8} {so_do['tai_s']:8.2f} {so_do['bai_moi_giay']:8.1f} "
+            f"{so_do['rss_mb']:9.0f}"
+        )
+    tang_toc = ket_qua["onnx"]["bai_moi_giay"] / ket_qua["torch"]["bai_moi_giay"]
+    print(f"Tăng tốc onnx/torch: {tang_toc:.2f}x")
+    print(
+        f"Cosine int8 vs float32: trung bình {cosine.mean():.4f}, "
+        f"thấp nhất {cosine.min():.4f}, p1 {np.percentile(cosine, 1):.4f}"
+    )
+
+
+if __name__ == "__main__":
+    main()
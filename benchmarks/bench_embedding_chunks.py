@@ -0,0 +1,131 @@
+"""Benchmark embedding bài dài: cắt 512 ký tự (truncate) so với chia đoạn (mean).
+
+Mỗi chế độ chạy trong một tiến trình con riêng để RSS đo được không lẫn nhau.
+Bài giả gồm phần mở đầu chung chung và một câu đặc trưng nằm sau ký tự 512;
+truy vấn là câu đặc trưng đó, nên recall đo được phần nội dung mà vector của
+bài thực sự biểu diễn.
+
+Đo: throughput (bài/s, đoạn/s), RSS đỉnh, recall@1 / recall@5.
+Chạy: python benchmarks/bench_embedding_chunks.py [--so-bai 256] [--backend torch]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import random
+import resource
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+_MO_DAU = [
+    "Thị trường chứng khoán phiên hôm nay diễn biến giằng co với thanh khoản thấp",
+    "Nhà đầu tư tiếp tục thận trọng trước các thông tin vĩ mô trong nước và quốc tế",
+    "Dòng tiền luân chuyển giữa các nhóm ngành, chưa có nhóm nào dẫn dắt rõ rệt",
+    "Giới phân tích cho rằng chỉ số có thể tiếp tục đi ngang trong ngắn hạn",
+]
+_DOANH_NGHIEP = ["FPT", "Vinamilk", "Hòa Phát", "Vietcombank", "Masan", "Vingroup", "PNJ", "MWG"]
+_SU_KIEN = [
+    "công bố lợi nhuận quý tăng {so}%",
+    "khởi công nhà máy mới vốn đầu tư {so} nghìn tỷ đồng",
+    "bị xử phạt {so} tỷ đồng do vi phạm công bố thông tin",
+    "chia cổ tức tiền mặt tỷ lệ {so}%",
+    "mua lại {so}% cổ phần của một công ty logistics",
+]
+
+
+def _sinh_du_lieu(so_bai: int) -> tuple[list[str], list[str]]:
+    """(bài, truy vấn); câu đặc trưng của bài i là truy vấn i."""
+    rng = random.Random(42)
+    ds_bai, ds_truy_van = [], []
+    for _ in range(so_bai):
+        dac_trung = (
+            f"{rng.choice(_DOANH_NGHIEP)} "
+            f"{rng.choice(_SU_KIEN).format(so=rng.randint(2, 90))}"
+        )
+        mo_dau = ". ".join(rng.choices(_MO_DAU, k=rng.randint(6, 10)))
+        ket = ". ".join(rng.choices(_MO_DAU, k=rng.randint(0, 4)))
+        ds_bai.append(f"{mo_dau}. {dac_trung}. {ket}")
+        ds_truy_van.append(dac_trung)
+    return ds_bai, ds_truy_van
+
+
+def _chay_che_do(che_do: str, backend: str, so_bai: int) -> None:
+    """Tiến trình con: encode bài theo một chế độ, in số đo ra stdout (JSON)."""
+    os.environ["EMBEDDING_CHUNK_MODE"] = che_do
+    os.environ["EMBEDDING_CACHE_ENABLED"] = "false"
+    from news_ingestor.processing.embeddings import BoTaoEmbeddings
+    from news_ingestor.utils.metrics import lay_metrics
+
+    ds_bai, ds_truy_van = _sinh_du_lieu(so_bai)
+    bo_tao = BoTaoEmbeddings(backend=backend)
+    bo_tao.khoi_dong()
+
+    bat_dau = time.perf_counter()
+    ma_tran_bai = bo_tao.tao_ma_tran_tai_lieu(ds_bai)
+    encode_s = time.perf_counter() - bat_dau
+    so_doan = lay_metrics().snapshot()["counters"].get("embedding_chunks", so_bai)
+
+    ma_tran_truy_van = bo_tao.tao_ma_tran(ds_truy_van)
+    # Vector đã chuẩn hóa L2 nên cosine = tích vô hướng
+    hang = np.argsort(-(ma_tran_truy_van @ ma_tran_bai.T), axis=1)
+    dung = hang == np.arange(so_bai)[:, None]
+
+    print(json.dumps({
+        "bai_moi_giay": so_bai / encode_s,
+        "doan_moi_giay": so_doan / encode_s,
+        "so_doan": so_doan,
+        "rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        "recall_1": float(dung[:, :1].any(axis=1).mean()),
+        "recall_5": float(dung[:, :5].any(axis=1).mean()),
+    }))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--so-bai", type=int, default=256)
+    parser.add_argument("--backend", choices=["torch", "onnx"], default="torch")
+    parser.add_argument("--che-do", choices=["truncate", "mean"], help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.che_do:
+        _chay_che_do(args.che_do, args.backend, args.so_bai)
+        return
+
+    ket_qua: dict[str, dict] = {}
+    for che_do in ("truncate", "mean"):
+        dau_ra = subprocess.run(
+            [
+                sys.executable, __file__,
+                "--che-do", che_do,
+                "--backend", args.backend,
+                "--so-bai", str(args.so_bai),
+            ],
+            capture_output=True, text=True, check=True,
+        ).stdout
+        ket_qua[che_do] = json.loads(dau_ra.strip().splitlines()[-1])
+
+    print(
+        f"{'chế độ':9} {'bài/s':>8} {'đoạn/s':>8} {'đoạn':>6} {'RSS (MB)':>9} "
+        f"{'R@1':>6} {'R@5':>6}"
+    )
+    for che_do, so_do in ket_qua.items():
+        print(
+            f"{che_do:9} {so_do['bai_moi_giay']:8.1f} {so_do['doan_moi_giay']:8.1f} "
+            f"{so_do['so_doan']:6d} {so_do['rss_mb']:9.0f} "
+            f"{so_do['recall_1']:6.3f} {so_do['recall_5']:6.3f}"
+        )
+    ti_le = ket_qua["mean"]["bai_moi_giay"] / ket_qua["truncate"]["bai_moi_giay"]
+    print(f"Throughput mean/truncate: {ti_le:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""Benchmark pool worker embedding: throughput theo số tiến trình fork.
+
+Mỗi cấu hình (0 = encode tại chỗ, 1, 2, 4... worker) chạy trong một tiến
+trình con riêng. Đo bài/s và tổng PSS của tiến trình cha + worker (Linux,
+/proc/<pid>/smaps_rollup): trang trọng số dùng chung copy-on-write chỉ được
+tính một lần, nên PSS cho thấy RAM thực tăng bao nhiêu theo số worker.
+
+Chạy: python benchmarks/bench_embedding_pool.py [--so-bai 2048] [--workers 1,2,4]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import multiprocessing
+import os
+import random
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+_CAU = [
+    "Ngân hàng Nhà nước giữ nguyên lãi suất điều hành",
+    "FPT báo lãi kỷ lục quý 3, doanh thu tăng 20%",
+    "Giá thép xây dựng tiếp tục giảm do nhu cầu yếu",
+    "Khối ngoại bán ròng hơn 500 tỷ đồng trên HOSE",
+    "Tỷ giá USD/VND tăng mạnh trên thị trường tự do",
+    "Lạm phát tháng 9 ở mức 3,5% so với cùng kỳ",
+]
+
+
+def _pss_mb(pid: int) -> float:
+    """PSS (MB) của một tiến trình; 0 nếu không đọc được."""
+    try:
+        with open(f"/proc/{pid}/smaps_rollup", encoding="utf-8") as f:
+            for dong in f:
+                if dong.startswith("Pss:"):
+                    return int(dong.split()[1]) / 1024
+    except OSError:
+        pass
+    return 0.0
+
+
+def _chay(so_worker: int, so_bai: int, backend: str) -> None:
+    """Tiến trình con: encode ``so_bai`` bài với ``so_worker`` worker, in số đo (JSON)."""
+    from news_ingestor.processing.embeddings import BoTaoEmbeddings
+
+    rng = random.Random(42)
+    # Thêm số ngẫu nhiên để không bài nào trùng nhau
+    ds_bai = [
+        ". ".join(rng.choices(_CAU, k=rng.randint(2, 8))) + f" ({i})" for i in range(so_bai)
+    ]
+    bo_tao = BoTaoEmbeddings(backend=backend)
+    if not bo_tao.dung_nhieu_tien_trinh(so_worker):
+        bo_tao.khoi_dong()
+    else:
+        bo_tao.tao_ma_tran(ds_bai[:64])  # hâm nóng các worker
+
+    bat_dau = time.perf_counter()
+    bo_tao.tao_ma_tran(ds_bai)
+    encode_s = time.perf_counter() - bat_dau
+
+    pids = [os.getpid()] + [p.pid for p in multiprocessing.active_children()]
+    print(json.dumps({
+        "bai_moi_giay": so_bai / encode_s,
+        "pss_mb": sum(_pss_mb(pid) for pid in pids),
+    }))
+    bo_tao.dung_pool()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--so-bai", type=int, default=2048)
+    parser.add_argument("--workers", default="1,2,4", help="Các số worker, cách nhau dấu phẩy")
+    parser.add_argument("--backend", choices=["torch", "onnx"], default="torch")
+    parser.add_argument("--so-worker", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    # Bench đo encode thuần, không dùng cache trên đĩa
+    os.environ["EMBEDDING_CACHE_ENABLED"] = "false"
+    if args.so_worker is not None:
+        _chay(args.so_worker, args.so_bai, args.backend)
+        return
+
+    print(f"{'worker':>6} {'bài/s':>8} {'tăng tốc':>9} {'PSS (MB)':>9}")
+    goc = None
+    for so_worker in [0] + [int(w) for w in args.workers.split(",")]:
+        dau_ra = subprocess.run(
+            [
+                sys.executable, __file__,
+                "--so-worker", str(so_worker),
+                "--so-bai", str(args.so_bai),
+                "--backend", args.backend,
+            ],
+            capture_output=True, text=True, check=True,
+        ).stdout
+        so_do = json.loads(dau_ra.strip().splitlines()[-1])
+        goc = goc or so_do["bai_moi_giay"]
+        print(
+            f"{so_worker:6d} {so_do['bai_moi_giay']:8.1f} "
+            f"{so_do['bai_moi_giay'] / goc:8.2f}x {so_do['pss_mb']:9.0f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
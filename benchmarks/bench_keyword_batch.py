@@ -0,0 +1,96 @@
+"""Micro-benchmark chấm điểm keyword từng bài so với cả lô (ma trận bài × từ khóa).
+
+Đo cảm xúc, tác động và danh mục trên các bài đã quét từ điển sẵn (kết quả
+quét được lưu trên ``VanBanChuanHoa``), tức phần chấm điểm khi xử lý lại bảng
+lịch sử. Kết quả hai đường được kiểm tra trùng nhau trước khi đo.
+
+Chạy: python benchmarks/bench_keyword_batch.py [--so-bai 5000]
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import sys
+import timeit
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from news_ingestor.processing.entity_extractor import BoTrichXuatThucThe  # noqa: E402
+from news_ingestor.processing.impact_classifier import BoPhanLoaiTacDong  # noqa: E402
+from news_ingestor.processing.sentiment import (  # noqa: E402
+    TU_TICH_CUC,
+    TU_TIEU_CUC,
+    BoPhanTichCamXuc,
+)
+from news_ingestor.utils.text_utils import VanBanChuanHoa  # noqa: E402
+
+_THUONG = "công ty cho biết trong quý năm nay báo cáo thị trường cổ đông".split()
+
+
+def _sinh_bai(rng: random.Random, so_bai: int) -> list[VanBanChuanHoa]:
+    tu_khoa = [
+        *TU_TICH_CUC,
+        *TU_TIEU_CUC,
+        *BoPhanLoaiTacDong.TU_KHOA_TAC_DONG_CAO,
+        *BoPhanLoaiTacDong.TU_KHOA_TAC_DONG_TRUNG_BINH,
+    ]
+    return [
+        VanBanChuanHoa.tu_van_ban(
+            " ".join(rng.choice(tu_khoa if rng.random() < 0.1 else _THUONG) for _ in range(300))
+        )
+        for _ in range(so_bai)
+    ]
+
+
+def _do(ten: str, tung_bai, ca_lo) -> None:
+    so_lan = 3
+    t_cu = min(timeit.repeat(tung_bai, number=1, repeat=so_lan))
+    t_moi = min(timeit.repeat(ca_lo, number=1, repeat=so_lan))
+    print(
+        f"{ten:<10} từng bài {t_cu * 1000:8.1f} ms   cả lô {t_moi * 1000:8.1f} ms"
+        f"   x{t_cu / t_moi:.1f}"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--so-bai", type=int, default=5000)
+    args = parser.parse_args()
+
+    ds_bai = _sinh_bai(random.Random(42), args.so_bai)
+    ds_ma_ck = [["FPT"] if i % 3 == 0 else None for i in range(len(ds_bai))]
+    cam_xuc = BoPhanTichCamXuc()
+    tac_dong = BoPhanLoaiTacDong()
+    trich_xuat = BoTrichXuatThucThe(duong_dan_chi_muc="")
+
+    def cam_xuc_tung_bai():
+        return [cam_xuc._phan_tich_keyword(v) for v in ds_bai]
+
+    def tac_dong_tung_bai():
+        return [tac_dong._cham_diem(v, m) for v, m in zip(ds_bai, ds_ma_ck, strict=True)]
+
+    def danh_muc_tung_bai():
+        return [
+            trich_xuat.phan_loai_danh_muc(v, m) for v, m in zip(ds_bai, ds_ma_ck, strict=True)
+        ]
+
+    # Lần gọi đầu quét từ điển và lưu kết quả trên từng VanBanChuanHoa
+    assert cam_xuc_tung_bai() == cam_xuc._phan_tich_keyword_nhieu(ds_bai)
+    assert tac_dong_tung_bai() == tac_dong._cham_diem_nhieu(ds_bai, ds_ma_ck)
+    assert danh_muc_tung_bai() == trich_xuat.phan_loai_danh_muc_nhieu(ds_bai, ds_ma_ck)
+
+    print(f"{args.so_bai} bài (đã quét từ điển)")
+    _do("cam_xuc", cam_xuc_tung_bai, lambda: cam_xuc._phan_tich_keyword_nhieu(ds_bai))
+    _do("tac_dong", tac_dong_tung_bai, lambda: tac_dong._cham_diem_nhieu(ds_bai, ds_ma_ck))
+    _do(
+        "danh_muc",
+        danh_muc_tung_bai,
+        lambda: trich_xuat.phan_loai_danh_muc_nhieu(ds_bai, ds_ma_ck),
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""Micro-benchmark bỏ dấu và sửa ký tự lỗi.
+
+- ``bo_dau``: cài đặt hiện tại so với NFKD + generator lọc từng ký tự (cách cũ)
+- Sửa ký tự lỗi: chuỗi ``str.replace`` hiện tại so với regex một lần duyệt.
+  Trên CPython, 7 lần ``str.replace`` (memchr) vẫn nhanh hơn regex nên được giữ.
+
+Kết quả được kiểm tra tương đương trước khi đo.
+
+Chạy: python benchmarks/bench_text_fold.py [--so-bai 500] [--do-dai 8000]
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import re
+import sys
+import timeit
+import unicodedata
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from news_ingestor.processing.cleaner import KY_TU_LOI, BoLamSach  # noqa: E402
+from news_ingestor.utils.text_utils import bo_dau  # noqa: E402
+
+_TU = (
+    "Ngân hàng Nhà nước điều chỉnh lãi suất tỷ giá đồng Việt Nam "
+    "Tập đoàn Hòa Phát lợi nhuận quý tăng trưởng kỷ lục cổ phiếu “VN-Index” – "
+    "thị trường chứng khoán khối ngoại mua ròng thanh khoản"
+).split()
+
+
+def _sinh_bai(rng: random.Random, do_dai: int) -> str:
+    tu = []
+    while sum(len(t) + 1 for t in tu) < do_dai:
+        tu.append(rng.choice(_TU))
+        if rng.random() < 0.02:
+            tu.append(rng.choice([" ", "​", "\r\n", "﻿"]))
+    return " ".join(tu)
+
+
+def _bo_dau_nfkd(text: str) -> str:
+    normalized = unicodedata.normalize("NFKD", text)
+    return "".join(ch for ch in normalized if not unicodedata.combining(ch))
+
+
+_KY_TU_RONG = "\u200b\u200c\u200d\ufeff"
+_MAU_KY_TU_LOI = re.compile(f"\r[{_KY_TU_RONG}]*\n?|[{_KY_TU_RONG}]+|\u00a0")
+
+
+def _sua_ky_tu_regex(text: str) -> str:
+    def thay(m: re.Match) -> str:
+        return "\n" if m.group()[0] == "\r" else KY_TU_LOI.get(m.group(), "")
+
+    return _MAU_KY_TU_LOI.sub(thay, text)
+
+
+def _do(ten: str, cu, moi, ds_bai: list[str]) -> None:
+    so_lan = 3
+    t_cu = min(timeit.repeat(lambda: [cu(b) for b in ds_bai], number=1, repeat=so_lan))
+    t_moi = min(timeit.repeat(lambda: [moi(b) for b in ds_bai], number=1, repeat=so_lan))
+    print(
+        f"{ten:<10} so sánh {t_cu * 1000:8.1f} ms   hiện tại {t_moi * 1000:8.1f} ms"
+        f"   x{t_cu / t_moi:.1f}"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--so-bai", type=int, default=500)
+    parser.add_argument("--do-dai", type=int, default=8000)
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    ds_bai = [_sinh_bai(rng, args.do_dai) for _ in range(args.so_bai)]
+    lam_sach = BoLamSach()
+
+    for bai in ds_bai:
+        assert bo_dau(bai) == _bo_dau_nfkd(bai.replace("đ", "d").replace("Đ", "D"))
+        assert lam_sach._sua_ky_tu_dac_biet(bai) == _sua_ky_tu_regex(bai)
+
+    print(f"{args.so_bai} bài x ~{args.do_dai} ký tự")
+    _do("bo_dau", _bo_dau_nfkd, bo_dau, ds_bai)
+    _do("sua_ky_tu", _sua_ky_tu_regex, lam_sach._sua_ky_tu_dac_biet, ds_bai)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+"""Benchmark chỉ mục mã CK toàn thị trường.
+
+Sinh CSV niêm yết giả (~1.600 mã như HOSE+HNX+UPCoM), đo:
+- thời gian build + kích thước file chỉ mục
+- thời gian và bộ nhớ đỉnh khi khởi tạo BoTrichXuatThucThe từ chỉ mục
+- throughput trích xuất so với vòng lặp substring theo từng bí danh
+
+Chạy: python benchmarks/bench_ticker_index.py [--so-ma 1600] [--so-bai 2000]
+"""
+
+from __future__ import annotations
+
+import argparse
+import csv
+import random
+import string
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from news_ingestor.processing.entity_extractor import BoTrichXuatThucThe  # noqa: E402
+from news_ingestor.processing.ticker_index import (  # noqa: E402
+    doc_csv_niem_yet,
+    luu_chi_muc,
+    xay_dung_chi_muc,
+)
+from news_ingestor.utils.text_utils import bo_dau  # noqa: E402
+
+_TU = [
+    "Đầu tư", "Phát triển", "Xây dựng", "Thương mại", "Dịch vụ", "Bất động sản",
+    "Thủy sản", "Dược phẩm", "Cao su", "Vận tải", "Điện lực", "Khoáng sản",
+    "Thép", "Nhựa", "Giấy", "Cơ khí", "Hóa chất", "Năng lượng", "Công nghệ",
+]
+
+
+def _sinh_csv(duong_dan: Path, so_ma: int, rng: random.Random) -> list[str]:
+    ma_ck: set[str] = set()
+    while len(ma_ck) < so_ma:
+        ma_ck.add("".join(rng.choices(string.ascii_uppercase, k=3)))
+
+    with open(duong_dan, "w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["ma", "ten_cong_ty", "san"])
+        for i, ma in enumerate(sorted(ma_ck)):
+            ten = f"Công ty Cổ phần {' '.join(rng.sample(_TU, 3))} {ma}"
+            writer.writerow([ma, ten, ("HOSE", "HNX", "UPCOM")[i % 3]])
+    return sorted(ma_ck)
+
+
+def _sinh_bai(ds_ma: list[str], so_bai: int, rng: random.Random) -> list[str]:
+    ds_bai = []
+    for _ in range(so_bai):
+        cau = [" ".join(rng.sample(_TU, 4)) for _ in range(30)]
+        ma = rng.choice(ds_ma)
+        cau.insert(rng.randrange(len(cau)), f"cổ phiếu {ma} tăng trần")
+        ds_bai.append(". ".join(cau))
+    return ds_bai
+
+
+def _vong_lap_ngay_tho(ma_ck: dict[str, dict], text: str) -> set[str]:
+    """Cách cũ: duyệt mọi bí danh và tìm substring."""
+    text_bo_dau = bo_dau(text.lower())
+    return {
+        ma
+        for ma, thong_tin in ma_ck.items()
+        for tk in thong_tin["tu_khoa"]
+        if bo_dau(tk.lower()) in text_bo_dau
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--so-ma", type=int, default=1600)
+    parser.add_argument("--so-bai", type=int, default=2000)
+    args = parser.parse_args()
+    rng = random.Random(42)
+
+    with tempfile.TemporaryDirectory() as thu_muc:
+        duong_dan_csv = Path(thu_muc) / "listings.csv"
+        duong_dan_chi_muc = Path(thu_muc) / "ticker_index.pkl"
+        ds_ma = _sinh_csv(duong_dan_csv, args.so_ma, rng)
+
+        bat_dau = time.perf_counter()
+        ma_ck = doc_csv_niem_yet(duong_dan_csv)
+        chi_muc = xay_dung_chi_muc(ma_ck)
+        so_byte = luu_chi_muc(chi_muc, duong_dan_chi_muc)
+        build_ms = (time.perf_counter() - bat_dau) * 1000
+
+        tracemalloc.start()
+        bat_dau = time.perf_counter()
+        bo_trich_xuat = BoTrichXuatThucThe(duong_dan_chi_muc=str(duong_dan_chi_muc))
+        khoi_dong_ms = (time.perf_counter() - bat_dau) * 1000
+        _, dinh = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        ds_bai = _sinh_bai(ds_ma, args.so_bai, rng)
+
+        bat_dau = time.perf_counter()
+        for bai in ds_bai:
+            bo_trich_xuat.trich_xuat_ma_ck(bai)
+        automaton_s = time.perf_counter() - bat_dau
+
+        mau = ds_bai[: max(1, len(ds_bai) // 20)]
+        bat_dau = time.perf_counter()
+        for bai in mau:
+            _vong_lap_ngay_tho(ma_ck, bai)
+        ngay_tho_s = (time.perf_counter() - bat_dau) * len(ds_bai) / len(mau)
+
+    print(f"Số mã: {chi_muc.so_ma}, bí danh: {chi_muc.bo_khop.so_mau}, "
+          f"trạng thái: {chi_muc.bo_khop.so_trang_thai}")
+    print(f"Build chỉ mục:       {build_ms:8.1f} ms  ({so_byte / 1024:.1f} KB)")
+    print(f"Khởi động extractor: {khoi_dong_ms:8.1f} ms  (bộ nhớ đỉnh {dinh / 1024:.1f} KB)")
+    print(f"Automaton:           {args.so_bai / automaton_s:8.0f} bài/s")
+    print(f"Vòng lặp substring:  {args.so_bai / ngay_tho_s:8.0f} bài/s (ước lượng)")
+
+
+if __name__ == "__main__":
+    main()
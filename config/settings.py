@@ -78,17 +78,231 @@ class CauHinhNLP(BaseSettings):
         alias="GEMINI_API_KEY",
         description="API key cho Google Gemini",
     )
+    gemini_model: str = Field(
+        default="gemini-2.0-flash-lite",
+        alias="GEMINI_MODEL",
+        description="Model Gemini dùng cho phân tích cảm xúc",
+    )
+    gemini_base_url: str = Field(
+        default="https://generativelanguage.googleapis.com",
+        alias="GEMINI_BASE_URL",
+        description="Endpoint REST của Gemini API",
+    )
+    gemini_kich_thuoc_lo: int = Field(
+        default=10,
+        alias="GEMINI_BATCH_SIZE",
+        description="Số bài gộp trong một request Gemini",
+        ge=1,
+        le=50,
+    )
+    gemini_so_request_dong_thoi: int = Field(
+        default=4,
+        alias="GEMINI_CONCURRENCY",
+        description="Số request Gemini chạy đồng thời tối đa",
+        ge=1,
+        le=32,
+    )
+    gemini_request_moi_phut: int = Field(
+        default=30,
+        alias="GEMINI_RPM",
+        description="Ngân sách request Gemini mỗi phút",
+        ge=1,
+    )
+    gemini_token_moi_phut: int = Field(
+        default=500_000,
+        alias="GEMINI_TPM",
+        description="Ngân sách token (ước lượng) Gemini mỗi phút",
+        ge=1000,
+    )
+    gemini_timeout_giay: float = Field(
+        default=30.0,
+        alias="GEMINI_TIMEOUT",
+        description="Timeout mỗi request Gemini (giây)",
+        gt=0,
+        le=300,
+    )
+    sentiment_backend: str = Field(
+        default="auto",
+        alias="SENTIMENT_BACKEND",
+        description="auto (Gemini → mô hình cục bộ → keyword) / gemini / local / keyword",
+    )
+    duong_dan_mo_hinh_cam_xuc: str = Field(
+        default="data/sentiment_model.npz",
+        alias="SENTIMENT_MODEL_PATH",
+        description="Mô hình cảm xúc cục bộ do train-sentiment tạo",
+    )
+    cache_ket_qua: bool = Field(
+        default=True,
+        alias="RESULT_CACHE_ENABLED",
+        description="Cache kết quả cảm xúc/tác động theo hash nội dung + phiên bản bộ phân tích",
+    )
+    kich_thuoc_cache_ket_qua: int = Field(
+        default=10_000,
+        alias="RESULT_CACHE_SIZE",
+        description="Số kết quả giữ trong LRU trong process (tầng 1)",
+        ge=0,
+    )
+    cache_ket_qua_db: bool = Field(
+        default=True,
+        alias="RESULT_CACHE_DB",
+        description="Lưu cache kết quả vào bảng ket_qua_phan_tich (tầng 2)",
+    )
     embedding_model: str = Field(
         default="paraphrase-multilingual-MiniLM-L12-v2",
         alias="EMBEDDING_MODEL",
         description="Tên model sentence-transformers",
     )
+    embedding_backend: str = Field(
+        default="torch",
+        alias="EMBEDDING_BACKEND",
+        description="Backend embedding: torch (SentenceTransformer) hoặc onnx (int8, onnxruntime)",
+    )
+    duong_dan_embedding_onnx: str = Field(
+        default="data/embedding_onnx",
+        alias="EMBEDDING_ONNX_PATH",
+        description="Thư mục model ONNX do export-onnx tạo",
+    )
+    khoi_dong_embedding: bool = Field(
+        default=False,
+        alias="EMBEDDING_PRELOAD",
+        description="Tải + hâm nóng model embedding trên thread nền khi serve-mcp / crawl --daemon",
+    )
+    cache_embedding: bool = Field(
+        default=True,
+        alias="EMBEDDING_CACHE_ENABLED",
+        description="Cache vector embedding trên đĩa theo hash văn bản + phiên bản model",
+    )
+    duong_dan_cache_embedding: str = Field(
+        default="data/embedding_cache",
+        alias="EMBEDDING_CACHE_PATH",
+        description="Thư mục cache embedding (file memmap float32 + chỉ mục hash)",
+    )
+    kich_thuoc_cache_truy_van: int = Field(
+        default=1024,
+        alias="QUERY_CACHE_SIZE",
+        description="Số vector câu hỏi giữ trong LRU của MCP server (0 = tắt)",
+        ge=0,
+    )
+    so_luong_embedding: int = Field(
+        default=0,
+        alias="EMBEDDING_THREADS",
+        description="Số luồng intra-op khi encode (0 = mặc định của runtime)",
+        ge=0,
+        le=256,
+    )
+    so_tien_trinh_embedding: int = Field(
+        default=0,
+        alias="EMBEDDING_WORKERS",
+        description="Số tiến trình worker fork dùng chung model để encode (0 = encode tại chỗ)",
+        ge=0,
+        le=64,
+    )
+    che_do_doan_embedding: str = Field(
+        default="truncate",
+        alias="EMBEDDING_CHUNK_MODE",
+        description="Bài dài: truncate (512 ký tự đầu), mean (trung bình đoạn), chunks (điểm/đoạn)",
+    )
+    so_token_doan_embedding: int = Field(
+        default=256,
+        alias="EMBEDDING_CHUNK_TOKENS",
+        description="Số token tối đa mỗi đoạn (còn bị giới hạn bởi max_seq_length của model)",
+        ge=16,
+    )
+    chong_lap_doan_embedding: int = Field(
+        default=32,
+        alias="EMBEDDING_CHUNK_OVERLAP",
+        description="Số token chồng lấp giữa hai đoạn liên tiếp",
+        ge=0,
+    )
+    so_doan_toi_da_embedding: int = Field(
+        default=16,
+        alias="EMBEDDING_MAX_CHUNKS",
+        description="Số đoạn tối đa mỗi bài (phần sau bị bỏ)",
+        ge=1,
+    )
+
+    pipeline_theo_lo: bool = Field(
+        default=True,
+        alias="PIPELINE_BATCH_MODE",
+        description="Chạy pipeline theo giai đoạn trên cả lô (batch encode/upsert/insert)",
+    )
+
+    duong_dan_chi_muc_ma_ck: str = Field(
+        default="data/ticker_index.pkl",
+        alias="TICKER_INDEX_PATH",
+        description="Chỉ mục mã CK toàn thị trường do import-tickers tạo (rỗng = tắt)",
+    )
+    duong_dan_tu_dien: str = Field(
+        default="config/lexicons.json",
+        alias="LEXICON_PATH",
+        description="File JSON ghi đè từ điển từ khóa {tên từ điển: [từ khóa]} (tùy chọn)",
+    )
+    chu_ky_tai_lai_tu_dien: float = Field(
+        default=30.0,
+        alias="LEXICON_RELOAD_INTERVAL",
+        description="Chu kỳ (giây) kiểm tra thay đổi từ điển ở chế độ daemon (0 = tắt)",
+        ge=0,
+        le=86400,
+    )
+    so_worker_fetch: int = Field(
+        default=4,
+        alias="STREAM_FETCH_WORKERS",
+        description="Số worker fetch nội dung trong pipeline dạng luồng",
+        ge=1,
+        le=64,
+    )
+    kich_thuoc_hang_doi: int = Field(
+        default=64,
+        alias="STREAM_QUEUE_SIZE",
+        description="Kích thước tối đa mỗi hàng đợi giữa các giai đoạn (backpressure)",
+        ge=1,
+        le=10000,
+    )
+    kich_thuoc_lo_ghi: int = Field(
+        default=16,
+        alias="STREAM_WRITE_BATCH",
+        description="Số bài tối đa mỗi lần ghi (encode + upsert + commit) ở chế độ luồng",
+        ge=1,
+        le=1000,
+    )
 
     @field_validator("gemini_api_key")
     @classmethod
     def _chuan_hoa_api_key(cls, value: str) -> str:
         return value.strip()
 
+    @field_validator("sentiment_backend")
+    @classmethod
+    def _kiem_tra_sentiment_backend(cls, value: str) -> str:
+        value = value.strip().lower()
+        if value not in {"auto", "gemini", "local", "keyword"}:
+            raise ValueError("SENTIMENT_BACKEND phải là auto, gemini, local hoặc keyword")
+        return value
+
+    @field_validator("embedding_backend")
+    @classmethod
+    def _kiem_tra_embedding_backend(cls, value: str) -> str:
+        value = value.strip().lower()
+        if value not in {"torch", "onnx"}:
+            raise ValueError("EMBEDDING_BACKEND phải là torch hoặc onnx")
+        return value
+
+    @field_validator("che_do_doan_embedding")
+    @classmethod
+    def _kiem_tra_che_do_doan_embedding(cls, value: str) -> str:
+        value = value.strip().lower()
+        if value not in {"truncate", "mean", "chunks"}:
+            raise ValueError("EMBEDDING_CHUNK_MODE phải là truncate, mean hoặc chunks")
+        return value
+
+    @field_validator("gemini_base_url")
+    @classmethod
+    def _kiem_tra_gemini_base_url(cls, value: str) -> str:
+        value = value.strip().rstrip("/")
+        if not (value.startswith("http://") or value.startswith("https://")):
+            raise ValueError("GEMINI_BASE_URL phải bắt đầu bằng http:// hoặc https://")
+        return value
+
     @field_validator("embedding_model")
     @classmethod
     def _kiem_tra_embedding_model(cls, value: str) -> str:
@@ -133,6 +347,52 @@ class CauHinhCrawler(BaseSettings):
         alias="USER_AGENT",
         description="User-Agent header cho HTTP requests",
     )
+    thu_thap_dong_thoi: bool = Field(
+        default=False,
+        alias="CRAWL_CONCURRENT",
+        description="Tải đồng thời tất cả nguồn bằng asyncio thay vì tuần tự",
+    )
+    conditional_get: bool = Field(
+        default=True,
+        alias="CRAWL_CONDITIONAL_GET",
+        description="Gửi ETag/Last-Modified khi tải feed, trang mục; bỏ qua trang 304",
+    )
+    http2: bool = Field(
+        default=True,
+        alias="HTTP2_ENABLED",
+        description="Dùng HTTP/2 cho pool kết nối dùng chung (cần gói h2)",
+    )
+    keepalive_giay: float = Field(
+        default=30.0,
+        alias="HTTP_KEEPALIVE_SECONDS",
+        description="Thời gian giữ kết nối rảnh trong pool trước khi đóng",
+        ge=0,
+        le=600,
+    )
+    so_ket_noi_toi_da: int = Field(
+        default=16,
+        alias="CRAWL_MAX_CONNECTIONS",
+        description="Số request đồng thời tối đa toàn cục (chế độ đồng thời)",
+        ge=1,
+        le=256,
+    )
+    so_ket_noi_moi_host: int = Field(
+        default=2,
+        alias="CRAWL_MAX_PER_HOST",
+        description="Số request đồng thời tối đa cho mỗi host (chế độ đồng thời)",
+        ge=1,
+        le=32,
+    )
+    gioi_han_toc_host: dict[str, dict[str, float]] = Field(
+        default={
+            "cafef.vn": {"toc_do": 0.5, "burst": 2},
+            "vnexpress.net": {"toc_do": 0.7, "burst": 2},
+            "vietstock.vn": {"toc_do": 0.5, "burst": 2},
+            "thanhnien.vn": {"toc_do": 1.0, "burst": 2},
+        },
+        alias="RATE_LIMITS",
+        description="Token bucket theo host (JSON): {host: {toc_do: req/giây, burst: n}}",
+    )
 
     @field_validator("user_agent")
     @classmethod
@@ -142,6 +402,16 @@ class CauHinhCrawler(BaseSettings):
             raise ValueError("USER_AGENT không được để trống")
         return value
 
+    @field_validator("gioi_han_toc_host")
+    @classmethod
+    def _kiem_tra_gioi_han_toc(
+        cls, value: dict[str, dict[str, float]]
+    ) -> dict[str, dict[str, float]]:
+        for host, cfg in value.items():
+            if cfg.get("toc_do", 1.0) <= 0 or cfg.get("burst", 1.0) < 1:
+                raise ValueError(f"RATE_LIMITS không hợp lệ cho host {host}")
+        return value
+
     model_config = SettingsConfigDict(env_file=".env", extra="ignore")
 
 
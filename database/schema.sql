@@ -26,6 +26,10 @@ CREATE TABLE IF NOT EXISTS tin_tuc_tai_chinh (
                     CHECK (diem_cam_xuc >= -1.0 AND diem_cam_xuc <= 1.0),
     nhan_cam_xuc    VARCHAR(20) DEFAULT 'NEUTRAL'
                     CHECK (nhan_cam_xuc IN ('POSITIVE', 'NEGATIVE', 'NEUTRAL')),
+    -- Bộ phân tích đã gán nhãn: gemini / local / keyword (NULL = bản ghi cũ)
+    nguon_cam_xuc   VARCHAR(20),
+    -- Phiên bản từ điển (mã CK + từ khóa) dùng khi phân tích bài
+    phien_ban_tu_dien VARCHAR(40),
     vector_id       UUID,
     trang_thai      VARCHAR(20) DEFAULT 'PENDING'
                     CHECK (trang_thai IN ('PENDING', 'PROCESSING', 'COMPLETED', 'ERROR')),
@@ -35,6 +39,12 @@ CREATE TABLE IF NOT EXISTS tin_tuc_tai_chinh (
     CONSTRAINT uq_bai_bao UNIQUE (url)
 );
 
+-- ============================================
+-- MIGRATION cho database đã tạo từ schema cũ
+-- ============================================
+ALTER TABLE tin_tuc_tai_chinh ADD COLUMN IF NOT EXISTS nguon_cam_xuc VARCHAR(20);
+ALTER TABLE tin_tuc_tai_chinh ADD COLUMN IF NOT EXISTS phien_ban_tu_dien VARCHAR(40);
+
 -- ============================================
 -- INDEX để tối ưu truy vấn
 -- ============================================
@@ -82,3 +92,30 @@ CREATE TABLE IF NOT EXISTS nhat_ky_thu_thap (
 -- Index cho theo dõi lịch sử
 CREATE INDEX IF NOT EXISTS idx_nhat_ky_thoi_gian
     ON nhat_ky_thu_thap (thoi_gian_bat_dau DESC);
+
+-- ============================================
+-- BẢNG PHỤ: http_validator
+-- ETag / Last-Modified của feed và trang mục (conditional GET)
+-- ============================================
+CREATE TABLE IF NOT EXISTS http_validator (
+    url             VARCHAR(2000) PRIMARY KEY,
+    etag            VARCHAR(500),
+    last_modified   VARCHAR(100),
+    thoi_gian_cap_nhat TIMESTAMP WITH TIME ZONE
+);
+
+-- ============================================
+-- BẢNG PHỤ: ket_qua_phan_tich
+-- Cache kết quả NLP (cảm xúc, mã CK, impact...) theo hash nội dung
+-- ============================================
+CREATE TABLE IF NOT EXISTS ket_qua_phan_tich (
+    khoa            VARCHAR(64) PRIMARY KEY,
+    bo_phan_tich    VARCHAR(50) NOT NULL,
+    phien_ban       VARCHAR(100) NOT NULL,
+    ket_qua         TEXT NOT NULL,
+    thoi_gian_tao   TIMESTAMP WITH TIME ZONE
+);
+
+-- Index cho dọn cache theo bộ phân tích / phiên bản
+CREATE INDEX IF NOT EXISTS ix_ket_qua_phan_tich_phien_ban
+    ON ket_qua_phan_tich (bo_phan_tich, phien_ban);
@@ -108,25 +108,79 @@ def khoi_tao_db() -> None:
 )
 @click.option("--skip-nlp", is_flag=True, default=False, help="Bỏ qua bước xử lý NLP")
 @click.option("--no-embedding", is_flag=True, default=False, help="Không tạo embeddings")
-def thu_thap(once: bool, daemon: bool, interval: int, skip_nlp: bool, no_embedding: bool) -> None:
+@click.option(
+    "--concurrent/--sequential",
+    default=None,
+    help="Tải đồng thời tất cả nguồn (asyncio). Mặc định theo CRAWL_CONCURRENT",
+)
+@click.option(
+    "--stream",
+    is_flag=True,
+    default=False,
+    help="Pipeline dạng luồng: crawl, fetch, NLP, lưu chạy chồng lên nhau",
+)
+@click.option(
+    "--preload-model/--no-preload-model",
+    default=None,
+    help="Tải model embedding nền khi khởi động (mặc định: EMBEDDING_PRELOAD nếu --daemon)",
+)
+def thu_thap(
+    once: bool,
+    daemon: bool,
+    interval: int,
+    skip_nlp: bool,
+    no_embedding: bool,
+    concurrent: bool | None,
+    stream: bool,
+    preload_model: bool | None,
+) -> None:
     """🕷️ Thu thập tin tức từ các nguồn.
 
     Mặc định chạy một lần. Dùng --daemon để chạy liên tục.
     """
     import logging
 
-    from config.settings import lay_cau_hinh_he_thong
+    from config.settings import lay_cau_hinh_crawler, lay_cau_hinh_he_thong, lay_cau_hinh_nlp
+    from news_ingestor.crawlers.async_engine import BoThuThapDongThoi
     from news_ingestor.crawlers.scheduler import BoLichThuThap
     from news_ingestor.storage.database import lay_quan_ly_db
+    from news_ingestor.storage.http_cache import KhoValidatorHttp
 
     logger = logging.getLogger(__name__)
 
+    # Tải model embedding nền, chồng lên khởi tạo DB + kết nối Qdrant bên dưới
+    if preload_model is None:
+        preload_model = daemon and lay_cau_hinh_nlp().khoi_dong_embedding
+    bo_embedding = None
+    if preload_model and not skip_nlp and not no_embedding:
+        from news_ingestor.processing.embeddings import BoTaoEmbeddings
+
+        bo_embedding = BoTaoEmbeddings(dung_cache=True)
+        # Fork pool worker (nếu bật) trước khi có thread hâm nóng
+        try:
+            bo_embedding.dung_nhieu_tien_trinh(lay_cau_hinh_nlp().so_tien_trinh_embedding)
+        except Exception as e:
+            logger.warning(f"Không thể khởi động pool embedding, encode tại chỗ: {e}")
+        bo_embedding.khoi_dong_nen()
+
     # Khởi tạo DB
     db = lay_quan_ly_db()
     db.khoi_tao_bang()
 
     # Khởi tạo scheduler
-    scheduler = BoLichThuThap()
+    cau_hinh_crawler = lay_cau_hinh_crawler()
+    if concurrent is None:
+        concurrent = cau_hinh_crawler.thu_thap_dong_thoi
+
+    bo_dong_thoi = None
+    if concurrent:
+        bo_dong_thoi = BoThuThapDongThoi(
+            so_ket_noi_toi_da=cau_hinh_crawler.so_ket_noi_toi_da,
+            so_ket_noi_moi_host=cau_hinh_crawler.so_ket_noi_moi_host,
+            timeout=cau_hinh_crawler.timeout_giay,
+        )
+    kho_validator = KhoValidatorHttp() if cau_hinh_crawler.conditional_get else None
+    scheduler = BoLichThuThap(bo_dong_thoi=bo_dong_thoi, kho_validator=kho_validator)
     scheduler.dang_ky_tat_ca()
 
     if not skip_nlp:
@@ -165,18 +219,36 @@ def thu_thap(once: bool, daemon: bool, interval: int, skip_nlp: bool, no_embeddi
             kho_vector=kho_vector,
             tao_embedding=not no_embedding and kho_vector is not None,
             bo_canh_bao=bo_canh_bao,
+            bo_embedding=bo_embedding,
         )
 
-        def callback(danh_sach_bai):
-            pipeline.xu_ly_hang_loat(danh_sach_bai)
+        if stream:
+            from news_ingestor.processing.streaming import LuongXuLyDongChay
 
-        scheduler.dat_callback(callback)
+            cau_hinh_nlp = lay_cau_hinh_nlp()
+            scheduler.dat_dong_chay(
+                LuongXuLyDongChay(
+                    pipeline,
+                    so_worker_fetch=cau_hinh_nlp.so_worker_fetch,
+                    kich_thuoc_hang_doi=cau_hinh_nlp.kich_thuoc_hang_doi,
+                    kich_thuoc_lo_ghi=cau_hinh_nlp.kich_thuoc_lo_ghi,
+                )
+            )
+        else:
+            def callback(danh_sach_bai):
+                pipeline.xu_ly_hang_loat(danh_sach_bai)
+
+            scheduler.dat_callback(callback)
     else:
         click.echo("⚠️ Bỏ qua xử lý NLP (--skip-nlp)")
+        if stream:
+            click.echo("⚠️ --stream cần bước NLP, chạy chế độ thường")
 
     if daemon:
         click.echo(f"🔄 Chế độ daemon - Chu kỳ: {interval}s ({interval // 60} phút)")
         click.echo("   Nhấn Ctrl+C để dừng")
+        if not skip_nlp and pipeline.bat_dau_theo_doi_tu_dien():
+            click.echo("   Tự tải lại từ điển NLP khi tickers.json / LEXICON_PATH thay đổi")
         scheduler.chay_daemon(khoang_cach_giay=interval)
     else:
         click.echo("▶️ Thu thập một lần...")
@@ -185,11 +257,20 @@ def thu_thap(once: bool, daemon: bool, interval: int, skip_nlp: bool, no_embeddi
 
 
 @cli.command("serve-mcp")
-def phuc_vu_mcp() -> None:
+@click.option(
+    "--preload-model/--no-preload-model",
+    default=None,
+    help="Tải model embedding trên thread nền khi khởi động (mặc định: EMBEDDING_PRELOAD)",
+)
+def phuc_vu_mcp(preload_model: bool | None) -> None:
     """🌐 Khởi động MCP Server cho AI Agent.
 
     Server chạy qua stdio protocol.
     """
+    from config.settings import lay_cau_hinh_nlp
+
+    if preload_model is None:
+        preload_model = lay_cau_hinh_nlp().khoi_dong_embedding
     click.echo("🌐 Đang khởi động MCP Server: tin-tuc-tai-chinh...")
     click.echo(
         "   Tools: tim_tin_vi_mo, lay_tin_doanh_nghiep, tim_kiem_ngu_nghia, "
@@ -197,7 +278,7 @@ def phuc_vu_mcp() -> None:
     )
 
     from news_ingestor.mcp_server.server import chay_server
-    asyncio.run(chay_server())
+    asyncio.run(chay_server(khoi_dong_model=preload_model))
 
 
 @cli.command("high-impact")
@@ -260,8 +341,15 @@ def thong_ke() -> None:
 @click.option("--days", type=int, default=7, help="Khung thời gian đánh giá (ngày)")
 @click.option("--limit", type=int, default=500, help="Số bản ghi tối đa để đánh giá")
 @click.option("--json-output", is_flag=True, default=False, help="In kết quả dạng JSON")
-def danh_gia(days: int, limit: int, json_output: bool) -> None:
+@click.option(
+    "--impact-labels",
+    default=None,
+    help="CSV gán nhãn impact (tieu_de, noi_dung, ma_ck, impact_level) để so sánh v1/v2",
+)
+def danh_gia(days: int, limit: int, json_output: bool, impact_labels: str | None) -> None:
     """🧪 Đánh giá chất lượng pipeline trên dữ liệu đã ingest."""
+    from config.settings import lay_cau_hinh_nlp
+    from news_ingestor.processing.sentiment_model import tai_mo_hinh_neu_co
     from news_ingestor.storage.database import lay_quan_ly_db
     from news_ingestor.storage.repository import KhoTinTuc
     from news_ingestor.utils.evaluation import tao_bao_cao_pipeline
@@ -271,10 +359,18 @@ def danh_gia(days: int, limit: int, json_output: bool) -> None:
 
     kho = KhoTinTuc()
     ds = kho.lay_tat_ca(gioi_han=limit)
-    bao_cao = tao_bao_cao_pipeline(ds_bai=ds, so_ngay=days)
+    mo_hinh = tai_mo_hinh_neu_co(lay_cau_hinh_nlp().duong_dan_mo_hinh_cam_xuc)
+    if mo_hinh is not None:
+        bao_cao = tao_bao_cao_pipeline(ds_bai=ds, so_ngay=days, du_doan_cam_xuc=mo_hinh.du_doan)
+    else:
+        bao_cao = tao_bao_cao_pipeline(ds_bai=ds, so_ngay=days)
+    so_sanh = _so_sanh_impact(impact_labels) if impact_labels else None
 
     if json_output:
-        click.echo(json.dumps(asdict(bao_cao), ensure_ascii=False, indent=2))
+        ket_qua = asdict(bao_cao)
+        if so_sanh is not None:
+            ket_qua["impact_comparison"] = asdict(so_sanh)
+        click.echo(json.dumps(ket_qua, ensure_ascii=False, indent=2))
         return
 
     click.echo("Evaluation summary")
@@ -298,6 +394,209 @@ def danh_gia(days: int, limit: int, json_output: bool) -> None:
         f"- Avg length (orig/sum): {bao_cao.avg_original_length:.2f}/"
         f"{bao_cao.avg_summary_length:.2f}"
     )
+    if bao_cao.sentiment_model_accuracy is not None:
+        click.echo(
+            f"- Local sentiment model vs Gemini: {bao_cao.sentiment_model_accuracy * 100:.2f}%"
+        )
+    if so_sanh is not None:
+        click.echo(
+            f"- Impact accuracy v1/v2 ({so_sanh.moi.so_mau} labels): "
+            f"{so_sanh.cu.accuracy * 100:.2f}% → {so_sanh.moi.accuracy * 100:.2f}% "
+            f"({so_sanh.chenh_lech_accuracy * 100:+.2f} pts)"
+        )
+
+
+def _so_sanh_impact(duong_dan: str):
+    """Chạy classifier impact v1 (chuỗi con) và v2 (n-gram) trên tập gán nhãn."""
+    from news_ingestor.processing.impact_classifier import BoPhanLoaiTacDong
+    from news_ingestor.utils.evaluation import doc_mau_impact, so_sanh_impact_classifier
+    from news_ingestor.utils.text_utils import VanBanChuanHoa
+
+    ds_mau = doc_mau_impact(duong_dan)
+    ds_van_ban = [
+        VanBanChuanHoa.tu_van_ban(f"{m['tieu_de']} {m['noi_dung']}".strip()) for m in ds_mau
+    ]
+    ds_ma_ck = [m["ma_ck"] for m in ds_mau]
+    return so_sanh_impact_classifier(
+        BoPhanLoaiTacDong(che_do="v1").phan_loai_nhieu(ds_van_ban, ds_ma_ck),
+        BoPhanLoaiTacDong(che_do="v2").phan_loai_nhieu(ds_van_ban, ds_ma_ck),
+        [m["impact_level"] for m in ds_mau],
+    )
+
+
+@cli.command("train-sentiment")
+@click.option("--output", default=None, help="File mô hình (mặc định: SENTIMENT_MODEL_PATH)")
+@click.option("--limit", type=int, default=None, help="Số mẫu tối đa lấy từ DB")
+@click.option("--min-samples", type=int, default=200, help="Số mẫu tối thiểu để huấn luyện")
+@click.option("--epochs", type=int, default=200, help="Số vòng lặp Adam (full-batch)")
+@click.option("--test-ratio", type=float, default=0.2, help="Tỷ lệ mẫu giữ lại để đánh giá")
+def huan_luyen_cam_xuc(
+    output: str | None, limit: int | None, min_samples: int, epochs: int, test_ratio: float
+) -> None:
+    """🧠 Huấn luyện mô hình cảm xúc cục bộ từ các bài đã được Gemini gán nhãn."""
+    import random
+
+    from config.settings import lay_cau_hinh_nlp
+    from news_ingestor.processing.sentiment_model import huan_luyen
+    from news_ingestor.storage.database import lay_quan_ly_db
+    from news_ingestor.storage.repository import KhoTinTuc
+    from news_ingestor.utils.evaluation import danh_gia_cam_xuc
+
+    if not 0.0 <= test_ratio < 1.0:
+        raise click.BadParameter("--test-ratio phải trong [0, 1)")
+
+    lay_quan_ly_db().khoi_tao_bang()
+    mau = KhoTinTuc().lay_mau_cam_xuc(nguon="gemini", gioi_han=limit)
+    if len(mau) < min_samples:
+        click.echo(f"❌ Chỉ có {len(mau)} bài có nhãn Gemini, cần tối thiểu {min_samples}")
+        sys.exit(1)
+
+    # Chia cố định (seed) để các lần huấn luyện so sánh được với nhau
+    random.Random(42).shuffle(mau)
+    so_kiem_tra = int(len(mau) * test_ratio)
+    kiem_tra, huan_luyen_mau = mau[:so_kiem_tra], mau[so_kiem_tra:]
+
+    mo_hinh = huan_luyen(
+        [van_ban for van_ban, _ in huan_luyen_mau],
+        [nhan for _, nhan in huan_luyen_mau],
+        so_vong=epochs,
+    )
+    if kiem_tra:
+        ket_qua = danh_gia_cam_xuc(
+            mo_hinh.du_doan([van_ban for van_ban, _ in kiem_tra]),
+            [nhan for _, nhan in kiem_tra],
+        )
+        click.echo(
+            f"🎯 Độ chính xác trên {ket_qua.so_mau} mẫu giữ lại: {ket_qua.accuracy * 100:.2f}%"
+        )
+
+    duong_dan = output or lay_cau_hinh_nlp().duong_dan_mo_hinh_cam_xuc
+    so_byte = mo_hinh.luu(duong_dan)
+    click.echo(
+        f"✅ Đã lưu mô hình {mo_hinh.phien_ban} ({len(huan_luyen_mau)} mẫu, "
+        f"{so_byte / 1024:.0f} KB) vào {duong_dan}"
+    )
+
+
+@cli.command("import-tickers")
+@click.option("--csv", "duong_dan_csv", required=True, help="CSV danh sách niêm yết HOSE/HNX/UPCoM")
+@click.option("--output", default=None, help="File chỉ mục đầu ra (mặc định: TICKER_INDEX_PATH)")
+@click.option(
+    "--merge-json/--no-merge-json",
+    default=True,
+    help="Gộp từ khóa thủ công trong config/tickers.json",
+)
+def nhap_ma_ck(duong_dan_csv: str, output: str | None, merge_json: bool) -> None:
+    """🏷️ Tạo chỉ mục bí danh mã CK toàn thị trường từ CSV."""
+    from config.settings import lay_cau_hinh_nlp
+    from news_ingestor.processing.ticker_index import (
+        doc_csv_niem_yet,
+        gop_tu_khoa,
+        luu_chi_muc,
+        xay_dung_chi_muc,
+    )
+
+    ma_ck = doc_csv_niem_yet(duong_dan_csv)
+    if merge_json and Path("config/tickers.json").exists():
+        with open("config/tickers.json", encoding="utf-8") as f:
+            ma_ck = gop_tu_khoa(json.load(f).get("ma_chung_khoan", {}), ma_ck)
+
+    chi_muc = xay_dung_chi_muc(ma_ck)
+    duong_dan = output or lay_cau_hinh_nlp().duong_dan_chi_muc_ma_ck
+    so_byte = luu_chi_muc(chi_muc, duong_dan)
+
+    click.echo(
+        f"✅ Đã tạo chỉ mục {chi_muc.so_ma} mã CK, {chi_muc.bo_khop.so_mau} bí danh, "
+        f"{chi_muc.bo_khop.so_trang_thai} trạng thái → {duong_dan} ({so_byte / 1024:.1f} KB)"
+    )
+
+
+@cli.command("reindex")
+@click.option("--batch-size", type=int, default=256, help="Số bài mỗi lần encode + upsert")
+@click.option("--limit", type=int, default=None, help="Số bài tối đa (mặc định: tất cả)")
+@click.option(
+    "--workers",
+    type=int,
+    default=None,
+    help="Số tiến trình encode dùng chung model (mặc định: EMBEDDING_WORKERS)",
+)
+def tao_lai_chi_muc_vector(batch_size: int, limit: int | None, workers: int | None) -> None:
+    """🔁 Tạo lại vector cho mọi bài trong DB và upsert vào Qdrant (dùng cache embedding)."""
+    import time
+    import uuid
+
+    from config.settings import lay_cau_hinh_nlp
+    from news_ingestor.processing.embeddings import BoTaoEmbeddings
+    from news_ingestor.processing.pipeline import LuongXuLy
+    from news_ingestor.storage.database import lay_quan_ly_db
+    from news_ingestor.storage.repository import KhoTinTuc
+    from news_ingestor.storage.vector_store import KhoVector
+
+    lay_quan_ly_db().khoi_tao_bang()
+    kho_vector = KhoVector()
+    if not kho_vector.ket_noi():
+        click.echo("❌ Không kết nối được Qdrant, dừng reindex")
+        sys.exit(1)
+
+    kho = KhoTinTuc()
+    bo_tao = BoTaoEmbeddings(dung_cache=True)
+    if workers is None:
+        workers = lay_cau_hinh_nlp().so_tien_trinh_embedding
+    if bo_tao.dung_nhieu_tien_trinh(workers):
+        click.echo(f"   Encode trên {workers} tiến trình")
+    bat_dau = time.perf_counter()
+    tong = 0
+    try:
+        for lo in kho.lap_theo_lo(kich_thuoc_lo=batch_size, gioi_han=limit):
+            ds_vector_id = [b.vector_id or str(uuid.uuid4()) for b in lo]
+            diem = LuongXuLy.tao_diem_vector(
+                bo_tao, lo, [f"{b.tieu_de} {b.noi_dung_goc}" for b in lo], ds_vector_id
+            )
+            kho_vector.luu_nhieu_vector(*diem)
+            LuongXuLy.xoa_diem_cu(kho_vector, lo, diem[2])
+            kho.cap_nhat_vector_id(
+                {b.id: v for b, v in zip(lo, ds_vector_id, strict=True) if not b.vector_id}
+            )
+            tong += len(lo)
+            click.echo(f"   {tong} bài...")
+    finally:
+        bo_tao.dung_pool()
+
+    thoi_gian = time.perf_counter() - bat_dau
+    click.echo(f"✅ Đã reindex {tong} bài trong {thoi_gian:.1f}s")
+    bo_nho_dem = bo_tao.lay_bo_nho_dem()
+    if bo_nho_dem is not None:
+        thong_ke = bo_nho_dem.thong_ke()
+        click.echo(
+            f"   Cache embedding: {thong_ke['ty_le_trung'] * 100:.1f}% trúng, "
+            f"{thong_ke['so_vector']} vector ({thong_ke['kich_thuoc_mb']} MB)"
+        )
+
+
+@cli.command("export-onnx")
+@click.option("--output", default=None, help="Thư mục đầu ra (mặc định: EMBEDDING_ONNX_PATH)")
+@click.option(
+    "--quantize/--no-quantize",
+    default=True,
+    help="Lượng tử hóa int8 động (mặc định bật)",
+)
+def xuat_model_onnx(output: str | None, quantize: bool) -> None:
+    """📦 Xuất model embedding sang ONNX (int8) cho EMBEDDING_BACKEND=onnx."""
+    from config.settings import lay_cau_hinh_nlp
+    from news_ingestor.processing.embeddings import xuat_onnx
+
+    cau_hinh = lay_cau_hinh_nlp()
+    thu_muc = output or cau_hinh.duong_dan_embedding_onnx
+    try:
+        duong_dan = xuat_onnx(cau_hinh.embedding_model, thu_muc, luong_tu_hoa=quantize)
+    except ImportError as e:
+        click.echo(f"❌ Thiếu thư viện ({e}); cài: pip install 'news-ingestor[onnx]'")
+        sys.exit(1)
+
+    click.echo(
+        f"✅ Đã xuất {cau_hinh.embedding_model} ({'int8' if quantize else 'fp32'}) → "
+        f"{duong_dan} ({duong_dan.stat().st_size / 1024 / 1024:.1f} MB)"
+    )
 
 
 def main() -> None:
@@ -0,0 +1,118 @@
+"""Async Engine - Tải đồng thời các trang nguồn của nhiều crawler qua httpx.AsyncClient."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from functools import partial
+from urllib.parse import urlparse
+
+import httpx
+
+from news_ingestor.crawlers.base import BaseCrawler
+from news_ingestor.models.article import BaiBaoTho
+from news_ingestor.utils.http_pool import lay_bo_ket_noi
+
+logger = logging.getLogger(__name__)
+
+
+class BoThuThapDongThoi:
+    """Chạy tất cả crawlers và tất cả mục/feed của chúng đồng thời.
+
+    - Giới hạn số kết nối đồng thời toàn cục
+    - Giới hạn số kết nối đồng thời theo từng host (lịch sự với nguồn tin)
+    - Giữ nguyên thứ tự kết quả: theo crawler, rồi theo thứ tự trang
+    """
+
+    def __init__(
+        self,
+        so_ket_noi_toi_da: int = 16,
+        so_ket_noi_moi_host: int = 2,
+        timeout: int = 30,
+        transport: httpx.AsyncBaseTransport | None = None,
+    ):
+        self._so_ket_noi_toi_da = so_ket_noi_toi_da
+        self._so_ket_noi_moi_host = so_ket_noi_moi_host
+        self._timeout = timeout
+        self._transport = transport
+        self._gioi_han_toan_cuc: asyncio.Semaphore | None = None
+        self._gioi_han_host: dict[str, asyncio.Semaphore] = {}
+
+    def thu_thap(self, crawlers: list[BaseCrawler]) -> list[list[BaiBaoTho]]:
+        """Chạy một chu kỳ thu thập đồng thời (blocking).
+
+        Returns:
+            Danh sách kết quả tương ứng từng crawler theo thứ tự đầu vào.
+        """
+        return asyncio.run(self.thu_thap_async(crawlers))
+
+    async def thu_thap_async(self, crawlers: list[BaseCrawler]) -> list[list[BaiBaoTho]]:
+        """Thu thập đồng thời trong event loop hiện tại."""
+        # Semaphore gắn với event loop đang chạy nên tạo mới mỗi chu kỳ
+        self._gioi_han_toan_cuc = asyncio.Semaphore(self._so_ket_noi_toi_da)
+        self._gioi_han_host = {}
+
+        # AsyncClient gắn với event loop của chu kỳ này; cấu hình lấy từ pool chung
+        async with lay_bo_ket_noi().tao_async_client(
+            so_ket_noi_toi_da=self._so_ket_noi_toi_da,
+            transport=self._transport,
+        ) as client:
+            return await asyncio.gather(
+                *(self._thu_thap_crawler(client, crawler) for crawler in crawlers)
+            )
+
+    async def _thu_thap_crawler(
+        self, client: httpx.AsyncClient, crawler: BaseCrawler
+    ) -> list[BaiBaoTho]:
+        """Thu thập tất cả trang của một crawler đồng thời."""
+        try:
+            lay_trang = getattr(crawler, "danh_sach_trang", None)
+            danh_sach_trang = lay_trang() if lay_trang else []
+            if not danh_sach_trang:
+                # Crawler chưa tách trang → chạy đồng bộ trong thread riêng
+                return await asyncio.to_thread(crawler.thu_thap)
+
+            ket_qua_trang = await asyncio.gather(
+                *(self._thu_thap_trang(client, crawler, trang) for trang in danh_sach_trang)
+            )
+            return [bai for ds in ket_qua_trang for bai in ds]
+        except Exception as e:
+            logger.error(f"Lỗi crawler {crawler.ten_nguon}: {e}", exc_info=True)
+            return []
+
+    async def _thu_thap_trang(
+        self, client: httpx.AsyncClient, crawler: BaseCrawler, trang: dict
+    ) -> list[BaiBaoTho]:
+        """Tải và phân tích một trang mục/feed."""
+        url = trang.get("url", "")
+        ten = trang.get("ten", url)
+        try:
+            noi_dung = await crawler.gui_request_async(
+                client, url, gioi_han=partial(self._khe_ket_noi, url)
+            )
+            if not noi_dung:
+                return []
+
+            # Parse HTML/XML tốn CPU → đẩy sang thread để không chặn các request khác
+            tin = await asyncio.to_thread(crawler.phan_tich_trang, noi_dung, trang)
+            crawler.danh_dau_da_phan_tich(url)
+            logger.info(f"  → {len(tin)} bài từ {ten}")
+            return tin
+        except Exception as e:
+            logger.error(f"Lỗi thu thập {ten}: {e}")
+            return []
+
+    @asynccontextmanager
+    async def _khe_ket_noi(self, url: str) -> AsyncIterator[None]:
+        """Giữ một slot của host rồi một slot toàn cục trong suốt request."""
+        host = urlparse(url).netloc.lower()
+        gioi_han_host = self._gioi_han_host.get(host)
+        if gioi_han_host is None:
+            gioi_han_host = asyncio.Semaphore(self._so_ket_noi_moi_host)
+            self._gioi_han_host[host] = gioi_han_host
+
+        async with gioi_han_host:
+            async with self._gioi_han_toan_cuc:
+                yield
@@ -2,16 +2,27 @@
 
 from __future__ import annotations
 
+import asyncio
 import logging
 import random
 import time
 from abc import ABC, abstractmethod
+from collections.abc import Callable, Iterator
+from contextlib import AbstractAsyncContextManager, nullcontext
+from typing import TYPE_CHECKING
 
 import httpx
 
 from news_ingestor.models.article import BaiBaoTho
+from news_ingestor.utils.http_pool import lay_bo_ket_noi
+from news_ingestor.utils.metrics import lay_metrics
+from news_ingestor.utils.rate_limiter import BoGioiHanToc, lay_bo_gioi_han_toc
+
+if TYPE_CHECKING:
+    from news_ingestor.storage.http_cache import KhoValidatorHttp
 
 logger = logging.getLogger(__name__)
+metrics = lay_metrics()
 
 # Danh sách User-Agent luân phiên để tránh bị chặn
 DANH_SACH_USER_AGENT = [
@@ -43,8 +54,10 @@ class BaseCrawler(ABC):
     """Lớp trừu tượng cơ sở cho bộ thu thập tin tức.
 
     Cung cấp:
-    - HTTP client với retry và rate limiting
+    - HTTP client dùng chung toàn process (HTTP/2, keep-alive) với retry
+    - Rate limiting theo host (token bucket dùng chung)
     - Luân phiên User-Agent
+    - Conditional GET (ETag/Last-Modified) khi có kho validator
     - Xử lý lỗi thống nhất
     """
 
@@ -54,54 +67,171 @@ class BaseCrawler(ABC):
         timeout: int = 30,
         so_lan_thu_lai: int = 3,
         do_tre_giua_request: float = 1.0,
+        bo_gioi_han: BoGioiHanToc | None = None,
+        kho_validator: KhoValidatorHttp | None = None,
     ):
         self.ten_nguon = ten_nguon
         self._timeout = timeout
         self._so_lan_thu_lai = so_lan_thu_lai
+        # Khoảng cách mặc định cho host chưa cấu hình trong RATE_LIMITS
         self._do_tre = do_tre_giua_request
+        self._bo_gioi_han = bo_gioi_han or lay_bo_gioi_han_toc()
+        self._kho_validator = kho_validator
+        # Validator của response 200 chưa ghi vào kho: chờ phân tích trang xong
+        # (_validator_cho → _validator_da_phan_tich) rồi scheduler mới chốt
+        self._validator_cho: dict[str, dict[str, str]] = {}
+        self._validator_da_phan_tich: dict[str, dict[str, str]] = {}
+        # Client riêng (chủ yếu cho test); mặc định mượn pool dùng chung
         self._client: httpx.Client | None = None
 
+    def dat_kho_validator(self, kho_validator: KhoValidatorHttp | None) -> None:
+        """Bật conditional GET cho các trang nguồn (feed, trang mục)."""
+        self._kho_validator = kho_validator
+
+    def _header_dieu_kien(self, url: str) -> dict[str, str]:
+        """Header If-None-Match / If-Modified-Since cho URL (nếu có)."""
+        if self._kho_validator is None:
+            return {}
+        return self._kho_validator.lay_header(url)
+
+    def danh_dau_da_phan_tich(self, url: str) -> None:
+        """Trang ``url`` đã phân tích xong: validator của nó được phép chốt."""
+        validator = self._validator_cho.pop(url, None)
+        if validator is not None:
+            self._validator_da_phan_tich[url] = validator
+
+    def xac_nhan_validator(self) -> int:
+        """Ghi validator của các trang đã phân tích vào kho; trả về số URL đã ghi.
+
+        Gọi sau khi bài của chu kỳ đã được bàn giao (lưu) thành công. Validator
+        của trang phân tích lỗi bị bỏ, nên lần sau trang được tải lại đầy đủ.
+        """
+        da_phan_tich, self._validator_da_phan_tich = self._validator_da_phan_tich, {}
+        self._validator_cho = {}
+        if self._kho_validator is None:
+            return 0
+        for url, validator in da_phan_tich.items():
+            self._kho_validator.cap_nhat(url, validator)
+        return len(da_phan_tich)
+
+    def huy_validator(self) -> None:
+        """Bỏ mọi validator chưa chốt (chu kỳ lỗi: lần sau tải lại đầy đủ)."""
+        self._validator_cho = {}
+        self._validator_da_phan_tich = {}
+
+    def _xu_ly_response(self, url: str, response: httpx.Response) -> str | None:
+        """Xử lý response thành công; 304 trả về None để bỏ qua bước phân tích."""
+        if response.status_code == 304:
+            metrics.tang("http_cache_hit")
+            logger.debug(f"Không thay đổi (304): {url}")
+            return None
+
+        response.raise_for_status()
+
+        if self._kho_validator is not None:
+            metrics.tang("http_cache_miss")
+            validator = {
+                ten: response.headers[ten]
+                for ten in ("etag", "last-modified")
+                if ten in response.headers
+            }
+            if validator:
+                self._validator_cho[url] = validator
+
+        logger.debug(
+            f"Request thành công: {url}",
+            extra={"extra_fields": {"status_code": response.status_code}},
+        )
+        return response.text
+
     def _tao_client(self) -> httpx.Client:
-        """Tạo HTTP client với cấu hình phù hợp."""
-        if self._client is None or self._client.is_closed:
-            self._client = httpx.Client(
-                timeout=self._timeout,
-                follow_redirects=True,
-                headers={
-                    "User-Agent": random.choice(DANH_SACH_USER_AGENT),
-                    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
-                    "Accept-Language": "vi-VN,vi;q=0.9,en-US;q=0.8,en;q=0.7",
-                    "Accept-Encoding": "gzip, deflate",
-                    "Connection": "keep-alive",
-                },
-            )
-        return self._client
+        """Lấy HTTP client: client riêng nếu có, ngược lại mượn pool dùng chung."""
+        if self._client is not None and not self._client.is_closed:
+            return self._client
+        return lay_bo_ket_noi().lay_client()
 
     def gui_request(self, url: str) -> str | None:
         """Gửi HTTP GET request với retry logic.
 
         Returns:
-            Nội dung response dạng text, hoặc None nếu thất bại.
+            Nội dung response dạng text, hoặc None nếu thất bại hoặc trang
+            không thay đổi (304) kể từ lần tải trước.
         """
         client = self._tao_client()
 
         for lan_thu in range(1, self._so_lan_thu_lai + 1):
             try:
-                # Luân phiên User-Agent mỗi lần thử
-                client.headers["User-Agent"] = random.choice(DANH_SACH_USER_AGENT)
+                # Rate limiting: chỉ chờ khi host này đã hết token
+                self._bo_gioi_han.cho(url, self._do_tre)
 
-                response = client.get(url)
-                response.raise_for_status()
+                # Luân phiên User-Agent mỗi lần thử (theo request, không sửa client chung)
+                response = client.get(
+                    url,
+                    headers={
+                        "User-Agent": random.choice(DANH_SACH_USER_AGENT),
+                        **self._header_dieu_kien(url),
+                    },
+                    timeout=self._timeout,
+                )
+                return self._xu_ly_response(url, response)
 
-                logger.debug(
-                    f"Request thành công: {url}",
-                    extra={"extra_fields": {"status_code": response.status_code}},
+            except httpx.TimeoutException:
+                logger.warning(
+                    f"Timeout lần {lan_thu}/{self._so_lan_thu_lai}: {url}"
+                )
+            except httpx.HTTPStatusError as e:
+                logger.warning(
+                    f"HTTP Error {e.response.status_code} lần {lan_thu}: {url}"
+                )
+                if e.response.status_code == 429:  # Rate limited
+                    thoi_gian_cho = 2 ** lan_thu + random.uniform(0, 1)
+                    logger.info(f"Rate limited, chờ {thoi_gian_cho:.1f}s...")
+                    time.sleep(thoi_gian_cho)
+            except Exception as e:
+                logger.error(
+                    f"Lỗi không xác định lần {lan_thu}: {e}"
                 )
 
-                # Rate limiting: chờ ngẫu nhiên giữa các request
-                time.sleep(self._do_tre * random.uniform(0.5, 1.5))
+            if lan_thu < self._so_lan_thu_lai:
+                thoi_gian_cho = lan_thu * 2 + random.uniform(0, 1)
+                time.sleep(thoi_gian_cho)
+
+        logger.error(f"Thất bại sau {self._so_lan_thu_lai} lần thử: {url}")
+        return None
+
+    async def gui_request_async(
+        self,
+        client: httpx.AsyncClient,
+        url: str,
+        gioi_han: Callable[[], AbstractAsyncContextManager] | None = None,
+    ) -> str | None:
+        """Phiên bản bất đồng bộ của ``gui_request`` với cùng logic retry.
+
+        Args:
+            client: AsyncClient dùng chung cho cả chu kỳ thu thập.
+            url: Địa chỉ cần tải.
+            gioi_han: Hàm tạo context manager giới hạn đồng thời (toàn cục +
+                theo host), giữ trong suốt request.
+
+        Returns:
+            Nội dung response dạng text, hoặc None nếu thất bại hoặc 304.
+        """
+        for lan_thu in range(1, self._so_lan_thu_lai + 1):
+            try:
+                # Chờ token trước khi giữ slot kết nối để không chặn host khác
+                await self._bo_gioi_han.cho_async(url, self._do_tre)
 
-                return response.text
+                async with gioi_han() if gioi_han is not None else nullcontext():
+                    response = await client.get(
+                        url,
+                        headers={
+                            "User-Agent": random.choice(DANH_SACH_USER_AGENT),
+                            **self._header_dieu_kien(url),
+                        },
+                        timeout=self._timeout,
+                    )
+
+                return self._xu_ly_response(url, response)
 
             except httpx.TimeoutException:
                 logger.warning(
@@ -114,7 +244,7 @@ class BaseCrawler(ABC):
                 if e.response.status_code == 429:  # Rate limited
                     thoi_gian_cho = 2 ** lan_thu + random.uniform(0, 1)
                     logger.info(f"Rate limited, chờ {thoi_gian_cho:.1f}s...")
-                    time.sleep(thoi_gian_cho)
+                    await asyncio.sleep(thoi_gian_cho)
             except Exception as e:
                 logger.error(
                     f"Lỗi không xác định lần {lan_thu}: {e}"
@@ -122,7 +252,7 @@ class BaseCrawler(ABC):
 
             if lan_thu < self._so_lan_thu_lai:
                 thoi_gian_cho = lan_thu * 2 + random.uniform(0, 1)
-                time.sleep(thoi_gian_cho)
+                await asyncio.sleep(thoi_gian_cho)
 
         logger.error(f"Thất bại sau {self._so_lan_thu_lai} lần thử: {url}")
         return None
@@ -132,8 +262,43 @@ class BaseCrawler(ABC):
         """Thu thập tin tức từ nguồn. Phải được override bởi lớp con."""
         ...
 
+    def danh_sach_trang(self) -> list[dict]:
+        """Danh sách trang nguồn (mục/feed) để tải đồng thời.
+
+        Mỗi phần tử cần có ít nhất ``url`` và ``ten``. Crawler trả về danh
+        sách rỗng sẽ được chạy bằng ``thu_thap`` đồng bộ trong thread riêng.
+        """
+        return []
+
+    def phan_tich_trang(self, noi_dung: str, trang: dict) -> list[BaiBaoTho]:
+        """Phân tích nội dung một trang đã tải thành danh sách bài báo."""
+        return []
+
+    def thu_thap_theo_trang(self) -> Iterator[list[BaiBaoTho]]:
+        """Thu thập dần: trả về bài của từng trang ngay sau khi phân tích xong.
+
+        Dùng cho pipeline dạng luồng để bài đầu tiên được xử lý sớm thay vì
+        chờ toàn bộ crawler hoàn thành.
+        """
+        danh_sach_trang = self.danh_sach_trang()
+        if not danh_sach_trang:
+            yield self.thu_thap()
+            return
+
+        for trang in danh_sach_trang:
+            ten = trang.get("ten", trang.get("url", ""))
+            try:
+                noi_dung = self.gui_request(trang["url"])
+                tin = self.phan_tich_trang(noi_dung, trang) if noi_dung else []
+                self.danh_dau_da_phan_tich(trang["url"])
+            except Exception as e:
+                logger.error(f"Lỗi thu thập {ten}: {e}")
+                continue
+            logger.info(f"  → {len(tin)} bài từ {ten}")
+            yield tin
+
     def dong(self) -> None:
-        """Đóng HTTP client."""
+        """Đóng client riêng (nếu có); pool dùng chung không bị đóng."""
         if self._client and not self._client.is_closed:
             self._client.close()
 
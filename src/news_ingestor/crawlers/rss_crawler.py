@@ -80,12 +80,24 @@ class RSSCrawler(BaseCrawler):
         logger.info(f"Tổng cộng: {len(tat_ca_tin)} bài từ {len(self._nguon_feeds)} nguồn RSS")
         return tat_ca_tin
 
+    def danh_sach_trang(self) -> list[dict]:
+        return [nguon for nguon in self._nguon_feeds if nguon.get("url")]
+
+    def phan_tich_trang(self, noi_dung: str, trang: dict) -> list[BaiBaoTho]:
+        return self._phan_tich_feed(noi_dung, trang.get("ten", "Không rõ"))
+
     def _thu_thap_feed(self, url: str, ten_nguon: str, danh_muc: str) -> list[BaiBaoTho]:
         """Thu thập tin từ một feed RSS/Atom cụ thể."""
         noi_dung = self.gui_request(url)
         if not noi_dung:
             return []
 
+        tin = self._phan_tich_feed(noi_dung, ten_nguon)
+        self.danh_dau_da_phan_tich(url)
+        return tin
+
+    def _phan_tich_feed(self, noi_dung: str, ten_nguon: str) -> list[BaiBaoTho]:
+        """Phân tích nội dung RSS/Atom đã tải thành danh sách bài báo."""
         feed = feedparser.parse(noi_dung)
         danh_sach = []
 
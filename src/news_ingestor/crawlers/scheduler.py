@@ -4,29 +4,48 @@ from __future__ import annotations
 
 import logging
 from collections.abc import Callable
+from typing import TYPE_CHECKING
 
+from news_ingestor.crawlers.async_engine import BoThuThapDongThoi
 from news_ingestor.crawlers.base import BaseCrawler
 from news_ingestor.crawlers.cafef import CafeFCrawler
 from news_ingestor.crawlers.rss_crawler import RSSCrawler
 from news_ingestor.crawlers.vietstock import VietStockCrawler
 from news_ingestor.crawlers.vnexpress import VnExpressCrawler
 from news_ingestor.models.article import BaiBaoTho
+from news_ingestor.storage.http_cache import KhoValidatorHttp
+from news_ingestor.utils.metrics import lay_metrics
+
+if TYPE_CHECKING:
+    from news_ingestor.processing.streaming import LuongXuLyDongChay
 
 logger = logging.getLogger(__name__)
+metrics = lay_metrics()
 
 
 class BoLichThuThap:
     """Quản lý và điều phối các bộ thu thập dữ liệu.
 
     Hỗ trợ:
-    - Chạy tất cả crawlers một lần (run_once)
+    - Chạy tất cả crawlers một lần (run_once), tuần tự hoặc đồng thời (asyncio)
+    - Chế độ luồng: crawl, fetch, NLP, lưu chạy chồng lên nhau qua hàng đợi
     - Chạy daemon với khoảng cách có thể cấu hình
     - Callback sau mỗi lần thu thập
     """
 
-    def __init__(self):
+    def __init__(
+        self,
+        bo_dong_thoi: BoThuThapDongThoi | None = None,
+        kho_validator: KhoValidatorHttp | None = None,
+    ):
         self._crawlers: list[BaseCrawler] = []
         self._callback: Callable[[list[BaiBaoTho]], None] | None = None
+        # Nếu có engine đồng thời, mọi crawler/mục được tải song song
+        self._bo_dong_thoi = bo_dong_thoi
+        # Kho ETag/Last-Modified dùng chung cho conditional GET
+        self._kho_validator = kho_validator
+        # Pipeline dạng luồng: xử lý luôn trong chu kỳ, không gọi callback
+        self._dong_chay: LuongXuLyDongChay | None = None
 
     def dang_ky_tat_ca(self) -> None:
         """Đăng ký tất cả crawlers mặc định."""
@@ -36,6 +55,9 @@ class BoLichThuThap:
             VnExpressCrawler(),
             VietStockCrawler(),
         ]
+        if self._kho_validator is not None:
+            for crawler in self._crawlers:
+                crawler.dat_kho_validator(self._kho_validator)
         logger.info(
             f"Đã đăng ký {len(self._crawlers)} bộ thu thập",
             extra={"extra_fields": {
@@ -45,6 +67,8 @@ class BoLichThuThap:
 
     def dang_ky_crawler(self, crawler: BaseCrawler) -> None:
         """Thêm một crawler vào danh sách."""
+        if self._kho_validator is not None:
+            crawler.dat_kho_validator(self._kho_validator)
         self._crawlers.append(crawler)
 
     def dat_callback(self, callback: Callable[[list[BaiBaoTho]], None]) -> None:
@@ -54,23 +78,35 @@ class BoLichThuThap:
         """
         self._callback = callback
 
+    def dat_dong_chay(self, dong_chay: LuongXuLyDongChay) -> None:
+        """Bật chế độ luồng: crawl, fetch, NLP và lưu chạy chồng lên nhau.
+
+        Mỗi chu kỳ trả về bài thô mới đã đưa vào pipeline; callback không được gọi.
+        """
+        self._dong_chay = dong_chay
+
     def chay_mot_lan(self) -> list[BaiBaoTho]:
-        """Chạy tất cả crawlers một lần và trả về kết quả tổng hợp."""
-        tat_ca_tin: list[BaiBaoTho] = []
+        """Chạy tất cả crawlers một lần và trả về kết quả tổng hợp.
 
-        for crawler in self._crawlers:
-            try:
-                logger.info(f"═══ Bắt đầu thu thập: {crawler.ten_nguon} ═══")
-                tin = crawler.thu_thap()
-                tat_ca_tin.extend(tin)
-                logger.info(
-                    f"═══ Hoàn thành {crawler.ten_nguon}: {len(tin)} bài ═══"
-                )
-            except Exception as e:
-                logger.error(
-                    f"Lỗi crawler {crawler.ten_nguon}: {e}",
-                    exc_info=True,
-                )
+        ETag/Last-Modified của trang chỉ được ghi vào kho khi chu kỳ bàn giao
+        trọn vẹn (pipeline không báo bài lỗi); nếu không, lần sau trang được
+        tải lại đầy đủ thay vì nhận 304 và bỏ sót bài chưa lưu.
+        """
+        if self._kho_validator is not None:
+            # Validator còn treo từ chu kỳ trước bị gián đoạn giữa chừng
+            for crawler in self._crawlers:
+                crawler.huy_validator()
+        loi_truoc = self._so_bai_loi()
+
+        if self._dong_chay is not None:
+            ket_qua = self._dong_chay.chay(self._crawlers)
+            self._chot_validator(self._so_bai_loi() == loi_truoc)
+            return ket_qua
+
+        if self._bo_dong_thoi is not None:
+            tat_ca_tin = self._thu_thap_dong_thoi()
+        else:
+            tat_ca_tin = self._thu_thap_tuan_tu()
 
         # Loại bỏ trùng lặp theo URL chuẩn hóa hoặc hash tiêu đề
         da_thay_url: set[str] = set()
@@ -94,14 +130,67 @@ class BoLichThuThap:
         )
 
         # Gọi callback nếu có
+        ban_giao_xong = True
         if self._callback and khong_trung:
             try:
                 self._callback(khong_trung)
             except Exception as e:
+                ban_giao_xong = False
                 logger.error(f"Lỗi callback: {e}", exc_info=True)
 
+        self._chot_validator(ban_giao_xong and self._so_bai_loi() == loi_truoc)
         return khong_trung
 
+    def _chot_validator(self, thanh_cong: bool) -> None:
+        """Ghi validator của các trang đã phân tích, hoặc bỏ hết nếu chu kỳ lỗi."""
+        if self._kho_validator is None:
+            return
+        if not thanh_cong:
+            logger.warning("Chu kỳ có bài lỗi, không lưu ETag/Last-Modified của chu kỳ này")
+        for crawler in self._crawlers:
+            if thanh_cong:
+                crawler.xac_nhan_validator()
+            else:
+                crawler.huy_validator()
+
+    @staticmethod
+    def _so_bai_loi() -> int:
+        return metrics.snapshot()["counters"].get("pipeline_articles_failed", 0)
+
+    def _thu_thap_tuan_tu(self) -> list[BaiBaoTho]:
+        """Chạy lần lượt từng crawler."""
+        tat_ca_tin: list[BaiBaoTho] = []
+
+        for crawler in self._crawlers:
+            try:
+                logger.info(f"═══ Bắt đầu thu thập: {crawler.ten_nguon} ═══")
+                tin = crawler.thu_thap()
+                tat_ca_tin.extend(tin)
+                logger.info(
+                    f"═══ Hoàn thành {crawler.ten_nguon}: {len(tin)} bài ═══"
+                )
+            except Exception as e:
+                logger.error(
+                    f"Lỗi crawler {crawler.ten_nguon}: {e}",
+                    exc_info=True,
+                )
+
+        return tat_ca_tin
+
+    def _thu_thap_dong_thoi(self) -> list[BaiBaoTho]:
+        """Chạy tất cả crawlers đồng thời; thứ tự kết quả giống chế độ tuần tự."""
+        logger.info(
+            f"═══ Bắt đầu thu thập đồng thời {len(self._crawlers)} bộ thu thập ═══"
+        )
+        ket_qua = self._bo_dong_thoi.thu_thap(self._crawlers)
+
+        tat_ca_tin: list[BaiBaoTho] = []
+        for crawler, tin in zip(self._crawlers, ket_qua, strict=True):
+            tat_ca_tin.extend(tin)
+            logger.info(f"═══ Hoàn thành {crawler.ten_nguon}: {len(tin)} bài ═══")
+
+        return tat_ca_tin
+
     def chay_daemon(self, khoang_cach_giay: int = 900) -> None:
         """Chạy thu thập theo chu kỳ (blocking) với retry/backoff.
 
@@ -58,12 +58,24 @@ class VietStockCrawler(BaseCrawler):
 
         return tat_ca_tin
 
+    def danh_sach_trang(self) -> list[dict]:
+        return self.DANH_SACH_MUC
+
+    def phan_tich_trang(self, noi_dung: str, trang: dict) -> list[BaiBaoTho]:
+        return self._phan_tich_html(noi_dung, trang["ten"])
+
     def _thu_thap_muc(self, url: str, ten_nguon: str) -> list[BaiBaoTho]:
         """Thu thập từ một mục."""
         html = self.gui_request(url)
         if not html:
             return []
 
+        tin = self._phan_tich_html(html, ten_nguon)
+        self.danh_dau_da_phan_tich(url)
+        return tin
+
+    def _phan_tich_html(self, html: str, ten_nguon: str) -> list[BaiBaoTho]:
+        """Phân tích HTML trang mục thành danh sách bài báo."""
         soup = BeautifulSoup(html, "lxml")
         danh_sach = []
 
@@ -16,7 +16,9 @@ from mcp.server import Server
 from mcp.server.stdio import stdio_server
 from mcp.types import TextContent, Tool
 
+from config.settings import lay_cau_hinh_nlp
 from news_ingestor.processing.embeddings import BoTaoEmbeddings
+from news_ingestor.storage.query_cache import BoNhoDemTruyVan
 from news_ingestor.storage.repository import KhoTinTuc
 from news_ingestor.storage.vector_store import KhoVector
 from news_ingestor.utils.metrics import lay_metrics
@@ -31,6 +33,7 @@ server = Server("tin-tuc-tai-chinh")
 _kho_tin_tuc: KhoTinTuc | None = None
 _kho_vector: KhoVector | None = None
 _bo_embedding: BoTaoEmbeddings | None = None
+_bo_nho_dem_truy_van: BoNhoDemTruyVan | None = None
 
 
 def _lay_kho_tin_tuc() -> KhoTinTuc:
@@ -55,6 +58,15 @@ def _lay_bo_embedding() -> BoTaoEmbeddings:
     return _bo_embedding
 
 
+def _lay_bo_nho_dem_truy_van() -> BoNhoDemTruyVan:
+    global _bo_nho_dem_truy_van
+    if _bo_nho_dem_truy_van is None:
+        _bo_nho_dem_truy_van = BoNhoDemTruyVan(
+            _lay_bo_embedding(), lay_cau_hinh_nlp().kich_thuoc_cache_truy_van
+        )
+    return _bo_nho_dem_truy_van
+
+
 # ============================================
 # ĐĂNG KÝ DANH SÁCH TOOLS
 # ============================================
@@ -325,9 +337,8 @@ async def _xu_ly_tim_kiem_ngu_nghia(args: dict) -> list[TextContent]:
         return [TextContent(type="text", text="Vui lòng nhập câu hỏi tìm kiếm.")]
 
     try:
-        # Tạo embedding cho câu hỏi
-        bo_emb = _lay_bo_embedding()
-        vector = bo_emb.tao_embedding(cau_hoi)
+        # Tạo embedding cho câu hỏi (câu hỏi lặp lại lấy từ LRU)
+        vector = _lay_bo_nho_dem_truy_van().lay_vector(cau_hoi)
 
         # Tìm kiếm trong Vector DB
         kho_vec = _lay_kho_vector()
@@ -414,10 +425,18 @@ async def _xu_ly_lay_cam_xuc(args: dict) -> list[TextContent]:
 # KHỞI CHẠY SERVER
 # ============================================
 
-async def chay_server() -> None:
-    """Khởi chạy MCP Server qua stdio."""
+async def chay_server(khoi_dong_model: bool = False) -> None:
+    """Khởi chạy MCP Server qua stdio.
+
+    ``khoi_dong_model``: tải model embedding trên thread nền ngay từ đầu,
+    song song với khởi tạo DB và kết nối Qdrant.
+    """
     from news_ingestor.storage.database import lay_quan_ly_db
 
+    if khoi_dong_model:
+        _lay_bo_embedding().khoi_dong_nen()
+        _lay_kho_vector()
+
     # Khởi tạo database
     db = lay_quan_ly_db()
     db.khoi_tao_bang()
@@ -68,6 +68,14 @@ class BaiBao(BaseModel):
         default=CamXuc.TRUNG_TINH,
         description="Nhãn cảm xúc: POSITIVE / NEGATIVE / NEUTRAL",
     )
+    nguon_cam_xuc: str = Field(
+        default="keyword",
+        description="Bộ phân tích đã gán nhãn cảm xúc: gemini / local / keyword",
+    )
+    phien_ban_tu_dien: str = Field(
+        default="",
+        description="Phiên bản từ điển (mã CK + từ khóa) dùng khi phân tích bài",
+    )
     impact_score: int = Field(default=0, description="Điểm tác động đến tài chính Việt Nam")
     impact_level: str = Field(default="LOW", description="Mức tác động: LOW/MEDIUM/HIGH")
     impact_tags: list[str] = Field(default_factory=list, description="Danh sách tag tác động")
@@ -2,6 +2,7 @@
 
 from __future__ import annotations
 
+import html
 import logging
 import re
 
@@ -34,6 +35,92 @@ KY_TU_LOI = {
     "\r": "\n",         # Old Mac newline
 }
 
+# Tag HTML và entity (tên / số thập phân / hex) trong một lần quét
+_MAU_HTML = re.compile(r"<[^>]+>|&(?:[a-zA-Z][a-zA-Z0-9]*|#\d+|#[xX][0-9a-fA-F]+);")
+
+
+def _ky_tu_dau(mau: str) -> set[str] | None:
+    """Tập ký tự mở đầu có thể có của mẫu (None nếu không xác định được).
+
+    Chỉ hỗ trợ mẫu mà mọi nhánh ``|`` cấp ngoài cùng bắt đầu bằng ký tự thường
+    hoặc ký tự đặc biệt đã escape (VD: ``\\[``) — đủ cho MAU_QUANG_CAO.
+    """
+    nhanh, do_sau, dau_nhanh, i = [], 0, 0, 0
+    while i < len(mau):
+        ky_tu = mau[i]
+        if ky_tu == "\\":
+            i += 1
+        elif ky_tu in "([":
+            do_sau += 1
+        elif ky_tu in ")]":
+            do_sau -= 1
+        elif ky_tu == "|" and do_sau == 0:
+            nhanh.append(mau[dau_nhanh:i])
+            dau_nhanh = i + 1
+        i += 1
+    nhanh.append(mau[dau_nhanh:])
+
+    ket_qua: set[str] = set()
+    for n in nhanh:
+        if n[:1].isalnum():
+            dau, sau = n[0], n[1:2]
+        elif n[:1] == "\\" and len(n) > 1 and not n[1].isalnum():
+            dau, sau = n[1], n[2:3]
+        else:
+            return None
+        if sau and sau in "?*{":
+            # Ký tự đầu có thể vắng mặt (VD: "x?abc")
+            return None
+        ket_qua.add(dau)
+    return ket_qua
+
+
+def _bien_dich_quang_cao(ds_mau: list[str]) -> tuple[re.Pattern | None, list[re.Pattern]]:
+    """Gộp các mẫu quảng cáo thành một alternation (cờ ``(?i)`` chuyển thành nhóm cục bộ).
+
+    Nếu xác định được ký tự mở đầu của mọi mẫu, thêm lookahead theo tập ký tự đó
+    để regex bỏ qua nhanh các vị trí không thể khớp. Mẫu neo cuối chuỗi (``$``)
+    được giữ riêng và chạy sau, như thứ tự cũ.
+    """
+    nhom, neo_cuoi = [], []
+    # Ký tự mở đầu: [không phân biệt hoa thường, phân biệt hoa thường]
+    ky_tu_dau: list[set[str]] | None = [set(), set()]
+    for mau in ds_mau:
+        if mau.endswith("$"):
+            neo_cuoi.append(re.compile(mau))
+            continue
+        khong_phan_biet_hoa = mau.startswith("(?i)")
+        than = mau[4:] if khong_phan_biet_hoa else mau
+        nhom.append(f"(?i:{than})" if khong_phan_biet_hoa else f"(?:{than})")
+        dau = _ky_tu_dau(than)
+        if dau is None or ky_tu_dau is None:
+            ky_tu_dau = None
+        else:
+            ky_tu_dau[0 if khong_phan_biet_hoa else 1].update(dau)
+
+    if not nhom:
+        return None, neo_cuoi
+    gop = "|".join(nhom)
+    if ky_tu_dau is not None:
+        khong_phan_biet, phan_biet = (re.escape("".join(sorted(tap))) for tap in ky_tu_dau)
+        lop = ([f"(?i:[{khong_phan_biet}])"] if khong_phan_biet else []) + (
+            [f"[{phan_biet}]"] if phan_biet else []
+        )
+        gop = f"(?=(?:{'|'.join(lop)}))(?:{gop})"
+    return re.compile(gop), neo_cuoi
+
+
+_MAU_QUANG_CAO_GOP, _MAU_QUANG_CAO_NEO_CUOI = _bien_dich_quang_cao(MAU_QUANG_CAO)
+
+
+def _thay_html(m: re.Match) -> str:
+    """Tag → khoảng trắng; entity → ký tự tương ứng (entity lạ → khoảng trắng)."""
+    khop = m.group()
+    if khop[0] == "<":
+        return " "
+    ky_tu = html.unescape(khop)
+    return " " if ky_tu == khop else ky_tu
+
 
 class BoLamSach:
     """Làm sạch và chuẩn hóa nội dung bài báo từ crawler."""
@@ -43,19 +130,17 @@ class BoLamSach:
         if not text:
             return ""
 
-        # 1. Loại bỏ HTML tags
-        text = loai_bo_html(text)
+        # 1. Loại bỏ HTML tags, giải mã entity (một lần quét)
+        text = _MAU_HTML.sub(_thay_html, text)
 
-        # 2. Sửa ký tự đặc biệt
-        text = self._sua_ky_tu_dac_biet(text)
+        # 2. Sửa ký tự đặc biệt, gộp khoảng trắng trước khi lọc quảng cáo
+        text = chuan_hoa_khoang_trang(self._sua_ky_tu_dac_biet(text))
 
         # 3. Loại bỏ quảng cáo
         text = self._loai_quang_cao(text)
 
         # 4. Chuẩn hóa khoảng trắng
-        text = chuan_hoa_khoang_trang(text)
-
-        return text.strip()
+        return chuan_hoa_khoang_trang(text)
 
     def lam_sach_tieu_de(self, tieu_de: str) -> str:
         """Làm sạch tiêu đề bài báo."""
@@ -70,9 +155,10 @@ class BoLamSach:
 
         return chuan_hoa_khoang_trang(tieu_de).strip()
 
-    def tom_tat(self, text: str, do_dai: int = 500) -> str:
-        """Tạo tóm tắt từ nội dung đã làm sạch."""
-        text = self.lam_sach(text)
+    def tom_tat(self, text: str, do_dai: int = 500, da_lam_sach: bool = False) -> str:
+        """Tạo tóm tắt từ nội dung (``da_lam_sach=True`` nếu text đã qua ``lam_sach``)."""
+        if not da_lam_sach:
+            text = self.lam_sach(text)
 
         if len(text) <= do_dai:
             return text
@@ -91,7 +177,19 @@ class BoLamSach:
         return text
 
     def _loai_quang_cao(self, text: str) -> str:
-        """Loại bỏ các mẫu quảng cáo."""
-        for mau in MAU_QUANG_CAO:
-            text = re.sub(mau, "", text)
-        return text
+        """Loại bỏ các mẫu quảng cáo (một regex gộp + mẫu neo cuối chuỗi).
+
+        Lặp đến khi không còn gì để xóa: xóa một mẫu có thể nối hai nửa của
+        mẫu khác ("quảng <xem thêm: url> cáo"), lượt sau sẽ bắt nốt. Văn bản
+        không có quảng cáo chỉ tốn một lượt.
+        """
+        while True:
+            so_lan_xoa = 0
+            if _MAU_QUANG_CAO_GOP is not None:
+                text, so_lan = _MAU_QUANG_CAO_GOP.subn("", text)
+                so_lan_xoa += so_lan
+            for mau in _MAU_QUANG_CAO_NEO_CUOI:
+                text, so_lan = mau.subn("", text)
+                so_lan_xoa += so_lan
+            if not so_lan_xoa:
+                return text
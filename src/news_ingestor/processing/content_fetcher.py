@@ -9,11 +9,13 @@ from __future__ import annotations
 import logging
 import random
 import re
-import time
 
 import httpx
 from bs4 import BeautifulSoup
 
+from news_ingestor.utils.http_pool import lay_bo_ket_noi
+from news_ingestor.utils.rate_limiter import BoGioiHanToc, lay_bo_gioi_han_toc
+
 logger = logging.getLogger(__name__)
 
 # User-Agent pool
@@ -104,24 +106,23 @@ class ContentFetcher:
         },
     }
 
-    def __init__(self, timeout: int = 20, delay: float = 1.0):
+    def __init__(
+        self,
+        timeout: int = 20,
+        delay: float = 1.0,
+        bo_gioi_han: BoGioiHanToc | None = None,
+    ):
         self._timeout = timeout
+        # Khoảng cách mặc định cho host chưa cấu hình trong RATE_LIMITS
         self._delay = delay
+        self._bo_gioi_han = bo_gioi_han or lay_bo_gioi_han_toc()
+        # Client riêng (chủ yếu cho test); mặc định mượn pool dùng chung
         self._client: httpx.Client | None = None
 
     def _get_client(self) -> httpx.Client:
-        if self._client is None or self._client.is_closed:
-            self._client = httpx.Client(
-                timeout=self._timeout,
-                follow_redirects=True,
-                headers={
-                    "User-Agent": random.choice(USER_AGENTS),
-                    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
-                    "Accept-Language": "vi-VN,vi;q=0.9,en-US;q=0.8",
-                    "Connection": "keep-alive",
-                },
-            )
-        return self._client
+        if self._client is not None and not self._client.is_closed:
+            return self._client
+        return lay_bo_ket_noi().lay_client()
 
     def fetch_content(self, url: str) -> dict:
         """Lấy nội dung đầy đủ từ URL bài báo.
@@ -147,12 +148,15 @@ class ContentFetcher:
             return result
 
         try:
-            # Rate limiting
-            time.sleep(self._delay * random.uniform(0.5, 1.5))
+            # Rate limiting theo host (dùng chung với crawlers)
+            self._bo_gioi_han.cho(url, self._delay)
 
             client = self._get_client()
-            client.headers["User-Agent"] = random.choice(USER_AGENTS)
-            response = client.get(url)
+            response = client.get(
+                url,
+                headers={"User-Agent": random.choice(USER_AGENTS)},
+                timeout=self._timeout,
+            )
             response.raise_for_status()
 
             html = response.text
@@ -0,0 +1,277 @@
+"""Embedding Pool - Encode song song trên nhiều tiến trình dùng chung một model.
+
+Tiến trình cha tải model một lần rồi fork N worker: trọng số nằm trong các
+trang nhớ được chia sẻ copy-on-write nên RAM gần như không tăng theo số
+worker, còn tokenize / tiền xử lý / hậu xử lý (vốn bị GIL giữ) chạy song song
+trên nhiều core.
+
+Mỗi lần ``encode``, tiến trình cha cấp phát một khối ``shared_memory`` cho
+ma trận kết quả, chia lô thành các phần liền nhau và giao cho từng worker qua
+pipe riêng; worker ghi vector float32 thẳng vào khối đó, pipe chỉ mang tín
+hiệu xong/lỗi nên không phải pickle vector. Cha biết worker nào giữ phần nào:
+worker chết giữa chừng (OOM killer, segfault) được fork lại và nhận lại phần
+đang làm dở.
+
+Chỉ dùng được với start method ``fork`` (Linux/macOS). Tiến trình cha không
+nên chạy inference trước khi fork (thread pool OpenMP không an toàn qua fork).
+"""
+
+from __future__ import annotations
+
+import logging
+import math
+import multiprocessing
+import os
+import signal
+import threading
+from collections import deque
+from collections.abc import Callable
+from multiprocessing import resource_tracker, shared_memory
+from multiprocessing.connection import Connection, wait
+from typing import Any
+
+import numpy as np
+
+from news_ingestor.utils.metrics import lay_metrics
+
+logger = logging.getLogger(__name__)
+metrics = lay_metrics()
+
+# Phần nhỏ nhất gửi cho một worker (lô nhỏ hơn không đáng chia)
+SO_VAN_BAN_TOI_THIEU_MOI_PHAN = 8
+
+
+def _chay_worker(tao_model: Callable[[], Any], ket_noi: Connection) -> None:
+    """Vòng lặp của worker: nhận (lô, khối shm, vị trí, văn bản), ghi vector vào shm."""
+    # Ctrl+C do tiến trình cha xử lý (gửi tín hiệu dừng qua pipe)
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    model = tao_model()
+    while True:
+        try:
+            viec = ket_noi.recv()
+        except EOFError:
+            return  # tiến trình cha đã đóng pipe
+        if viec is None:
+            return
+        ma_lo, ten_shm, so_hang, kich_thuoc, dau, ds_van_ban = viec
+        try:
+            vector = np.asarray(
+                model.encode(
+                    ds_van_ban, normalize_embeddings=True, batch_size=32, show_progress_bar=False
+                ),
+                dtype=np.float32,
+            )
+            shm = shared_memory.SharedMemory(name=ten_shm)
+            try:
+                ma_tran = np.ndarray((so_hang, kich_thuoc), dtype=np.float32, buffer=shm.buf)
+                ma_tran[dau : dau + len(ds_van_ban)] = vector
+                del ma_tran  # nhả buffer trước khi close
+            finally:
+                shm.close()
+            ket_noi.send((ma_lo, dau, None))
+        except Exception as e:
+            ket_noi.send((ma_lo, dau, f"{type(e).__name__}: {e}"))
+
+
+class BoEmbeddingDaTienTrinh:
+    """Pool worker fork dùng chung model, giao diện ``encode`` như SentenceTransformer.
+
+    ``tao_model`` được gọi trong từng worker sau khi fork (thường trả về chính
+    model đã tải ở tiến trình cha); ``kich_thuoc`` là số chiều vector.
+    """
+
+    def __init__(self, tao_model: Callable[[], Any], kich_thuoc: int, so_tien_trinh: int):
+        if so_tien_trinh < 1:
+            raise ValueError("Cần ít nhất 1 tiến trình")
+        self._tao_model = tao_model
+        self._kich_thuoc = kich_thuoc
+        self._so_tien_trinh = so_tien_trinh
+        self._ngu_canh = multiprocessing.get_context("fork")
+        self._ds_tien_trinh: list[multiprocessing.Process] = []
+        self._ds_ket_noi: list[Connection] = []
+        # Mỗi lần encode dùng hết pool; các luồng gọi đồng thời xếp hàng
+        self._lock = threading.Lock()
+        self._ma_lo = 0
+        self._so_lan_fork_lai = 0
+        self._hong = False
+
+    @property
+    def so_tien_trinh(self) -> int:
+        return self._so_tien_trinh
+
+    @property
+    def con_hoat_dong(self) -> bool:
+        """False khi chưa khởi động, đã dừng, hoặc worker chết liên tục (nên bỏ pool)."""
+        return bool(self._ds_tien_trinh) and not self._hong
+
+    def bat_dau(self) -> None:
+        """Fork các worker (gọi sau khi đã tải model ở tiến trình cha)."""
+        if self._ds_tien_trinh:
+            return
+        # Worker dùng chung resource tracker của tiến trình cha: khối shm do cha
+        # unlink không bị tracker riêng của worker báo rò rỉ khi thoát
+        resource_tracker.ensure_running()
+        self._hong = False
+        for i in range(self._so_tien_trinh):
+            self._khoi_dong_worker(i)
+        logger.info(f"Đã khởi động {self._so_tien_trinh} worker embedding (fork)")
+
+    def _khoi_dong_worker(self, i: int) -> None:
+        """Fork worker thứ ``i`` (thêm mới hoặc thay worker đã chết)."""
+        ket_noi, ket_noi_worker = self._ngu_canh.Pipe()
+        tien_trinh = self._ngu_canh.Process(
+            target=_chay_worker,
+            args=(self._tao_model, ket_noi_worker),
+            name=f"embedding-worker-{i}",
+            daemon=True,
+        )
+        tien_trinh.start()
+        # Chỉ worker giữ đầu pipe này: worker chết thì cha đọc được EOF
+        ket_noi_worker.close()
+        if i < len(self._ds_tien_trinh):
+            self._ds_tien_trinh[i] = tien_trinh
+            self._ds_ket_noi[i] = ket_noi
+        else:
+            self._ds_tien_trinh.append(tien_trinh)
+            self._ds_ket_noi.append(ket_noi)
+
+    def encode(
+        self,
+        van_ban: list[str],
+        normalize_embeddings: bool = True,
+        batch_size: int = 32,
+        show_progress_bar: bool = False,
+    ) -> np.ndarray:
+        """Encode cả lô trên các worker; trả ma trận float32 (n, d) đã chuẩn hóa L2."""
+        ds_van_ban = list(van_ban)
+        if not ds_van_ban:
+            return np.zeros((0, self._kich_thuoc), dtype=np.float32)
+        if not self.con_hoat_dong:
+            raise RuntimeError("Pool embedding chưa khởi động (bat_dau) hoặc đã hỏng")
+
+        so_hang = len(ds_van_ban)
+        co_phan = max(
+            SO_VAN_BAN_TOI_THIEU_MOI_PHAN, math.ceil(so_hang / self._so_tien_trinh)
+        )
+        shm = shared_memory.SharedMemory(create=True, size=so_hang * self._kich_thuoc * 4)
+        try:
+            with self._lock:
+                self._ma_lo += 1
+                self._chay_lo(self._ma_lo, shm.name, ds_van_ban, co_phan)
+
+            ma_tran = np.ndarray((so_hang, self._kich_thuoc), dtype=np.float32, buffer=shm.buf)
+            ket_qua = ma_tran.copy()
+            del ma_tran  # nhả buffer trước khi close
+        finally:
+            shm.close()
+            shm.unlink()
+
+        metrics.tang("embedding_pool_batches")
+        metrics.tang("embedding_pool_texts", so_hang)
+        return ket_qua
+
+    def _chay_lo(self, ma_lo: int, ten_shm: str, ds_van_ban: list[str], co_phan: int) -> None:
+        """Giao các phần của lô cho worker rảnh và chờ tất cả xong.
+
+        Worker chết giữa chừng được fork lại và nhận lại phần đang làm dở; lỗi
+        nếu worker báo lỗi encode, hoặc phải fork lại quá ``so_tien_trinh`` lần
+        trong một lô (khi đó pool bị đánh dấu hỏng).
+        """
+        so_hang = len(ds_van_ban)
+        cho = deque(range(0, so_hang, co_phan))
+        dang_lam: dict[int, int] = {}  # chỉ số worker -> vị trí đầu phần đang encode
+        loi: list[str] = []
+        self._so_lan_fork_lai = 0
+
+        def giao(i: int) -> None:
+            dau = cho.popleft()
+            dang_lam[i] = dau
+            try:
+                self._ds_ket_noi[i].send(
+                    (ma_lo, ten_shm, so_hang, self._kich_thuoc, dau,
+                     ds_van_ban[dau : dau + co_phan])
+                )
+            except OSError:
+                pass  # worker đã chết: phát hiện qua sentinel ở vòng chờ bên dưới
+
+        for i in range(len(self._ds_tien_trinh)):
+            if cho:
+                giao(i)
+        while dang_lam:
+            san_sang = set(wait(
+                [self._ds_ket_noi[i] for i in dang_lam]
+                + [self._ds_tien_trinh[i].sentinel for i in dang_lam]
+            ))
+            for i, dau in list(dang_lam.items()):
+                ket_noi = self._ds_ket_noi[i]
+                if ket_noi not in san_sang and self._ds_tien_trinh[i].sentinel not in san_sang:
+                    continue
+                try:
+                    if not ket_noi.poll():
+                        raise EOFError  # chỉ sentinel sẵn sàng: tiến trình đã thoát
+                    ma, _, thong_bao = ket_noi.recv()
+                except (EOFError, OSError):
+                    del dang_lam[i]
+                    cho.appendleft(dau)
+                    self._fork_lai(i)
+                    giao(i)
+                    continue
+                if ma != ma_lo:
+                    continue  # tín hiệu muộn của lô trước (đã bị hủy)
+                del dang_lam[i]
+                if thong_bao is not None:
+                    loi.append(thong_bao)
+                if cho:
+                    giao(i)
+        if loi:
+            raise RuntimeError(f"Lỗi encode trong worker: {loi[0]}")
+
+    def _fork_lai(self, i: int) -> None:
+        """Thay worker ``i`` đã chết bằng worker mới; lỗi nếu chết quá nhiều lần."""
+        tien_trinh = self._ds_tien_trinh[i]
+        tien_trinh.join(timeout=1)
+        self._ds_ket_noi[i].close()
+        self._so_lan_fork_lai += 1
+        if self._so_lan_fork_lai > self._so_tien_trinh:
+            self._hong = True
+            raise RuntimeError(
+                f"Worker embedding dừng liên tục ({tien_trinh.name}, "
+                f"exitcode={tien_trinh.exitcode})"
+            )
+        metrics.tang("embedding_pool_worker_restarts")
+        logger.warning(
+            f"Worker {tien_trinh.name} đã dừng (exitcode={tien_trinh.exitcode}), fork lại"
+        )
+        self._khoi_dong_worker(i)
+
+    def dung(self, thoi_gian_cho: float = 5) -> None:
+        """Gửi tín hiệu dừng và chờ các worker thoát."""
+        if not self._ds_tien_trinh:
+            return
+        for ket_noi in self._ds_ket_noi:
+            try:
+                ket_noi.send(None)
+            except OSError:
+                pass  # worker đã chết hoặc pipe đã đóng
+        for tien_trinh, ket_noi in zip(self._ds_tien_trinh, self._ds_ket_noi, strict=True):
+            tien_trinh.join(timeout=thoi_gian_cho)
+            if tien_trinh.is_alive():
+                tien_trinh.terminate()
+            ket_noi.close()
+        self._ds_tien_trinh = []
+        self._ds_ket_noi = []
+        logger.info("Đã dừng pool worker embedding")
+
+    def __enter__(self) -> BoEmbeddingDaTienTrinh:
+        self.bat_dau()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.dung()
+
+
+def so_luong_moi_worker(so_tien_trinh: int, so_luong: int = 0) -> int:
+    """Số luồng intra-op cho mỗi worker: ``so_luong`` nếu đặt, không thì chia đều số core."""
+    if so_luong > 0:
+        return so_luong
+    return max(1, (os.cpu_count() or 1) // so_tien_trinh)
@@ -1,45 +1,418 @@
-"""Embeddings Generator - Tạo vector embeddings cho tìm kiếm ngữ nghĩa."""
+"""Embeddings Generator - Tạo vector embeddings cho tìm kiếm ngữ nghĩa.
+
+Hai backend:
+
+- ``torch``: SentenceTransformer gốc (float32, PyTorch).
+- ``onnx``: cùng model xuất sang ONNX, lượng tử hóa int8 động, chạy bằng
+  onnxruntime trên CPU (``news-ingestor export-onnx``). Không cần import
+  torch khi chạy nên tải nhanh và tốn ít RAM hơn.
+
+Bài dài (``EMBEDDING_CHUNK_MODE``):
+
+- ``truncate``: chỉ lấy ``DO_DAI_TOI_DA`` ký tự đầu (mặc định, như trước).
+- ``mean``: cắt bài thành các đoạn theo số token của tokenizer, encode mọi
+  đoạn của cả lô trong một lần ``encode``, rồi lấy trung bình thành một vector.
+- ``chunks``: như ``mean`` nhưng mỗi đoạn là một điểm riêng trong Vector DB
+  (xem ``LuongXuLy.tao_diem_vector``).
+"""
 
 from __future__ import annotations
 
+import json
 import logging
+import threading
+import time
+from pathlib import Path
+
+import numpy as np
 
 from config.settings import lay_cau_hinh_nlp
+from news_ingestor.processing.embedding_pool import BoEmbeddingDaTienTrinh, so_luong_moi_worker
+from news_ingestor.storage.embedding_cache import BoNhoDemEmbedding, lay_bo_nho_dem_embedding
+from news_ingestor.utils.metrics import lay_metrics
 
 logger = logging.getLogger(__name__)
+metrics = lay_metrics()
+
+# Số ký tự tối đa đưa vào model (tokenizer còn cắt theo max_seq_length)
+DO_DAI_TOI_DA = 512
+TEN_FILE_ONNX = "model.onnx"
+TEN_FILE_THONG_TIN = "embedding_onnx.json"
+# Lô câu giả dùng để hâm nóng (độ dài khác nhau để cấp phát sẵn nhiều kích thước)
+_CAU_KHOI_DONG = [
+    "Ngân hàng Nhà nước giữ nguyên lãi suất điều hành",
+    "FPT báo lãi kỷ lục quý 3, doanh thu tăng 20% so với cùng kỳ năm trước. " * 4,
+]
+
+
+class _MoHinhOnnx:
+    """Model ONNX với giao diện ``encode`` giống SentenceTransformer (mean pooling)."""
+
+    def __init__(self, thu_muc: str | Path, so_luong: int = 0):
+        import onnxruntime as ort
+        from tokenizers import Tokenizer
+
+        thu_muc = Path(thu_muc)
+        with open(thu_muc / TEN_FILE_THONG_TIN, encoding="utf-8") as f:
+            self.thong_tin: dict = json.load(f)
+
+        tuy_chon = ort.SessionOptions()
+        tuy_chon.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        tuy_chon.inter_op_num_threads = 1
+        if so_luong > 0:
+            tuy_chon.intra_op_num_threads = so_luong
+        self._phien = ort.InferenceSession(
+            str(thu_muc / TEN_FILE_ONNX), tuy_chon, providers=["CPUExecutionProvider"]
+        )
+        self._dau_vao = {i.name for i in self._phien.get_inputs()}
+
+        self._tokenizer = Tokenizer.from_file(str(thu_muc / "tokenizer.json"))
+        self._tokenizer.enable_truncation(max_length=int(self.thong_tin["max_seq_length"]))
+        self._tokenizer.enable_padding(pad_id=int(self.thong_tin.get("pad_id", 0)))
+        self.max_seq_length = int(self.thong_tin["max_seq_length"])
+        # Bản riêng không cắt/đệm, chỉ dùng để lấy vị trí token khi chia đoạn
+        self._tokenizer_vi_tri = Tokenizer.from_file(str(thu_muc / "tokenizer.json"))
+
+    def get_sentence_embedding_dimension(self) -> int:
+        return int(self.thong_tin["kich_thuoc"])
+
+    def vi_tri_token(self, ds_van_ban: list[str]) -> list[list[tuple[int, int]]]:
+        """Vị trí ký tự (đầu, cuối) của từng token, không gồm token đặc biệt."""
+        ma_hoa = self._tokenizer_vi_tri.encode_batch(ds_van_ban, add_special_tokens=False)
+        return [m.offsets for m in ma_hoa]
+
+    def encode(
+        self,
+        van_ban: str | list[str],
+        normalize_embeddings: bool = True,
+        batch_size: int = 32,
+        show_progress_bar: bool = False,
+    ) -> np.ndarray:
+        """Encode như SentenceTransformer; trả mảng float32 (n, d) hoặc (d,)."""
+        mot_cau = isinstance(van_ban, str)
+        ds_van_ban = [van_ban] if mot_cau else list(van_ban)
+        ket_qua = np.zeros((len(ds_van_ban), self.get_sentence_embedding_dimension()), np.float32)
+
+        # Gom câu dài gần nhau vào cùng lô để giảm padding
+        thu_tu = sorted(range(len(ds_van_ban)), key=lambda i: len(ds_van_ban[i]))
+        for dau in range(0, len(thu_tu), batch_size):
+            chi_so = thu_tu[dau : dau + batch_size]
+            ma_hoa = self._tokenizer.encode_batch([ds_van_ban[i] for i in chi_so])
+            ids = np.array([m.ids for m in ma_hoa], dtype=np.int64)
+            mat_na = np.array([m.attention_mask for m in ma_hoa], dtype=np.int64)
+            dau_vao = {"input_ids": ids, "attention_mask": mat_na}
+            if "token_type_ids" in self._dau_vao:
+                dau_vao["token_type_ids"] = np.zeros_like(ids)
+            an = self._phien.run(None, {k: v for k, v in dau_vao.items() if k in self._dau_vao})[0]
+
+            trong_so = mat_na[:, :, None].astype(np.float32)
+            ket_qua[chi_so] = (an * trong_so).sum(axis=1) / np.maximum(trong_so.sum(axis=1), 1e-9)
+
+        if normalize_embeddings:
+            ket_qua /= np.maximum(np.linalg.norm(ket_qua, axis=1, keepdims=True), 1e-12)
+        return ket_qua[0] if mot_cau else ket_qua
+
+
+def chia_doan_theo_token(
+    van_ban: str,
+    vi_tri: list[tuple[int, int]],
+    so_token: int,
+    chong_lap: int = 0,
+    so_doan_toi_da: int = 0,
+) -> list[str]:
+    """Cắt văn bản thành các đoạn tối đa ``so_token`` token.
+
+    ``vi_tri``: vị trí ký tự (đầu, cuối) của từng token. Điểm cắt được lùi về
+    ranh giới từ (token liền sau không dính vào token cuối), hai đoạn liên
+    tiếp chồng lấp ``chong_lap`` token. ``so_doan_toi_da=0``: không giới hạn.
+    """
+    so_token = max(so_token, 1)
+    if len(vi_tri) <= so_token:
+        return [van_ban]
+
+    def dinh_lien(i: int) -> bool:
+        return vi_tri[i][0] == vi_tri[i - 1][1]
+
+    ds_doan: list[str] = []
+    dau = 0
+    while True:
+        cuoi = min(dau + so_token, len(vi_tri))
+        if cuoi < len(vi_tri):
+            # Lùi tối đa nửa đoạn; không tìm được ranh giới thì cắt ngay giữa từ
+            ranh_gioi = cuoi
+            while ranh_gioi > dau + max(so_token // 2, 1) and dinh_lien(ranh_gioi):
+                ranh_gioi -= 1
+            if not dinh_lien(ranh_gioi):
+                cuoi = ranh_gioi
+        ds_doan.append(van_ban[vi_tri[dau][0] : vi_tri[cuoi - 1][1]])
+        if cuoi == len(vi_tri) or len(ds_doan) == so_doan_toi_da:
+            return ds_doan
+
+        dau = max(cuoi - chong_lap, dau + 1)
+        while dau < cuoi and dinh_lien(dau):
+            dau += 1
+
+
+def xuat_onnx(ten_model: str, thu_muc: str | Path, luong_tu_hoa: bool = True) -> Path:
+    """Xuất SentenceTransformer sang ONNX (+ lượng tử hóa int8 động) kèm tokenizer.
+
+    Cần ``sentence-transformers``, ``onnx`` và ``onnxruntime`` (extra ``onnx``).
+    Trả về đường dẫn file .onnx.
+    """
+    import torch
+    from sentence_transformers import SentenceTransformer
+
+    thu_muc = Path(thu_muc)
+    thu_muc.mkdir(parents=True, exist_ok=True)
+    model = SentenceTransformer(ten_model, device="cpu")
+    cau_hinh_pooling = model[1].get_config_dict() if len(model) > 1 else {}
+    if not cau_hinh_pooling.get("pooling_mode_mean_tokens", False):
+        raise ValueError(f"{ten_model}: backend ONNX chỉ hỗ trợ model dùng mean pooling")
+
+    class _BocTransformer(torch.nn.Module):
+        def __init__(self, auto_model):
+            super().__init__()
+            self.auto_model = auto_model
+
+        def forward(self, input_ids, attention_mask):
+            return self.auto_model(input_ids=input_ids, attention_mask=attention_mask)[0]
+
+    mau = model.tokenizer(["xuất onnx"], return_tensors="pt")
+    file_fp32 = thu_muc / "model_fp32.onnx"
+    duong_dan = thu_muc / TEN_FILE_ONNX
+    with torch.no_grad():
+        torch.onnx.export(
+            _BocTransformer(model[0].auto_model).eval(),
+            (mau["input_ids"], mau["attention_mask"]),
+            str(file_fp32),
+            input_names=["input_ids", "attention_mask"],
+            output_names=["last_hidden_state"],
+            dynamic_axes={
+                "input_ids": {0: "batch", 1: "seq"},
+                "attention_mask": {0: "batch", 1: "seq"},
+                "last_hidden_state": {0: "batch", 1: "seq"},
+            },
+            opset_version=14,
+        )
+
+    if luong_tu_hoa:
+        from onnxruntime.quantization import QuantType, quantize_dynamic
+
+        quantize_dynamic(str(file_fp32), str(duong_dan), weight_type=QuantType.QInt8)
+        file_fp32.unlink()
+    else:
+        file_fp32.replace(duong_dan)
+
+    model.tokenizer.save_pretrained(str(thu_muc))
+    thong_tin = {
+        "ten_model": ten_model,
+        "kich_thuoc": model.get_sentence_embedding_dimension(),
+        "max_seq_length": model.max_seq_length,
+        "pad_id": model.tokenizer.pad_token_id or 0,
+        "luong_tu_hoa": luong_tu_hoa,
+    }
+    with open(thu_muc / TEN_FILE_THONG_TIN, "w", encoding="utf-8") as f:
+        json.dump(thong_tin, f, ensure_ascii=False, indent=2)
+    logger.info(f"Đã xuất {ten_model} sang ONNX ({'int8' if luong_tu_hoa else 'fp32'})")
+    return duong_dan
 
 
 class BoTaoEmbeddings:
     """Tạo vector embeddings từ văn bản sử dụng sentence-transformers.
 
     Model mặc định: paraphrase-multilingual-MiniLM-L12-v2
-    (hỗ trợ 50+ ngôn ngữ bao gồm tiếng Việt)
+    (hỗ trợ 50+ ngôn ngữ bao gồm tiếng Việt). ``EMBEDDING_BACKEND=onnx``
+    dùng bản ONNX int8 đã xuất bằng ``export-onnx``.
     """
 
-    def __init__(self, ten_model: str | None = None):
+    def __init__(
+        self,
+        ten_model: str | None = None,
+        backend: str | None = None,
+        thu_muc_onnx: str | None = None,
+        dung_cache: bool = False,
+    ):
+        """``dung_cache``: đọc/ghi cache vector trên đĩa (EMBEDDING_CACHE_*)."""
         cau_hinh = lay_cau_hinh_nlp()
         self._ten_model = ten_model or cau_hinh.embedding_model
+        self._backend = backend or cau_hinh.embedding_backend
+        self._thu_muc_onnx = thu_muc_onnx or cau_hinh.duong_dan_embedding_onnx
+        self._so_luong = cau_hinh.so_luong_embedding
+        self._che_do_doan = cau_hinh.che_do_doan_embedding
+        self._so_token_doan = cau_hinh.so_token_doan_embedding
+        self._chong_lap_doan = cau_hinh.chong_lap_doan_embedding
+        self._so_doan_toi_da = cau_hinh.so_doan_toi_da_embedding
         self._model = None
         self._kich_thuoc: int = 384  # Mặc định cho MiniLM
+        self._dung_cache = dung_cache
+        self._lock_tai = threading.Lock()
+        self._bo_nho_dem: BoNhoDemEmbedding | None = None
+        self._pool: BoEmbeddingDaTienTrinh | None = None
+
+    @property
+    def backend(self) -> str:
+        return self._backend
+
+    @property
+    def che_do_doan(self) -> str:
+        """Cách xử lý bài dài: truncate, mean hoặc chunks (EMBEDDING_CHUNK_MODE)."""
+        return self._che_do_doan
 
     def _tai_model(self) -> None:
-        """Lazy loading - tải model khi cần lần đầu."""
+        """Lazy loading - tải model khi cần lần đầu.
+
+        Có khóa: nếu thread khởi động nền đang tải, lời gọi đầu tiên chờ
+        đúng lần tải đó thay vì tải lần thứ hai.
+        """
         if self._model is not None:
             return
 
-        try:
-            from sentence_transformers import SentenceTransformer
-
-            logger.info(f"Đang tải model embedding: {self._ten_model}...")
-            self._model = SentenceTransformer(self._ten_model)
-            self._kich_thuoc = self._model.get_sentence_embedding_dimension()
-            logger.info(
-                f"Đã tải model embedding thành công "
-                f"(kích thước vector: {self._kich_thuoc})"
+        with self._lock_tai:
+            if self._model is not None:
+                return
+            try:
+                logger.info(f"Đang tải model embedding: {self._ten_model} ({self._backend})...")
+                bat_dau = time.perf_counter()
+                if self._backend == "onnx":
+                    model = self._tai_model_onnx()
+                else:
+                    from sentence_transformers import SentenceTransformer
+
+                    model = SentenceTransformer(self._ten_model)
+                    if self._so_luong > 0:
+                        import torch
+
+                        torch.set_num_threads(self._so_luong)
+                self._kich_thuoc = model.get_sentence_embedding_dimension()
+                self._model = model
+                thoi_gian_ms = int((time.perf_counter() - bat_dau) * 1000)
+                metrics.gan("embedding_load_ms", thoi_gian_ms)
+                logger.info(
+                    f"Đã tải model embedding thành công "
+                    f"(kích thước vector: {self._kich_thuoc}, {thoi_gian_ms}ms)"
+                )
+            except Exception as e:
+                logger.error(f"Không thể tải model embedding: {e}")
+                raise
+
+    def khoi_dong(self) -> None:
+        """Tải model và encode thử để hâm nóng kernel, ghi độ trễ lạnh/nóng vào metrics.
+
+        ``embedding_cold_encode_ms``: lần encode đầu sau khi tải (cấp phát,
+        JIT); ``embedding_warm_encode_ms``: lần encode kế tiếp, đại diện cho
+        độ trễ ổn định.
+        """
+        self._tai_model()
+        for ten in ("embedding_cold_encode_ms", "embedding_warm_encode_ms"):
+            bat_dau = time.perf_counter()
+            self._encode(_CAU_KHOI_DONG)
+            metrics.gan(ten, int((time.perf_counter() - bat_dau) * 1000))
+
+    def khoi_dong_nen(self) -> threading.Thread:
+        """Chạy ``khoi_dong`` trên thread nền (song song với khởi tạo DB, Qdrant...)."""
+
+        def chay() -> None:
+            try:
+                self.khoi_dong()
+            except Exception as e:
+                # Lần dùng thật sẽ thử tải lại và báo lỗi như bình thường
+                logger.warning(f"Khởi động nền model embedding thất bại: {e}")
+
+        thread = threading.Thread(target=chay, name="embedding-warmup", daemon=True)
+        thread.start()
+        return thread
+
+    def dung_nhieu_tien_trinh(self, so_tien_trinh: int) -> bool:
+        """Encode qua ``so_tien_trinh`` worker fork từ tiến trình này; False nếu bỏ qua.
+
+        Model được tải ở đây (trước khi fork) để worker dùng chung trọng số;
+        gọi trước ``khoi_dong_nen`` và trước khi tạo các thread khác.
+        """
+        if so_tien_trinh <= 0 or self._pool is not None:
+            return False
+        self._tai_model()
+        so_luong = so_luong_moi_worker(so_tien_trinh, self._so_luong)
+        pool = BoEmbeddingDaTienTrinh(
+            lambda: self.tao_model_worker(so_luong), self._kich_thuoc, so_tien_trinh
+        )
+        pool.bat_dau()
+        self._pool = pool
+        return True
+
+    def dung_pool(self) -> None:
+        """Dừng pool worker (nếu có), quay lại encode trong tiến trình này."""
+        if self._pool is not None:
+            self._pool.dung()
+            self._pool = None
+
+    def tao_model_worker(self, so_luong: int):
+        """Model dùng trong worker, gọi sau khi fork.
+
+        torch: chính model của tiến trình cha (trọng số copy-on-write), chỉ
+        đặt lại số luồng. onnx: mở phiên onnxruntime mới vì thread pool của
+        phiên cũ không còn sau fork (file int8 nhỏ nên tốn thêm ít RAM).
+        """
+        if self._backend == "onnx":
+            return _MoHinhOnnx(self._thu_muc_onnx, so_luong=so_luong)
+        import torch
+
+        torch.set_num_threads(so_luong)
+        return self._model
+
+    def _encode(self, texts: list[str]) -> np.ndarray:
+        """Encode qua pool worker nếu đã bật, không thì trong tiến trình này."""
+        if self._pool is not None:
+            try:
+                return self._pool.encode(texts)
+            except RuntimeError as e:
+                if self._pool.con_hoat_dong:
+                    raise  # lỗi encode của chính lô này, encode tại chỗ cũng lỗi
+                logger.warning(f"Pool worker embedding hỏng, chuyển sang encode tại chỗ: {e}")
+                metrics.tang("embedding_pool_fallbacks")
+                self.dung_pool()
+        return self._model.encode(
+            texts,
+            normalize_embeddings=True,
+            batch_size=32,
+            show_progress_bar=len(texts) > 10,
+        )
+
+    def _tai_model_onnx(self) -> _MoHinhOnnx:
+        thu_muc = Path(self._thu_muc_onnx)
+        if not (thu_muc / TEN_FILE_ONNX).exists():
+            raise FileNotFoundError(
+                f"Chưa có model ONNX tại {thu_muc}; hãy chạy news-ingestor export-onnx"
             )
-        except Exception as e:
-            logger.error(f"Không thể tải model embedding: {e}")
-            raise
+        model = _MoHinhOnnx(thu_muc, so_luong=self._so_luong)
+        if model.thong_tin.get("ten_model") != self._ten_model:
+            raise ValueError(
+                f"Model ONNX tại {thu_muc} xuất từ {model.thong_tin.get('ten_model')}, "
+                f"khác EMBEDDING_MODEL={self._ten_model}"
+            )
+        return model
+
+    @property
+    def phien_ban(self) -> str:
+        """Phiên bản vector (backend + model), dùng làm khóa cache; không cần tải model."""
+        if self._backend != "onnx":
+            return f"torch:{self._ten_model}"
+        luong_tu_hoa = True
+        try:
+            with open(Path(self._thu_muc_onnx) / TEN_FILE_THONG_TIN, encoding="utf-8") as f:
+                luong_tu_hoa = json.load(f).get("luong_tu_hoa", True)
+        except OSError:
+            pass
+        return f"onnx-{'int8' if luong_tu_hoa else 'fp32'}:{self._ten_model}"
+
+    def lay_bo_nho_dem(self) -> BoNhoDemEmbedding | None:
+        """Cache embedding trên đĩa của model này (None nếu tắt hoặc chưa mở được)."""
+        if self._bo_nho_dem is None and self._dung_cache:
+            # Trước khi tải model chỉ mở được cache đã có (chưa biết số chiều)
+            kich_thuoc = self._kich_thuoc if self._model is not None else None
+            self._bo_nho_dem = lay_bo_nho_dem_embedding(self.phien_ban, kich_thuoc)
+            if self._bo_nho_dem is not None:
+                self._kich_thuoc = self._bo_nho_dem.kich_thuoc
+        return self._bo_nho_dem
 
     def tao_embedding(self, text: str) -> list[float]:
         """Tạo vector embedding cho một văn bản.
@@ -50,17 +423,15 @@ class BoTaoEmbeddings:
         Returns:
             List[float]: Vector embedding.
         """
-        self._tai_model()
-
         if not text:
+            self._tai_model()
             return [0.0] * self._kich_thuoc
 
         try:
-            # Giới hạn độ dài input để tối ưu hiệu suất
-            text_clean = text[:512]
-            embedding = self._model.encode(text_clean, normalize_embeddings=True)
-            return embedding.tolist()
+            return self.tao_ma_tran_tai_lieu([text])[0].tolist()
         except Exception as e:
+            if self._model is None:
+                raise
             logger.error(f"Lỗi tạo embedding: {e}")
             return [0.0] * self._kich_thuoc
 
@@ -73,25 +444,89 @@ class BoTaoEmbeddings:
         Returns:
             List vectors tương ứng.
         """
-        self._tai_model()
-
         if not danh_sach_text:
             return []
 
         try:
-            # Giới hạn độ dài mỗi text
-            texts_clean = [t[:512] if t else "" for t in danh_sach_text]
-            embeddings = self._model.encode(
-                texts_clean,
-                normalize_embeddings=True,
-                batch_size=32,
-                show_progress_bar=len(texts_clean) > 10,
-            )
-            return [e.tolist() for e in embeddings]
+            return self.tao_ma_tran_tai_lieu(danh_sach_text).tolist()
         except Exception as e:
+            if self._model is None:
+                raise
             logger.error(f"Lỗi tạo batch embeddings: {e}")
             return [[0.0] * self._kich_thuoc] * len(danh_sach_text)
 
+    def chia_doan(self, danh_sach_text: list[str]) -> list[list[str]]:
+        """Cắt từng văn bản thành các đoạn theo tokenizer của model (cả lô một lần)."""
+        self._tai_model()
+        # Chừa chỗ cho token đặc biệt (CLS/SEP) trong max_seq_length
+        so_token = min(self._so_token_doan, self._model.max_seq_length - 2)
+        texts = [t or "" for t in danh_sach_text]
+        if self._backend == "onnx":
+            ds_vi_tri = self._model.vi_tri_token(texts)
+        else:
+            ds_vi_tri = self._model.tokenizer(
+                texts, add_special_tokens=False, return_offsets_mapping=True, verbose=False
+            )["offset_mapping"]
+        return [
+            chia_doan_theo_token(
+                text, vi_tri, so_token, self._chong_lap_doan, self._so_doan_toi_da
+            )
+            for text, vi_tri in zip(texts, ds_vi_tri, strict=True)
+        ]
+
+    def tao_ma_tran_doan(self, danh_sach_text: list[str]) -> tuple[np.ndarray, np.ndarray]:
+        """Vector của mọi đoạn (m, d) và chỉ số văn bản của từng đoạn (m,).
+
+        Mọi đoạn của cả lô đi qua một lần ``tao_ma_tran`` (một lần ``encode``
+        cho phần chưa có trong cache); đoạn của cùng văn bản nằm liền nhau.
+        """
+        ds_doan = self.chia_doan(danh_sach_text)
+        chi_so = np.repeat(np.arange(len(ds_doan)), [len(doan) for doan in ds_doan])
+        ma_tran = self.tao_ma_tran([d for doan in ds_doan for d in doan], do_dai_toi_da=None)
+        metrics.tang("embedding_chunks", len(chi_so))
+        return ma_tran, chi_so
+
+    def tao_ma_tran_tai_lieu(self, danh_sach_text: list[str]) -> np.ndarray:
+        """Một vector mỗi văn bản (n, d) theo ``che_do_doan``.
+
+        ``truncate``: cắt theo ký tự; ``mean``/``chunks``: trung bình vector các
+        đoạn rồi chuẩn hóa lại L2.
+        """
+        if self._che_do_doan == "truncate":
+            return self.tao_ma_tran(danh_sach_text)
+
+        ma_tran, chi_so = self.tao_ma_tran_doan(danh_sach_text)
+        tong = np.zeros((len(danh_sach_text), ma_tran.shape[1]), dtype=np.float32)
+        np.add.at(tong, chi_so, ma_tran)
+        return tong / np.maximum(np.linalg.norm(tong, axis=1, keepdims=True), 1e-12)
+
+    def tao_ma_tran(
+        self, danh_sach_text: list[str], do_dai_toi_da: int | None = DO_DAI_TOI_DA
+    ) -> np.ndarray:
+        """Ma trận float32 (n, d) đã chuẩn hóa L2; chỉ encode văn bản chưa có trong cache.
+
+        ``do_dai_toi_da=None``: không cắt theo ký tự (đoạn đã giới hạn theo token).
+        """
+        texts_clean = [t[:do_dai_toi_da] if t else "" for t in danh_sach_text]
+        bo_nho_dem = self.lay_bo_nho_dem()
+        da_co = bo_nho_dem.lay_nhieu(texts_clean) if bo_nho_dem else [None] * len(texts_clean)
+        thieu = [i for i, vector in enumerate(da_co) if vector is None]
+        if not thieu:
+            return np.stack(da_co) if da_co else np.zeros((0, self._kich_thuoc), np.float32)
+
+        self._tai_model()
+        moi = np.asarray(self._encode([texts_clean[i] for i in thieu]), dtype=np.float32)
+        ket_qua = np.empty((len(texts_clean), moi.shape[1]), dtype=np.float32)
+        for i, vector in enumerate(da_co):
+            if vector is not None:
+                ket_qua[i] = vector
+        ket_qua[thieu] = moi
+
+        bo_nho_dem = self.lay_bo_nho_dem()
+        if bo_nho_dem is not None:
+            bo_nho_dem.luu_nhieu([texts_clean[i] for i in thieu], moi)
+        return ket_qua
+
     @property
     def kich_thuoc_vector(self) -> int:
         """Kích thước vector embedding."""
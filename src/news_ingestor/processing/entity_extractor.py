@@ -2,85 +2,179 @@
 
 from __future__ import annotations
 
+import hashlib
 import json
 import logging
 import re
+from dataclasses import dataclass, field, replace
 from pathlib import Path
 
+import numpy as np
+
+from config.settings import lay_cau_hinh_nlp
 from news_ingestor.models.enums import DanhMuc
-from news_ingestor.utils.text_utils import bo_dau
+from news_ingestor.processing.lexicon import lay_bo_tu_dien
+from news_ingestor.processing.ticker_index import (
+    chuan_hoa_bi_danh,
+    gop_tu_khoa,
+    tai_chi_muc,
+    xay_dung_chi_muc,
+)
+from news_ingestor.utils.aho_corasick import BoKhopDaMau
+from news_ingestor.utils.text_utils import VanBanChuanHoa, chuan_hoa_van_ban
 
 logger = logging.getLogger(__name__)
 
 
+@dataclass(frozen=True)
+class _TrangThaiMaCK:
+    """Ảnh chụp bất biến của từ điển mã CK; tải lại bằng cách thay cả đối tượng."""
+
+    ma_ck: frozenset[str] = frozenset()
+    bo_khop: BoKhopDaMau = field(default_factory=BoKhopDaMau)
+    phien_ban: str = ""
+
+
 class BoTrichXuatThucThe:
     """Nhận diện mã chứng khoán (NER) và phân loại danh mục tin tức.
 
-    Sử dụng từ điển từ config/tickers.json để matching.
+    Sử dụng từ điển từ config/tickers.json, biên dịch một lần thành automaton
+    Aho-Corasick trên từ đã bỏ dấu (khớp cả văn bản có dấu lẫn không dấu).
+    Nếu có chỉ mục toàn thị trường (``import-tickers``), automaton được nạp
+    sẵn từ file; bí danh trong tickers.json chưa có trong chỉ mục được gộp
+    thêm mỗi lần tải (chỉ khi đó mới biên dịch lại).
+    Từ khóa vĩ mô/ngành được đăng ký vào registry từ điển dùng chung (lexicon).
+    ``tai_lai()`` dựng bản mới ở bên cạnh rồi hoán đổi một lần, an toàn khi
+    các luồng khác đang trích xuất.
     """
 
-    def __init__(self, duong_dan_tickers: str = "config/tickers.json"):
-        self._ma_ck: dict[str, dict] = {}
-        self._tu_khoa_vi_mo: list[str] = []
-        self._tu_khoa_nganh: dict[str, list[str]] = {}
-        self._tai_cau_hinh(duong_dan_tickers)
-
-    def _tai_cau_hinh(self, duong_dan: str) -> None:
-        """Tải cấu hình từ file tickers.json."""
+    def __init__(
+        self,
+        duong_dan_tickers: str = "config/tickers.json",
+        duong_dan_chi_muc: str | None = None,
+    ):
+        if duong_dan_chi_muc is None:
+            duong_dan_chi_muc = lay_cau_hinh_nlp().duong_dan_chi_muc_ma_ck
+        self.duong_dan_tickers = duong_dan_tickers
+        self.duong_dan_chi_muc = duong_dan_chi_muc
+        self._trang_thai = _TrangThaiMaCK()
         try:
-            path = Path(duong_dan)
-            if not path.exists():
-                logger.warning(f"Không tìm thấy file tickers: {duong_dan}")
-                return
-
-            with open(path, encoding="utf-8") as f:
-                data = json.load(f)
-
-            self._ma_ck = data.get("ma_chung_khoan", {})
-            self._tu_khoa_vi_mo = data.get("tu_khoa_vi_mo", [])
-            self._tu_khoa_nganh = data.get("tu_khoa_nganh", {})
-
-            logger.info(
-                f"Đã tải {len(self._ma_ck)} mã CK, "
-                f"{len(self._tu_khoa_vi_mo)} từ khóa vĩ mô, "
-                f"{len(self._tu_khoa_nganh)} ngành"
-            )
+            self.tai_lai()
         except Exception as e:
             logger.error(f"Lỗi tải cấu hình tickers: {e}")
 
-    def trich_xuat_ma_ck(self, text: str) -> list[str]:
-        """Trích xuất danh sách mã chứng khoán từ văn bản.
+    @property
+    def phien_ban(self) -> str:
+        """Dấu vân tay của tickers.json + chỉ mục mã CK đang dùng."""
+        return self._trang_thai.phien_ban
+
+    def tai_lai(self) -> str:
+        """Đọc lại tickers.json (và chỉ mục mã CK nếu có), hoán đổi nguyên tử.
 
-        Sử dụng matching cả mã CK lẫn tên công ty/từ khóa.
+        Lỗi đọc/parse tickers.json được ném ra và giữ nguyên trạng thái cũ.
+        Trả về phiên bản mới.
         """
-        if not text:
-            return []
+        bam = hashlib.sha256()
+        path = Path(self.duong_dan_tickers)
+        if path.exists():
+            noi_dung = path.read_bytes()
+            data = json.loads(noi_dung)
+            bam.update(noi_dung)
+        else:
+            logger.warning(f"Không tìm thấy file tickers: {self.duong_dan_tickers}")
+            data = {}
+
+        ma_ck = data.get("ma_chung_khoan", {})
+        tu_khoa_vi_mo = data.get("tu_khoa_vi_mo", [])
+        tu_khoa_nganh = data.get("tu_khoa_nganh", {})
+        trang_thai = _TrangThaiMaCK(
+            ma_ck=frozenset(ma_ck),
+            bo_khop=xay_dung_chi_muc(ma_ck, khop_ma=True).bo_khop,
+        )
+        if self.duong_dan_chi_muc:
+            trang_thai = self._tai_chi_muc(self.duong_dan_chi_muc, ma_ck, bam) or trang_thai
+
+        lay_bo_tu_dien().cap_nhat(
+            {
+                "vi_mo": tu_khoa_vi_mo,
+                "nganh": [tk for ds in tu_khoa_nganh.values() for tk in ds],
+            }
+        )
+        self._trang_thai = replace(trang_thai, phien_ban=bam.hexdigest()[:16])
+
+        logger.info(
+            f"Đã tải {len(trang_thai.ma_ck)} mã CK, "
+            f"{len(tu_khoa_vi_mo)} từ khóa vĩ mô, "
+            f"{len(tu_khoa_nganh)} ngành"
+        )
+        return self._trang_thai.phien_ban
+
+    @staticmethod
+    def _tai_chi_muc(duong_dan: str, ma_ck: dict[str, dict], bam) -> _TrangThaiMaCK | None:
+        """Nạp chỉ mục mã CK toàn thị trường, gộp thêm bí danh mới của tickers.json."""
+        path = Path(duong_dan)
+        if not path.exists():
+            logger.debug(f"Chưa có chỉ mục mã CK: {duong_dan}, dùng tickers.json")
+            return None
 
-        text_lower = text.lower()
-        text_no_dau = bo_dau(text_lower)
-        ma_tim_thay: set[str] = set()
+        try:
+            chi_muc = tai_chi_muc(duong_dan)
+        except Exception as e:
+            logger.error(f"Lỗi nạp chỉ mục mã CK {duong_dan}: {e}")
+            return None
+
+        thong_tin = path.stat()
+        bam.update(f"{thong_tin.st_size}:{thong_tin.st_mtime_ns}".encode())
+        logger.info(
+            f"Đã nạp chỉ mục {chi_muc.so_ma} mã CK "
+            f"({chi_muc.bo_khop.so_mau} bí danh) từ {duong_dan}"
+        )
+
+        # Mã / bí danh thêm vào tickers.json sau lần import-tickers cuối
+        thieu = {
+            ma: thong_tin_ma
+            for ma, thong_tin_ma in ma_ck.items()
+            if ma not in chi_muc.ten_cong_ty
+            or not {
+                " ".join(chuan_hoa_bi_danh(tk)) for tk in thong_tin_ma.get("tu_khoa", [])
+            } <= set(chi_muc.bi_danh.get(ma, ()))
+        }
+        if thieu:
+            tu_chi_muc = {
+                ma: {"ten_cong_ty": ten, "tu_khoa": list(chi_muc.bi_danh.get(ma, ()))}
+                for ma, ten in chi_muc.ten_cong_ty.items()
+            }
+            chi_muc = xay_dung_chi_muc(gop_tu_khoa(thieu, tu_chi_muc))
+            logger.info(f"Đã gộp {len(thieu)} mã CK từ tickers.json vào chỉ mục")
+        return _TrangThaiMaCK(ma_ck=frozenset(chi_muc.ten_cong_ty), bo_khop=chi_muc.bo_khop)
+
+    def trich_xuat_ma_ck(self, text: str | VanBanChuanHoa) -> list[str]:
+        """Trích xuất danh sách mã chứng khoán từ văn bản.
 
-        for ma, thong_tin in self._ma_ck.items():
-            tu_khoa = thong_tin.get("tu_khoa", [])
+        Sử dụng matching cả mã CK lẫn tên công ty/từ khóa, theo ranh giới từ,
+        trong một lần duyệt văn bản.
+        """
+        van_ban = chuan_hoa_van_ban(text)
+        if not van_ban.goc:
+            return []
 
-            for tk in tu_khoa:
-                tk_lower = tk.lower()
-                tk_no_dau = bo_dau(tk_lower)
+        # Đọc trạng thái một lần: tải lại giữa chừng không làm lẫn hai bản
+        trang_thai = self._trang_thai
 
-                # Kiểm tra cả có dấu và không dấu
-                if tk_lower in text_lower or tk_no_dau in text_no_dau:
-                    ma_tim_thay.add(ma)
-                    break
+        # Văn bản bỏ dấu khớp cả từ khóa có dấu lẫn không dấu
+        ma_tim_thay = trang_thai.bo_khop.tim(van_ban.tokens)
 
         # Bổ sung: tìm mã CK 3 ký tự viết hoa (VD: FPT, VIC, VCB)
-        ma_regex = re.findall(r"\b([A-Z]{3})\b", text)
+        ma_regex = re.findall(r"\b([A-Z]{3})\b", van_ban.goc)
         for ma in ma_regex:
-            if ma in self._ma_ck:
+            if ma in trang_thai.ma_ck:
                 ma_tim_thay.add(ma)
 
         return sorted(ma_tim_thay)
 
-    def phan_loai_danh_muc(self, text: str, ma_ck_da_tim: list[str] | None = None) -> DanhMuc:
+    def phan_loai_danh_muc(
+        self, text: str | VanBanChuanHoa, ma_ck_da_tim: list[str] | None = None
+    ) -> DanhMuc:
         """Phân loại bài báo vào danh mục: MACRO, MICRO, hoặc INDUSTRY.
 
         Logic phân loại:
@@ -93,21 +187,10 @@ class BoTrichXuatThucThe:
         if ma_ck_da_tim:
             return DanhMuc.DOANH_NGHIEP
 
-        text_lower = text.lower()
-        text_no_dau = bo_dau(text_lower)
-
-        # Kiểm tra từ khóa ngành
-        diem_nganh = 0
-        for _nganh, tu_khoa_list in self._tu_khoa_nganh.items():
-            for tk in tu_khoa_list:
-                if tk.lower() in text_lower or bo_dau(tk.lower()) in text_no_dau:
-                    diem_nganh += 1
-
-        # Kiểm tra từ khóa vĩ mô
-        diem_vi_mo = 0
-        for tk in self._tu_khoa_vi_mo:
-            if tk.lower() in text_lower or bo_dau(tk.lower()) in text_no_dau:
-                diem_vi_mo += 1
+        # Đếm từ khóa ngành / vĩ mô (dùng chung lần quét từ điển với các bước khác)
+        ket_qua_quet = lay_bo_tu_dien().quet(chuan_hoa_van_ban(text))
+        diem_nganh = ket_qua_quet.dem("nganh")
+        diem_vi_mo = ket_qua_quet.dem("vi_mo")
 
         # Quyết định dựa trên điểm
         if diem_vi_mo > diem_nganh and diem_vi_mo > 0:
@@ -117,14 +200,33 @@ class BoTrichXuatThucThe:
 
         return DanhMuc.VI_MO  # Mặc định
 
-    def phan_tich(self, text: str) -> dict:
+    def phan_loai_danh_muc_nhieu(
+        self,
+        ds_text: list[str | VanBanChuanHoa],
+        ds_ma_ck_da_tim: list[list[str] | None],
+    ) -> list[DanhMuc]:
+        """Như ``phan_loai_danh_muc`` cho cả lô, đếm từ khóa trên ma trận bài × từ khóa."""
+        if not ds_text:
+            return []
+        khop = lay_bo_tu_dien().quet_nhieu([chuan_hoa_van_ban(text) for text in ds_text])
+        diem_nganh = khop.dem("nganh")
+        diem_vi_mo = khop.dem("vi_mo")
+
+        co_ma_ck = np.fromiter((bool(ma) for ma in ds_ma_ck_da_tim), dtype=bool)
+        nganh = (diem_nganh > 0) & (diem_vi_mo <= diem_nganh)
+        loai = np.select([co_ma_ck, nganh], [0, 1], default=2)
+        thu_tu = (DanhMuc.DOANH_NGHIEP, DanhMuc.NGANH, DanhMuc.VI_MO)
+        return [thu_tu[i] for i in loai.tolist()]
+
+    def phan_tich(self, text: str | VanBanChuanHoa) -> dict:
         """Phân tích đầy đủ: trích xuất mã CK + phân loại danh mục.
 
         Returns:
             Dict với keys: 'ma_chung_khoan', 'danh_muc'
         """
-        ma_ck = self.trich_xuat_ma_ck(text)
-        danh_muc = self.phan_loai_danh_muc(text, ma_ck)
+        van_ban = chuan_hoa_van_ban(text)
+        ma_ck = self.trich_xuat_ma_ck(van_ban)
+        danh_muc = self.phan_loai_danh_muc(van_ban, ma_ck)
 
         return {
             "ma_chung_khoan": ma_ck,
@@ -0,0 +1,277 @@
+"""Gemini Batch Backend - Phân tích cảm xúc nhiều bài trong một request Gemini.
+
+Mỗi request gộp tối đa ``kich_thuoc_lo`` bài và yêu cầu Gemini trả về một mảng
+JSON (mỗi bài một kết quả, khớp theo ``id``). Các lô chạy đồng thời nhưng bị
+giới hạn bởi số request đồng thời, ngân sách request/phút và token/phút. Bài
+trùng nội dung trong cùng lần gọi chỉ được gửi một lần; cache giữa các lần gọi
+nằm ở ``BoNhoDemKetQua`` (khóa theo ``phien_ban``).
+
+Gọi thẳng REST API qua pool HTTP dùng chung để có timeout theo request và có
+thể thay endpoint bằng server giả lập khi test.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import threading
+import time
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+
+from news_ingestor.models.enums import CamXuc
+from news_ingestor.utils.http_pool import lay_bo_ket_noi
+from news_ingestor.utils.metrics import lay_metrics
+from news_ingestor.utils.rate_limiter import BoGioiHanToc
+
+logger = logging.getLogger(__name__)
+metrics = lay_metrics()
+
+# Tăng khi đổi prompt/format để không dùng lại kết quả đã cache
+PHIEN_BAN_PROMPT = 1
+SO_KY_TU_MOI_BAI = 2000
+# Ước lượng thô cho tiếng Việt; được hiệu chỉnh theo usageMetadata sau mỗi request
+SO_KY_TU_MOI_TOKEN = 3
+TOKEN_DAU_RA_MOI_BAI = 40
+
+_NHAN = {
+    "POSITIVE": CamXuc.TICH_CUC,
+    "NEGATIVE": CamXuc.TIEU_CUC,
+    "NEUTRAL": CamXuc.TRUNG_TINH,
+}
+
+_HUONG_DAN = """Bạn là chuyên gia phân tích cảm xúc tin tức tài chính Việt Nam chuyên nghiệp.
+Nhiệm vụ: Phân tích cảm xúc TỪNG bài báo bên dưới đối với thị trường tài chính
+hoặc một doanh nghiệp cụ thể.
+
+Quy tắc quan trọng:
+1. Hãy nhạy bén với tin tức tiêu cực như: bắt giam lãnh đạo, tấn công vũ trang, khởi tố,
+lừa đảo, lỗ nặng. Những tin này PHẢI là NEGATIVE.
+2. Các hoạt động M&A (sát nhập, mua lại) thường là POSITIVE hoặc NEUTRAL tùy ngữ cảnh.
+Nếu là hai doanh nghiệp lớn sát nhập để tăng sức mạnh thì thường là POSITIVE.
+3. Nếu tin tức có tác động hỗn hợp, hãy ưu tiên tác động ngắn hạn lên giá cổ phiếu.
+4. Trả về một mảng JSON, mỗi bài đúng một phần tử:
+{"id": <số thứ tự bài>, "nhan": "POSITIVE" | "NEGATIVE" | "NEUTRAL",
+ "diem": <số thực từ -1.0 đến 1.0>, "tin_don": true | false}
+"""
+
+_SCHEMA_KET_QUA = {
+    "type": "ARRAY",
+    "items": {
+        "type": "OBJECT",
+        "properties": {
+            "id": {"type": "INTEGER"},
+            "nhan": {"type": "STRING", "enum": list(_NHAN)},
+            "diem": {"type": "NUMBER"},
+            "tin_don": {"type": "BOOLEAN"},
+        },
+        "required": ["id", "nhan", "diem"],
+    },
+}
+
+
+class _NganSachToken:
+    """Token bucket theo số token/phút; cho phép nợ (xếp hàng) như ``BoGioiHanToc``."""
+
+    def __init__(self, token_moi_phut: int, dong_ho: Callable[[], float] = time.monotonic):
+        self._lock = threading.Lock()
+        self._dong_ho = dong_ho
+        self._toc_do = token_moi_phut / 60.0
+        self._dung_luong = float(token_moi_phut)
+        self._so_token = float(token_moi_phut)
+        self._cap_nhat_luc = dong_ho()
+
+    def dat_truoc(self, so_token: int) -> float:
+        """Trừ ``so_token`` khỏi ngân sách, trả về số giây cần chờ."""
+        with self._lock:
+            bay_gio = self._dong_ho()
+            self._so_token = min(
+                self._dung_luong,
+                self._so_token + (bay_gio - self._cap_nhat_luc) * self._toc_do,
+            )
+            self._cap_nhat_luc = bay_gio
+            self._so_token -= so_token
+            return -self._so_token / self._toc_do if self._so_token < 0 else 0.0
+
+    def dieu_chinh(self, chenh_lech: int) -> None:
+        """Hiệu chỉnh theo số token thực tế (dương = tiêu nhiều hơn ước lượng)."""
+        with self._lock:
+            self._so_token = min(self._dung_luong, self._so_token - chenh_lech)
+
+
+class BoPhanTichGeminiLo:
+    """Phân tích cảm xúc theo lô qua Gemini REST API.
+
+    ``phan_tich_nhieu`` trả về kết quả theo đúng thứ tự đầu vào; phần tử là
+    ``None`` khi Gemini lỗi hoặc thiếu kết quả cho bài đó (bên gọi tự fallback).
+    """
+
+    def __init__(
+        self,
+        api_key: str,
+        model: str = "gemini-2.0-flash-lite",
+        base_url: str = "https://generativelanguage.googleapis.com",
+        kich_thuoc_lo: int = 10,
+        so_request_dong_thoi: int = 4,
+        request_moi_phut: int = 30,
+        token_moi_phut: int = 500_000,
+        timeout: float = 30.0,
+    ):
+        self._api_key = api_key
+        self._model = model
+        self._url = f"{base_url.rstrip('/')}/v1beta/models/{model}:generateContent"
+        self._kich_thuoc_lo = kich_thuoc_lo
+        self._so_request_dong_thoi = so_request_dong_thoi
+        self._timeout = timeout
+
+        self._dong_thoi = threading.Semaphore(so_request_dong_thoi)
+        self._gioi_han_toc = BoGioiHanToc(
+            cau_hinh_host={
+                self._url: {"toc_do": request_moi_phut / 60.0, "burst": so_request_dong_thoi}
+            }
+        )
+        self._ngan_sach_token = _NganSachToken(token_moi_phut)
+
+    @classmethod
+    def tu_cau_hinh(cls, api_key: str) -> BoPhanTichGeminiLo:
+        """Tạo backend theo ``CauHinhNLP``."""
+        from config.settings import lay_cau_hinh_nlp
+
+        cau_hinh = lay_cau_hinh_nlp()
+        return cls(
+            api_key=api_key,
+            model=cau_hinh.gemini_model,
+            base_url=cau_hinh.gemini_base_url,
+            kich_thuoc_lo=cau_hinh.gemini_kich_thuoc_lo,
+            so_request_dong_thoi=cau_hinh.gemini_so_request_dong_thoi,
+            request_moi_phut=cau_hinh.gemini_request_moi_phut,
+            token_moi_phut=cau_hinh.gemini_token_moi_phut,
+            timeout=cau_hinh.gemini_timeout_giay,
+        )
+
+    @property
+    def phien_ban(self) -> str:
+        """Định danh model + prompt, dùng làm phiên bản khóa cache kết quả."""
+        return f"gemini:{self._model}:p{PHIEN_BAN_PROMPT}"
+
+    def phan_tich_nhieu(self, ds_text: list[str]) -> list[dict | None]:
+        """Phân tích cảm xúc nhiều bài, gửi theo lô (bài trùng nội dung chỉ gửi một lần)."""
+        ket_qua: list[dict | None] = [None] * len(ds_text)
+        vi_tri: dict[str, list[int]] = {}
+        for i, text in enumerate(ds_text):
+            vi_tri.setdefault(text[:SO_KY_TU_MOI_BAI], []).append(i)
+        if not vi_tri:
+            return ket_qua
+
+        ds_can_goi = list(vi_tri)
+        ds_lo = [
+            ds_can_goi[i:i + self._kich_thuoc_lo]
+            for i in range(0, len(ds_can_goi), self._kich_thuoc_lo)
+        ]
+
+        if len(ds_lo) == 1:
+            ds_ket_qua_lo = [self._goi_lo(ds_lo[0])]
+        else:
+            so_luong = min(len(ds_lo), self._so_request_dong_thoi)
+            with ThreadPoolExecutor(max_workers=so_luong, thread_name_prefix="gemini") as pool:
+                ds_ket_qua_lo = list(pool.map(self._goi_lo, ds_lo))
+
+        for lo, ket_qua_lo in zip(ds_lo, ds_ket_qua_lo, strict=True):
+            for text, kq in zip(lo, ket_qua_lo, strict=True):
+                if kq is None:
+                    continue
+                for i in vi_tri[text]:
+                    ket_qua[i] = dict(kq)
+        return ket_qua
+
+    def _goi_lo(self, ds_text: list[str]) -> list[dict | None]:
+        """Gửi một request cho cả lô, trả về kết quả theo thứ tự (None nếu thiếu)."""
+        prompt = self._tao_prompt(ds_text)
+        uoc_luong = len(prompt) // SO_KY_TU_MOI_TOKEN + TOKEN_DAU_RA_MOI_BAI * len(ds_text)
+        payload = {
+            "contents": [{"role": "user", "parts": [{"text": prompt}]}],
+            "generationConfig": {
+                "temperature": 0.0,
+                "responseMimeType": "application/json",
+                "responseSchema": _SCHEMA_KET_QUA,
+            },
+        }
+
+        with self._dong_thoi:
+            cho_token = self._ngan_sach_token.dat_truoc(uoc_luong)
+            if cho_token > 0:
+                metrics.tang("gemini_token_budget_wait_ms", int(cho_token * 1000))
+                time.sleep(cho_token)
+            self._gioi_han_toc.cho(self._url)
+
+            bat_dau = time.perf_counter()
+            try:
+                client = lay_bo_ket_noi().lay_client()
+                response = client.post(
+                    self._url,
+                    json=payload,
+                    headers={"x-goog-api-key": self._api_key, "Accept": "application/json"},
+                    timeout=self._timeout,
+                )
+                response.raise_for_status()
+                du_lieu = response.json()
+            except Exception as e:
+                metrics.tang("gemini_errors")
+                logger.warning(f"Gemini lỗi cho lô {len(ds_text)} bài: {e}")
+                return [None] * len(ds_text)
+            finally:
+                metrics.tang("gemini_requests")
+                metrics.tang("gemini_request_ms", int((time.perf_counter() - bat_dau) * 1000))
+
+        so_token = (du_lieu.get("usageMetadata") or {}).get("totalTokenCount")
+        if isinstance(so_token, int):
+            self._ngan_sach_token.dieu_chinh(so_token - uoc_luong)
+            metrics.tang("gemini_tokens", so_token)
+        metrics.tang("gemini_articles_sent", len(ds_text))
+
+        theo_id = self._doc_phan_hoi(du_lieu)
+        ket_qua = [theo_id.get(i) for i in range(1, len(ds_text) + 1)]
+        thieu = ket_qua.count(None)
+        if thieu:
+            metrics.tang("gemini_missing_results", thieu)
+            logger.debug(f"Gemini thiếu {thieu}/{len(ds_text)} kết quả trong lô")
+        return ket_qua
+
+    @staticmethod
+    def _tao_prompt(ds_text: list[str]) -> str:
+        phan = [_HUONG_DAN]
+        for i, text in enumerate(ds_text, 1):
+            phan.append(f"\n### Bài {i}\n{text[:SO_KY_TU_MOI_BAI]}")
+        return "\n".join(phan)
+
+    @staticmethod
+    def _doc_phan_hoi(du_lieu: dict) -> dict[int, dict]:
+        """Parse mảng JSON trong response thành {id: kết quả}; bỏ qua phần tử hỏng."""
+        try:
+            text = "".join(
+                part.get("text", "")
+                for part in du_lieu["candidates"][0]["content"]["parts"]
+            )
+            ds_muc = json.loads(text)
+        except (KeyError, IndexError, TypeError, ValueError) as e:
+            metrics.tang("gemini_parse_errors")
+            logger.debug(f"Parse Gemini response lỗi: {e}")
+            return {}
+
+        if not isinstance(ds_muc, list):
+            metrics.tang("gemini_parse_errors")
+            return {}
+
+        ket_qua: dict[int, dict] = {}
+        for muc in ds_muc:
+            try:
+                nhan = _NHAN.get(str(muc["nhan"]).strip().upper(), CamXuc.TRUNG_TINH)
+                ket_qua[int(muc["id"])] = {
+                    "nhan": nhan,
+                    "diem": max(-1.0, min(1.0, float(muc["diem"]))),
+                    "tin_don": bool(muc.get("tin_don", False)),
+                    "nguon": "gemini",
+                }
+            except (KeyError, TypeError, ValueError):
+                continue
+        return ket_qua
@@ -0,0 +1,189 @@
+"""Hot Reload - Tải lại từ điển NLP khi file cấu hình thay đổi, không cần khởi động lại.
+
+Theo dõi (polling mtime) ``config/tickers.json``, chỉ mục mã CK và file ghi đè
+từ điển từ khóa (``LEXICON_PATH``). Bản mới luôn được biên dịch ở bên cạnh rồi
+hoán đổi một lần (xem ``BoTuDien.cap_nhat`` / ``BoTrichXuatThucThe.tai_lai``),
+nên các luồng đang phân tích không bao giờ thấy từ điển nửa cũ nửa mới; file
+lỗi giữ nguyên bản đang chạy.
+
+Định dạng file ghi đè: ``{"tên từ điển": ["từ khóa", ...]}``, ví dụ
+``{"tac_dong_cao": ["lãi suất điều hành", "tỷ giá"]}``. Xóa một khóa khỏi
+file sẽ khôi phục từ điển mặc định tương ứng.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import threading
+import time
+from pathlib import Path
+
+from news_ingestor.processing.entity_extractor import BoTrichXuatThucThe
+from news_ingestor.processing.lexicon import (
+    BoTuDien,
+    lay_bo_tu_dien,
+    lay_bo_tu_dien_ngram,
+)
+from news_ingestor.utils.metrics import lay_metrics
+
+logger = logging.getLogger(__name__)
+metrics = lay_metrics()
+
+# Từ điển do tickers.json quản lý, không ghi đè qua file từ điển
+_TU_DIEN_TU_TICKERS = frozenset({"vi_mo", "nganh"})
+
+
+def _dau_file(duong_dan: str | None) -> tuple[int, int] | None:
+    """(mtime_ns, kích thước) của file; None nếu không có."""
+    if not duong_dan:
+        return None
+    try:
+        thong_tin = Path(duong_dan).stat()
+    except OSError:
+        return None
+    return thong_tin.st_mtime_ns, thong_tin.st_size
+
+
+def doc_file_tu_dien(duong_dan: str | Path) -> dict[str, list[str]]:
+    """Đọc file ghi đè từ điển; ValueError nếu sai định dạng."""
+    with open(duong_dan, encoding="utf-8") as f:
+        du_lieu = json.load(f)
+    if not isinstance(du_lieu, dict):
+        raise ValueError(f"{duong_dan}: cần object {{tên từ điển: [từ khóa]}}")
+    for ten, ds_tu in du_lieu.items():
+        if not isinstance(ds_tu, list) or not all(isinstance(tu, str) for tu in ds_tu):
+            raise ValueError(f"{duong_dan}: từ điển '{ten}' phải là danh sách chuỗi")
+    return du_lieu
+
+
+class BoTaiLaiTuDien:
+    """Theo dõi file từ điển và tải lại nóng cho một bộ trích xuất thực thể.
+
+    ``kiem_tra()`` kiểm tra một lần (đồng bộ); ``bat_dau()`` chạy kiểm tra
+    định kỳ trên một thread nền cho các tiến trình chạy lâu (daemon).
+    """
+
+    def __init__(
+        self,
+        trich_xuat: BoTrichXuatThucThe,
+        duong_dan_tu_dien: str | None = None,
+        bo_tu_dien: BoTuDien | None = None,
+        bo_tu_dien_ngram: BoTuDien | None = None,
+    ):
+        if duong_dan_tu_dien is None:
+            from config.settings import lay_cau_hinh_nlp
+
+            duong_dan_tu_dien = lay_cau_hinh_nlp().duong_dan_tu_dien
+        self._trich_xuat = trich_xuat
+        self._duong_dan_tu_dien = duong_dan_tu_dien
+        self._bo_tu_dien = bo_tu_dien or lay_bo_tu_dien()
+        self._bo_tu_dien_ngram = bo_tu_dien_ngram or lay_bo_tu_dien_ngram()
+        # Từ khóa mặc định của các từ điển đã bị ghi đè (để khôi phục khi bỏ khỏi file)
+        self._mac_dinh: dict[str, list[str]] = {}
+        self._dau_ma_ck: tuple | None = None
+        self._dau_tu_dien: tuple | None = None
+        self._da_kiem_tra = False
+        self._lock = threading.Lock()
+        self._dung = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    @property
+    def phien_ban(self) -> str:
+        """Phiên bản tổng hợp gắn lên bài báo: mã CK, từ điển dùng chung, từ điển n-gram."""
+        return ":".join(
+            phien_ban[:8]
+            for phien_ban in (
+                self._trich_xuat.phien_ban,
+                self._bo_tu_dien.phien_ban,
+                self._bo_tu_dien_ngram.phien_ban,
+            )
+        )
+
+    def kiem_tra(self) -> bool:
+        """Tải lại phần đã đổi kể từ lần kiểm tra trước; True nếu có tải lại.
+
+        Lần gọi đầu chỉ ghi nhận trạng thái file mã CK (bộ trích xuất vừa nạp
+        xong) và áp dụng file ghi đè từ điển nếu có.
+        """
+        with self._lock:
+            dau_ma_ck = (
+                _dau_file(self._trich_xuat.duong_dan_tickers),
+                _dau_file(self._trich_xuat.duong_dan_chi_muc),
+            )
+            dau_tu_dien = _dau_file(self._duong_dan_tu_dien)
+
+            can_tai_ma_ck = self._da_kiem_tra and dau_ma_ck != self._dau_ma_ck
+            can_tai_tu_dien = dau_tu_dien != self._dau_tu_dien or (
+                not self._da_kiem_tra and dau_tu_dien is not None
+            )
+            self._dau_ma_ck, self._dau_tu_dien = dau_ma_ck, dau_tu_dien
+            self._da_kiem_tra = True
+            if not (can_tai_ma_ck or can_tai_tu_dien):
+                return False
+
+            bat_dau = time.perf_counter()
+            try:
+                if can_tai_ma_ck:
+                    self._trich_xuat.tai_lai()
+                if can_tai_tu_dien:
+                    self._ap_dung_tu_dien()
+            except Exception as e:
+                # Giữ bản đang chạy; file được đọc lại ở lần thay đổi kế tiếp
+                metrics.tang("lexicon_reload_errors")
+                logger.error(f"Lỗi tải lại từ điển, giữ phiên bản cũ: {e}")
+                return False
+
+            thoi_gian_ms = int((time.perf_counter() - bat_dau) * 1000)
+            metrics.tang("lexicon_reloads")
+            metrics.gan("lexicon_reload_ms", thoi_gian_ms)
+            logger.info(f"Đã tải lại từ điển NLP ({self.phien_ban}) trong {thoi_gian_ms}ms")
+            return True
+
+    def _ap_dung_tu_dien(self) -> None:
+        """Áp dụng file ghi đè lên registry dùng chung và registry n-gram."""
+        ghi_de: dict[str, list[str]] = {}
+        if self._dau_tu_dien is not None:
+            ghi_de = doc_file_tu_dien(self._duong_dan_tu_dien)
+        for ten in _TU_DIEN_TU_TICKERS & set(ghi_de):
+            logger.warning(f"Bỏ qua từ điển '{ten}' trong file ghi đè: sửa tickers.json")
+            del ghi_de[ten]
+
+        ds_ngram = set(self._bo_tu_dien_ngram.ten_tu_dien())
+        for ten in ghi_de:
+            if ten not in self._mac_dinh:
+                self._mac_dinh[ten] = self._bo_tu_dien.tu_khoa(ten)
+        # Từ điển đã bị xóa khỏi file → trở về mặc định
+        moi = {ten: self._mac_dinh.get(ten, []) for ten in self._mac_dinh} | ghi_de
+
+        self._bo_tu_dien.cap_nhat(moi)
+        self._bo_tu_dien_ngram.cap_nhat({ten: ds for ten, ds in moi.items() if ten in ds_ngram})
+
+    def bat_dau(self, chu_ky: float | None = None) -> bool:
+        """Chạy kiểm tra định kỳ trên thread nền; False nếu chu kỳ = 0 (tắt)."""
+        if chu_ky is None:
+            from config.settings import lay_cau_hinh_nlp
+
+            chu_ky = lay_cau_hinh_nlp().chu_ky_tai_lai_tu_dien
+        if chu_ky <= 0 or self._thread is not None:
+            return False
+
+        def chay() -> None:
+            while not self._dung.wait(chu_ky):
+                try:
+                    self.kiem_tra()
+                except Exception:
+                    logger.exception("Lỗi thread theo dõi từ điển")
+
+        self._dung.clear()
+        self._thread = threading.Thread(target=chay, name="lexicon-reload", daemon=True)
+        self._thread.start()
+        logger.info(f"Theo dõi thay đổi từ điển mỗi {chu_ky:g}s")
+        return True
+
+    def dung(self) -> None:
+        """Dừng thread theo dõi (nếu đang chạy)."""
+        self._dung.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
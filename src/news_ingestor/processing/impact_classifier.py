@@ -1,93 +1,166 @@
-"""Bộ phân loại mức độ tác động đến tài chính Việt Nam (rule-based v1)."""
+"""Bộ phân loại mức độ tác động đến tài chính Việt Nam (rule-based)."""
 
 from __future__ import annotations
 
-from news_ingestor.utils.text_utils import bo_dau
+import numpy as np
+
+from news_ingestor.processing.lexicon import (
+    BoTuDien,
+    KetQuaQuet,
+    lay_bo_tu_dien,
+    lay_bo_tu_dien_ngram,
+)
+from news_ingestor.storage.result_cache import BoNhoDemKetQua
+from news_ingestor.utils.text_utils import VanBanChuanHoa
 
 
 class BoPhanLoaiTacDong:
-    """Classifier v1 dựa trên từ khóa + mã chứng khoán + chủ đề."""
+    """Classifier dựa trên từ khóa + mã chứng khoán + chủ đề.
+
+    - ``v2`` (mặc định): khớp n-gram theo ranh giới từ, giữ dấu
+    - ``v1``: khớp chuỗi con trên văn bản bỏ dấu, giữ lại để so sánh
+      (``evaluate --impact-labels``)
+    """
 
+    # Từ khóa viết có dấu: bản v2 khớp giữ dấu ("thuế" không khớp "thuê")
     TU_KHOA_TAC_DONG_CAO = {
-        "ngan hang nha nuoc",
+        "ngân hàng nhà nước",
         "nhnn",
-        "lai suat",
-        "ty gia",
-        "lam phat",
+        "lãi suất",
+        "tỷ giá",
+        "lạm phát",
         "gdp",
         "cpi",
         "fed",
-        "chinh sach tien te",
-        "trai phieu chinh phu",
-        "room tin dung",
-        "thue",
-        "thuong mai",
-        "xuat khau",
-        "nhap khau",
-        "gia xang",
-        "gia dau",
+        "chính sách tiền tệ",
+        "trái phiếu chính phủ",
+        "room tín dụng",
+        "thuế",
+        "thương mại",
+        "xuất khẩu",
+        "nhập khẩu",
+        "giá xăng",
+        "giá dầu",
         "vn-index",
         "vnindex",
-        "thi truong chung khoan",
-        "bat dong san",
-        "khung hoang",
-        "suy thoai",
-        "thao tung",
-        "pha san",
-        "vo no",
-        "giai ngan dau tu cong",
+        "thị trường chứng khoán",
+        "bất động sản",
+        "khủng hoảng",
+        "suy thoái",
+        "thao túng",
+        "phá sản",
+        "vỡ nợ",
+        "giải ngân đầu tư công",
     }
 
     TU_KHOA_TAC_DONG_TRUNG_BINH = {
         "doanh thu",
-        "loi nhuan",
-        "co tuc",
-        "mua lai co phieu",
-        "chia co tuc",
-        "phat hanh",
-        "trai phieu doanh nghiep",
+        "lợi nhuận",
+        "cổ tức",
+        "mua lại cổ phiếu",
+        "chia cổ tức",
+        "phát hành",
+        "trái phiếu doanh nghiệp",
         "m&a",
-        "sap nhap",
-        "hop tac chien luoc",
-        "nang hang",
-        "ha hang",
-        "khoi ngoai",
-        "mua rong",
-        "ban rong",
-        "thanh khoan",
+        "sáp nhập",
+        "hợp tác chiến lược",
+        "nâng hạng",
+        "hạ hạng",
+        "khối ngoại",
+        "mua ròng",
+        "bán ròng",
+        "thanh khoản",
     }
 
     TAG_THEO_CHU_DE = {
-        "lai_suat": {"lai suat", "nhnn", "fed", "chinh sach tien te"},
-        "ty_gia": {"ty gia", "usd", "ngoai hoi"},
-        "lam_phat": {"lam phat", "cpi"},
-        "tang_truong": {"gdp", "tang truong kinh te"},
-        "co_phieu": {"vn-index", "vnindex", "thi truong chung khoan", "co phieu"},
-        "ngan_hang": {"ngan hang", "tin dung", "room tin dung"},
-        "bat_dong_san": {"bat dong san", "nha o", "du an"},
-        "nang_luong": {"gia xang", "gia dau", "nang luong"},
-        "thuong_mai": {"xuat khau", "nhap khau", "thuong mai"},
+        "lai_suat": {"lãi suất", "nhnn", "fed", "chính sách tiền tệ"},
+        "ty_gia": {"tỷ giá", "usd", "ngoại hối"},
+        "lam_phat": {"lạm phát", "cpi"},
+        "tang_truong": {"gdp", "tăng trưởng kinh tế"},
+        "co_phieu": {"vn-index", "vnindex", "thị trường chứng khoán", "cổ phiếu"},
+        "ngan_hang": {"ngân hàng", "tín dụng", "room tín dụng"},
+        "bat_dong_san": {"bất động sản", "nhà ở", "dự án"},
+        "nang_luong": {"giá xăng", "giá dầu", "năng lượng"},
+        "thuong_mai": {"xuất khẩu", "nhập khẩu", "thương mại"},
     }
 
-    def phan_loai(self, tieu_de: str, noi_dung: str, ma_ck: list[str] | None = None) -> dict:
-        """Trả về điểm, mức tác động, và tags."""
-        text = f"{tieu_de} {noi_dung}".strip().lower()
-        text_khong_dau = bo_dau(text)
-
-        diem = 0
-
-        for tu in self.TU_KHOA_TAC_DONG_CAO:
-            if tu in text_khong_dau:
-                diem += 3
-
-        for tu in self.TU_KHOA_TAC_DONG_TRUNG_BINH:
-            if tu in text_khong_dau:
-                diem += 1
+    BO_PHAN_TICH = "impact"
+    CHE_DO = ("v1", "v2")
+
+    def __init__(self, bo_nho_dem: BoNhoDemKetQua | None = None, che_do: str = "v2"):
+        if che_do not in self.CHE_DO:
+            raise ValueError(f"che_do phải là một trong {self.CHE_DO}")
+        self._bo_nho_dem = bo_nho_dem
+        self._che_do = che_do
+        self._tu_dien: BoTuDien = bo_tu_dien if che_do == "v1" else bo_tu_dien_ngram
+
+    @property
+    def phien_ban(self) -> str:
+        """Chế độ khớp + dấu vân tay từ điển, một phần của khóa cache."""
+        return f"{self._che_do}:{self._tu_dien.phien_ban}"
+
+    def phan_loai(
+        self,
+        tieu_de: str,
+        noi_dung: str,
+        ma_ck: list[str] | None = None,
+        van_ban: VanBanChuanHoa | None = None,
+    ) -> dict:
+        """Trả về điểm, mức tác động, và tags.
+
+        ``van_ban`` là tiêu đề + nội dung đã chuẩn hóa sẵn (nếu có) để khỏi bỏ dấu
+        và quét từ điển lại.
+        """
+        if van_ban is None:
+            van_ban = VanBanChuanHoa.tu_van_ban(f"{tieu_de} {noi_dung}".strip())
+        return self.phan_loai_nhieu([van_ban], [ma_ck])[0]
+
+    def phan_loai_nhieu(
+        self,
+        ds_van_ban: list[VanBanChuanHoa],
+        ds_ma_ck: list[list[str] | None],
+    ) -> list[dict]:
+        """Chấm điểm tác động nhiều bài (tiêu đề + nội dung đã chuẩn hóa), dùng cache nếu có."""
+        if self._bo_nho_dem is None:
+            return self._cham_diem_lo(ds_van_ban, ds_ma_ck)
+
+        # Điểm chỉ phụ thuộc văn bản và số mã CK (tối đa 5)
+        phien_ban = self.phien_ban
+        ds_khoa = [
+            BoNhoDemKetQua.tao_khoa(
+                self.BO_PHAN_TICH, phien_ban, f"{min(len(ma_ck or []), 5)}|{van_ban.goc}"
+            )
+            for van_ban, ma_ck in zip(ds_van_ban, ds_ma_ck, strict=True)
+        ]
+        ket_qua = self._bo_nho_dem.lay_nhieu(self.BO_PHAN_TICH, ds_khoa)
+        thieu = [i for i, kq in enumerate(ket_qua) if kq is None]
+        ds_moi = self._cham_diem_lo(
+            [ds_van_ban[i] for i in thieu], [ds_ma_ck[i] for i in thieu]
+        )
+        for i, kq in zip(thieu, ds_moi, strict=True):
+            ket_qua[i] = kq
+        self._bo_nho_dem.luu_nhieu(
+            self.BO_PHAN_TICH, phien_ban, {ds_khoa[i]: ket_qua[i] for i in thieu}
+        )
+        return ket_qua
+
+    def _cham_diem_lo(
+        self, ds_van_ban: list[VanBanChuanHoa], ds_ma_ck: list[list[str] | None]
+    ) -> list[dict]:
+        # Một bài: đường đơn lẻ rẻ hơn dựng ma trận
+        if len(ds_van_ban) == 1:
+            return [self._cham_diem(ds_van_ban[0], ds_ma_ck[0])]
+        return self._cham_diem_nhieu(ds_van_ban, ds_ma_ck)
+
+    def _cham_diem(self, van_ban: VanBanChuanHoa, ma_ck: list[str] | None) -> dict:
+        ket_qua_quet = self._tu_dien.quet(van_ban)
+
+        diem = 3 * ket_qua_quet.dem("tac_dong_cao") + ket_qua_quet.dem("tac_dong_trung_binh")
 
         if ma_ck:
             diem += min(len(ma_ck), 5)
 
-        tags = self._gan_tags(text_khong_dau)
+        tags = self._gan_tags(ket_qua_quet)
 
         if diem >= 8:
             muc = "HIGH"
@@ -103,9 +176,40 @@ class BoPhanLoaiTacDong:
             "is_high_impact": muc == "HIGH",
         }
 
-    def _gan_tags(self, text_khong_dau: str) -> list[str]:
-        tags: list[str] = []
-        for tag, tu_khoa_set in self.TAG_THEO_CHU_DE.items():
-            if any(tu in text_khong_dau for tu in tu_khoa_set):
-                tags.append(tag)
-        return tags
+    def _cham_diem_nhieu(
+        self, ds_van_ban: list[VanBanChuanHoa], ds_ma_ck: list[list[str] | None]
+    ) -> list[dict]:
+        """Như ``_cham_diem`` cho cả lô, tính trên ma trận bài × từ khóa."""
+        if not ds_van_ban:
+            return []
+        khop = self._tu_dien.quet_nhieu(ds_van_ban)
+
+        so_ma = np.fromiter((min(len(ma or []), 5) for ma in ds_ma_ck), dtype=np.int64)
+        diem = 3 * khop.dem("tac_dong_cao") + khop.dem("tac_dong_trung_binh") + so_ma
+        muc = np.select([diem >= 8, diem >= 4], ["HIGH", "MEDIUM"], default="LOW")
+
+        # Ma trận bài × tag, mỗi cột là một chủ đề theo thứ tự TAG_THEO_CHU_DE
+        ds_tag = list(self.TAG_THEO_CHU_DE)
+        co_tag = np.column_stack([khop.co(f"chu_de_{tag}") for tag in ds_tag])
+
+        return [
+            {
+                "impact_score": d,
+                "impact_level": m,
+                "impact_tags": [tag for tag, co in zip(ds_tag, hang, strict=True) if co],
+                "is_high_impact": m == "HIGH",
+            }
+            for d, m, hang in zip(diem.tolist(), muc.tolist(), co_tag.tolist(), strict=True)
+        ]
+
+    def _gan_tags(self, ket_qua_quet: KetQuaQuet) -> list[str]:
+        return [tag for tag in self.TAG_THEO_CHU_DE if ket_qua_quet.co(f"chu_de_{tag}")]
+
+
+bo_tu_dien = lay_bo_tu_dien()
+bo_tu_dien_ngram = lay_bo_tu_dien_ngram()
+for _tu_dien in (bo_tu_dien, bo_tu_dien_ngram):
+    _tu_dien.dang_ky("tac_dong_cao", BoPhanLoaiTacDong.TU_KHOA_TAC_DONG_CAO)
+    _tu_dien.dang_ky("tac_dong_trung_binh", BoPhanLoaiTacDong.TU_KHOA_TAC_DONG_TRUNG_BINH)
+    for _tag, _tu_khoa in BoPhanLoaiTacDong.TAG_THEO_CHU_DE.items():
+        _tu_dien.dang_ky(f"chu_de_{_tag}", _tu_khoa)
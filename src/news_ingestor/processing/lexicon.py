@@ -0,0 +1,369 @@
+"""Lexicon Registry - Từ điển từ khóa biên dịch sẵn, dùng chung cho mọi bộ chấm điểm.
+
+Mỗi từ điển (cảm xúc, tác động, vĩ mô/ngành...) được đăng ký một lần; từ khóa
+được chữ thường + bỏ dấu khi biên dịch, không phải lặp lại cho từng bài báo.
+Toàn bộ từ khóa gộp thành một regex dạng trie nên mỗi bài chỉ cần một lần quét
+cho tất cả từ điển, kết quả được lưu trên ``VanBanChuanHoa`` để các bước sau
+dùng lại. ``quet_nhieu`` gom kết quả của cả lô thành ma trận thưa bài × từ khóa
+để các bộ chấm điểm tính điểm cho mọi bài bằng phép toán NumPy.
+
+``BoTuDienNGram`` là biến thể khớp theo ranh giới từ (n-gram token) thay vì
+chuỗi con, giữ dấu để "thuế" không khớp "thuê".
+"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import re
+import threading
+import time
+import unicodedata
+from collections.abc import Iterable
+from dataclasses import dataclass, field
+
+import numpy as np
+
+from news_ingestor.utils.metrics import lay_metrics
+from news_ingestor.utils.text_utils import VanBanChuanHoa, bo_dau, chuan_hoa_van_ban, tach_tu
+
+logger = logging.getLogger(__name__)
+metrics = lay_metrics()
+
+
+def chuan_hoa_tu_khoa(tu: str) -> str:
+    """Dạng so khớp của từ khóa: chữ thường, bỏ dấu."""
+    return bo_dau(tu.lower())
+
+
+def _tao_regex_trie(ds_tu: Iterable[str]) -> str:
+    """Gộp danh sách chuỗi thành regex dạng trie (mỗi vị trí chỉ rẽ nhánh theo ký tự)."""
+    goc: dict = {}
+    for tu in ds_tu:
+        nut = goc
+        for ky_tu in tu:
+            nut = nut.setdefault(ky_tu, {})
+        nut[""] = None
+
+    def _duyet(nut: dict) -> str:
+        nhanh = [re.escape(k) + _duyet(con) for k, con in sorted(nut.items()) if k]
+        if not nhanh:
+            return ""
+        ket_thuc = "" in nut
+        if len(nhanh) == 1 and not ket_thuc:
+            return nhanh[0]
+        mau = "(?:" + "|".join(nhanh) + ")"
+        return mau + "?" if ket_thuc else mau
+
+    return _duyet(goc)
+
+
+@dataclass(frozen=True, eq=False)
+class _BanBienDich:
+    """Trạng thái đã biên dịch (bất biến, thay thế nguyên khối khi đăng ký lại).
+
+    So sánh/hash theo định danh để làm khóa bộ nhớ đệm trên ``VanBanChuanHoa``.
+    """
+
+    mau: re.Pattern | None
+    # Từ khóa → các từ khóa khác nằm trong nó (luôn xuất hiện cùng)
+    tu_con: dict[str, tuple[str, ...]]
+    # Tên từ điển → {từ khóa đã chuẩn hóa: số lần xuất hiện trong từ điển gốc}
+    tu_dien: dict[str, dict[str, int]]
+    # Hash nội dung mọi từ điển, đổi khi từ khóa đổi
+    dau_van_tay: str
+    # Từ khóa → cột trong ma trận bài × từ khóa
+    chi_so_tu: dict[str, int]
+    # Tên từ điển → vector số lần xuất hiện theo cột (để nhân với ma trận khớp)
+    trong_so: dict[str, np.ndarray]
+
+
+@dataclass(frozen=True, eq=False)
+class _BanBienDichNGram(_BanBienDich):
+    """Bản biên dịch của ``BoTuDienNGram``: trie theo token thay cho regex."""
+
+    # token → (từ khóa kết thúc tại đây, nút con); gồm cả dạng có dấu và bỏ dấu
+    trie: dict[str, tuple[tuple[str, ...], dict]]
+
+
+@dataclass(frozen=True)
+class KetQuaQuet:
+    """Kết quả một lần quét văn bản qua mọi từ điển."""
+
+    tu_khop: frozenset[str]
+    _ban: _BanBienDich
+    # Cột của các từ khớp trong ma trận bài × từ khóa (dùng cho quet_nhieu)
+    cot: np.ndarray = field(default_factory=lambda: np.zeros(0, dtype=np.int64))
+
+    def dem(self, ten: str) -> int:
+        """Số từ khóa của từ điển ``ten`` xuất hiện (tính cả từ trùng trong từ điển)."""
+        tu_dien = self._ban.tu_dien.get(ten, {})
+        return sum(tu_dien.get(tu, 0) for tu in self.tu_khop)
+
+    def co(self, ten: str) -> bool:
+        """Có ít nhất một từ khóa của từ điển ``ten`` xuất hiện."""
+        tu_dien = self._ban.tu_dien.get(ten, {})
+        return any(tu in tu_dien for tu in self.tu_khop)
+
+    def khop(self, ten: str) -> set[str]:
+        """Các từ khóa (đã chuẩn hóa) của từ điển ``ten`` xuất hiện."""
+        tu_dien = self._ban.tu_dien.get(ten, {})
+        return {tu for tu in self.tu_khop if tu in tu_dien}
+
+
+@dataclass(frozen=True)
+class MaTranKhop:
+    """Ma trận thưa (COO) bài × từ khóa của một lô: ``hang[i]`` khớp ``cot[i]``."""
+
+    so_bai: int
+    hang: np.ndarray
+    cot: np.ndarray
+    _ban: _BanBienDich
+
+    def dem(self, ten: str) -> np.ndarray:
+        """Như ``KetQuaQuet.dem`` cho cả lô, shape (so_bai,)."""
+        trong_so = self._ban.trong_so.get(ten)
+        if trong_so is None or not len(self.cot):
+            return np.zeros(self.so_bai, dtype=np.int64)
+        return np.bincount(
+            self.hang, weights=trong_so[self.cot], minlength=self.so_bai
+        ).astype(np.int64)
+
+    def co(self, ten: str) -> np.ndarray:
+        """Như ``KetQuaQuet.co`` cho cả lô, mảng bool shape (so_bai,)."""
+        return self.dem(ten) > 0
+
+
+class BoTuDien:
+    """Registry các từ điển từ khóa, biên dịch lười sau mỗi lần đăng ký.
+
+    So khớp giữ ngữ nghĩa chuỗi con như các vòng lặp ``tu in text`` trước đây.
+    """
+
+    # Tiền tố tên metric (lexicon_scans, lexicon_compile_ms...)
+    TEN_METRIC = "lexicon"
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # Tuần tự hóa các lần ghi; biên dịch lại không giữ _lock nên luồng quét không bị chặn
+        self._lock_ghi = threading.Lock()
+        self._tu_dien_goc: dict[str, list[str]] = {}
+        self._ban: _BanBienDich | None = None
+
+    def dang_ky(self, ten: str, ds_tu: Iterable[str]) -> None:
+        """Đăng ký (hoặc thay thế) từ điển ``ten``."""
+        with self._lock_ghi, self._lock:
+            self._tu_dien_goc[ten] = [tu for tu in ds_tu if tu]
+            self._ban = None
+
+    def cap_nhat(self, ds_tu_dien: dict[str, Iterable[str]]) -> str:
+        """Thay nhiều từ điển cùng lúc, biên dịch bản mới rồi hoán đổi nguyên tử.
+
+        Trong lúc biên dịch, các luồng quét vẫn dùng bản cũ; không có thời điểm
+        nào từ điển ở trạng thái nửa cũ nửa mới. Trả về phiên bản mới.
+        """
+        with self._lock_ghi:
+            tu_dien_goc = dict(self._tu_dien_goc)
+            for ten, ds_tu in ds_tu_dien.items():
+                tu_dien_goc[ten] = [tu for tu in ds_tu if tu]
+            ban = self._bien_dich(tu_dien_goc)
+            with self._lock:
+                self._tu_dien_goc = tu_dien_goc
+                self._ban = ban
+        return ban.dau_van_tay
+
+    def ten_tu_dien(self) -> list[str]:
+        return sorted(self._tu_dien_goc)
+
+    def tu_khoa(self, ten: str) -> list[str]:
+        """Từ khóa gốc (chưa chuẩn hóa) của từ điển ``ten``."""
+        return list(self._tu_dien_goc.get(ten, []))
+
+    @property
+    def phien_ban(self) -> str:
+        """Dấu vân tay nội dung từ điển (dùng làm phiên bản khóa cache kết quả)."""
+        return self.bien_dich().dau_van_tay
+
+    def bien_dich(self) -> _BanBienDich:
+        """Biên dịch mọi từ điển thành một regex; trả về bản đang dùng nếu chưa đổi."""
+        ban = self._ban
+        if ban is not None:
+            return ban
+
+        with self._lock:
+            if self._ban is None:
+                self._ban = self._bien_dich(self._tu_dien_goc)
+            return self._ban
+
+    def _bien_dich(self, tu_dien_goc: dict[str, list[str]]) -> _BanBienDich:
+        bat_dau = time.perf_counter()
+        tu_dien: dict[str, dict[str, int]] = {}
+        for ten, ds_tu in tu_dien_goc.items():
+            dem: dict[str, int] = {}
+            for tu in ds_tu:
+                tu_chuan = self._chuan_hoa_tu_khoa(tu)
+                dem[tu_chuan] = dem.get(tu_chuan, 0) + 1
+            tu_dien[ten] = dem
+
+        tat_ca = sorted({tu for dem in tu_dien.values() for tu in dem})
+        chi_so_tu = {tu: i for i, tu in enumerate(tat_ca)}
+        trong_so: dict[str, np.ndarray] = {}
+        for ten, dem in tu_dien.items():
+            vector = np.zeros(len(tat_ca), dtype=np.int64)
+            vector[[chi_so_tu[tu] for tu in dem]] = list(dem.values())
+            trong_so[ten] = vector
+
+        dau_van_tay = hashlib.sha256(
+            repr(sorted((ten, sorted(dem.items())) for ten, dem in tu_dien.items()))
+            .encode("utf-8")
+        ).hexdigest()[:16]
+
+        ban = self._tao_ban(
+            tat_ca,
+            tu_dien=tu_dien,
+            dau_van_tay=dau_van_tay,
+            chi_so_tu=chi_so_tu,
+            trong_so=trong_so,
+        )
+        thoi_gian_ms = int((time.perf_counter() - bat_dau) * 1000)
+
+        metrics.gan(f"{self.TEN_METRIC}_compile_ms", thoi_gian_ms)
+        metrics.gan(f"{self.TEN_METRIC}_terms", len(tat_ca))
+        logger.debug(
+            f"Đã biên dịch {len(tu_dien)} từ điển, {len(tat_ca)} từ khóa trong {thoi_gian_ms}ms"
+        )
+        return ban
+
+    @staticmethod
+    def _chuan_hoa_tu_khoa(tu: str) -> str:
+        return chuan_hoa_tu_khoa(tu)
+
+    def _tao_ban(self, tat_ca: list[str], **chung) -> _BanBienDich:
+        # Regex chỉ trả về từ dài nhất tại mỗi vị trí; các từ ngắn hơn nằm
+        # trong nó được bổ sung qua bảng tu_con nên kết quả vẫn đầy đủ
+        tu_con = {
+            tu: tuple(khac for khac in tat_ca if khac != tu and khac in tu) for tu in tat_ca
+        }
+        mau = re.compile(f"(?=({_tao_regex_trie(tat_ca)}))") if tat_ca else None
+        return _BanBienDich(mau=mau, tu_con=tu_con, **chung)
+
+    def _tim_tu(self, van_ban: VanBanChuanHoa, ban: _BanBienDich) -> set[str]:
+        tu_khop: set[str] = set()
+        if ban.mau is not None:
+            for m in ban.mau.finditer(van_ban.khong_dau):
+                tu = m.group(1)
+                if tu not in tu_khop:
+                    tu_khop.add(tu)
+                    tu_khop.update(ban.tu_con[tu])
+        return tu_khop
+
+    def quet(self, text: str | VanBanChuanHoa) -> KetQuaQuet:
+        """Quét văn bản một lần qua mọi từ điển (dùng lại kết quả đã lưu nếu có)."""
+        return self._quet(chuan_hoa_van_ban(text), self.bien_dich())
+
+    def quet_nhieu(self, ds_text: list[str | VanBanChuanHoa]) -> MaTranKhop:
+        """Quét cả lô, trả về ma trận bài × từ khóa (cùng một bản biên dịch cho mọi bài)."""
+        ban = self.bien_dich()
+        ds_cot = [self._quet(chuan_hoa_van_ban(text), ban).cot for text in ds_text]
+        so_khop = np.fromiter((len(cot) for cot in ds_cot), dtype=np.int64, count=len(ds_cot))
+        hang = np.repeat(np.arange(len(ds_cot), dtype=np.int64), so_khop)
+        cot = np.concatenate(ds_cot) if ds_cot else np.zeros(0, dtype=np.int64)
+        return MaTranKhop(so_bai=len(ds_cot), hang=hang, cot=cot, _ban=ban)
+
+    def _quet(self, van_ban: VanBanChuanHoa, ban: _BanBienDich) -> KetQuaQuet:
+        ket_qua = van_ban.bo_nho.get(ban)
+        if ket_qua is not None:
+            return ket_qua
+
+        bat_dau = time.perf_counter()
+        tu_khop = self._tim_tu(van_ban, ban)
+
+        metrics.tang(f"{self.TEN_METRIC}_scans")
+        metrics.tang(f"{self.TEN_METRIC}_scan_chars", len(van_ban.khong_dau))
+        metrics.tang(
+            f"{self.TEN_METRIC}_scan_us", int((time.perf_counter() - bat_dau) * 1_000_000)
+        )
+
+        ket_qua = KetQuaQuet(
+            tu_khop=frozenset(tu_khop),
+            _ban=ban,
+            cot=np.fromiter((ban.chi_so_tu[tu] for tu in tu_khop), dtype=np.int64),
+        )
+        van_ban.bo_nho[ban] = ket_qua
+        return ket_qua
+
+
+def _tach_token(thuong: str) -> list[str]:
+    # NFC để dấu tổ hợp (văn bản NFD) không cắt đôi một từ
+    return tach_tu(unicodedata.normalize("NFC", thuong))
+
+
+class BoTuDienNGram(BoTuDien):
+    """Registry từ điển khớp theo ranh giới từ thay vì chuỗi con.
+
+    Mỗi bài tách token một lần, mọi 1..N-gram (N = số token của từ khóa dài
+    nhất) được tra qua trie băm theo token; tiền tố không khớp thì dừng sớm.
+    Chi phí tuyến tính theo độ dài văn bản, không phụ thuộc kích thước từ điển.
+    So khớp giữ dấu ("thuế" không khớp "thuê"); n-gram viết không dấu vẫn
+    khớp từ khóa có dấu tương ứng. Vì vậy từ khóa nên được đăng ký có dấu.
+    """
+
+    TEN_METRIC = "lexicon_ngram"
+
+    @staticmethod
+    def _chuan_hoa_tu_khoa(tu: str) -> str:
+        return " ".join(_tach_token(tu.lower()))
+
+    def _tao_ban(self, tat_ca: list[str], **chung) -> _BanBienDichNGram:
+        # Dựng bằng list [khop, con] rồi đóng băng thành tuple
+        goc: dict[str, list] = {}
+        for tu in tat_ca:
+            for dang in {tu, bo_dau(tu)}:
+                con = goc
+                for token in dang.split(" "):
+                    nut = con.setdefault(token, [(), {}])
+                    con = nut[1]
+                nut[0] = (*nut[0], tu)
+
+        def _dong_bang(cay: dict[str, list]) -> dict:
+            return {token: (khop, _dong_bang(con)) for token, (khop, con) in cay.items()}
+
+        return _BanBienDichNGram(mau=None, tu_con={}, trie=_dong_bang(goc), **chung)
+
+    def _tim_tu(self, van_ban: VanBanChuanHoa, ban: _BanBienDichNGram) -> set[str]:
+        tu_khop: set[str] = set()
+        trie = ban.trie
+        token = _tach_token(van_ban.thuong)
+        so_token = len(token)
+        # Lọc trước (trong C) các vị trí có token đầu của một từ khóa
+        for i in [i for i, tu in enumerate(token) if tu in trie]:
+            khop, con = trie[token[i]]
+            j = i + 1
+            while True:
+                if khop:
+                    tu_khop.update(khop)
+                if not con or j >= so_token or token[j] not in con:
+                    break
+                khop, con = con[token[j]]
+                j += 1
+        return tu_khop
+
+
+_bo_tu_dien: BoTuDien | None = None
+_bo_tu_dien_ngram: BoTuDienNGram | None = None
+
+
+def lay_bo_tu_dien() -> BoTuDien:
+    """Lấy singleton registry từ điển."""
+    global _bo_tu_dien
+    if _bo_tu_dien is None:
+        _bo_tu_dien = BoTuDien()
+    return _bo_tu_dien
+
+
+def lay_bo_tu_dien_ngram() -> BoTuDienNGram:
+    """Lấy singleton registry từ điển khớp theo ranh giới từ."""
+    global _bo_tu_dien_ngram
+    if _bo_tu_dien_ngram is None:
+        _bo_tu_dien_ngram = BoTuDienNGram()
+    return _bo_tu_dien_ngram
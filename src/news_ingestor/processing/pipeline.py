@@ -3,6 +3,9 @@
 from __future__ import annotations
 
 import logging
+import time
+import uuid
+from dataclasses import dataclass
 
 from config.settings import lay_cau_hinh_nlp
 from news_ingestor.models.article import BaiBao, BaiBaoTho
@@ -11,17 +14,31 @@ from news_ingestor.processing.cleaner import BoLamSach
 from news_ingestor.processing.content_fetcher import ContentFetcher
 from news_ingestor.processing.embeddings import BoTaoEmbeddings
 from news_ingestor.processing.entity_extractor import BoTrichXuatThucThe
+from news_ingestor.processing.hot_reload import BoTaiLaiTuDien
 from news_ingestor.processing.impact_classifier import BoPhanLoaiTacDong
 from news_ingestor.processing.sentiment import BoPhanTichCamXuc
+from news_ingestor.processing.sentiment_model import tai_mo_hinh_neu_co
 from news_ingestor.storage.repository import KhoTinTuc
+from news_ingestor.storage.result_cache import lay_bo_nho_dem_ket_qua
 from news_ingestor.storage.vector_store import KhoVector
 from news_ingestor.utils.alerting import BoCanhBaoTelegram
 from news_ingestor.utils.metrics import lay_metrics
+from news_ingestor.utils.text_utils import VanBanChuanHoa, tao_hash_tieu_de
 
 logger = logging.getLogger(__name__)
 metrics = lay_metrics()
 
 
+@dataclass
+class _BaiDaLamSach:
+    """Kết quả bước làm sạch của một bài, đầu vào cho cảm xúc/NER/tác động."""
+
+    tieu_de: str
+    noi_dung: str
+    tom_tat: str
+    van_ban: VanBanChuanHoa
+
+
 class LuongXuLy:
     """Pipeline xử lý NLP tổng hợp cho tin tức tài chính.
 
@@ -36,11 +53,26 @@ class LuongXuLy:
         tao_embedding: bool = True,
         fetch_content: bool = True,
         bo_canh_bao: BoCanhBaoTelegram | None = None,
+        che_do_lo: bool | None = None,
+        bo_embedding: BoTaoEmbeddings | None = None,
+        so_tien_trinh_embedding: int | None = None,
     ):
+        """``bo_embedding``: bộ tạo embedding có sẵn (VD đang khởi động nền).
+
+        ``so_tien_trinh_embedding``: số worker fork để encode (mặc định
+        EMBEDDING_WORKERS); pool được fork ngay ở đây, trước các thread khác.
+        """
         # Khởi tạo các module xử lý
+        cau_hinh_nlp = lay_cau_hinh_nlp()
+        # Cache kết quả cảm xúc/tác động theo hash nội dung (LRU + DB)
+        bo_nho_dem = lay_bo_nho_dem_ket_qua()
+
         self._lam_sach = BoLamSach()
         self._trich_xuat = BoTrichXuatThucThe()
-        self._phan_loai_tac_dong = BoPhanLoaiTacDong()
+        self._phan_loai_tac_dong = BoPhanLoaiTacDong(bo_nho_dem=bo_nho_dem)
+        # Từ điển ghi đè (LEXICON_PATH) áp dụng ngay; daemon bật theo dõi thay đổi
+        self._tai_lai_tu_dien = BoTaiLaiTuDien(self._trich_xuat)
+        self._tai_lai_tu_dien.kiem_tra()
 
         # Content Fetcher — lấy nội dung đầy đủ từ URL gốc
         self._fetch_content = fetch_content
@@ -48,20 +80,37 @@ class LuongXuLy:
         if fetch_content:
             self._content_fetcher = ContentFetcher(timeout=20, delay=0.8)
 
-        # Sentiment analyzer: dùng Gemini nếu có API key
-        cau_hinh_nlp = lay_cau_hinh_nlp()
-        gemini_key = cau_hinh_nlp.gemini_api_key if cau_hinh_nlp.gemini_api_key else None
-        self._cam_xuc = BoPhanTichCamXuc(gemini_api_key=gemini_key)
+        # Sentiment analyzer: Gemini nếu có API key, mô hình cục bộ nếu đã huấn luyện
+        backend = cau_hinh_nlp.sentiment_backend
+        gemini_key = None
+        if backend in ("auto", "gemini") and cau_hinh_nlp.gemini_api_key:
+            gemini_key = cau_hinh_nlp.gemini_api_key
+        mo_hinh = None
+        if backend in ("auto", "local"):
+            mo_hinh = tai_mo_hinh_neu_co(cau_hinh_nlp.duong_dan_mo_hinh_cam_xuc)
+        self._cam_xuc = BoPhanTichCamXuc(
+            gemini_api_key=gemini_key, bo_nho_dem=bo_nho_dem, mo_hinh=mo_hinh
+        )
+
+        # Chế độ lô: mỗi giai đoạn chạy trên cả lô (embedding/DB theo batch)
+        self._che_do_lo = cau_hinh_nlp.pipeline_theo_lo if che_do_lo is None else che_do_lo
 
         # Embedding generator (lazy load)
         self._tao_embedding = tao_embedding
         self._embeddings: BoTaoEmbeddings | None = None
         if tao_embedding:
             try:
-                self._embeddings = BoTaoEmbeddings()
+                self._embeddings = bo_embedding or BoTaoEmbeddings(dung_cache=True)
             except Exception as e:
                 logger.warning(f"Không thể khởi tạo embedding model: {e}")
                 self._tao_embedding = False
+        if so_tien_trinh_embedding is None:
+            so_tien_trinh_embedding = cau_hinh_nlp.so_tien_trinh_embedding
+        if self._embeddings and so_tien_trinh_embedding > 0:
+            try:
+                self._embeddings.dung_nhieu_tien_trinh(so_tien_trinh_embedding)
+            except Exception as e:
+                logger.warning(f"Không thể khởi động pool embedding, encode tại chỗ: {e}")
 
         # Storage
         self._kho_tin_tuc = kho_tin_tuc or KhoTinTuc()
@@ -76,9 +125,14 @@ class LuongXuLy:
                 "vector_db": kho_vector is not None,
                 "content_fetch": fetch_content,
                 "telegram_alert": bo_canh_bao is not None,
+                "che_do_lo": self._che_do_lo,
             }},
         )
 
+    def bat_dau_theo_doi_tu_dien(self, chu_ky: float | None = None) -> bool:
+        """Tải lại nóng từ điển khi file thay đổi (cho tiến trình chạy lâu)."""
+        return self._tai_lai_tu_dien.bat_dau(chu_ky)
+
     def xu_ly_mot_bai(self, bai_tho: BaiBaoTho) -> BaiBao | None:
         """Xử lý một bài báo thô qua pipeline đầy đủ.
 
@@ -87,82 +141,21 @@ class LuongXuLy:
         """
         try:
             # 0. Fetch nội dung đầy đủ từ URL gốc (nếu chưa có)
-            noi_dung_goc = bai_tho.noi_dung
-            noi_dung_day_du = ""
-
-            if self._fetch_content and self._content_fetcher and bai_tho.url:
-                try:
-                    fetch_result = self._content_fetcher.fetch_content(bai_tho.url)
-                    if fetch_result["success"] and fetch_result["noi_dung_day_du"]:
-                        noi_dung_day_du = fetch_result["noi_dung_day_du"]
-                        logger.debug(
-                            f"Fetched full content: {fetch_result['char_count']} chars "
-                            f"(was {len(noi_dung_goc)} chars) for: {bai_tho.tieu_de[:50]}"
-                        )
-                    else:
-                        loi_fetch = fetch_result.get("error", "unknown")
-                        logger.debug(
-                            f"Content fetch failed for {bai_tho.url}: {loi_fetch}"
-                        )
-                except Exception as e:
-                    logger.warning(f"Content fetch error: {e}")
-
-            # Sử dụng nội dung đầy đủ nếu có, nếu không dùng nội dung từ crawler
-            noi_dung_phan_tich = noi_dung_day_du if noi_dung_day_du else noi_dung_goc
-
-            # 1. Làm sạch nội dung
-            tieu_de_sach = self._lam_sach.lam_sach_tieu_de(bai_tho.tieu_de)
-            noi_dung_sach = self._lam_sach.lam_sach(noi_dung_phan_tich)
-            tom_tat = self._lam_sach.tom_tat(noi_dung_goc if noi_dung_goc else noi_dung_sach)
-
-            # 2. Trích xuất thực thể (dùng nội dung đầy đủ)
-            van_ban_phan_tich = f"{tieu_de_sach} {noi_dung_sach}"
-            ket_qua_ner = self._trich_xuat.phan_tich(van_ban_phan_tich)
-
-            # 3. Phân tích cảm xúc (dùng nội dung đầy đủ)
-            ket_qua_cam_xuc = self._cam_xuc.phan_tich(van_ban_phan_tich)
-
-            # 4. Chấm điểm tác động
-            ket_qua_tac_dong = self._phan_loai_tac_dong.phan_loai(
-                tieu_de=tieu_de_sach,
-                noi_dung=noi_dung_sach,
-                ma_ck=ket_qua_ner["ma_chung_khoan"],
-            )
+            noi_dung_day_du = self.lay_noi_dung_day_du(bai_tho)
 
-            # 5. Tạo đối tượng BaiBao
-            bai_bao = BaiBao(
-                tieu_de=tieu_de_sach,
-                noi_dung_tom_tat=tom_tat,
-                noi_dung_goc=noi_dung_sach,
-                url=bai_tho.url,
-                nguon_tin=bai_tho.nguon_tin,
-                thoi_gian_xuat_ban=bai_tho.thoi_gian_xuat_ban,
-                danh_muc=ket_qua_ner["danh_muc"],
-                ma_chung_khoan_lien_quan=ket_qua_ner["ma_chung_khoan"],
-                diem_cam_xuc=ket_qua_cam_xuc["diem"],
-                nhan_cam_xuc=ket_qua_cam_xuc["nhan"],
-                impact_score=ket_qua_tac_dong["impact_score"],
-                impact_level=ket_qua_tac_dong["impact_level"],
-                impact_tags=ket_qua_tac_dong["impact_tags"],
-                is_high_impact=ket_qua_tac_dong["is_high_impact"],
-                trang_thai=TrangThai.HOAN_THANH,
-            )
+            # 1-5. Làm sạch, NER, cảm xúc, tác động → BaiBao
+            bai_bao, van_ban_phan_tich = self.phan_tich_bai(bai_tho, noi_dung_day_du)
 
             # 6. Tạo embedding và lưu Vector DB
             if self._tao_embedding and self._embeddings and self._kho_vector:
                 try:
-                    vector = self._embeddings.tao_embedding(van_ban_phan_tich)
-                    vector_id = self._kho_vector.luu_vector(
-                        vector=vector,
-                        metadata={
-                            "bai_bao_id": bai_bao.id,
-                            "tieu_de": tieu_de_sach,
-                            "nguon_tin": bai_bao.nguon_tin,
-                            "danh_muc": str(bai_bao.danh_muc),
-                            "diem_cam_xuc": bai_bao.diem_cam_xuc,
-                            "ma_ck": bai_bao.ma_chung_khoan_lien_quan,
-                        },
+                    vector_id = str(uuid.uuid4())
+                    diem = self.tao_diem_vector(
+                        self._embeddings, [bai_bao], [van_ban_phan_tich], [vector_id]
                     )
+                    self._kho_vector.luu_nhieu_vector(*diem)
+                    if self._embeddings.che_do_doan == "chunks":
+                        self.xoa_diem_cu(self._kho_vector, [bai_bao], diem[2])
                     bai_bao.vector_id = vector_id
                 except Exception as e:
                     logger.warning(f"Lỗi tạo embedding: {e}")
@@ -171,11 +164,7 @@ class LuongXuLy:
             self._kho_tin_tuc.luu_bai_bao(bai_bao)
 
             # 8. Gửi cảnh báo nếu là tin tác động cao
-            if self._bo_canh_bao and bai_bao.is_high_impact:
-                if self._bo_canh_bao.gui_canh_bao_bai_bao(bai_bao):
-                    metrics.tang("alerts_sent")
-                else:
-                    metrics.tang("alerts_failed")
+            self._gui_canh_bao(bai_bao)
 
             return bai_bao
 
@@ -186,29 +175,324 @@ class LuongXuLy:
             )
             return None
 
+    def lay_noi_dung_day_du(self, bai_tho: BaiBaoTho) -> str:
+        """Giai đoạn fetch: lấy nội dung đầy đủ từ URL gốc, rỗng nếu thất bại."""
+        if not (self._fetch_content and self._content_fetcher and bai_tho.url):
+            return ""
+
+        try:
+            fetch_result = self._content_fetcher.fetch_content(bai_tho.url)
+            if fetch_result["success"] and fetch_result["noi_dung_day_du"]:
+                logger.debug(
+                    f"Fetched full content: {fetch_result['char_count']} chars "
+                    f"(was {len(bai_tho.noi_dung)} chars) for: {bai_tho.tieu_de[:50]}"
+                )
+                return fetch_result["noi_dung_day_du"]
+
+            loi_fetch = fetch_result.get("error", "unknown")
+            logger.debug(f"Content fetch failed for {bai_tho.url}: {loi_fetch}")
+        except Exception as e:
+            logger.warning(f"Content fetch error: {e}")
+        return ""
+
+    def phan_tich_bai(
+        self, bai_tho: BaiBaoTho, noi_dung_day_du: str
+    ) -> tuple[BaiBao, str]:
+        """Giai đoạn NLP: làm sạch, NER, cảm xúc, tác động.
+
+        Returns:
+            (BaiBao chưa có vector_id, văn bản dùng để tạo embedding)
+        """
+        phien_ban_tu_dien = self._tai_lai_tu_dien.phien_ban
+        bai = self._lam_sach_bai(bai_tho, noi_dung_day_du)
+        ket_qua_ner = self._trich_xuat.phan_tich(bai.van_ban)
+        ket_qua_cam_xuc = self._cam_xuc.phan_tich(bai.van_ban)
+        ket_qua_tac_dong = self._phan_loai_tac_dong.phan_loai(
+            tieu_de=bai.tieu_de,
+            noi_dung=bai.noi_dung,
+            ma_ck=ket_qua_ner["ma_chung_khoan"],
+            van_ban=bai.van_ban,
+        )
+        bai_bao = self._tao_bai_bao(
+            bai_tho, bai, ket_qua_ner, ket_qua_cam_xuc, ket_qua_tac_dong, phien_ban_tu_dien
+        )
+        return bai_bao, bai.van_ban.goc
+
+    def phan_tich_nhieu_bai(
+        self, danh_sach: list[BaiBaoTho], ds_noi_dung: list[str]
+    ) -> tuple[list[BaiBao], list[str]]:
+        """Giai đoạn NLP cho cả lô.
+
+        Cảm xúc và tác động chạy một lần cho cả lô (một lần gọi Gemini, một
+        lần tra cache). Bài lỗi được ghi log và bỏ qua; nếu bước chấm điểm
+        theo lô lỗi, các bài được phân tích lại từng bài (``phan_tich_bai``).
+        """
+        phien_ban_tu_dien = self._tai_lai_tu_dien.phien_ban
+        ds_hop_le: list[tuple[BaiBaoTho, _BaiDaLamSach, dict]] = []
+        ds_noi_dung_hop_le: list[str] = []
+        for bai_tho, noi_dung_day_du in zip(danh_sach, ds_noi_dung, strict=True):
+            try:
+                bai = self._lam_sach_bai(bai_tho, noi_dung_day_du)
+                ma_ck = self._trich_xuat.trich_xuat_ma_ck(bai.van_ban)
+                ds_hop_le.append((bai_tho, bai, {"ma_chung_khoan": ma_ck}))
+                ds_noi_dung_hop_le.append(noi_dung_day_du)
+            except Exception:
+                logger.error(
+                    f"Lỗi xử lý bài: {bai_tho.tieu_de[:50]}...",
+                    exc_info=True,
+                )
+
+        try:
+            return self._cham_diem_lo(ds_hop_le, phien_ban_tu_dien)
+        except Exception:
+            metrics.tang("pipeline_batch_nlp_fallbacks")
+            logger.error(
+                f"Lỗi chấm điểm lô {len(ds_hop_le)} bài, phân tích lại từng bài",
+                exc_info=True,
+            )
+
+        ds_bai_bao: list[BaiBao] = []
+        ds_van_ban_embedding: list[str] = []
+        for (bai_tho, _, _), noi_dung_day_du in zip(ds_hop_le, ds_noi_dung_hop_le, strict=True):
+            try:
+                bai_bao, van_ban = self.phan_tich_bai(bai_tho, noi_dung_day_du)
+            except Exception:
+                logger.error(
+                    f"Lỗi xử lý bài: {bai_tho.tieu_de[:50]}...",
+                    exc_info=True,
+                )
+                continue
+            ds_bai_bao.append(bai_bao)
+            ds_van_ban_embedding.append(van_ban)
+        return ds_bai_bao, ds_van_ban_embedding
+
+    def _cham_diem_lo(
+        self,
+        ds_hop_le: list[tuple[BaiBaoTho, _BaiDaLamSach, dict]],
+        phien_ban_tu_dien: str,
+    ) -> tuple[list[BaiBao], list[str]]:
+        """Danh mục, cảm xúc, tác động cho cả lô bài đã làm sạch + NER."""
+        # Danh mục, cảm xúc keyword và tác động chấm cho cả lô trên ma trận khớp từ điển
+        ds_van_ban = [bai.van_ban for _, bai, _ in ds_hop_le]
+        ds_ma_ck = [ner["ma_chung_khoan"] for _, _, ner in ds_hop_le]
+        for (_, _, ner), danh_muc in zip(
+            ds_hop_le, self._trich_xuat.phan_loai_danh_muc_nhieu(ds_van_ban, ds_ma_ck), strict=True
+        ):
+            ner["danh_muc"] = danh_muc
+        ds_cam_xuc = self._cam_xuc.phan_tich_nhieu(ds_van_ban)
+        ds_tac_dong = self._phan_loai_tac_dong.phan_loai_nhieu(ds_van_ban, ds_ma_ck)
+
+        ds_bai_bao: list[BaiBao] = []
+        ds_van_ban_embedding: list[str] = []
+        for (bai_tho, bai, ner), cam_xuc, tac_dong in zip(
+            ds_hop_le, ds_cam_xuc, ds_tac_dong, strict=True
+        ):
+            try:
+                ds_bai_bao.append(
+                    self._tao_bai_bao(bai_tho, bai, ner, cam_xuc, tac_dong, phien_ban_tu_dien)
+                )
+            except Exception:
+                logger.error(
+                    f"Lỗi xử lý bài: {bai_tho.tieu_de[:50]}...",
+                    exc_info=True,
+                )
+                continue
+            ds_van_ban_embedding.append(bai.van_ban.goc)
+        return ds_bai_bao, ds_van_ban_embedding
+
+    def _lam_sach_bai(self, bai_tho: BaiBaoTho, noi_dung_day_du: str) -> _BaiDaLamSach:
+        """Làm sạch tiêu đề/nội dung, tóm tắt và chuẩn hóa văn bản phân tích."""
+        noi_dung_goc = bai_tho.noi_dung
+
+        # Sử dụng nội dung đầy đủ nếu có, nếu không dùng nội dung từ crawler
+        noi_dung_phan_tich = noi_dung_day_du if noi_dung_day_du else noi_dung_goc
+
+        tieu_de_sach = self._lam_sach.lam_sach_tieu_de(bai_tho.tieu_de)
+        noi_dung_sach = self._lam_sach.lam_sach(noi_dung_phan_tich)
+        if noi_dung_goc and noi_dung_goc != noi_dung_phan_tich:
+            tom_tat = self._lam_sach.tom_tat(noi_dung_goc)
+        else:
+            # Tóm tắt chính nội dung vừa làm sạch, không làm sạch lại
+            tom_tat = self._lam_sach.tom_tat(noi_dung_sach, da_lam_sach=True)
+
+        # Chuẩn hóa (chữ thường, bỏ dấu, tách từ) một lần cho mọi bước sau
+        van_ban = VanBanChuanHoa.tu_van_ban(f"{tieu_de_sach} {noi_dung_sach}")
+        return _BaiDaLamSach(tieu_de_sach, noi_dung_sach, tom_tat, van_ban)
+
+    @staticmethod
+    def _tao_bai_bao(
+        bai_tho: BaiBaoTho,
+        bai: _BaiDaLamSach,
+        ket_qua_ner: dict,
+        ket_qua_cam_xuc: dict,
+        ket_qua_tac_dong: dict,
+        phien_ban_tu_dien: str = "",
+    ) -> BaiBao:
+        """Ghép kết quả làm sạch, NER, cảm xúc, tác động thành BaiBao."""
+        return BaiBao(
+            tieu_de=bai.tieu_de,
+            noi_dung_tom_tat=bai.tom_tat,
+            noi_dung_goc=bai.noi_dung,
+            url=bai_tho.url,
+            nguon_tin=bai_tho.nguon_tin,
+            thoi_gian_xuat_ban=bai_tho.thoi_gian_xuat_ban,
+            danh_muc=ket_qua_ner["danh_muc"],
+            ma_chung_khoan_lien_quan=ket_qua_ner["ma_chung_khoan"],
+            diem_cam_xuc=ket_qua_cam_xuc["diem"],
+            nhan_cam_xuc=ket_qua_cam_xuc["nhan"],
+            nguon_cam_xuc=ket_qua_cam_xuc["nguon"],
+            phien_ban_tu_dien=phien_ban_tu_dien,
+            impact_score=ket_qua_tac_dong["impact_score"],
+            impact_level=ket_qua_tac_dong["impact_level"],
+            impact_tags=ket_qua_tac_dong["impact_tags"],
+            is_high_impact=ket_qua_tac_dong["is_high_impact"],
+            trang_thai=TrangThai.HOAN_THANH,
+        )
+
+    @staticmethod
+    def tao_metadata_vector(bai_bao: BaiBao) -> dict:
+        """Payload lưu kèm vector trong Vector DB."""
+        return {
+            "bai_bao_id": bai_bao.id,
+            "tieu_de": bai_bao.tieu_de,
+            "nguon_tin": bai_bao.nguon_tin,
+            "danh_muc": str(bai_bao.danh_muc),
+            "diem_cam_xuc": bai_bao.diem_cam_xuc,
+            "ma_ck": bai_bao.ma_chung_khoan_lien_quan,
+        }
+
+    @classmethod
+    def tao_diem_vector(
+        cls,
+        bo_embedding: BoTaoEmbeddings,
+        ds_bai_bao: list[BaiBao],
+        ds_van_ban: list[str],
+        ds_vector_id: list[str],
+    ) -> tuple[list[list[float]], list[dict], list[str]]:
+        """(vector, payload, id) của các điểm cần upsert cho một lô bài.
+
+        Mỗi bài một điểm mang ``ds_vector_id[i]``, trừ chế độ ``chunks``: mỗi
+        đoạn một điểm, payload thêm ``doan``/``so_doan``; đoạn 0 mang id của
+        bài, đoạn k dùng ``uuid5(id bài, k)`` nên reindex ghi đè đúng điểm cũ.
+        """
+        ds_metadata = [cls.tao_metadata_vector(b) for b in ds_bai_bao]
+        if bo_embedding.che_do_doan != "chunks":
+            return bo_embedding.tao_nhieu_embedding(ds_van_ban), ds_metadata, ds_vector_id
+
+        ma_tran, chi_so = bo_embedding.tao_ma_tran_doan(ds_van_ban)
+        so_doan = [0] * len(ds_bai_bao)
+        for i in chi_so.tolist():
+            so_doan[i] += 1
+        ds_metadata_doan: list[dict] = []
+        ds_id_doan: list[str] = []
+        for metadata, vector_id, so in zip(ds_metadata, ds_vector_id, so_doan, strict=True):
+            for k in range(so):
+                ds_metadata_doan.append({**metadata, "doan": k, "so_doan": so})
+                ds_id_doan.append(
+                    vector_id if k == 0 else str(uuid.uuid5(uuid.UUID(vector_id), str(k)))
+                )
+        return ma_tran.tolist(), ds_metadata_doan, ds_id_doan
+
+    @staticmethod
+    def xoa_diem_cu(kho_vector: KhoVector, ds_bai_bao: list[BaiBao], ds_id: list[str]) -> None:
+        """Xóa điểm của các bài này không nằm trong ``ds_id`` vừa upsert.
+
+        Gọi sau upsert ở chế độ ``chunks`` và khi reindex: bài ít đoạn đi, hay
+        đổi chế độ (chunks ↔ một vector mỗi bài), không để lại đoạn cũ trong
+        kết quả tìm kiếm.
+        """
+        kho_vector.xoa_theo_bai([b.id for b in ds_bai_bao], giu_id=ds_id)
+
+    def _gui_canh_bao(self, bai_bao: BaiBao) -> None:
+        """Gửi cảnh báo Telegram nếu là tin tác động cao."""
+        if self._bo_canh_bao and bai_bao.is_high_impact:
+            if self._bo_canh_bao.gui_canh_bao_bai_bao(bai_bao):
+                metrics.tang("alerts_sent")
+            else:
+                metrics.tang("alerts_failed")
+
+    def loc_bai_da_luu(self, danh_sach: list[BaiBaoTho]) -> list[BaiBaoTho]:
+        """Loại bài đã có trong DB trước khi fetch nội dung và chạy NLP.
+
+        Hash tiêu đề được tính trên tiêu đề đã làm sạch, giống giá trị mà
+        ``luu_bai_bao`` ghi xuống DB.
+        """
+        if not danh_sach:
+            return danh_sach
+
+        ds_hash = [
+            tao_hash_tieu_de(self._lam_sach.lam_sach_tieu_de(bai.tieu_de))
+            for bai in danh_sach
+        ]
+        try:
+            url_da_co, hash_da_co = self._kho_tin_tuc.tim_khoa_da_ton_tai(
+                (bai.url_chuan_hoa for bai in danh_sach), ds_hash
+            )
+        except Exception as e:
+            logger.warning(f"Không thể kiểm tra trùng lặp trước NLP: {e}")
+            return danh_sach
+
+        con_lai = [
+            bai
+            for bai, tieu_de_hash in zip(danh_sach, ds_hash, strict=True)
+            if bai.url_chuan_hoa not in url_da_co and tieu_de_hash not in hash_da_co
+        ]
+
+        da_bo_qua = len(danh_sach) - len(con_lai)
+        if da_bo_qua:
+            metrics.tang("pipeline_prededup_skipped", da_bo_qua)
+            logger.info(f"Bỏ qua {da_bo_qua}/{len(danh_sach)} bài đã có trong DB")
+        return con_lai
+
     def xu_ly_hang_loat(self, danh_sach: list[BaiBaoTho]) -> list[BaiBao]:
         """Xử lý nhiều bài báo thô qua pipeline.
 
+        Ở chế độ lô (mặc định), mỗi giai đoạn chạy trên cả lô: một lần
+        ``encode`` cho embeddings, một lần upsert vector và một transaction DB.
+
         Args:
             danh_sach: Danh sách bài báo thô từ crawler.
 
         Returns:
             Danh sách bài báo đã xử lý thành công.
         """
-        ket_qua: list[BaiBao] = []
-        loi = 0
-
         metrics.tang("pipeline_batches")
+        tong = len(danh_sach)
+        danh_sach = self.loc_bai_da_luu(danh_sach)
         logger.info(f"Bắt đầu xử lý {len(danh_sach)} bài báo qua pipeline NLP")
 
+        if self._che_do_lo:
+            ket_qua = self._xu_ly_theo_giai_doan(danh_sach)
+        else:
+            ket_qua = self._xu_ly_tung_bai(danh_sach)
+
+        loi = len(danh_sach) - len(ket_qua)
+        metrics.tang("pipeline_articles_success", len(ket_qua))
+        metrics.tang("pipeline_articles_failed", loi)
+
+        logger.info(
+            f"Hoàn thành xử lý: {len(ket_qua)}/{len(danh_sach)} bài "
+            f"(lỗi: {loi})",
+            extra={"extra_fields": {
+                "tong": tong,
+                "thanh_cong": len(ket_qua),
+                "loi": loi,
+            }},
+        )
+
+        return ket_qua
+
+    def _xu_ly_tung_bai(self, danh_sach: list[BaiBaoTho]) -> list[BaiBao]:
+        """Chế độ tuần tự: mỗi bài đi hết pipeline trước khi sang bài kế tiếp."""
+        ket_qua: list[BaiBao] = []
+        loi = 0
+
         for i, bai_tho in enumerate(danh_sach, 1):
             bai_bao = self.xu_ly_mot_bai(bai_tho)
             if bai_bao:
                 ket_qua.append(bai_bao)
-                metrics.tang("pipeline_articles_success")
             else:
                 loi += 1
-                metrics.tang("pipeline_articles_failed")
 
             # Báo cáo tiến trình mỗi 10 bài
             if i % 10 == 0:
@@ -217,14 +501,102 @@ class LuongXuLy:
                     f"(thành công: {len(ket_qua)}, lỗi: {loi})"
                 )
 
+        return ket_qua
+
+    def _xu_ly_theo_giai_doan(self, danh_sach: list[BaiBaoTho]) -> list[BaiBao]:
+        """Chế độ lô: fetch → NLP → embedding → vector DB → DB, mỗi bước trên cả lô."""
+        thoi_gian_ms: dict[str, int] = {}
+
+        # 1. Fetch nội dung đầy đủ
+        bat_dau = time.perf_counter()
+        ds_noi_dung = [self.lay_noi_dung_day_du(bai_tho) for bai_tho in danh_sach]
+        thoi_gian_ms["fetch"] = self._ket_thuc_giai_doan("fetch", bat_dau)
+
+        # 2. Làm sạch + NER + cảm xúc (một lần gọi cho cả lô) + tác động
+        bat_dau = time.perf_counter()
+        ket_qua, ds_van_ban = self.phan_tich_nhieu_bai(danh_sach, ds_noi_dung)
+        thoi_gian_ms["nlp"] = self._ket_thuc_giai_doan("nlp", bat_dau)
+
+        # 3-6. Lọc trùng, embedding, vector DB, DB, cảnh báo
+        ket_qua, thoi_gian_ghi_ms = self.ghi_lo(ket_qua, ds_van_ban)
+        thoi_gian_ms.update(thoi_gian_ghi_ms)
+
         logger.info(
-            f"Hoàn thành xử lý: {len(ket_qua)}/{len(danh_sach)} bài "
-            f"(lỗi: {loi})",
-            extra={"extra_fields": {
-                "tong": len(danh_sach),
-                "thanh_cong": len(ket_qua),
-                "loi": loi,
-            }},
+            "Thời gian theo giai đoạn: "
+            + ", ".join(f"{ten}={ms}ms" for ten, ms in thoi_gian_ms.items()),
+            extra={"extra_fields": {"thoi_gian_giai_doan_ms": thoi_gian_ms}},
         )
-
         return ket_qua
+
+    def ghi_lo(
+        self, ds_bai_bao: list[BaiBao], ds_van_ban: list[str]
+    ) -> tuple[list[BaiBao], dict[str, int]]:
+        """Giai đoạn lưu trữ cho một lô đã phân tích.
+
+        Lọc trùng (một truy vấn), một lần encode, một lần upsert vector, một
+        transaction DB, rồi gửi cảnh báo. Chỉ bài thực sự được ghi vào DB mới
+        được cảnh báo và trả về; lỗi DB làm hỏng cả lô được ghi log và trả về
+        danh sách rỗng thay vì ném ra. Trả về (bài đã lưu, thời gian ms theo
+        giai đoạn).
+        """
+        thoi_gian_ms: dict[str, int] = {}
+
+        # Lọc trùng trước khi encode để không upsert vector cho bài không được lưu
+        bat_dau = time.perf_counter()
+        try:
+            bai_moi = self._kho_tin_tuc.loc_bai_moi(ds_bai_bao)
+        except Exception as e:
+            metrics.tang("pipeline_batch_write_errors")
+            logger.error(f"Lỗi kiểm tra trùng lô {len(ds_bai_bao)} bài: {e}", exc_info=True)
+            return [], thoi_gian_ms
+        giu = {id(b) for b in bai_moi}
+        ds_van_ban = [v for b, v in zip(ds_bai_bao, ds_van_ban, strict=True) if id(b) in giu]
+        ds_bai_bao = bai_moi
+        thoi_gian_ms["dedup"] = self._ket_thuc_giai_doan("dedup", bat_dau)
+
+        # Một lần encode cho cả lô, một lần upsert vector
+        if ds_bai_bao and self._tao_embedding and self._embeddings and self._kho_vector:
+            bat_dau = time.perf_counter()
+            try:
+                ds_vector_id = [str(uuid.uuid4()) for _ in ds_bai_bao]
+                diem = self.tao_diem_vector(self._embeddings, ds_bai_bao, ds_van_ban, ds_vector_id)
+                thoi_gian_ms["embedding"] = self._ket_thuc_giai_doan("embedding", bat_dau)
+
+                bat_dau = time.perf_counter()
+                self._kho_vector.luu_nhieu_vector(*diem)
+                if self._embeddings.che_do_doan == "chunks":
+                    self.xoa_diem_cu(self._kho_vector, ds_bai_bao, diem[2])
+                for bai_bao, vector_id in zip(ds_bai_bao, ds_vector_id, strict=True):
+                    bai_bao.vector_id = vector_id
+                thoi_gian_ms["vector_db"] = self._ket_thuc_giai_doan("vector_db", bat_dau)
+            except Exception as e:
+                logger.warning(f"Lỗi tạo embedding theo lô: {e}")
+
+        # Một transaction DB cho cả lô
+        bat_dau = time.perf_counter()
+        try:
+            da_luu = self._kho_tin_tuc.them_nhieu_bai_bao(ds_bai_bao)
+        except Exception as e:
+            metrics.tang("pipeline_batch_write_errors")
+            logger.error(f"Lỗi ghi lô {len(ds_bai_bao)} bài vào DB: {e}", exc_info=True)
+            da_luu = []
+        thoi_gian_ms["database"] = self._ket_thuc_giai_doan("database", bat_dau)
+
+        # Vector của bài không được ghi (trùng với luồng khác, lỗi DB) không còn bản ghi nào trỏ tới
+        id_da_luu = {id(b) for b in da_luu}
+        mo_coi = [b.id for b in ds_bai_bao if b.vector_id and id(b) not in id_da_luu]
+        if mo_coi and self._kho_vector:
+            self._kho_vector.xoa_theo_bai(mo_coi)
+
+        # Cảnh báo tin tác động cao
+        for bai_bao in da_luu:
+            self._gui_canh_bao(bai_bao)
+
+        return da_luu, thoi_gian_ms
+
+    @staticmethod
+    def _ket_thuc_giai_doan(ten: str, bat_dau: float) -> int:
+        """Ghi nhận thời gian một giai đoạn vào metrics, trả về số ms."""
+        thoi_gian = int((time.perf_counter() - bat_dau) * 1000)
+        metrics.tang(f"pipeline_stage_{ten}_ms", thoi_gian)
+        return thoi_gian
@@ -4,8 +4,14 @@ from __future__ import annotations
 
 import logging
 
+import numpy as np
+
 from news_ingestor.models.enums import CamXuc
-from news_ingestor.utils.text_utils import bo_dau
+from news_ingestor.processing.gemini_batch import BoPhanTichGeminiLo
+from news_ingestor.processing.lexicon import lay_bo_tu_dien
+from news_ingestor.processing.sentiment_model import MoHinhCamXucCucBo
+from news_ingestor.storage.result_cache import BoNhoDemKetQua
+from news_ingestor.utils.text_utils import VanBanChuanHoa, chuan_hoa_van_ban
 
 logger = logging.getLogger(__name__)
 
@@ -54,144 +60,163 @@ TU_TIN_DON = {
     "rumor", "unverified", "anonymous source",
 }
 
+bo_tu_dien = lay_bo_tu_dien()
+bo_tu_dien.dang_ky("cam_xuc_tich_cuc", TU_TICH_CUC)
+bo_tu_dien.dang_ky("cam_xuc_tieu_cuc", TU_TIEU_CUC)
+bo_tu_dien.dang_ky("tin_don", TU_TIN_DON)
+
+
+# Dấu của (tích cực - tiêu cực) → nhãn
+_NHAN_THEO_DAU = {1: CamXuc.TICH_CUC, -1: CamXuc.TIEU_CUC, 0: CamXuc.TRUNG_TINH}
+
 
 class BoPhanTichCamXuc:
     """Phân tích cảm xúc tin tức tài chính.
 
-    Hỗ trợ 2 chế độ:
-    1. Gemini AI (chính xác hơn, cần API key)
-    2. Keyword-based (fallback, hoạt động offline)
+    Hỗ trợ 3 chế độ, theo thứ tự ưu tiên:
+    1. Gemini AI theo lô (chính xác hơn, cần API key)
+    2. Mô hình cục bộ huấn luyện từ nhãn Gemini (``train-sentiment``)
+    3. Keyword-based (fallback, hoạt động offline)
+
+    Nếu có ``bo_nho_dem``, kết quả của backend chính được cache theo hash nội
+    dung + phiên bản (model/prompt Gemini, trọng số mô hình hoặc từ điển).
     """
 
-    def __init__(self, gemini_api_key: str | None = None):
+    BO_PHAN_TICH = "sentiment"
+
+    def __init__(
+        self,
+        gemini_api_key: str | None = None,
+        gemini: BoPhanTichGeminiLo | None = None,
+        bo_nho_dem: BoNhoDemKetQua | None = None,
+        mo_hinh: MoHinhCamXucCucBo | None = None,
+    ):
         self._gemini_key = gemini_api_key
-        self._gemini_client = None
+        self._gemini = gemini
+        self._bo_nho_dem = bo_nho_dem
+        self._mo_hinh = mo_hinh
 
-        if gemini_api_key:
+        if gemini is None and gemini_api_key:
             self._khoi_tao_gemini(gemini_api_key)
 
     def _khoi_tao_gemini(self, api_key: str) -> None:
-        """Khởi tạo Gemini client."""
+        """Khởi tạo backend Gemini theo lô."""
         try:
-            from google import genai
-
-            self._gemini_client = genai.Client(api_key=api_key)
+            self._gemini = BoPhanTichGeminiLo.tu_cau_hinh(api_key)
             logger.info("Đã khởi tạo Gemini AI cho phân tích cảm xúc")
         except Exception as e:
             logger.warning(f"Không thể khởi tạo Gemini: {e}. Dùng keyword-based.")
-            self._gemini_client = None
-
-    def phan_tich(self, text: str) -> dict:
+            self._gemini = None
+
+    @property
+    def backend(self) -> str:
+        """Backend chính: gemini / local / keyword."""
+        if self._gemini:
+            return "gemini"
+        if self._mo_hinh is not None:
+            return "local"
+        return "keyword"
+
+    @property
+    def phien_ban(self) -> str:
+        """Phiên bản của backend chính, một phần của khóa cache."""
+        if self._gemini:
+            return self._gemini.phien_ban
+        if self._mo_hinh is not None:
+            return f"local:{self._mo_hinh.phien_ban}"
+        return f"keyword:{bo_tu_dien.phien_ban}"
+
+    def phan_tich(self, text: str | VanBanChuanHoa) -> dict:
         """Phân tích cảm xúc của văn bản.
 
         Returns:
-            Dict: {'nhan': CamXuc, 'diem': float(-1.0 → 1.0), 'tin_don': bool}
+            Dict: {'nhan': CamXuc, 'diem': float(-1.0 → 1.0), 'tin_don': bool,
+            'nguon': backend đã gán nhãn}
         """
-        if not text:
-            return {
-                "nhan": CamXuc.TRUNG_TINH,
-                "diem": 0.0,
-                "tin_don": False,
-            }
-
-        # Thử Gemini trước
-        if self._gemini_client:
-            ket_qua = self._phan_tich_gemini(text)
-            if ket_qua:
-                return ket_qua
-
-        # Fallback: keyword-based
-        return self._phan_tich_keyword(text)
-
-    def _phan_tich_gemini(self, text: str) -> dict | None:
-        """Phân tích cảm xúc bằng Gemini AI."""
-        try:
-            prompt = f"""Bạn là chuyên gia phân tích cảm xúc tin tức tài chính Việt Nam chuyên nghiệp.
-Nhiệm vụ: Phân tích cảm xúc bài báo đối với thị trường tài chính hoặc một doanh nghiệp cụ thể.
-
-Quy tắc quan trọng:
-1. Hãy nhạy bén với tin tức tiêu cực như: bắt giam lãnh đạo, tấn công vũ trang, khởi tố, lừa đảo, lỗ nặng. Những tin này PHẢI là NEGATIVE.
-2. Các hoạt động M&A (sát nhập, mua lại) thường là POSITIVE hoặc NEUTRAL tùy ngữ cảnh. Nếu là hai doanh nghiệp lớn sát nhập để tăng sức mạnh thì thường là POSITIVE.
-3. Nếu tin tức có tác động hỗn hợp, hãy ưu tiên tác động ngắn hạn lên giá cổ phiếu.
-4. Trả lời CHÍNH XÁC theo format sau (không giải thích thêm):
-NHAN: [POSITIVE | NEGATIVE | NEUTRAL]
-DIEM: [số thực từ -1.0 đến 1.0]
-TIN_DON: [TRUE | FALSE]
+        return self.phan_tich_nhieu([text])[0]
 
-Bài báo:
-{text[:2000]}"""
+    def phan_tich_nhieu(self, ds_text: list[str | VanBanChuanHoa]) -> list[dict]:
+        """Phân tích cảm xúc nhiều văn bản, gộp các lời gọi Gemini thành lô.
 
-            response = self._gemini_client.models.generate_content(
-                model="gemini-2.0-flash-lite",
-                contents=prompt,
-            )
-
-            return self._parse_gemini_response(response.text)
-
-        except Exception as e:
-            logger.debug(f"Gemini sentiment lỗi: {e}")
-            return None
-
-    def _parse_gemini_response(self, response_text: str) -> dict | None:
-        """Parse kết quả từ Gemini response."""
-        try:
-            lines = response_text.strip().split("\n")
-            result = {}
-
-            for line in lines:
-                line = line.strip()
-                if line.startswith("NHAN:"):
-                    nhan_str = line.split(":", 1)[1].strip().upper()
-                    if "POSITIVE" in nhan_str:
-                        result["nhan"] = CamXuc.TICH_CUC
-                    elif "NEGATIVE" in nhan_str:
-                        result["nhan"] = CamXuc.TIEU_CUC
-                    else:
-                        result["nhan"] = CamXuc.TRUNG_TINH
-
-                elif line.startswith("DIEM:"):
-                    diem_str = line.split(":", 1)[1].strip()
-                    diem = float(diem_str)
-                    result["diem"] = max(-1.0, min(1.0, diem))
-
-                elif line.startswith("TIN_DON:"):
-                    td_str = line.split(":", 1)[1].strip().upper()
-                    result["tin_don"] = td_str == "TRUE"
-
-            if "nhan" in result and "diem" in result:
-                result.setdefault("tin_don", False)
-                return result
-
-        except Exception as e:
-            logger.debug(f"Parse Gemini response lỗi: {e}")
-
-        return None
+        Bài Gemini không trả được kết quả sẽ dùng mô hình cục bộ hoặc
+        keyword-based (không cache).
+        """
+        ds_van_ban = [chuan_hoa_van_ban(text) for text in ds_text]
+        ket_qua: list[dict | None] = [None] * len(ds_van_ban)
+        vi_tri = [i for i, van_ban in enumerate(ds_van_ban) if van_ban.goc]
+
+        # Tra cache cho cả danh sách (một truy vấn DB cho các khóa chưa có trong LRU)
+        backend = self.backend
+        phien_ban = self.phien_ban
+        khoa: dict[int, str] = {}
+        tu_cache: set[int] = set()
+        if self._bo_nho_dem and vi_tri:
+            khoa = {
+                i: BoNhoDemKetQua.tao_khoa(self.BO_PHAN_TICH, phien_ban, ds_van_ban[i].goc)
+                for i in vi_tri
+            }
+            ds_da_co = self._bo_nho_dem.lay_nhieu(self.BO_PHAN_TICH, list(khoa.values()))
+            for i, kq in zip(vi_tri, ds_da_co, strict=True):
+                if kq is not None:
+                    kq["nhan"] = CamXuc(kq["nhan"])
+                    kq.setdefault("nguon", backend)
+                    ket_qua[i] = kq
+                    tu_cache.add(i)
+
+        # Thử Gemini trước (một lần gọi cho các bài chưa có trong cache)
+        con_lai = [i for i in vi_tri if ket_qua[i] is None]
+        if self._gemini and con_lai:
+            ds_gemini = self._gemini.phan_tich_nhieu([ds_van_ban[i].goc for i in con_lai])
+            for i, kq in zip(con_lai, ds_gemini, strict=True):
+                ket_qua[i] = kq
+
+        # Mô hình cục bộ: dự đoán cả phần còn lại trong một lần
+        con_lai = [i for i in vi_tri if ket_qua[i] is None]
+        if self._mo_hinh is not None and con_lai:
+            ds_du_doan = self._mo_hinh.du_doan([ds_van_ban[i] for i in con_lai])
+            ds_tin_don = bo_tu_dien.quet_nhieu([ds_van_ban[i] for i in con_lai]).co("tin_don")
+            for i, kq, tin_don in zip(con_lai, ds_du_doan, ds_tin_don.tolist(), strict=True):
+                kq["tin_don"] = tin_don
+                kq["nguon"] = "local"
+                ket_qua[i] = kq
+
+        # Fallback: keyword-based (nhiều bài thì chấm cả lô bằng ma trận khớp)
+        con_lai = [i for i in vi_tri if ket_qua[i] is None]
+        if len(con_lai) > 1:
+            ds_keyword = self._phan_tich_keyword_nhieu([ds_van_ban[i] for i in con_lai])
+            for i, kq in zip(con_lai, ds_keyword, strict=True):
+                ket_qua[i] = kq
+        elif con_lai:
+            ket_qua[con_lai[0]] = self._phan_tich_keyword(ds_van_ban[con_lai[0]])
+
+        for i, kq in enumerate(ket_qua):
+            if kq is None:
+                ket_qua[i] = {
+                    "nhan": CamXuc.TRUNG_TINH,
+                    "diem": 0.0,
+                    "tin_don": False,
+                    "nguon": "keyword",
+                }
+
+        # Chỉ cache kết quả của backend chính; fallback sẽ được thử lại lần sau
+        ket_qua_moi = {
+            khoa_i: ket_qua[i]
+            for i, khoa_i in khoa.items()
+            if i not in tu_cache and ket_qua[i]["nguon"] == backend
+        }
+        if ket_qua_moi:
+            self._bo_nho_dem.luu_nhieu(self.BO_PHAN_TICH, phien_ban, ket_qua_moi)
+        return ket_qua
 
-    def _phan_tich_keyword(self, text: str) -> dict:
+    def _phan_tich_keyword(self, text: str | VanBanChuanHoa) -> dict:
         """Phân tích cảm xúc bằng từ điển keyword."""
-        text_lower = text.lower()
-        text_no_dau = bo_dau(text_lower)
-
-        diem_tich_cuc = 0
-        diem_tieu_cuc = 0
-
-        # Đếm từ tích cực
-        for tu in TU_TICH_CUC:
-            tu_lower = tu.lower()
-            if tu_lower in text_lower or bo_dau(tu_lower) in text_no_dau:
-                diem_tich_cuc += 1
-
-        # Đếm từ tiêu cực
-        for tu in TU_TIEU_CUC:
-            tu_lower = tu.lower()
-            if tu_lower in text_lower or bo_dau(tu_lower) in text_no_dau:
-                diem_tieu_cuc += 1
-
-        # Kiểm tra tin đồn
-        tin_don = any(
-            tu.lower() in text_lower or bo_dau(tu.lower()) in text_no_dau
-            for tu in TU_TIN_DON
-        )
+        # Một lần quét (dùng chung với các bước khác) cho mọi từ điển
+        ket_qua_quet = bo_tu_dien.quet(chuan_hoa_van_ban(text))
+
+        # Đếm từ tích cực / tiêu cực, kiểm tra tin đồn
+        diem_tich_cuc = ket_qua_quet.dem("cam_xuc_tich_cuc")
+        diem_tieu_cuc = ket_qua_quet.dem("cam_xuc_tieu_cuc")
+        tin_don = ket_qua_quet.co("tin_don")
 
         # Tính điểm tổng
         tong = diem_tich_cuc + diem_tieu_cuc
@@ -216,4 +241,27 @@ Bài báo:
             "nhan": nhan,
             "diem": round(diem, 4),
             "tin_don": tin_don,
+            "nguon": "keyword",
         }
+
+    def _phan_tich_keyword_nhieu(self, ds_van_ban: list[VanBanChuanHoa]) -> list[dict]:
+        """Như ``_phan_tich_keyword`` cho cả lô: điểm tính trên ma trận bài × từ khóa."""
+        khop = bo_tu_dien.quet_nhieu(ds_van_ban)
+        diem_tich_cuc = khop.dem("cam_xuc_tich_cuc")
+        diem_tieu_cuc = khop.dem("cam_xuc_tieu_cuc")
+        tin_don = khop.co("tin_don")
+
+        chenh_lech = diem_tich_cuc - diem_tieu_cuc
+        diem = np.clip(chenh_lech / np.maximum(diem_tich_cuc + diem_tieu_cuc, 1), -1.0, 1.0)
+        diem = np.where(tin_don, diem * 0.5, diem)
+        nhan = np.sign(chenh_lech)
+
+        return [
+            {
+                "nhan": _NHAN_THEO_DAU[dau],
+                "diem": round(d, 4) if dau else 0.0,
+                "tin_don": td,
+                "nguon": "keyword",
+            }
+            for dau, d, td in zip(nhan.tolist(), diem.tolist(), tin_don.tolist(), strict=True)
+        ]
@@ -0,0 +1,239 @@
+"""Local Sentiment Model - Hồi quy logistic trên n-gram băm, huấn luyện từ nhãn Gemini.
+
+Đặc trưng là unigram + bigram (chữ thường, giữ dấu) băm vào ``so_chieu`` cột,
+chuẩn hóa L2 theo bài. Mô hình softmax 3 lớp (NEGATIVE / NEUTRAL / POSITIVE)
+chỉ dùng NumPy: dự đoán cả lô bằng ma trận thưa dạng COO + ``np.bincount``
+nên không cần mạng và chỉ tốn vài micro-giây mỗi bài.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import re
+import zipfile
+import zlib
+from dataclasses import dataclass, field
+from functools import lru_cache
+from pathlib import Path
+
+import numpy as np
+
+from news_ingestor.models.enums import CamXuc
+from news_ingestor.utils.text_utils import VanBanChuanHoa, chuan_hoa_van_ban
+
+logger = logging.getLogger(__name__)
+
+# Tăng khi đổi cách trích đặc trưng (file mô hình cũ sẽ bị từ chối)
+PHIEN_BAN_DAC_TRUNG = 1
+SO_CHIEU_MAC_DINH = 1 << 18
+NHAN = (CamXuc.TIEU_CUC, CamXuc.TRUNG_TINH, CamXuc.TICH_CUC)
+_CHI_SO_NHAN = {str(nhan): i for i, nhan in enumerate(NHAN)}
+
+_TU = re.compile(r"\w+")
+
+
+@lru_cache(maxsize=1 << 20)
+def _bam(n_gram: str) -> int:
+    # crc32 ổn định giữa các process (hash() của Python bị salt)
+    return zlib.crc32(n_gram.encode("utf-8"))
+
+
+def trich_n_gram(van_ban: str | VanBanChuanHoa) -> list[str]:
+    """Unigram + bigram của văn bản (chữ thường, giữ dấu, bỏ token toàn số)."""
+    tu = [t for t in _TU.findall(chuan_hoa_van_ban(van_ban).thuong) if not t.isdigit()]
+    return tu + [f"{a} {b}" for a, b in zip(tu, tu[1:], strict=False)]
+
+
+def vector_hoa(
+    ds_van_ban: list[str | VanBanChuanHoa], so_chieu: int = SO_CHIEU_MAC_DINH
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Ma trận đặc trưng thưa dạng COO: (hàng, cột, giá trị), mỗi hàng chuẩn hóa L2."""
+    ds_hang: list[np.ndarray] = []
+    ds_cot: list[np.ndarray] = []
+    ds_gia_tri: list[np.ndarray] = []
+    mat_na = so_chieu - 1
+    for i, van_ban in enumerate(ds_van_ban):
+        cot = np.unique(
+            np.fromiter((_bam(g) for g in trich_n_gram(van_ban)), dtype=np.int64) & mat_na
+        )
+        if not len(cot):
+            continue
+        ds_hang.append(np.full(len(cot), i, dtype=np.int64))
+        ds_cot.append(cot)
+        ds_gia_tri.append(np.full(len(cot), 1.0 / np.sqrt(len(cot)), dtype=np.float32))
+
+    if not ds_hang:
+        rong = np.zeros(0, dtype=np.int64)
+        return rong, rong, np.zeros(0, dtype=np.float32)
+    return np.concatenate(ds_hang), np.concatenate(ds_cot), np.concatenate(ds_gia_tri)
+
+
+def _logit(
+    hang: np.ndarray,
+    cot: np.ndarray,
+    gia_tri: np.ndarray,
+    so_bai: int,
+    trong_so: np.ndarray,
+    he_so_chan: np.ndarray,
+) -> np.ndarray:
+    """X @ W + b với X dạng COO (một ``bincount`` cho mỗi lớp)."""
+    dong_gop = gia_tri[:, None] * trong_so[cot]
+    z = np.empty((so_bai, trong_so.shape[1]), dtype=np.float64)
+    for k in range(trong_so.shape[1]):
+        z[:, k] = np.bincount(hang, weights=dong_gop[:, k], minlength=so_bai)
+    return z + he_so_chan
+
+
+def _softmax(z: np.ndarray) -> np.ndarray:
+    z = z - z.max(axis=1, keepdims=True)
+    e = np.exp(z)
+    return e / e.sum(axis=1, keepdims=True)
+
+
+@dataclass
+class MoHinhCamXucCucBo:
+    """Mô hình cảm xúc cục bộ đã huấn luyện."""
+
+    trong_so: np.ndarray  # (so_chieu, 3)
+    he_so_chan: np.ndarray  # (3,)
+    so_mau_huan_luyen: int = 0
+    phien_ban: str = field(init=False)
+
+    def __post_init__(self):
+        self.trong_so = np.asarray(self.trong_so, dtype=np.float32)
+        self.he_so_chan = np.asarray(self.he_so_chan, dtype=np.float64)
+        bam = hashlib.sha256(self.trong_so.tobytes())
+        bam.update(self.he_so_chan.tobytes())
+        self.phien_ban = f"f{PHIEN_BAN_DAC_TRUNG}-{bam.hexdigest()[:12]}"
+
+    @property
+    def so_chieu(self) -> int:
+        return self.trong_so.shape[0]
+
+    def du_doan_xac_suat(self, ds_van_ban: list[str | VanBanChuanHoa]) -> np.ndarray:
+        """Xác suất (NEGATIVE, NEUTRAL, POSITIVE) cho cả lô, shape (n, 3)."""
+        hang, cot, gia_tri = vector_hoa(ds_van_ban, self.so_chieu)
+        z = _logit(hang, cot, gia_tri, len(ds_van_ban), self.trong_so, self.he_so_chan)
+        return _softmax(z)
+
+    def du_doan(self, ds_van_ban: list[str | VanBanChuanHoa]) -> list[dict]:
+        """Nhãn + điểm (P(tích cực) - P(tiêu cực)) cho cả lô."""
+        if not ds_van_ban:
+            return []
+        xac_suat = self.du_doan_xac_suat(ds_van_ban)
+        ds_nhan = xac_suat.argmax(axis=1)
+        ds_diem = xac_suat[:, 2] - xac_suat[:, 0]
+        return [
+            {"nhan": NHAN[nhan], "diem": round(float(diem), 4)}
+            for nhan, diem in zip(ds_nhan, ds_diem, strict=True)
+        ]
+
+    def luu(self, duong_dan: str | Path) -> int:
+        """Ghi mô hình ra file .npz (ghi file tạm rồi đổi tên), trả về số byte."""
+        duong_dan = Path(duong_dan)
+        duong_dan.parent.mkdir(parents=True, exist_ok=True)
+        tam = duong_dan.with_name(duong_dan.name + ".tmp")
+        with open(tam, "wb") as f:
+            np.savez_compressed(
+                f,
+                trong_so=self.trong_so,
+                he_so_chan=self.he_so_chan,
+                phien_ban_dac_trung=np.int64(PHIEN_BAN_DAC_TRUNG),
+                so_mau_huan_luyen=np.int64(self.so_mau_huan_luyen),
+            )
+        tam.replace(duong_dan)
+        return duong_dan.stat().st_size
+
+    @classmethod
+    def tai(cls, duong_dan: str | Path) -> MoHinhCamXucCucBo:
+        """Nạp mô hình; ValueError nếu file sai định dạng hoặc khác phiên bản đặc trưng."""
+        try:
+            with np.load(duong_dan, allow_pickle=False) as du_lieu:
+                phien_ban = int(du_lieu["phien_ban_dac_trung"])
+                trong_so = du_lieu["trong_so"]
+                he_so_chan = du_lieu["he_so_chan"]
+                so_mau = int(du_lieu["so_mau_huan_luyen"])
+        except (KeyError, OSError, EOFError, zipfile.BadZipFile, zlib.error) as e:
+            # File thiếu khóa, cắt cụt hoặc hỏng nén giữa chừng
+            raise ValueError(f"{duong_dan} không phải file mô hình cảm xúc: {e}") from e
+
+        if phien_ban != PHIEN_BAN_DAC_TRUNG:
+            raise ValueError(
+                f"Mô hình phiên bản đặc trưng {phien_ban}, cần {PHIEN_BAN_DAC_TRUNG}; "
+                "hãy chạy lại train-sentiment"
+            )
+        if trong_so.ndim != 2 or trong_so.shape[1] != len(NHAN) or he_so_chan.shape != (3,):
+            raise ValueError(f"{duong_dan}: kích thước trọng số không hợp lệ")
+        so_chieu = trong_so.shape[0]
+        if so_chieu & (so_chieu - 1):
+            raise ValueError(f"{duong_dan}: số chiều phải là lũy thừa của 2")
+        return cls(trong_so=trong_so, he_so_chan=he_so_chan, so_mau_huan_luyen=so_mau)
+
+
+def huan_luyen(
+    ds_van_ban: list[str | VanBanChuanHoa],
+    ds_nhan: list[str],
+    so_chieu: int = SO_CHIEU_MAC_DINH,
+    so_vong: int = 200,
+    toc_do_hoc: float = 0.05,
+    l2: float = 1e-6,
+) -> MoHinhCamXucCucBo:
+    """Huấn luyện hồi quy logistic đa lớp (full-batch, Adam, L2).
+
+    Args:
+        ds_van_ban: Văn bản phân tích (tiêu đề + nội dung đã làm sạch).
+        ds_nhan: Nhãn POSITIVE / NEGATIVE / NEUTRAL tương ứng.
+    """
+    if len(ds_van_ban) != len(ds_nhan):
+        raise ValueError("Kích thước ds_van_ban và ds_nhan phải bằng nhau")
+    if not ds_van_ban:
+        raise ValueError("Không có mẫu huấn luyện")
+    if so_chieu <= 0 or so_chieu & (so_chieu - 1):
+        raise ValueError("so_chieu phải là lũy thừa của 2")
+
+    n = len(ds_van_ban)
+    y = np.zeros((n, len(NHAN)))
+    y[np.arange(n), [_CHI_SO_NHAN[str(nhan)] for nhan in ds_nhan]] = 1.0
+    hang, cot, gia_tri = vector_hoa(ds_van_ban, so_chieu)
+
+    w = np.zeros((so_chieu, len(NHAN)))
+    b = np.log(y.mean(axis=0) + 1e-9)
+    m_w, v_w = np.zeros_like(w), np.zeros_like(w)
+    m_b, v_b = np.zeros_like(b), np.zeros_like(b)
+    beta1, beta2, eps = 0.9, 0.999, 1e-8
+
+    for t in range(1, so_vong + 1):
+        sai_so = (_softmax(_logit(hang, cot, gia_tri, n, w, b)) - y) / n
+        grad_w = np.empty_like(w)
+        for k in range(len(NHAN)):
+            grad_w[:, k] = np.bincount(cot, weights=gia_tri * sai_so[hang, k], minlength=so_chieu)
+        grad_w += l2 * w
+        grad_b = sai_so.sum(axis=0)
+
+        m_w = beta1 * m_w + (1 - beta1) * grad_w
+        v_w = beta2 * v_w + (1 - beta2) * grad_w**2
+        m_b = beta1 * m_b + (1 - beta1) * grad_b
+        v_b = beta2 * v_b + (1 - beta2) * grad_b**2
+        hieu_chinh = toc_do_hoc * np.sqrt(1 - beta2**t) / (1 - beta1**t)
+        w -= hieu_chinh * m_w / (np.sqrt(v_w) + eps)
+        b -= hieu_chinh * m_b / (np.sqrt(v_b) + eps)
+
+    logger.info(f"Đã huấn luyện mô hình cảm xúc trên {n} mẫu, {so_vong} vòng")
+    return MoHinhCamXucCucBo(trong_so=w, he_so_chan=b, so_mau_huan_luyen=n)
+
+
+def tai_mo_hinh_neu_co(duong_dan: str | Path | None) -> MoHinhCamXucCucBo | None:
+    """Nạp mô hình nếu file tồn tại; None (kèm log) nếu chưa huấn luyện hoặc file hỏng."""
+    if not duong_dan or not Path(duong_dan).exists():
+        return None
+    try:
+        mo_hinh = MoHinhCamXucCucBo.tai(duong_dan)
+    except ValueError as e:
+        logger.warning(f"Bỏ qua mô hình cảm xúc cục bộ: {e}")
+        return None
+    logger.info(
+        f"Đã nạp mô hình cảm xúc cục bộ {mo_hinh.phien_ban} "
+        f"({mo_hinh.so_mau_huan_luyen} mẫu huấn luyện)"
+    )
+    return mo_hinh
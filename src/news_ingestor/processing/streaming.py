@@ -0,0 +1,203 @@
+"""Streaming Pipeline - Xử lý dạng luồng với hàng đợi giới hạn giữa các giai đoạn.
+
+Crawlers → [hàng đợi] → fetch workers → [hàng đợi] → NLP workers → [hàng đợi] → writer
+
+Hàng đợi có kích thước giới hạn nên giai đoạn nhanh sẽ bị chặn (backpressure)
+khi giai đoạn sau chậm. Fetch (I/O) và NLP (CPU) chạy chồng lên nhau, bài
+đầu tiên được lưu ngay sau khi lô ghi đầu tiên đầy hoặc hết thời gian chờ.
+"""
+
+from __future__ import annotations
+
+import logging
+import queue
+import threading
+import time
+
+from news_ingestor.crawlers.base import BaseCrawler
+from news_ingestor.models.article import BaiBao, BaiBaoTho
+from news_ingestor.processing.pipeline import LuongXuLy
+from news_ingestor.utils.metrics import lay_metrics
+
+logger = logging.getLogger(__name__)
+metrics = lay_metrics()
+
+# Tín hiệu kết thúc hàng đợi
+_KET_THUC = object()
+
+
+class LuongXuLyDongChay:
+    """Pipeline producer/consumer chạy một chu kỳ thu thập + xử lý.
+
+    - Mỗi crawler là một producer, đẩy bài ngay khi phân tích xong từng trang
+    - Dedup trong chu kỳ (URL chuẩn hóa / hash tiêu đề) và với DB trước khi fetch
+    - Pool fetch workers lấy nội dung đầy đủ
+    - NLP workers làm sạch, trích xuất, chấm điểm
+    - Một writer gom lô để encode, upsert vector và commit DB
+    """
+
+    def __init__(
+        self,
+        luong_xu_ly: LuongXuLy,
+        so_worker_fetch: int = 4,
+        so_worker_nlp: int = 1,
+        kich_thuoc_hang_doi: int = 64,
+        kich_thuoc_lo_ghi: int = 16,
+        thoi_gian_cho_ghi: float = 2.0,
+    ):
+        self._luong_xu_ly = luong_xu_ly
+        self._so_worker_fetch = max(1, so_worker_fetch)
+        self._so_worker_nlp = max(1, so_worker_nlp)
+        self._kich_thuoc_hang_doi = kich_thuoc_hang_doi
+        self._kich_thuoc_lo_ghi = max(1, kich_thuoc_lo_ghi)
+        self._thoi_gian_cho_ghi = thoi_gian_cho_ghi
+
+    def chay(self, crawlers: list[BaseCrawler]) -> list[BaiBaoTho]:
+        """Chạy một chu kỳ (blocking).
+
+        Returns:
+            Danh sách bài thô mới (sau dedup) đã được đưa vào pipeline.
+        """
+        bat_dau = time.perf_counter()
+        hang_doi_fetch: queue.Queue = queue.Queue(self._kich_thuoc_hang_doi)
+        hang_doi_nlp: queue.Queue = queue.Queue(self._kich_thuoc_hang_doi)
+        hang_doi_ghi: queue.Queue = queue.Queue(self._kich_thuoc_hang_doi)
+
+        lock_dedup = threading.Lock()
+        da_thay_url: set[str] = set()
+        da_thay_tieu_de: set[str] = set()
+        da_nhan: list[BaiBaoTho] = []
+        da_luu: list[BaiBao] = []
+        luu_dau_tien: list[float] = []
+
+        def san_xuat(crawler: BaseCrawler) -> None:
+            try:
+                for tin in crawler.thu_thap_theo_trang():
+                    # Dedup trong chu kỳ, giữ thứ tự xuất hiện như chế độ tuần tự
+                    with lock_dedup:
+                        moi = []
+                        for bai in tin:
+                            if (
+                                bai.url_chuan_hoa in da_thay_url
+                                or bai.tieu_de_hash in da_thay_tieu_de
+                            ):
+                                continue
+                            da_thay_url.add(bai.url_chuan_hoa)
+                            da_thay_tieu_de.add(bai.tieu_de_hash)
+                            moi.append(bai)
+
+                    # Một truy vấn DB cho mỗi trang
+                    for bai in self._luong_xu_ly.loc_bai_da_luu(moi):
+                        with lock_dedup:
+                            da_nhan.append(bai)
+                        hang_doi_fetch.put(bai)
+            except Exception as e:
+                logger.error(f"Lỗi crawler {crawler.ten_nguon}: {e}", exc_info=True)
+
+        def fetch() -> None:
+            while (bai_tho := hang_doi_fetch.get()) is not _KET_THUC:
+                noi_dung = self._luong_xu_ly.lay_noi_dung_day_du(bai_tho)
+                hang_doi_nlp.put((bai_tho, noi_dung))
+
+        def nlp() -> None:
+            while (muc := hang_doi_nlp.get()) is not _KET_THUC:
+                bai_tho, noi_dung = muc
+                try:
+                    hang_doi_ghi.put(self._luong_xu_ly.phan_tich_bai(bai_tho, noi_dung))
+                except Exception:
+                    metrics.tang("pipeline_articles_failed")
+                    logger.error(
+                        f"Lỗi xử lý bài: {bai_tho.tieu_de[:50]}...",
+                        exc_info=True,
+                    )
+
+        def ghi() -> None:
+            ket_thuc = False
+            while not ket_thuc:
+                lo: list[tuple[BaiBao, str]] = []
+                han_cuoi = None
+                while len(lo) < self._kich_thuoc_lo_ghi:
+                    con_lai = None if han_cuoi is None else han_cuoi - time.monotonic()
+                    if con_lai is not None and con_lai <= 0:
+                        break
+                    try:
+                        muc = hang_doi_ghi.get(timeout=con_lai)
+                    except queue.Empty:
+                        break
+                    if muc is _KET_THUC:
+                        ket_thuc = True
+                        break
+                    lo.append(muc)
+                    if han_cuoi is None:
+                        han_cuoi = time.monotonic() + self._thoi_gian_cho_ghi
+
+                if not lo:
+                    continue
+                ds_bai_bao = [bai for bai, _ in lo]
+                try:
+                    ds_da_luu, _ = self._luong_xu_ly.ghi_lo(
+                        ds_bai_bao, [van_ban for _, van_ban in lo]
+                    )
+                except Exception as e:
+                    metrics.tang("pipeline_articles_failed", len(lo))
+                    logger.error(f"Lỗi ghi lô {len(lo)} bài: {e}", exc_info=True)
+                    continue
+                if ds_da_luu and not luu_dau_tien:
+                    luu_dau_tien.append(time.perf_counter() - bat_dau)
+                da_luu.extend(ds_da_luu)
+                metrics.tang("pipeline_articles_success", len(ds_da_luu))
+                if len(ds_da_luu) < len(lo):
+                    metrics.tang("pipeline_articles_failed", len(lo) - len(ds_da_luu))
+
+        producers = [
+            threading.Thread(target=san_xuat, args=(c,), name=f"stream-crawl-{c.ten_nguon}")
+            for c in crawlers
+        ]
+        fetchers = [
+            threading.Thread(target=fetch, name=f"stream-fetch-{i}")
+            for i in range(self._so_worker_fetch)
+        ]
+        nlp_workers = [
+            threading.Thread(target=nlp, name=f"stream-nlp-{i}")
+            for i in range(self._so_worker_nlp)
+        ]
+        writer = threading.Thread(target=ghi, name="stream-writer")
+
+        metrics.tang("pipeline_batches")
+        for t in [*producers, *fetchers, *nlp_workers, writer]:
+            t.start()
+
+        # Đóng từng giai đoạn theo thứ tự để hàng đợi được xả hết
+        self._dung_giai_doan(producers, None, 0)
+        self._dung_giai_doan(fetchers, hang_doi_fetch, len(fetchers))
+        self._dung_giai_doan(nlp_workers, hang_doi_nlp, len(nlp_workers))
+        self._dung_giai_doan([writer], hang_doi_ghi, 1)
+
+        tong_ms = int((time.perf_counter() - bat_dau) * 1000)
+        dau_tien_ms = int(luu_dau_tien[0] * 1000) if luu_dau_tien else None
+        if dau_tien_ms is not None:
+            metrics.gan("stream_first_saved_ms", dau_tien_ms)
+        logger.info(
+            f"Hoàn thành chu kỳ luồng: {len(da_luu)}/{len(da_nhan)} bài "
+            f"trong {tong_ms}ms (bài đầu tiên lưu sau {dau_tien_ms}ms)",
+            extra={"extra_fields": {
+                "sau_loai_trung": len(da_nhan),
+                "thanh_cong": len(da_luu),
+                "tong_ms": tong_ms,
+                "bai_dau_tien_ms": dau_tien_ms,
+            }},
+        )
+        return da_nhan
+
+    @staticmethod
+    def _dung_giai_doan(
+        threads: list[threading.Thread],
+        hang_doi: queue.Queue | None,
+        so_tin_hieu: int,
+    ) -> None:
+        """Gửi tín hiệu kết thúc cho một giai đoạn rồi chờ các thread của nó."""
+        if hang_doi is not None:
+            for _ in range(so_tin_hieu):
+                hang_doi.put(_KET_THUC)
+        for t in threads:
+            t.join()
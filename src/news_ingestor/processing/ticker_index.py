@@ -0,0 +1,163 @@
+"""Ticker Index - Chỉ mục bí danh mã chứng khoán toàn thị trường (HOSE/HNX/UPCoM).
+
+Importer đọc CSV danh sách niêm yết, sinh bí danh (đã bỏ dấu) từ tên công ty
+và lưu automaton đã biên dịch ra file pickle để nạp nhanh khi khởi động.
+"""
+
+from __future__ import annotations
+
+import csv
+import logging
+import pickle
+import re
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from news_ingestor.utils.aho_corasick import BoKhopDaMau
+from news_ingestor.utils.text_utils import bo_dau, tach_tu
+
+logger = logging.getLogger(__name__)
+
+PHIEN_BAN_CHI_MUC = 2
+
+# Tên cột chấp nhận trong CSV (không phân biệt hoa thường)
+COT_MA = ("ma", "ma_ck", "symbol", "ticker", "code")
+COT_TEN = ("ten_cong_ty", "ten", "company_name", "name", "organ_name")
+COT_SAN = ("san", "exchange", "com_group_code")
+COT_BI_DANH = ("tu_khoa", "bi_danh", "aliases")
+
+# Tiền tố pháp lý thường gặp trong tên doanh nghiệp, bỏ đi để sinh bí danh ngắn
+_TIEN_TO_PHAP_LY = re.compile(
+    r"^(?:công ty cổ phần|công ty cp|ctcp|tổng công ty cổ phần|tổng công ty|"
+    r"ngân hàng thương mại cổ phần|ngân hàng tmcp|nhtmcp|tập đoàn|công ty)\s+",
+    re.IGNORECASE,
+)
+
+# Bí danh sinh tự động phải có ít nhất từng này từ để tránh khớp từ thông dụng
+SO_TU_TOI_THIEU_BI_DANH = 2
+
+
+@dataclass
+class ChiMucMaCK:
+    """Chỉ mục đã biên dịch: automaton bí danh → mã và bảng mã → bí danh."""
+
+    bo_khop: BoKhopDaMau
+    bi_danh: dict[str, tuple[str, ...]] = field(default_factory=dict)
+    ten_cong_ty: dict[str, str] = field(default_factory=dict)
+    phien_ban: int = PHIEN_BAN_CHI_MUC
+
+    @property
+    def so_ma(self) -> int:
+        return len(self.ten_cong_ty)
+
+
+def chuan_hoa_bi_danh(bi_danh: str) -> tuple[str, ...]:
+    """Chuẩn hóa bí danh thành chuỗi từ chữ thường, bỏ dấu."""
+    return tuple(tach_tu(bo_dau(bi_danh.lower())))
+
+
+def sinh_bi_danh(ten_cong_ty: str) -> list[str]:
+    """Sinh bí danh từ tên công ty: tên đầy đủ và tên bỏ tiền tố pháp lý."""
+    ten = " ".join(ten_cong_ty.split())
+    if not ten:
+        return []
+
+    ket_qua = [ten]
+    ten_rut_gon = _TIEN_TO_PHAP_LY.sub("", ten)
+    if ten_rut_gon != ten and len(tach_tu(ten_rut_gon)) >= SO_TU_TOI_THIEU_BI_DANH:
+        ket_qua.append(ten_rut_gon)
+    return ket_qua
+
+
+def doc_csv_niem_yet(duong_dan: str | Path) -> dict[str, dict]:
+    """Đọc CSV danh sách niêm yết thành dict cùng dạng ``ma_chung_khoan`` của tickers.json.
+
+    Cột bí danh (nếu có) phân tách bằng ``;`` hoặc ``|``.
+    """
+    ma_ck: dict[str, dict] = {}
+    with open(duong_dan, encoding="utf-8-sig", newline="") as f:
+        reader = csv.DictReader(f)
+        cot = {ten.strip().lower(): ten for ten in reader.fieldnames or []}
+        cot_ma = next((cot[c] for c in COT_MA if c in cot), None)
+        if cot_ma is None:
+            raise ValueError(f"CSV thiếu cột mã chứng khoán (một trong: {', '.join(COT_MA)})")
+        cot_ten = next((cot[c] for c in COT_TEN if c in cot), None)
+        cot_san = next((cot[c] for c in COT_SAN if c in cot), None)
+        cot_bi_danh = next((cot[c] for c in COT_BI_DANH if c in cot), None)
+
+        for dong in reader:
+            ma = (dong.get(cot_ma) or "").strip().upper()
+            if not ma:
+                continue
+            ten = (dong.get(cot_ten) or "").strip() if cot_ten else ""
+            bi_danh = sinh_bi_danh(ten)
+            if cot_bi_danh and dong.get(cot_bi_danh):
+                bi_danh.extend(
+                    b.strip() for b in re.split(r"[;|]", dong[cot_bi_danh]) if b.strip()
+                )
+
+            thong_tin = ma_ck.setdefault(ma, {"ten_cong_ty": ten, "tu_khoa": []})
+            if cot_san and dong.get(cot_san):
+                thong_tin["san"] = dong[cot_san].strip().upper()
+            thong_tin["tu_khoa"].extend(b for b in bi_danh if b not in thong_tin["tu_khoa"])
+
+    return ma_ck
+
+
+def xay_dung_chi_muc(ma_ck: dict[str, dict], khop_ma: bool = False) -> ChiMucMaCK:
+    """Biên dịch dict mã CK → từ khóa thành chỉ mục.
+
+    Mặc định mã CK chỉ được khớp khi có trong ``tu_khoa``; mã viết hoa trong
+    văn bản đã được bắt bởi bước regex của bộ trích xuất, tránh khớp nhầm mã
+    trùng từ thông dụng ("hai", "vnd") khi dùng toàn bộ thị trường.
+    ``khop_ma=True`` thêm cả bản thân mã (dùng cho từ điển nhỏ tickers.json).
+    """
+    bo_khop = BoKhopDaMau()
+    bi_danh: dict[str, tuple[str, ...]] = {}
+    ten_cong_ty: dict[str, str] = {}
+
+    for ma, thong_tin in ma_ck.items():
+        da_them: dict[tuple[str, ...], None] = {}
+        tu_khoa = thong_tin.get("tu_khoa", [])
+        for tk in [ma, *tu_khoa] if khop_ma else tu_khoa:
+            tokens = chuan_hoa_bi_danh(tk)
+            if tokens and tokens not in da_them:
+                da_them[tokens] = None
+                bo_khop.them(tokens, ma)
+        bi_danh[ma] = tuple(" ".join(t) for t in da_them)
+        ten_cong_ty[ma] = thong_tin.get("ten_cong_ty", "")
+
+    return ChiMucMaCK(bo_khop=bo_khop.bien_dich(), bi_danh=bi_danh, ten_cong_ty=ten_cong_ty)
+
+
+def gop_tu_khoa(goc: dict[str, dict], bo_sung: dict[str, dict]) -> dict[str, dict]:
+    """Gộp hai dict mã CK; từ khóa của ``goc`` đứng trước, không trùng lặp."""
+    ket_qua = {ma: {**tt, "tu_khoa": list(tt.get("tu_khoa", []))} for ma, tt in goc.items()}
+    for ma, thong_tin in bo_sung.items():
+        dich = ket_qua.setdefault(ma, {**thong_tin, "tu_khoa": []})
+        if not dich.get("ten_cong_ty"):
+            dich["ten_cong_ty"] = thong_tin.get("ten_cong_ty", "")
+        dich["tu_khoa"].extend(
+            tk for tk in thong_tin.get("tu_khoa", []) if tk not in dich["tu_khoa"]
+        )
+    return ket_qua
+
+
+def luu_chi_muc(chi_muc: ChiMucMaCK, duong_dan: str | Path) -> int:
+    """Ghi chỉ mục ra file pickle (ghi file tạm rồi đổi tên). Trả về số byte."""
+    duong_dan = Path(duong_dan)
+    duong_dan.parent.mkdir(parents=True, exist_ok=True)
+    file_tam = duong_dan.with_suffix(duong_dan.suffix + ".tmp")
+    with open(file_tam, "wb") as f:
+        pickle.dump(chi_muc, f, protocol=pickle.HIGHEST_PROTOCOL)
+    file_tam.replace(duong_dan)
+    return duong_dan.stat().st_size
+
+
+def tai_chi_muc(duong_dan: str | Path) -> ChiMucMaCK:
+    """Nạp chỉ mục đã biên dịch từ file pickle (chỉ dùng file do importer tạo)."""
+    with open(duong_dan, "rb") as f:
+        chi_muc = pickle.load(f)
+    if not isinstance(chi_muc, ChiMucMaCK) or chi_muc.phien_ban != PHIEN_BAN_CHI_MUC:
+        raise ValueError(f"File chỉ mục mã CK không hợp lệ hoặc sai phiên bản: {duong_dan}")
+    return chi_muc
@@ -49,6 +49,8 @@ class BangTinTuc(Base):
     ma_chung_khoan_lien_quan = Column(Text, default="")  # JSON string cho SQLite
     diem_cam_xuc = Column(Float, default=0.0)
     nhan_cam_xuc = Column(String(20), default="NEUTRAL")
+    nguon_cam_xuc = Column(String(20), nullable=True)
+    phien_ban_tu_dien = Column(String(40), nullable=True)
     impact_score = Column(Integer, default=0)
     impact_level = Column(String(20), default="LOW", index=True)
     impact_tags = Column(Text, default="")
@@ -73,6 +75,32 @@ class BangNhatKy(Base):
     thong_bao_loi = Column(Text, nullable=True)
 
 
+class BangHttpValidator(Base):
+    """ORM model cho bảng http_validator (ETag/Last-Modified của feed, trang mục)."""
+
+    __tablename__ = "http_validator"
+
+    url = Column(String(2000), primary_key=True)
+    etag = Column(String(500), nullable=True)
+    last_modified = Column(String(100), nullable=True)
+    thoi_gian_cap_nhat = Column(DateTime(timezone=True))
+
+
+class BangKetQuaPhanTich(Base):
+    """ORM model cho bảng ket_qua_phan_tich (cache kết quả NLP theo hash nội dung)."""
+
+    __tablename__ = "ket_qua_phan_tich"
+    __table_args__ = (
+        Index("ix_ket_qua_phan_tich_phien_ban", "bo_phan_tich", "phien_ban"),
+    )
+
+    khoa = Column(String(64), primary_key=True)
+    bo_phan_tich = Column(String(50), nullable=False)
+    phien_ban = Column(String(100), nullable=False)
+    ket_qua = Column(Text, nullable=False)  # JSON
+    thoi_gian_tao = Column(DateTime(timezone=True))
+
+
 class QuanLyDatabase:
     """Quản lý kết nối và phiên làm việc với database."""
 
@@ -128,6 +156,9 @@ class QuanLyDatabase:
             "impact_level": "TEXT DEFAULT 'LOW'",
             "impact_tags": "TEXT DEFAULT ''",
             "is_high_impact": "INTEGER DEFAULT 0",
+            # Bản ghi cũ: không rõ nguồn nhãn, không dùng để huấn luyện
+            "nguon_cam_xuc": "TEXT",
+            "phien_ban_tu_dien": "TEXT",
         }
 
         with self._engine.begin() as conn:
@@ -0,0 +1,228 @@
+"""Cache vector embedding trên đĩa: file float32 memory-mapped + chỉ mục hash → hàng.
+
+Mỗi phiên bản model (tên model + backend) có một cặp file riêng trong thư mục
+cache:
+
+- ``<phiên bản>.f32``: ma trận float32 (hàng × số chiều), memory-mapped; file
+  được nới theo khối nên thêm vector không phải chép lại dữ liệu cũ.
+- ``<phiên bản>.idx``: chuỗi digest 16 byte nối tiếp, digest thứ i ứng với hàng
+  i. Vector được ghi trước, digest ghi sau nên chỉ mục không bao giờ trỏ tới
+  hàng chưa có dữ liệu; file chỉ ghi nối thêm nên không cần ghi lại cả chỉ mục.
+
+Tra cứu trả về view NumPy chỉ đọc trên memmap (không chép). Nhiều tiến trình
+có thể dùng chung thư mục: ghi được tuần tự hóa bằng ``flock`` (nếu có) và
+tiến trình khác đọc thêm phần chỉ mục mới khi tra cứu trượt.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import unicodedata
+from pathlib import Path
+from threading import Lock
+
+import numpy as np
+
+from news_ingestor.utils.metrics import lay_metrics
+
+try:
+    import fcntl
+except ImportError:  # Windows: chỉ khóa trong process
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+metrics = lay_metrics()
+
+KICH_THUOC_DIGEST = 16
+# Số hàng nới thêm mỗi lần file dữ liệu đầy
+SO_HANG_MOI_KHOI = 4096
+
+
+def chuan_hoa_khoa(van_ban: str) -> str:
+    """Dạng văn bản dùng làm khóa: NFC, gộp khoảng trắng."""
+    return " ".join(unicodedata.normalize("NFC", van_ban).split())
+
+
+class BoNhoDemEmbedding:
+    """Cache vector theo (phiên bản model, văn bản đã chuẩn hóa) trên file memmap."""
+
+    def __init__(self, thu_muc: str | Path, phien_ban: str, kich_thuoc: int | None = None):
+        """``kich_thuoc=None``: lấy số chiều từ cache đã có (FileNotFoundError nếu chưa có)."""
+        self._thu_muc = Path(thu_muc)
+        self.phien_ban = phien_ban
+
+        ten = hashlib.sha256(phien_ban.encode("utf-8")).hexdigest()[:16]
+        self._file_du_lieu = self._thu_muc / f"{ten}.f32"
+        self._file_chi_muc = self._thu_muc / f"{ten}.idx"
+        self.kich_thuoc = self._doc_thong_tin(self._thu_muc / f"{ten}.json", kich_thuoc)
+
+        self._lock = Lock()
+        self._chi_muc: dict[bytes, int] = {}
+        self._so_byte_chi_muc = 0
+        self._memmap: np.memmap | None = None
+        self._file_du_lieu.touch(exist_ok=True)
+        self._file_chi_muc.touch(exist_ok=True)
+        self._doc_them_chi_muc()
+
+    def _doc_thong_tin(self, duong_dan: Path, kich_thuoc: int | None) -> int:
+        if duong_dan.exists():
+            with open(duong_dan, encoding="utf-8") as f:
+                da_co = json.load(f)
+            if da_co["phien_ban"] != self.phien_ban or kich_thuoc not in (
+                None,
+                da_co["kich_thuoc"],
+            ):
+                raise ValueError(f"{duong_dan}: cache embedding khác phiên bản/kích thước")
+            return int(da_co["kich_thuoc"])
+        if kich_thuoc is None:
+            raise FileNotFoundError(f"Chưa có cache embedding cho {self.phien_ban}")
+
+        self._thu_muc.mkdir(parents=True, exist_ok=True)
+        with open(duong_dan, "w", encoding="utf-8") as f:
+            json.dump({"phien_ban": self.phien_ban, "kich_thuoc": kich_thuoc}, f)
+        return kich_thuoc
+
+    def tao_khoa(self, van_ban: str) -> bytes:
+        """Digest 16 byte của văn bản đã chuẩn hóa (phiên bản nằm ở tên file)."""
+        return hashlib.blake2b(
+            chuan_hoa_khoa(van_ban).encode("utf-8"), digest_size=KICH_THUOC_DIGEST
+        ).digest()
+
+    def __len__(self) -> int:
+        return len(self._chi_muc)
+
+    def lay_nhieu(self, ds_van_ban: list[str]) -> list[np.ndarray | None]:
+        """Tra cứu cả lô; mỗi kết quả là view chỉ đọc trên memmap hoặc None."""
+        ds_khoa = [self.tao_khoa(van_ban) for van_ban in ds_van_ban]
+        with self._lock:
+            if any(khoa not in self._chi_muc for khoa in ds_khoa):
+                # Tiến trình khác có thể vừa ghi thêm
+                self._doc_them_chi_muc()
+            ds_hang = [self._chi_muc.get(khoa) for khoa in ds_khoa]
+            memmap = self._memmap
+
+        ket_qua: list[np.ndarray | None] = []
+        for hang in ds_hang:
+            if hang is None:
+                ket_qua.append(None)
+                continue
+            view = memmap[hang]
+            view.flags.writeable = False
+            ket_qua.append(view)
+
+        so_trung = sum(v is not None for v in ket_qua)
+        if so_trung:
+            metrics.tang("embedding_cache_hits", so_trung)
+        if so_trung < len(ket_qua):
+            metrics.tang("embedding_cache_misses", len(ket_qua) - so_trung)
+        return ket_qua
+
+    def luu_nhieu(self, ds_van_ban: list[str], ma_tran: np.ndarray) -> int:
+        """Ghi vector mới (bỏ qua văn bản đã có); trả về số hàng đã ghi."""
+        ma_tran = np.asarray(ma_tran, dtype=np.float32).reshape(-1, self.kich_thuoc)
+        with self._lock, open(self._file_chi_muc, "ab") as f_chi_muc:
+            if fcntl is not None:
+                fcntl.flock(f_chi_muc, fcntl.LOCK_EX)
+            try:
+                self._doc_them_chi_muc()
+                moi: dict[bytes, int] = {}
+                for i, van_ban in enumerate(ds_van_ban):
+                    khoa = self.tao_khoa(van_ban)
+                    if khoa not in self._chi_muc and khoa not in moi:
+                        moi[khoa] = i
+                if not moi:
+                    return 0
+
+                hang_dau = self._so_byte_chi_muc // KICH_THUOC_DIGEST
+                self._dam_bao_suc_chua(hang_dau + len(moi))
+                self._memmap[hang_dau : hang_dau + len(moi)] = ma_tran[list(moi.values())]
+                self._memmap.flush()
+
+                f_chi_muc.write(b"".join(moi))
+                f_chi_muc.flush()
+                for hang, khoa in enumerate(moi, start=hang_dau):
+                    self._chi_muc[khoa] = hang
+                self._so_byte_chi_muc += len(moi) * KICH_THUOC_DIGEST
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(f_chi_muc, fcntl.LOCK_UN)
+
+        metrics.tang("embedding_cache_writes", len(moi))
+        return len(moi)
+
+    def thong_ke(self) -> dict[str, float]:
+        """Số lần trúng/trượt, tỷ lệ trúng và số vector đang lưu."""
+        counters = metrics.snapshot()["counters"]
+        trung = counters.get("embedding_cache_hits", 0)
+        truot = counters.get("embedding_cache_misses", 0)
+        tong = trung + truot
+        return {
+            "trung": trung,
+            "truot": truot,
+            "ty_le_trung": round(trung / tong, 4) if tong else 0.0,
+            "so_vector": len(self._chi_muc),
+            "kich_thuoc_mb": round(self._file_du_lieu.stat().st_size / 1024 / 1024, 2),
+        }
+
+    def _doc_them_chi_muc(self) -> None:
+        """Đọc phần chỉ mục được ghi thêm (bởi process này hoặc process khác)."""
+        with open(self._file_chi_muc, "rb") as f:
+            f.seek(self._so_byte_chi_muc)
+            du_lieu = f.read()
+        # Bỏ phần digest ghi dở (nếu có) ở cuối file
+        du_lieu = du_lieu[: len(du_lieu) - len(du_lieu) % KICH_THUOC_DIGEST]
+        hang = self._so_byte_chi_muc // KICH_THUOC_DIGEST
+        for i in range(0, len(du_lieu), KICH_THUOC_DIGEST):
+            self._chi_muc.setdefault(du_lieu[i : i + KICH_THUOC_DIGEST], hang)
+            hang += 1
+        self._so_byte_chi_muc += len(du_lieu)
+        self._dam_bao_suc_chua(hang)
+
+    def _dam_bao_suc_chua(self, so_hang: int) -> None:
+        """Nới file dữ liệu (theo khối) và map lại khi cần."""
+        so_byte_hang = self.kich_thuoc * 4
+        so_hang_file = self._file_du_lieu.stat().st_size // so_byte_hang
+        if so_hang > so_hang_file:
+            so_hang_file = -(-so_hang // SO_HANG_MOI_KHOI) * SO_HANG_MOI_KHOI
+            with open(self._file_du_lieu, "r+b") as f:
+                f.truncate(so_hang_file * so_byte_hang)
+        if so_hang_file and (self._memmap is None or self._memmap.shape[0] != so_hang_file):
+            # View cũ vẫn giữ mapping cũ nên vẫn đọc được sau khi map lại
+            self._memmap = np.memmap(
+                self._file_du_lieu,
+                dtype=np.float32,
+                mode="r+",
+                shape=(so_hang_file, self.kich_thuoc),
+            )
+
+
+_bo_nho_dem: dict[str, BoNhoDemEmbedding] = {}
+_lock_bo_nho_dem = Lock()
+
+
+def lay_bo_nho_dem_embedding(
+    phien_ban: str, kich_thuoc: int | None = None
+) -> BoNhoDemEmbedding | None:
+    """Cache embedding dùng chung cho một phiên bản model; None nếu tắt hoặc lỗi.
+
+    ``kich_thuoc=None`` chỉ mở cache đã có (trước khi tải model).
+    """
+    from config.settings import lay_cau_hinh_nlp
+
+    cau_hinh = lay_cau_hinh_nlp()
+    if not cau_hinh.cache_embedding:
+        return None
+    with _lock_bo_nho_dem:
+        if phien_ban not in _bo_nho_dem:
+            try:
+                _bo_nho_dem[phien_ban] = BoNhoDemEmbedding(
+                    cau_hinh.duong_dan_cache_embedding, phien_ban, kich_thuoc
+                )
+            except FileNotFoundError:
+                return None
+            except (OSError, ValueError) as e:
+                logger.warning(f"Không dùng được cache embedding: {e}")
+                return None
+        return _bo_nho_dem[phien_ban]
@@ -0,0 +1,86 @@
+"""Lưu trữ HTTP validators (ETag / Last-Modified) cho conditional GET."""
+
+from __future__ import annotations
+
+import logging
+from collections.abc import Mapping
+from datetime import datetime, timezone
+from threading import Lock
+
+from news_ingestor.storage.database import BangHttpValidator, lay_quan_ly_db
+
+logger = logging.getLogger(__name__)
+
+
+class KhoValidatorHttp:
+    """Kho validator HTTP bền vững cho feed RSS và trang mục của crawlers.
+
+    Toàn bộ bảng được nạp vào bộ nhớ ở lần dùng đầu, nên việc tạo header
+    không cần truy vấn DB. Nếu DB lỗi, kho vẫn hoạt động in-memory.
+    """
+
+    def __init__(self, database_url: str | None = None):
+        self._db = lay_quan_ly_db(database_url)
+        self._lock = Lock()
+        self._bo_nho: dict[str, tuple[str | None, str | None]] | None = None
+
+    def lay_header(self, url: str) -> dict[str, str]:
+        """Tạo header If-None-Match / If-Modified-Since cho URL đã thấy trước đó."""
+        etag, last_modified = self._lay_bo_nho().get(url, (None, None))
+        header: dict[str, str] = {}
+        if etag:
+            header["If-None-Match"] = etag
+        if last_modified:
+            header["If-Modified-Since"] = last_modified
+        return header
+
+    def cap_nhat(self, url: str, header_response: Mapping[str, str]) -> None:
+        """Ghi nhận validator mới từ response 200 (nếu server có trả về)."""
+        etag = header_response.get("etag")
+        last_modified = header_response.get("last-modified")
+        if not etag and not last_modified:
+            return
+
+        bo_nho = self._lay_bo_nho()
+        if bo_nho.get(url) == (etag, last_modified):
+            return
+        with self._lock:
+            bo_nho[url] = (etag, last_modified)
+
+        session = self._db.tao_phien()
+        try:
+            session.merge(
+                BangHttpValidator(
+                    url=url,
+                    etag=etag,
+                    last_modified=last_modified,
+                    thoi_gian_cap_nhat=datetime.now(tz=timezone.utc),
+                )
+            )
+            session.commit()
+        except Exception as e:
+            session.rollback()
+            logger.warning(f"Không thể lưu HTTP validator cho {url}: {e}")
+        finally:
+            session.close()
+
+    def _lay_bo_nho(self) -> dict[str, tuple[str | None, str | None]]:
+        """Nạp bảng validator vào bộ nhớ một lần."""
+        if self._bo_nho is not None:
+            return self._bo_nho
+
+        with self._lock:
+            if self._bo_nho is None:
+                bo_nho: dict[str, tuple[str | None, str | None]] = {}
+                session = self._db.tao_phien()
+                try:
+                    for ban_ghi in session.query(BangHttpValidator).all():
+                        bo_nho[ban_ghi.url] = (ban_ghi.etag, ban_ghi.last_modified)
+                    logger.info(f"Đã nạp {len(bo_nho)} HTTP validator")
+                except Exception as e:
+                    logger.warning(f"Không thể nạp HTTP validator, dùng in-memory: {e}")
+                finally:
+                    session.close()
+                self._bo_nho = bo_nho
+
+        return self._bo_nho
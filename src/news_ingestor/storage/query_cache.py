@@ -0,0 +1,58 @@
+"""Cache LRU vector truy vấn cho tìm kiếm ngữ nghĩa (MCP server).
+
+Agent hay lặp lại vài câu hỏi ("lãi suất", "tỷ giá", mã CK...): câu hỏi đã
+gặp trả về vector trong RAM, không chạy lại model. Khóa là văn bản đã chuẩn
+hóa (NFC, gộp khoảng trắng) và chính văn bản đó được encode, nên hai cách
+gõ cho cùng khóa luôn ra cùng vector.
+"""
+
+from __future__ import annotations
+
+from collections import OrderedDict
+from threading import Lock
+from typing import TYPE_CHECKING
+
+from news_ingestor.storage.embedding_cache import chuan_hoa_khoa
+from news_ingestor.utils.metrics import lay_metrics
+
+if TYPE_CHECKING:
+    from news_ingestor.processing.embeddings import BoTaoEmbeddings
+
+metrics = lay_metrics()
+
+
+class BoNhoDemTruyVan:
+    """LRU có giới hạn đặt trước ``BoTaoEmbeddings``; ``kich_thuoc=0`` là tắt."""
+
+    def __init__(self, bo_embedding: BoTaoEmbeddings, kich_thuoc: int = 1024):
+        self._bo_embedding = bo_embedding
+        self._kich_thuoc = kich_thuoc
+        self._lru: OrderedDict[str, tuple[float, ...]] = OrderedDict()
+        self._lock = Lock()
+
+    def __len__(self) -> int:
+        return len(self._lru)
+
+    def lay_vector(self, cau_hoi: str) -> list[float]:
+        """Vector của câu hỏi: từ LRU nếu đã gặp, không thì encode rồi lưu lại.
+
+        Lỗi encode được ném ra (không cache vector rỗng).
+        """
+        khoa = chuan_hoa_khoa(cau_hoi)
+        with self._lock:
+            vector = self._lru.get(khoa)
+            if vector is not None:
+                self._lru.move_to_end(khoa)
+        if vector is not None:
+            metrics.tang("query_cache_hits")
+            return list(vector)
+
+        metrics.tang("query_cache_misses")
+        vector = tuple(self._bo_embedding.tao_ma_tran_tai_lieu([khoa])[0].tolist())
+        if self._kich_thuoc > 0:
+            with self._lock:
+                self._lru[khoa] = vector
+                self._lru.move_to_end(khoa)
+                while len(self._lru) > self._kich_thuoc:
+                    self._lru.popitem(last=False)
+        return list(vector)
@@ -5,6 +5,7 @@ from __future__ import annotations
 import json
 import logging
 import uuid
+from collections.abc import Iterable, Iterator
 from datetime import datetime, timedelta, timezone
 
 from sqlalchemy import desc, or_
@@ -17,6 +18,9 @@ from news_ingestor.utils.metrics import lay_metrics
 logger = logging.getLogger(__name__)
 metrics = lay_metrics()
 
+# Số khóa tối đa trong một mệnh đề IN (an toàn với giới hạn tham số của SQLite)
+KICH_THUOC_LO_KHOA = 400
+
 
 class KhoTinTuc:
     """Repository cho bảng tin_tuc_tai_chinh - thao tác CRUD chính."""
@@ -44,31 +48,7 @@ class KhoTinTuc:
                 logger.debug(f"Bài báo đã tồn tại (dedup): {bai_bao.url_chuan_hoa}")
                 return False
 
-            ban_ghi = BangTinTuc(
-                id=bai_bao.id,
-                tieu_de=bai_bao.tieu_de,
-                tieu_de_hash=bai_bao.tieu_de_hash,
-                noi_dung_tom_tat=bai_bao.noi_dung_tom_tat,
-                noi_dung_goc=bai_bao.noi_dung_goc,
-                url=bai_bao.url,
-                url_chuan_hoa=bai_bao.url_chuan_hoa,
-                nguon_tin=bai_bao.nguon_tin,
-                thoi_gian_xuat_ban=bai_bao.thoi_gian_xuat_ban,
-                danh_muc=str(bai_bao.danh_muc),
-                ma_chung_khoan_lien_quan=json.dumps(
-                    bai_bao.ma_chung_khoan_lien_quan, ensure_ascii=False
-                ),
-                diem_cam_xuc=bai_bao.diem_cam_xuc,
-                nhan_cam_xuc=str(bai_bao.nhan_cam_xuc),
-                impact_score=bai_bao.impact_score,
-                impact_level=bai_bao.impact_level,
-                impact_tags=json.dumps(bai_bao.impact_tags, ensure_ascii=False),
-                is_high_impact=1 if bai_bao.is_high_impact else 0,
-                vector_id=bai_bao.vector_id,
-                trang_thai=str(bai_bao.trang_thai),
-                thoi_gian_tao=bai_bao.thoi_gian_tao,
-            )
-            session.add(ban_ghi)
+            session.add(self._tao_ban_ghi(bai_bao))
             session.commit()
             metrics.tang("articles_saved")
             logger.info(f"Đã lưu bài báo mới: {bai_bao.tieu_de[:50]}...")
@@ -82,14 +62,132 @@ class KhoTinTuc:
             session.close()
 
     def luu_nhieu_bai_bao(self, danh_sach: list[BaiBao]) -> int:
-        """Lưu nhiều bài báo, trả về số bài mới được lưu."""
-        so_moi = 0
-        for bai_bao in danh_sach:
-            if self.luu_bai_bao(bai_bao):
-                so_moi += 1
+        """Lưu nhiều bài báo trong một transaction, trả về số bài mới được lưu.
+
+        Dedup bằng một truy vấn khóa cho cả lô (và trong nội bộ lô). Nếu
+        commit lô thất bại, lưu lại từng bài để không mất cả lô.
+        """
+        if not danh_sach:
+            return 0
+        so_moi = len(self.them_nhieu_bai_bao(self.loc_bai_moi(danh_sach)))
         logger.info(f"Đã lưu {so_moi}/{len(danh_sach)} bài báo mới")
         return so_moi
 
+    def loc_bai_moi(self, danh_sach: list[BaiBao]) -> list[BaiBao]:
+        """Bỏ bài đã có trong DB hoặc trùng trong nội bộ lô (một truy vấn khóa)."""
+        if not danh_sach:
+            return []
+
+        url_da_co, hash_da_co = self.tim_khoa_da_ton_tai(
+            (b.url_chuan_hoa for b in danh_sach),
+            (b.tieu_de_hash for b in danh_sach),
+        )
+        bai_moi: list[BaiBao] = []
+        for bai_bao in danh_sach:
+            if bai_bao.url_chuan_hoa in url_da_co or bai_bao.tieu_de_hash in hash_da_co:
+                continue
+            url_da_co.add(bai_bao.url_chuan_hoa)
+            hash_da_co.add(bai_bao.tieu_de_hash)
+            bai_moi.append(bai_bao)
+
+        so_trung = len(danh_sach) - len(bai_moi)
+        if so_trung:
+            metrics.tang("articles_dedup_skipped", so_trung)
+        return bai_moi
+
+    def them_nhieu_bai_bao(self, bai_moi: list[BaiBao]) -> list[BaiBao]:
+        """Ghi các bài đã qua ``loc_bai_moi`` trong một transaction; trả về bài đã ghi.
+
+        Nếu commit lô thất bại (VD bài vừa được luồng khác ghi), lưu lại từng
+        bài kèm kiểm tra trùng, nên kết quả có thể ít hơn đầu vào.
+        """
+        if not bai_moi:
+            return []
+        session = self._db.tao_phien()
+        try:
+            session.add_all([self._tao_ban_ghi(b) for b in bai_moi])
+            session.commit()
+            da_luu = list(bai_moi)
+            metrics.tang("articles_saved", len(da_luu))
+        except Exception as e:
+            session.rollback()
+            logger.warning(f"Lưu theo lô thất bại ({e}), chuyển sang lưu từng bài")
+            da_luu = [b for b in bai_moi if self.luu_bai_bao(b)]
+        finally:
+            session.close()
+        return da_luu
+
+    @staticmethod
+    def _tao_ban_ghi(bai_bao: BaiBao) -> BangTinTuc:
+        """Chuyển Pydantic model → ORM record."""
+        return BangTinTuc(
+            id=bai_bao.id,
+            tieu_de=bai_bao.tieu_de,
+            tieu_de_hash=bai_bao.tieu_de_hash,
+            noi_dung_tom_tat=bai_bao.noi_dung_tom_tat,
+            noi_dung_goc=bai_bao.noi_dung_goc,
+            url=bai_bao.url,
+            url_chuan_hoa=bai_bao.url_chuan_hoa,
+            nguon_tin=bai_bao.nguon_tin,
+            thoi_gian_xuat_ban=bai_bao.thoi_gian_xuat_ban,
+            danh_muc=str(bai_bao.danh_muc),
+            ma_chung_khoan_lien_quan=json.dumps(
+                bai_bao.ma_chung_khoan_lien_quan, ensure_ascii=False
+            ),
+            diem_cam_xuc=bai_bao.diem_cam_xuc,
+            nhan_cam_xuc=str(bai_bao.nhan_cam_xuc),
+            nguon_cam_xuc=bai_bao.nguon_cam_xuc,
+            phien_ban_tu_dien=bai_bao.phien_ban_tu_dien or None,
+            impact_score=bai_bao.impact_score,
+            impact_level=bai_bao.impact_level,
+            impact_tags=json.dumps(bai_bao.impact_tags, ensure_ascii=False),
+            is_high_impact=1 if bai_bao.is_high_impact else 0,
+            vector_id=bai_bao.vector_id,
+            trang_thai=str(bai_bao.trang_thai),
+            thoi_gian_tao=bai_bao.thoi_gian_tao,
+        )
+
+    def tim_khoa_da_ton_tai(
+        self,
+        ds_url_chuan_hoa: Iterable[str],
+        ds_tieu_de_hash: Iterable[str],
+    ) -> tuple[set[str], set[str]]:
+        """Tìm các URL chuẩn hóa / hash tiêu đề đã có trong DB.
+
+        Chạy một truy vấn cho mỗi lô khóa thay vì một truy vấn mỗi bài.
+
+        Returns:
+            (tập url_chuan_hoa đã tồn tại, tập tieu_de_hash đã tồn tại)
+        """
+        ds_url = list(dict.fromkeys(u for u in ds_url_chuan_hoa if u))
+        ds_hash = list(dict.fromkeys(h for h in ds_tieu_de_hash if h))
+        url_da_co: set[str] = set()
+        hash_da_co: set[str] = set()
+
+        session = self._db.tao_phien()
+        try:
+            so_lo = max(len(ds_url), len(ds_hash))
+            for i in range(0, so_lo, KICH_THUOC_LO_KHOA):
+                lo_url = ds_url[i : i + KICH_THUOC_LO_KHOA]
+                lo_hash = ds_hash[i : i + KICH_THUOC_LO_KHOA]
+                rows = (
+                    session.query(BangTinTuc.url_chuan_hoa, BangTinTuc.tieu_de_hash)
+                    .filter(
+                        or_(
+                            BangTinTuc.url_chuan_hoa.in_(lo_url),
+                            BangTinTuc.tieu_de_hash.in_(lo_hash),
+                        )
+                    )
+                    .all()
+                )
+                for url_chuan_hoa, tieu_de_hash in rows:
+                    url_da_co.add(url_chuan_hoa)
+                    hash_da_co.add(tieu_de_hash)
+        finally:
+            session.close()
+
+        return url_da_co, hash_da_co
+
     def tim_theo_ma_ck(
         self,
         ma_ck: str,
@@ -234,6 +332,30 @@ class KhoTinTuc:
         finally:
             session.close()
 
+    def lay_mau_cam_xuc(
+        self, nguon: str = "gemini", gioi_han: int | None = None
+    ) -> list[tuple[str, str]]:
+        """Lấy (văn bản phân tích, nhãn) của các bài có nhãn cảm xúc từ ``nguon``.
+
+        Văn bản là tiêu đề + nội dung đã làm sạch, giống đầu vào bộ phân tích.
+        """
+        session = self._db.tao_phien()
+        try:
+            truy_van = (
+                session.query(BangTinTuc.tieu_de, BangTinTuc.noi_dung_goc, BangTinTuc.nhan_cam_xuc)
+                .filter(BangTinTuc.nguon_cam_xuc == nguon)
+                .order_by(desc(BangTinTuc.thoi_gian_xuat_ban))
+            )
+            if gioi_han:
+                truy_van = truy_van.limit(gioi_han)
+            return [
+                (f"{tieu_de} {noi_dung or ''}", nhan)
+                for tieu_de, noi_dung, nhan in truy_van.all()
+                if nhan
+            ]
+        finally:
+            session.close()
+
     def lay_tin_tac_dong_cao(self, so_ngay: int = 3, gioi_han: int = 20) -> list[BaiBao]:
         """Lấy danh sách tin tác động cao gần đây."""
         session = self._db.tao_phien()
@@ -259,6 +381,51 @@ class KhoTinTuc:
         finally:
             session.close()
 
+    def lap_theo_lo(
+        self, kich_thuoc_lo: int = 256, gioi_han: int | None = None
+    ) -> Iterator[list[BaiBao]]:
+        """Duyệt toàn bộ bài báo theo lô (phân trang theo id, không giữ phiên dài)."""
+        id_cuoi = ""
+        da_lay = 0
+        while gioi_han is None or da_lay < gioi_han:
+            so_lay = kich_thuoc_lo if gioi_han is None else min(kich_thuoc_lo, gioi_han - da_lay)
+            session = self._db.tao_phien()
+            try:
+                ket_qua = (
+                    session.query(BangTinTuc)
+                    .filter(BangTinTuc.id > id_cuoi)
+                    .order_by(BangTinTuc.id)
+                    .limit(so_lay)
+                    .all()
+                )
+                lo = [self._chuyen_doi(r) for r in ket_qua]
+            finally:
+                session.close()
+            if not lo:
+                return
+            yield lo
+            id_cuoi = lo[-1].id
+            da_lay += len(lo)
+
+    def cap_nhat_vector_id(self, ds_vector_id: dict[str, str]) -> int:
+        """Gán vector_id cho nhiều bài (id bài → vector_id) trong một transaction."""
+        if not ds_vector_id:
+            return 0
+        session = self._db.tao_phien()
+        try:
+            session.bulk_update_mappings(
+                BangTinTuc,
+                [{"id": bai_id, "vector_id": v} for bai_id, v in ds_vector_id.items()],
+            )
+            session.commit()
+            return len(ds_vector_id)
+        except Exception as e:
+            session.rollback()
+            logger.error(f"Lỗi cập nhật vector_id: {e}")
+            return 0
+        finally:
+            session.close()
+
     # --- Nhật ký thu thập ---
 
     def tao_nhat_ky(self, nguon_tin: str) -> str:
@@ -343,6 +510,8 @@ class KhoTinTuc:
                 if ban_ghi.nhan_cam_xuc
                 else CamXuc.TRUNG_TINH
             ),
+            nguon_cam_xuc=ban_ghi.nguon_cam_xuc or "",
+            phien_ban_tu_dien=ban_ghi.phien_ban_tu_dien or "",
             impact_score=ban_ghi.impact_score or 0,
             impact_level=ban_ghi.impact_level or "LOW",
             impact_tags=impact_tags,
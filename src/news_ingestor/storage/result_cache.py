@@ -0,0 +1,207 @@
+"""Cache kết quả phân tích NLP theo hash nội dung (LRU trong process + bảng DB)."""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+from collections import OrderedDict
+from datetime import datetime, timezone
+from threading import Lock
+
+from news_ingestor.storage.database import (
+    BangKetQuaPhanTich,
+    QuanLyDatabase,
+    lay_quan_ly_db,
+)
+from news_ingestor.utils.metrics import lay_metrics
+
+logger = logging.getLogger(__name__)
+metrics = lay_metrics()
+
+# Số khóa tối đa trong một mệnh đề IN (an toàn với giới hạn tham số của SQLite)
+KICH_THUOC_LO_KHOA = 400
+
+
+class BoNhoDemKetQua:
+    """Cache hai tầng cho kết quả của các bộ phân tích (cảm xúc, tác động...).
+
+    Khóa là hash của (tên bộ phân tích, phiên bản, văn bản đã chuẩn hóa), nên
+    bài trùng nội dung (tin đăng lại, xử lý lại) chỉ tốn một lần tra cứu. Đổi
+    phiên bản bộ phân tích (model, prompt, từ điển) sẽ tự sinh khóa mới.
+
+    Tầng 1 là LRU trong process, tầng 2 là bảng ``ket_qua_phan_tich``; mỗi
+    lô chỉ tốn một truy vấn đọc và một transaction ghi. Nếu DB lỗi, cache vẫn
+    hoạt động in-memory.
+    """
+
+    def __init__(
+        self,
+        database_url: str | None = None,
+        kich_thuoc_lru: int = 10_000,
+        dung_db: bool = True,
+    ):
+        self._database_url = database_url
+        self._dung_db = dung_db
+        self._kich_thuoc_lru = kich_thuoc_lru
+        self._lru: OrderedDict[str, dict] = OrderedDict()
+        self._lock = Lock()
+
+    @property
+    def _db(self) -> QuanLyDatabase | None:
+        # Lấy qua singleton mỗi lần: cache sống lâu hơn một kết nối DB cụ thể
+        return lay_quan_ly_db(self._database_url) if self._dung_db else None
+
+    @staticmethod
+    def tao_khoa(bo_phan_tich: str, phien_ban: str, van_ban: str) -> str:
+        """Khóa cache: sha256 của tên bộ phân tích, phiên bản và văn bản."""
+        noi_dung = f"{bo_phan_tich}\x1f{phien_ban}\x1f{van_ban}"
+        return hashlib.sha256(noi_dung.encode("utf-8")).hexdigest()
+
+    def lay_nhieu(self, bo_phan_tich: str, ds_khoa: list[str]) -> list[dict | None]:
+        """Tra cứu nhiều khóa: LRU trước, phần còn thiếu bằng một truy vấn DB."""
+        ket_qua: list[dict | None] = [None] * len(ds_khoa)
+        thieu: dict[str, list[int]] = {}
+        with self._lock:
+            for i, khoa in enumerate(ds_khoa):
+                kq = self._lru.get(khoa)
+                if kq is None:
+                    thieu.setdefault(khoa, []).append(i)
+                else:
+                    self._lru.move_to_end(khoa)
+                    ket_qua[i] = dict(kq)
+
+        so_trung_lru = len(ds_khoa) - sum(map(len, thieu.values()))
+        so_trung_db = 0
+        if thieu and self._dung_db:
+            for khoa, kq in self._doc_db(list(thieu)).items():
+                self._ghi_lru(khoa, kq)
+                for i in thieu.pop(khoa):
+                    ket_qua[i] = dict(kq)
+                    so_trung_db += 1
+
+        so_truot = sum(map(len, thieu.values()))
+        self._ghi_thong_ke(bo_phan_tich, so_trung_lru, so_trung_db, so_truot)
+        return ket_qua
+
+    def luu_nhieu(self, bo_phan_tich: str, phien_ban: str, muc: dict[str, dict]) -> None:
+        """Ghi kết quả mới vào LRU và DB (một transaction, bỏ qua khóa đã có)."""
+        if not muc:
+            return
+        for khoa, kq in muc.items():
+            self._ghi_lru(khoa, kq)
+        if not self._dung_db:
+            return
+
+        session = self._db.tao_phien()
+        try:
+            ds_khoa = list(muc)
+            da_co: set[str] = set()
+            for i in range(0, len(ds_khoa), KICH_THUOC_LO_KHOA):
+                da_co.update(
+                    khoa
+                    for (khoa,) in session.query(BangKetQuaPhanTich.khoa)
+                    .filter(BangKetQuaPhanTich.khoa.in_(ds_khoa[i : i + KICH_THUOC_LO_KHOA]))
+                    .all()
+                )
+            bay_gio = datetime.now(tz=timezone.utc)
+            session.add_all(
+                BangKetQuaPhanTich(
+                    khoa=khoa,
+                    bo_phan_tich=bo_phan_tich,
+                    phien_ban=phien_ban,
+                    ket_qua=json.dumps(kq, ensure_ascii=False),
+                    thoi_gian_tao=bay_gio,
+                )
+                for khoa, kq in muc.items()
+                if khoa not in da_co
+            )
+            session.commit()
+            metrics.tang("result_cache_writes", len(muc) - len(da_co))
+        except Exception as e:
+            # Ghi trùng khóa từ luồng khác hoặc DB lỗi: LRU vẫn có kết quả
+            session.rollback()
+            logger.warning(f"Không thể lưu cache kết quả {bo_phan_tich}: {e}")
+        finally:
+            session.close()
+
+    def thong_ke(self) -> dict[str, float]:
+        """Số lần trúng/trượt, tỷ lệ trúng và số mục bị đẩy khỏi LRU."""
+        counters = metrics.snapshot()["counters"]
+        trung_lru = counters.get("result_cache_hits_memory", 0)
+        trung_db = counters.get("result_cache_hits_db", 0)
+        truot = counters.get("result_cache_misses", 0)
+        tong = trung_lru + trung_db + truot
+        return {
+            "trung_lru": trung_lru,
+            "trung_db": trung_db,
+            "truot": truot,
+            "ty_le_trung": round((trung_lru + trung_db) / tong, 4) if tong else 0.0,
+            "bi_day_ra": counters.get("result_cache_evictions", 0),
+            "kich_thuoc_lru": len(self._lru),
+        }
+
+    def _doc_db(self, ds_khoa: list[str]) -> dict[str, dict]:
+        ket_qua: dict[str, dict] = {}
+        session = self._db.tao_phien()
+        try:
+            for i in range(0, len(ds_khoa), KICH_THUOC_LO_KHOA):
+                rows = (
+                    session.query(BangKetQuaPhanTich.khoa, BangKetQuaPhanTich.ket_qua)
+                    .filter(BangKetQuaPhanTich.khoa.in_(ds_khoa[i : i + KICH_THUOC_LO_KHOA]))
+                    .all()
+                )
+                for khoa, ket_qua_json in rows:
+                    ket_qua[khoa] = json.loads(ket_qua_json)
+        except Exception as e:
+            logger.warning(f"Không thể đọc cache kết quả, bỏ qua tầng DB: {e}")
+        finally:
+            session.close()
+        return ket_qua
+
+    def _ghi_lru(self, khoa: str, ket_qua: dict) -> None:
+        if self._kich_thuoc_lru <= 0:
+            return
+        with self._lock:
+            self._lru[khoa] = dict(ket_qua)
+            self._lru.move_to_end(khoa)
+            so_bi_day = len(self._lru) - self._kich_thuoc_lru
+            for _ in range(max(so_bi_day, 0)):
+                self._lru.popitem(last=False)
+        if so_bi_day > 0:
+            metrics.tang("result_cache_evictions", so_bi_day)
+
+    @staticmethod
+    def _ghi_thong_ke(bo_phan_tich: str, trung_lru: int, trung_db: int, truot: int) -> None:
+        if trung_lru:
+            metrics.tang("result_cache_hits_memory", trung_lru)
+        if trung_db:
+            metrics.tang("result_cache_hits_db", trung_db)
+        if truot:
+            metrics.tang("result_cache_misses", truot)
+        if trung_lru or trung_db:
+            metrics.tang(f"result_cache_{bo_phan_tich}_hits", trung_lru + trung_db)
+        if truot:
+            metrics.tang(f"result_cache_{bo_phan_tich}_misses", truot)
+
+
+_bo_nho_dem: BoNhoDemKetQua | None = None
+_lock_bo_nho_dem = Lock()
+
+
+def lay_bo_nho_dem_ket_qua() -> BoNhoDemKetQua | None:
+    """Lấy cache kết quả dùng chung (singleton) theo cấu hình NLP; None nếu tắt."""
+    global _bo_nho_dem
+    from config.settings import lay_cau_hinh_nlp
+
+    cau_hinh = lay_cau_hinh_nlp()
+    if not cau_hinh.cache_ket_qua:
+        return None
+    if _bo_nho_dem is None:
+        with _lock_bo_nho_dem:
+            if _bo_nho_dem is None:
+                _bo_nho_dem = BoNhoDemKetQua(
+                    kich_thuoc_lru=cau_hinh.kich_thuoc_cache_ket_qua,
+                    dung_db=cau_hinh.cache_ket_qua_db,
+                )
+    return _bo_nho_dem
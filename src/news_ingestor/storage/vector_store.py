@@ -5,7 +5,7 @@ from __future__ import annotations
 import logging
 import uuid
 
-from config.settings import lay_cau_hinh_qdrant
+from config.settings import lay_cau_hinh_nlp, lay_cau_hinh_qdrant
 
 logger = logging.getLogger(__name__)
 
@@ -24,6 +24,13 @@ class KhoVector:
         self._in_memory: list[dict] = []  # Fallback in-memory storage
         self._kich_thuoc_vector = 384  # paraphrase-multilingual-MiniLM-L12-v2
         self._da_ket_noi = False
+        # EMBEDDING_CHUNK_MODE=chunks: một bài có thể có nhiều điểm → lấy dư rồi gộp theo bài
+        cau_hinh_nlp = lay_cau_hinh_nlp()
+        self._he_so_lay_them = (
+            cau_hinh_nlp.so_doan_toi_da_embedding
+            if cau_hinh_nlp.che_do_doan_embedding == "chunks"
+            else 1
+        )
 
     def ket_noi(self) -> bool:
         """Kết nối tới Qdrant server. Trả về True nếu thành công."""
@@ -46,6 +53,7 @@ class KhoVector:
                     ),
                 )
                 logger.info(f"Đã tạo collection mới: {self._ten_collection}")
+            self._tao_index_bai_bao_id()
 
             self._da_ket_noi = True
             logger.info(f"Kết nối Qdrant thành công: {self._url}")
@@ -92,34 +100,143 @@ class KhoVector:
 
         return vector_id
 
+    def luu_nhieu_vector(
+        self,
+        ds_vector: list[list[float]],
+        ds_metadata: list[dict],
+        ds_vector_id: list[str] | None = None,
+    ) -> list[str]:
+        """Lưu nhiều vector trong một lần upsert (ghi đè nếu trùng id). Trả về vector_id."""
+        if ds_vector_id is None:
+            ds_vector_id = [str(uuid.uuid4()) for _ in ds_vector]
+        if not ds_vector_id:
+            return []
+
+        if self._da_ket_noi and self._client:
+            try:
+                from qdrant_client.models import PointStruct
+
+                self._client.upsert(
+                    collection_name=self._ten_collection,
+                    points=[
+                        PointStruct(id=vector_id, vector=vector, payload=metadata)
+                        for vector_id, vector, metadata in zip(
+                            ds_vector_id, ds_vector, ds_metadata, strict=True
+                        )
+                    ],
+                )
+                logger.debug(f"Đã lưu {len(ds_vector_id)} vector")
+                return ds_vector_id
+            except Exception as e:
+                logger.error(f"Lỗi lưu vector theo lô vào Qdrant: {e}")
+
+        # Fallback in-memory (ghi đè điểm trùng id như upsert của Qdrant)
+        id_moi = set(ds_vector_id)
+        self._in_memory = [item for item in self._in_memory if item["id"] not in id_moi]
+        for vector_id, vector, metadata in zip(ds_vector_id, ds_vector, ds_metadata, strict=True):
+            self._luu_in_memory(vector_id, vector, metadata)
+        return ds_vector_id
+
+    def xoa_theo_bai(self, ds_bai_bao_id: list[str], giu_id: list[str] | None = None) -> None:
+        """Xóa mọi điểm (kể cả các đoạn) có ``bai_bao_id`` thuộc danh sách.
+
+        ``giu_id``: id các điểm vừa upsert, được giữ lại (chỉ xóa điểm cũ).
+        """
+        if not ds_bai_bao_id:
+            return
+        giu_id = giu_id or []
+        if self._da_ket_noi and self._client:
+            try:
+                from qdrant_client.models import (
+                    FieldCondition,
+                    Filter,
+                    FilterSelector,
+                    HasIdCondition,
+                    MatchAny,
+                )
+
+                dieu_kien = FieldCondition(key="bai_bao_id", match=MatchAny(any=ds_bai_bao_id))
+                bo_loc = Filter(
+                    must=[dieu_kien],
+                    must_not=[HasIdCondition(has_id=giu_id)] if giu_id else None,
+                )
+                self._client.delete(
+                    collection_name=self._ten_collection,
+                    points_selector=FilterSelector(filter=bo_loc),
+                )
+                return
+            except Exception as e:
+                logger.error(f"Lỗi xóa vector theo bài trong Qdrant: {e}")
+
+        can_xoa = set(ds_bai_bao_id)
+        giu = set(giu_id)
+        self._in_memory = [
+            item for item in self._in_memory
+            if item["metadata"].get("bai_bao_id") not in can_xoa or item["id"] in giu
+        ]
+
+    def _tao_index_bai_bao_id(self) -> None:
+        """Index payload ``bai_bao_id`` để xóa theo bài không phải quét cả collection."""
+        try:
+            from qdrant_client.models import PayloadSchemaType
+
+            self._client.create_payload_index(
+                collection_name=self._ten_collection,
+                field_name="bai_bao_id",
+                field_schema=PayloadSchemaType.KEYWORD,
+            )
+        except Exception as e:
+            logger.debug(f"Không tạo được index bai_bao_id: {e}")
+
     def tim_kiem_ngu_nghia(
         self,
         vector_truy_van: list[float],
         gioi_han: int = 10,
         diem_toi_thieu: float = 0.3,
     ) -> list[dict]:
-        """Tìm kiếm ngữ nghĩa - trả về danh sách kết quả với metadata và điểm."""
+        """Tìm kiếm ngữ nghĩa - trả về danh sách kết quả với metadata và điểm.
+
+        Mỗi bài chỉ xuất hiện một lần (đoạn có điểm cao nhất).
+        """
+        so_lay = gioi_han * self._he_so_lay_them
         if self._da_ket_noi and self._client:
             try:
                 ket_qua = self._client.search(
                     collection_name=self._ten_collection,
                     query_vector=vector_truy_van,
-                    limit=gioi_han,
+                    limit=so_lay,
                     score_threshold=diem_toi_thieu,
                 )
-                return [
-                    {
-                        "vector_id": str(hit.id),
-                        "diem_tuong_dong": round(hit.score, 4),
-                        **hit.payload,
-                    }
-                    for hit in ket_qua
-                ]
+                return self._gop_theo_bai(
+                    [
+                        {
+                            "vector_id": str(hit.id),
+                            "diem_tuong_dong": round(hit.score, 4),
+                            **hit.payload,
+                        }
+                        for hit in ket_qua
+                    ],
+                    gioi_han,
+                )
             except Exception as e:
                 logger.error(f"Lỗi tìm kiếm Qdrant: {e}")
-                return self._tim_in_memory(vector_truy_van, gioi_han)
-        else:
-            return self._tim_in_memory(vector_truy_van, gioi_han)
+        return self._gop_theo_bai(self._tim_in_memory(vector_truy_van, so_lay), gioi_han)
+
+    @staticmethod
+    def _gop_theo_bai(ket_qua: list[dict], gioi_han: int) -> list[dict]:
+        """Giữ kết quả đầu tiên (điểm cao nhất) của mỗi ``bai_bao_id``."""
+        da_co: set = set()
+        gop: list[dict] = []
+        for item in ket_qua:
+            bai_bao_id = item.get("bai_bao_id")
+            if bai_bao_id is not None:
+                if bai_bao_id in da_co:
+                    continue
+                da_co.add(bai_bao_id)
+            gop.append(item)
+            if len(gop) == gioi_han:
+                break
+        return gop
 
     def dem_vectors(self) -> int:
         """Đếm số lượng vector trong collection."""
@@ -0,0 +1,126 @@
+"""Aho-Corasick trên chuỗi token - khớp nhiều mẫu trong một lần duyệt văn bản."""
+
+from __future__ import annotations
+
+from collections import deque
+from collections.abc import Iterable, Sequence
+
+# Khóa chuyển trạng thái: (trạng thái << _SO_BIT_TOKEN) | token_id
+_SO_BIT_TOKEN = 22
+
+
+class BoKhopDaMau:
+    """Automaton Aho-Corasick với bảng chữ cái là token (từ).
+
+    Mẫu và văn bản đều là danh sách token đã chuẩn hóa (VD: chữ thường, bỏ
+    dấu), nên khớp luôn tôn trọng ranh giới từ: "fpt" không khớp "fpts".
+    Thời gian tìm kiếm tỉ lệ với số token của văn bản, không phụ thuộc số mẫu.
+
+    Cấu trúc dữ liệu phẳng (dict khóa int, list) để pickle gọn và nạp nhanh.
+    """
+
+    def __init__(self):
+        self._tu_vung: dict[str, int] = {}
+        self._chuyen: dict[int, int] = {}
+        self._that_bai: list[int] = [0]
+        self._dau_ra: dict[int, tuple[int, ...]] = {}
+        self._gia_tri: list[str] = []
+        self._chi_so_gia_tri: dict[str, int] = {}
+        # Danh sách con của mỗi trạng thái, chỉ cần khi xây dựng
+        self._con: list[list[int]] | None = [[]]
+        self._so_mau = 0
+
+    @property
+    def so_mau(self) -> int:
+        return self._so_mau
+
+    @property
+    def so_trang_thai(self) -> int:
+        return len(self._that_bai)
+
+    def them(self, tokens: Sequence[str], gia_tri: str) -> None:
+        """Thêm một mẫu (chuỗi token) gắn với giá trị trả về khi khớp."""
+        if self._con is None:
+            raise RuntimeError("Automaton đã biên dịch, không thể thêm mẫu")
+        if not tokens:
+            return
+
+        trang_thai = 0
+        for token in tokens:
+            token_id = self._tu_vung.setdefault(token, len(self._tu_vung))
+            khoa = (trang_thai << _SO_BIT_TOKEN) | token_id
+            tiep = self._chuyen.get(khoa)
+            if tiep is None:
+                tiep = len(self._that_bai)
+                self._chuyen[khoa] = tiep
+                self._that_bai.append(0)
+                self._con.append([])
+                self._con[trang_thai].append(token_id)
+            trang_thai = tiep
+
+        gia_tri_id = self._chi_so_gia_tri.setdefault(gia_tri, len(self._gia_tri))
+        if gia_tri_id == len(self._gia_tri):
+            self._gia_tri.append(gia_tri)
+        dau_ra = self._dau_ra.get(trang_thai, ())
+        if gia_tri_id not in dau_ra:
+            self._dau_ra[trang_thai] = (*dau_ra, gia_tri_id)
+        self._so_mau += 1
+
+    def bien_dich(self) -> BoKhopDaMau:
+        """Tính liên kết thất bại (BFS) và gộp đầu ra theo liên kết thất bại."""
+        if self._con is None:
+            return self
+
+        hang_doi: deque[int] = deque()
+        for token_id in self._con[0]:
+            hang_doi.append(self._chuyen[token_id])
+
+        while hang_doi:
+            trang_thai = hang_doi.popleft()
+            for token_id in self._con[trang_thai]:
+                con = self._chuyen[(trang_thai << _SO_BIT_TOKEN) | token_id]
+                hang_doi.append(con)
+
+                lui = self._that_bai[trang_thai]
+                while lui and ((lui << _SO_BIT_TOKEN) | token_id) not in self._chuyen:
+                    lui = self._that_bai[lui]
+                dich = self._chuyen.get((lui << _SO_BIT_TOKEN) | token_id, 0)
+                self._that_bai[con] = dich if dich != con else 0
+
+                dau_ra_lui = self._dau_ra.get(self._that_bai[con])
+                if dau_ra_lui:
+                    dau_ra = self._dau_ra.get(con, ())
+                    self._dau_ra[con] = (*dau_ra, *(g for g in dau_ra_lui if g not in dau_ra))
+
+        self._con = None
+        self._chi_so_gia_tri = {}
+        return self
+
+    def tim(self, tokens: Iterable[str]) -> set[str]:
+        """Trả về tập giá trị của mọi mẫu xuất hiện trong chuỗi token."""
+        if self._con is not None:
+            self.bien_dich()
+
+        tu_vung = self._tu_vung
+        chuyen = self._chuyen
+        that_bai = self._that_bai
+        dau_ra = self._dau_ra
+        tim_thay: set[int] = set()
+
+        trang_thai = 0
+        for token in tokens:
+            token_id = tu_vung.get(token)
+            if token_id is None:
+                # Token không có trong mẫu nào → quay về gốc
+                trang_thai = 0
+                continue
+
+            while trang_thai and ((trang_thai << _SO_BIT_TOKEN) | token_id) not in chuyen:
+                trang_thai = that_bai[trang_thai]
+            trang_thai = chuyen.get((trang_thai << _SO_BIT_TOKEN) | token_id, 0)
+
+            ket_qua = dau_ra.get(trang_thai)
+            if ket_qua:
+                tim_thay.update(ket_qua)
+
+        return {self._gia_tri[i] for i in tim_thay}
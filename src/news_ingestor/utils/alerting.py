@@ -4,9 +4,8 @@ from __future__ import annotations
 
 import logging
 
-import httpx
-
 from news_ingestor.models.article import BaiBao
+from news_ingestor.utils.http_pool import lay_bo_ket_noi
 
 logger = logging.getLogger(__name__)
 
@@ -62,9 +61,10 @@ class BoCanhBaoTelegram:
         }
 
         try:
-            with httpx.Client(timeout=self._timeout) as client:
-                response = client.post(url, json=payload)
-                response.raise_for_status()
+            # Mượn pool dùng chung: giữ kết nối TLS tới api.telegram.org giữa các cảnh báo
+            client = lay_bo_ket_noi().lay_client()
+            response = client.post(url, json=payload, timeout=self._timeout)
+            response.raise_for_status()
             return True
         except Exception as e:
             logger.warning(f"Gửi cảnh báo Telegram thất bại: {e}")
@@ -2,8 +2,12 @@
 
 from __future__ import annotations
 
+import csv
+import re
+from collections.abc import Callable
 from dataclasses import dataclass
 from datetime import datetime, timedelta, timezone
+from pathlib import Path
 
 from news_ingestor.models.article import BaiBao
 
@@ -18,6 +22,25 @@ class KetQuaDanhGiaImpact:
     confusion: dict[str, dict[str, int]]
 
 
+@dataclass
+class KetQuaSoSanhImpact:
+    """So sánh hai phiên bản classifier impact trên cùng tập gán nhãn."""
+
+    cu: KetQuaDanhGiaImpact
+    moi: KetQuaDanhGiaImpact
+    chenh_lech_accuracy: float
+
+
+@dataclass
+class KetQuaDanhGiaCamXuc:
+    """Kết quả đánh giá bộ phân tích cảm xúc so với nhãn tham chiếu."""
+
+    so_mau: int
+    dung: int
+    accuracy: float
+    confusion: dict[str, dict[str, int]]
+
+
 @dataclass
 class BaoCaoDanhGiaPipeline:
     """Báo cáo KPI pipeline trên dữ liệu đã lưu."""
@@ -33,6 +56,8 @@ class BaoCaoDanhGiaPipeline:
     high_impact_ratio: float
     avg_original_length: float
     avg_summary_length: float
+    # Độ khớp của mô hình cảm xúc cục bộ với nhãn Gemini (None nếu không đánh giá)
+    sentiment_model_accuracy: float | None = None
 
 
 def _lam_tron(so: float, chu_so: int = 4) -> float:
@@ -85,6 +110,92 @@ def danh_gia_impact_classifier(
     )
 
 
+def so_sanh_impact_classifier(
+    du_doan_cu: list[dict[str, str]],
+    du_doan_moi: list[dict[str, str]],
+    nhan_thuc_te: list[str],
+) -> KetQuaSoSanhImpact:
+    """Đánh giá hai phiên bản classifier impact và chênh lệch accuracy (mới - cũ)."""
+    cu = danh_gia_impact_classifier(du_doan_cu, nhan_thuc_te)
+    moi = danh_gia_impact_classifier(du_doan_moi, nhan_thuc_te)
+    return KetQuaSoSanhImpact(
+        cu=cu, moi=moi, chenh_lech_accuracy=_lam_tron(moi.accuracy - cu.accuracy)
+    )
+
+
+def doc_mau_impact(duong_dan: str | Path) -> list[dict]:
+    """Đọc CSV gán nhãn impact: cột ``tieu_de``, ``noi_dung``, ``ma_ck``, ``impact_level``.
+
+    ``ma_ck`` (tùy chọn) phân tách bằng ``;``, ``|`` hoặc khoảng trắng.
+    """
+    ds_mau: list[dict] = []
+    with open(duong_dan, encoding="utf-8-sig", newline="") as f:
+        reader = csv.DictReader(f)
+        thieu = {"tieu_de", "impact_level"} - set(reader.fieldnames or [])
+        if thieu:
+            raise ValueError(f"CSV thiếu cột: {', '.join(sorted(thieu))}")
+        for dong in reader:
+            nhan = (dong.get("impact_level") or "").strip().upper()
+            if not nhan:
+                continue
+            ds_mau.append(
+                {
+                    "tieu_de": dong.get("tieu_de") or "",
+                    "noi_dung": dong.get("noi_dung") or "",
+                    "ma_ck": [m for m in re.split(r"[;|\s]+", dong.get("ma_ck") or "") if m],
+                    "impact_level": nhan,
+                }
+            )
+    return ds_mau
+
+
+def danh_gia_cam_xuc(
+    du_doan: list[dict],
+    nhan_thuc_te: list[str],
+) -> KetQuaDanhGiaCamXuc:
+    """Đánh giá độ chính xác nhãn cảm xúc.
+
+    Args:
+        du_doan: Danh sách dict kết quả phân tích, cần có key ``nhan``.
+        nhan_thuc_te: Nhãn tham chiếu tương ứng (POSITIVE/NEGATIVE/NEUTRAL).
+    """
+    if len(du_doan) != len(nhan_thuc_te):
+        raise ValueError("Kích thước du_doan và nhan_thuc_te phải bằng nhau")
+
+    labels = ["POSITIVE", "NEGATIVE", "NEUTRAL"]
+    confusion: dict[str, dict[str, int]] = {
+        label: {inner: 0 for inner in labels} for label in labels
+    }
+
+    dung = 0
+    for ket_qua, y_true in zip(du_doan, nhan_thuc_te, strict=False):
+        y_true = str(y_true).upper()
+        y_pred = str(ket_qua.get("nhan", "NEUTRAL")).upper()
+        confusion.setdefault(y_true, {inner: 0 for inner in labels})
+        confusion[y_true][y_pred] = confusion[y_true].get(y_pred, 0) + 1
+        if y_true == y_pred:
+            dung += 1
+
+    tong = len(nhan_thuc_te)
+    return KetQuaDanhGiaCamXuc(
+        so_mau=tong,
+        dung=dung,
+        accuracy=_lam_tron(dung / tong if tong else 0.0),
+        confusion=confusion,
+    )
+
+
+def _do_khop_cam_xuc(
+    ds_bai: list[BaiBao], du_doan_cam_xuc: Callable[[list[str]], list[dict]]
+) -> float | None:
+    # Chỉ so trên bài có nhãn Gemini (nhãn keyword không đủ tin cậy làm chuẩn)
+    co_nhan = [b for b in ds_bai if b.nguon_cam_xuc == "gemini"]
+    if not co_nhan:
+        return None
+    du_doan = du_doan_cam_xuc([f"{b.tieu_de} {b.noi_dung_goc}" for b in co_nhan])
+    return danh_gia_cam_xuc(du_doan, [str(b.nhan_cam_xuc) for b in co_nhan]).accuracy
+
+
 def _dem_phan_bo_sentiment(ds_bai: list[BaiBao]) -> dict[str, int]:
     dem = {"POSITIVE": 0, "NEGATIVE": 0, "NEUTRAL": 0}
     for bai in ds_bai:
@@ -105,8 +216,16 @@ def _dem_phan_bo_impact(ds_bai: list[BaiBao]) -> dict[str, int]:
     return dem
 
 
-def tao_bao_cao_pipeline(ds_bai: list[BaiBao], so_ngay: int) -> BaoCaoDanhGiaPipeline:
-    """Tổng hợp KPI pipeline từ danh sách bài báo đã ingest."""
+def tao_bao_cao_pipeline(
+    ds_bai: list[BaiBao],
+    so_ngay: int,
+    du_doan_cam_xuc: Callable[[list[str]], list[dict]] | None = None,
+) -> BaoCaoDanhGiaPipeline:
+    """Tổng hợp KPI pipeline từ danh sách bài báo đã ingest.
+
+    ``du_doan_cam_xuc`` (vd. ``MoHinhCamXucCucBo.du_doan``) được so với nhãn
+    Gemini trong cửa sổ để điền ``sentiment_model_accuracy``.
+    """
     if so_ngay <= 0:
         raise ValueError("so_ngay phải lớn hơn 0")
 
@@ -172,4 +291,7 @@ def tao_bao_cao_pipeline(ds_bai: list[BaiBao], so_ngay: int) -> BaoCaoDanhGiaPip
         high_impact_ratio=_lam_tron(high_impact / tong),
         avg_original_length=do_dai_goc_tb,
         avg_summary_length=do_dai_tom_tat_tb,
+        sentiment_model_accuracy=(
+            _do_khop_cam_xuc(cua_so, du_doan_cam_xuc) if du_doan_cam_xuc else None
+        ),
     )
@@ -0,0 +1,154 @@
+"""Registry kết nối HTTP dùng chung toàn process (HTTP/2, keep-alive, pool theo host)."""
+
+from __future__ import annotations
+
+import importlib.util
+import logging
+from threading import Lock
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+# Header chung; User-Agent và timeout được truyền theo từng request
+HEADER_MAC_DINH = {
+    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+    "Accept-Language": "vi-VN,vi;q=0.9,en-US;q=0.8,en;q=0.7",
+    "Accept-Encoding": "gzip, deflate",
+}
+
+
+class BoQuanLyKetNoi:
+    """Một pool kết nối cho mọi thành phần: crawlers, ContentFetcher, Telegram.
+
+    TLS handshake và TCP setup chỉ tốn một lần cho mỗi host. Host có cấu hình
+    riêng (``gioi_han_host``) được mount transport với pool giới hạn số kết
+    nối; các host còn lại dùng transport mặc định với giới hạn toàn cục.
+
+    Các thành phần mượn client qua ``lay_client`` và KHÔNG được đóng nó.
+    """
+
+    def __init__(
+        self,
+        so_ket_noi_toi_da: int = 32,
+        keepalive_giay: float = 30.0,
+        http2: bool = True,
+        gioi_han_host: dict[str, int] | None = None,
+        timeout: float = 30.0,
+    ):
+        self._so_ket_noi_toi_da = so_ket_noi_toi_da
+        self._keepalive_giay = keepalive_giay
+        self._http2 = http2 and self._co_ho_tro_http2()
+        self._gioi_han_host = dict(gioi_han_host or {})
+        self._timeout = timeout
+        self._lock = Lock()
+        self._client: httpx.Client | None = None
+
+    @property
+    def http2(self) -> bool:
+        return self._http2
+
+    def lay_client(self) -> httpx.Client:
+        """Lấy client đồng bộ dùng chung (tạo lười, thread-safe)."""
+        if self._client is not None and not self._client.is_closed:
+            return self._client
+
+        with self._lock:
+            if self._client is None or self._client.is_closed:
+                self._client = httpx.Client(
+                    http2=self._http2,
+                    limits=self._tao_limits(self._so_ket_noi_toi_da),
+                    mounts={
+                        f"all://*{host}": httpx.HTTPTransport(
+                            http2=self._http2,
+                            limits=self._tao_limits(so_ket_noi),
+                        )
+                        for host, so_ket_noi in self._gioi_han_host.items()
+                    },
+                    timeout=self._timeout,
+                    follow_redirects=True,
+                    headers=HEADER_MAC_DINH,
+                )
+                logger.info(
+                    f"Khởi tạo HTTP pool dùng chung (http2={self._http2}, "
+                    f"{len(self._gioi_han_host)} host có pool riêng)"
+                )
+        return self._client
+
+    def tao_async_client(
+        self,
+        so_ket_noi_toi_da: int | None = None,
+        transport: httpx.AsyncBaseTransport | None = None,
+    ) -> httpx.AsyncClient:
+        """Tạo AsyncClient cùng cấu hình pool.
+
+        AsyncClient gắn với một event loop nên bên gọi sở hữu và đóng nó
+        (thường là một client cho mỗi chu kỳ thu thập đồng thời).
+        """
+        so_ket_noi_toi_da = so_ket_noi_toi_da or self._so_ket_noi_toi_da
+        mounts = None
+        if transport is None:
+            mounts = {
+                f"all://*{host}": httpx.AsyncHTTPTransport(
+                    http2=self._http2,
+                    limits=self._tao_limits(min(so_ket_noi, so_ket_noi_toi_da)),
+                )
+                for host, so_ket_noi in self._gioi_han_host.items()
+            }
+        return httpx.AsyncClient(
+            http2=self._http2,
+            limits=self._tao_limits(so_ket_noi_toi_da),
+            transport=transport,
+            mounts=mounts,
+            timeout=self._timeout,
+            follow_redirects=True,
+            headers=HEADER_MAC_DINH,
+        )
+
+    def dong(self) -> None:
+        """Đóng client dùng chung (chỉ gọi khi tắt process)."""
+        with self._lock:
+            if self._client is not None and not self._client.is_closed:
+                self._client.close()
+            self._client = None
+
+    def _tao_limits(self, so_ket_noi: int) -> httpx.Limits:
+        return httpx.Limits(
+            max_connections=so_ket_noi,
+            max_keepalive_connections=so_ket_noi,
+            keepalive_expiry=self._keepalive_giay,
+        )
+
+    @staticmethod
+    def _co_ho_tro_http2() -> bool:
+        """HTTP/2 của httpx cần gói ``h2`` (extra ``httpx[http2]``)."""
+        if importlib.util.find_spec("h2") is None:
+            logger.warning("Chưa cài gói h2 (httpx[http2]), dùng HTTP/1.1 keep-alive")
+            return False
+        return True
+
+
+_bo_ket_noi: BoQuanLyKetNoi | None = None
+_lock_bo_ket_noi = Lock()
+
+
+def lay_bo_ket_noi() -> BoQuanLyKetNoi:
+    """Lấy registry kết nối HTTP dùng chung (singleton) theo cấu hình crawler."""
+    global _bo_ket_noi
+    if _bo_ket_noi is None:
+        with _lock_bo_ket_noi:
+            if _bo_ket_noi is None:
+                from config.settings import lay_cau_hinh_crawler
+
+                cau_hinh = lay_cau_hinh_crawler()
+                _bo_ket_noi = BoQuanLyKetNoi(
+                    so_ket_noi_toi_da=cau_hinh.so_ket_noi_toi_da,
+                    keepalive_giay=cau_hinh.keepalive_giay,
+                    http2=cau_hinh.http2,
+                    gioi_han_host={
+                        host: cau_hinh.so_ket_noi_moi_host
+                        for host in cau_hinh.gioi_han_toc_host
+                    },
+                    timeout=cau_hinh.timeout_giay,
+                )
+    return _bo_ket_noi
@@ -0,0 +1,151 @@
+"""Giới hạn tốc độ request theo host bằng token bucket dùng chung trong process."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
+from threading import Lock
+from urllib.parse import urlsplit
+
+from news_ingestor.utils.metrics import lay_metrics
+
+logger = logging.getLogger(__name__)
+metrics = lay_metrics()
+
+
+@dataclass
+class _XoToken:
+    """Trạng thái token bucket của một host."""
+
+    toc_do: float  # token nạp lại mỗi giây (request/giây)
+    dung_luong: float  # burst tối đa
+    so_token: float
+    cap_nhat_luc: float
+
+
+class BoGioiHanToc:
+    """Token bucket theo host, dùng chung giữa crawlers và ContentFetcher.
+
+    Mỗi lần gọi ``cho`` sẽ đặt trước một token của host tương ứng và chỉ chờ
+    khi host đó đã hết token. Request tới host khác không bị chặn, nên
+    tiến trình không đứng yên giữa các nguồn tin.
+
+    Host được cấu hình khớp cả subdomain (``cafef.vn`` áp dụng cho
+    ``s.cafef.vn``). Host chưa cấu hình dùng ``khoang_cach_mac_dinh`` của
+    bên gọi (giây giữa hai request), hoặc tốc độ mặc định của bộ giới hạn.
+    Bucket dự phòng được tách theo (host, khoảng cách): bên gọi nào cũng giữ
+    đúng nhịp của mình, không phụ thuộc ai gọi host đó trước.
+    """
+
+    def __init__(
+        self,
+        cau_hinh_host: dict[str, dict[str, float]] | None = None,
+        toc_do_mac_dinh: float = 1.0,
+        burst_mac_dinh: float = 1.0,
+        dong_ho: Callable[[], float] = time.monotonic,
+    ):
+        self._lock = Lock()
+        self._dong_ho = dong_ho
+        self._toc_do_mac_dinh = toc_do_mac_dinh
+        self._burst_mac_dinh = burst_mac_dinh
+        self._cau_hinh: dict[str, tuple[float, float]] = {}
+        self._xo: dict[str, _XoToken] = {}
+
+        for host, cfg in (cau_hinh_host or {}).items():
+            self.cau_hinh_host(
+                host,
+                toc_do=cfg.get("toc_do", toc_do_mac_dinh),
+                burst=cfg.get("burst", burst_mac_dinh),
+            )
+
+    def cau_hinh_host(self, host: str, toc_do: float, burst: float = 1.0) -> None:
+        """Đặt tốc độ (request/giây) và burst cho một host."""
+        if toc_do <= 0 or burst < 1:
+            raise ValueError("toc_do phải > 0 và burst phải >= 1")
+        host = self._chuan_hoa_host(host)
+        with self._lock:
+            self._cau_hinh[host] = (toc_do, burst)
+            self._xo.pop(host, None)
+
+    def cho(self, url: str, khoang_cach_mac_dinh: float | None = None) -> float:
+        """Chờ (blocking) tới khi host của ``url`` còn token. Trả về số giây đã chờ."""
+        thoi_gian_cho = self._dat_truoc(url, khoang_cach_mac_dinh)
+        if thoi_gian_cho > 0:
+            time.sleep(thoi_gian_cho)
+        return thoi_gian_cho
+
+    async def cho_async(self, url: str, khoang_cach_mac_dinh: float | None = None) -> float:
+        """Phiên bản bất đồng bộ của ``cho``."""
+        thoi_gian_cho = self._dat_truoc(url, khoang_cach_mac_dinh)
+        if thoi_gian_cho > 0:
+            await asyncio.sleep(thoi_gian_cho)
+        return thoi_gian_cho
+
+    def _dat_truoc(self, url: str, khoang_cach_mac_dinh: float | None) -> float:
+        """Lấy một token (có thể âm = xếp hàng) và tính thời gian cần chờ."""
+        khoa, toc_do, dung_luong = self._tim_cau_hinh(url, khoang_cach_mac_dinh)
+        if toc_do is None:
+            return 0.0
+
+        with self._lock:
+            bay_gio = self._dong_ho()
+            xo = self._xo.get(khoa)
+            if xo is None:
+                xo = _XoToken(toc_do, dung_luong, dung_luong, bay_gio)
+                self._xo[khoa] = xo
+
+            xo.so_token = min(
+                xo.dung_luong,
+                xo.so_token + (bay_gio - xo.cap_nhat_luc) * xo.toc_do,
+            )
+            xo.cap_nhat_luc = bay_gio
+            xo.so_token -= 1
+            thoi_gian_cho = -xo.so_token / xo.toc_do if xo.so_token < 0 else 0.0
+
+        if thoi_gian_cho > 0:
+            metrics.tang("rate_limit_waits")
+            metrics.tang("rate_limit_wait_ms", int(thoi_gian_cho * 1000))
+            logger.debug(f"Rate limit {khoa}: chờ {thoi_gian_cho:.2f}s")
+        return thoi_gian_cho
+
+    def _tim_cau_hinh(
+        self, url: str, khoang_cach_mac_dinh: float | None
+    ) -> tuple[str, float | None, float]:
+        """Tìm khóa bucket và cấu hình áp dụng cho URL."""
+        host = self._chuan_hoa_host(url)
+        for khoa, (toc_do, burst) in self._cau_hinh.items():
+            if host == khoa or host.endswith(f".{khoa}"):
+                return khoa, toc_do, burst
+
+        if khoang_cach_mac_dinh is not None:
+            if khoang_cach_mac_dinh <= 0:
+                return host, None, 1.0
+            return f"{host}|{khoang_cach_mac_dinh:g}s", 1.0 / khoang_cach_mac_dinh, 1.0
+        return host, self._toc_do_mac_dinh, self._burst_mac_dinh
+
+    @staticmethod
+    def _chuan_hoa_host(url_hoac_host: str) -> str:
+        """Trích host chữ thường, bỏ ``www.`` và cổng."""
+        if "://" in url_hoac_host:
+            host = urlsplit(url_hoac_host).hostname or ""
+        else:
+            host = url_hoac_host.split(":", 1)[0]
+        host = host.lower()
+        return host[4:] if host.startswith("www.") else host
+
+
+_bo_gioi_han: BoGioiHanToc | None = None
+
+
+def lay_bo_gioi_han_toc() -> BoGioiHanToc:
+    """Lấy bộ giới hạn tốc độ dùng chung (singleton) theo cấu hình crawler."""
+    global _bo_gioi_han
+    if _bo_gioi_han is None:
+        from config.settings import lay_cau_hinh_crawler
+
+        cau_hinh = lay_cau_hinh_crawler()
+        _bo_gioi_han = BoGioiHanToc(cau_hinh_host=cau_hinh.gioi_han_toc_host)
+    return _bo_gioi_han
@@ -5,13 +5,83 @@ from __future__ import annotations
 import hashlib
 import re
 import unicodedata
+from dataclasses import dataclass, field
 from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
 
+# Dấu tiếng Việt sau NFKD: huyền, sắc, ngã, hỏi, nặng, mũ, trăng, móc
+_DAU_TIENG_VIET = ("\u0300", "\u0301", "\u0303", "\u0309", "\u0323", "\u0302", "\u0306", "\u031b")
+_PHI_ASCII = re.compile(r"[^\x00-\x7f]")
+
 
 def bo_dau(text: str) -> str:
-    """Loại bỏ dấu tiếng Việt để so sánh không phân biệt dấu."""
-    normalized = unicodedata.normalize("NFKD", text)
-    return "".join(ch for ch in normalized if not unicodedata.combining(ch))
+    """Loại bỏ dấu tiếng Việt (kể cả đ → d) để so sánh không phân biệt dấu.
+
+    Tương đương NFKD + bỏ mọi ký tự tổ hợp, nhưng xóa dấu bằng ``str.replace``
+    theo từng loại dấu thay vì duyệt từng ký tự bằng Python.
+    """
+    if text.isascii():
+        return text
+
+    chuan = unicodedata.normalize("NFKD", text)
+    for dau in _DAU_TIENG_VIET:
+        if dau in chuan:
+            chuan = chuan.replace(dau, "")
+    if "đ" in chuan:
+        chuan = chuan.replace("đ", "d")
+    if "Đ" in chuan:
+        chuan = chuan.replace("Đ", "D")
+    if chuan.isascii():
+        return chuan
+
+    # Còn ký tự ngoài ASCII (ngoặc kép, gạch ngang...): xóa dấu tổ hợp khác nếu có
+    for ky_tu in set(_PHI_ASCII.findall(chuan)):
+        if unicodedata.combining(ky_tu):
+            chuan = chuan.replace(ky_tu, "")
+    return chuan
+
+
+_MAU_TU = re.compile(r"\w+")
+
+
+def tach_tu(text: str) -> list[str]:
+    """Tách văn bản thành các từ (chuỗi ký tự chữ/số liên tiếp)."""
+    return _MAU_TU.findall(text)
+
+
+@dataclass(frozen=True)
+class VanBanChuanHoa:
+    """Văn bản đã chuẩn hóa sẵn, tính một lần và dùng chung cho mọi bước NLP.
+
+    - ``goc``: văn bản gốc
+    - ``thuong``: chữ thường
+    - ``khong_dau``: chữ thường đã bỏ dấu
+    - ``tokens``: các từ của ``khong_dau``
+    - ``bo_nho``: kết quả trung gian các bước NLP lưu lại để dùng chung
+    """
+
+    goc: str
+    thuong: str
+    khong_dau: str
+    tokens: tuple[str, ...]
+    bo_nho: dict = field(default_factory=dict, compare=False, repr=False)
+
+    @classmethod
+    def tu_van_ban(cls, text: str) -> VanBanChuanHoa:
+        thuong = (text or "").lower()
+        khong_dau = bo_dau(thuong)
+        return cls(
+            goc=text or "",
+            thuong=thuong,
+            khong_dau=khong_dau,
+            tokens=tuple(tach_tu(khong_dau)),
+        )
+
+
+def chuan_hoa_van_ban(text: str | VanBanChuanHoa) -> VanBanChuanHoa:
+    """Trả về ``VanBanChuanHoa``; giữ nguyên nếu đã chuẩn hóa."""
+    if isinstance(text, VanBanChuanHoa):
+        return text
+    return VanBanChuanHoa.tu_van_ban(text)
 
 
 def chuan_hoa_khoang_trang(text: str) -> str:
@@ -12,6 +12,7 @@ from news_ingestor.models.article import BaiBaoTho
 from news_ingestor.processing.pipeline import LuongXuLy
 from news_ingestor.storage.database import lay_quan_ly_db
 from news_ingestor.storage.repository import KhoTinTuc
+from news_ingestor.storage.vector_store import KhoVector
 
 
 @pytest.fixture
@@ -91,3 +92,154 @@ class TestLuongXuLy:
         ket_qua = pipeline.xu_ly_hang_loat(danh_sach)
         assert len(ket_qua) == 5
         assert all(b.impact_level in {"LOW", "MEDIUM", "HIGH"} for b in ket_qua)
+
+    def test_bo_qua_bai_da_luu_truoc_nlp(self, pipeline: LuongXuLy):
+        danh_sach = [
+            BaiBaoTho(
+                tieu_de=f"CafeF - Tin đã lưu số {i}",
+                noi_dung=f"Nội dung bài {i}",
+                url=f"https://test.com/da-luu-{i}?utm_source=rss",
+                nguon_tin="Test",
+                thoi_gian_xuat_ban=datetime.now(tz=timezone.utc),
+            )
+            for i in range(3)
+        ]
+        assert len(pipeline.xu_ly_hang_loat(danh_sach)) == 3
+
+        # Chu kỳ sau: cùng bài (URL khác query tracking) + một bài mới
+        danh_sach_moi = [
+            bai.model_copy(update={"url": bai.url.split("?")[0]}) for bai in danh_sach
+        ]
+        danh_sach_moi.append(
+            BaiBaoTho(
+                tieu_de="Tin hoàn toàn mới",
+                url="https://test.com/tin-moi",
+                nguon_tin="Test",
+                thoi_gian_xuat_ban=datetime.now(tz=timezone.utc),
+            )
+        )
+
+        assert [b.tieu_de for b in pipeline.loc_bai_da_luu(danh_sach_moi)] == [
+            "Tin hoàn toàn mới"
+        ]
+
+    def test_che_do_lo_giong_tung_bai(self, pipeline: LuongXuLy):
+        class EmbeddingGia:
+            che_do_doan = "truncate"
+
+            def __init__(self):
+                self.so_lan_goi = 0
+
+            def tao_nhieu_embedding(self, ds_text: list[str]) -> list[list[float]]:
+                self.so_lan_goi += 1
+                return [[float(len(t)), 1.0] for t in ds_text]
+
+        danh_sach = [
+            BaiBaoTho(
+                tieu_de=f"VNM lãi kỷ lục, cổ phiếu tăng mạnh lần {i}",
+                noi_dung="Vinamilk công bố lợi nhuận tăng trưởng",
+                url=f"https://test.com/vnm-lo-{i}",
+                nguon_tin="Test",
+                thoi_gian_xuat_ban=datetime.now(tz=timezone.utc),
+            )
+            for i in range(4)
+        ]
+        pipeline._fetch_content = False
+        tung_bai = [pipeline.phan_tich_bai(b, "")[0] for b in danh_sach]
+
+        embedding = EmbeddingGia()
+        pipeline._che_do_lo = True
+        pipeline._tao_embedding = True
+        pipeline._embeddings = embedding
+        pipeline._kho_vector = KhoVector()
+
+        theo_lo = pipeline.xu_ly_hang_loat(danh_sach)
+
+        assert embedding.so_lan_goi == 1
+        assert pipeline._kho_vector.dem_vectors() == 4
+        assert all(b.vector_id for b in theo_lo)
+        assert [
+            (b.tieu_de, b.diem_cam_xuc, b.ma_chung_khoan_lien_quan, b.impact_score)
+            for b in theo_lo
+        ] == [
+            (b.tieu_de, b.diem_cam_xuc, b.ma_chung_khoan_lien_quan, b.impact_score)
+            for b in tung_bai
+        ]
+        assert pipeline._kho_tin_tuc.dem_bai_bao() == 4
+
+    def test_loi_cham_diem_lo_phan_tich_lai_tung_bai(self, pipeline: LuongXuLy, monkeypatch):
+        danh_sach = [
+            BaiBaoTho(
+                tieu_de=tieu_de,
+                noi_dung="Vinamilk công bố lợi nhuận tăng trưởng",
+                url=f"https://test.com/cham-diem-{i}",
+                nguon_tin="Test",
+                thoi_gian_xuat_ban=datetime.now(tz=timezone.utc),
+            )
+            for i, tieu_de in enumerate(["VNM lãi kỷ lục", "Bài gây lỗi", "FPT tăng trưởng"])
+        ]
+
+        def phan_tich_nhieu_loi(ds_van_ban):
+            # Một bài hỏng làm lỗi cả lần gọi chứa nó
+            if any("gay loi" in v.khong_dau for v in ds_van_ban):
+                raise RuntimeError("cảm xúc lỗi")
+            return phan_tich_nhieu_goc(ds_van_ban)
+
+        phan_tich_nhieu_goc = pipeline._cam_xuc.phan_tich_nhieu
+        monkeypatch.setattr(pipeline._cam_xuc, "phan_tich_nhieu", phan_tich_nhieu_loi)
+        pipeline._fetch_content = False
+        pipeline._che_do_lo = True
+
+        ket_qua = pipeline.xu_ly_hang_loat(danh_sach)
+
+        # Chỉ bài lỗi bị bỏ, không mất cả lô
+        assert [b.tieu_de for b in ket_qua] == ["VNM lãi kỷ lục", "FPT tăng trưởng"]
+        assert pipeline._kho_tin_tuc.dem_bai_bao() == 2
+
+    def test_ghi_lo_chi_tra_ve_bai_da_luu(self, pipeline: LuongXuLy, monkeypatch):
+        class EmbeddingGia:
+            che_do_doan = "truncate"
+
+            def tao_nhieu_embedding(self, ds_text: list[str]) -> list[list[float]]:
+                return [[1.0, 0.0] for _ in ds_text]
+
+        danh_sach = [
+            BaiBaoTho(
+                tieu_de=f"HPG mở rộng nhà máy thép lần {i}",
+                url=f"https://test.com/hpg-ghi-lo-{i}",
+                nguon_tin="Test",
+                thoi_gian_xuat_ban=datetime.now(tz=timezone.utc),
+            )
+            for i in range(3)
+        ]
+        ds_bai = [pipeline.phan_tich_bai(b, "")[0] for b in danh_sach]
+        # Bài 0 đã được lưu từ trước
+        pipeline._kho_tin_tuc.luu_bai_bao(ds_bai[0])
+        pipeline._tao_embedding = True
+        pipeline._embeddings = EmbeddingGia()
+        pipeline._kho_vector = KhoVector()
+        da_canh_bao = []
+        monkeypatch.setattr(pipeline, "_gui_canh_bao", da_canh_bao.append)
+
+        da_luu, _ = pipeline.ghi_lo(ds_bai, ["a", "b", "c"])
+
+        assert da_luu == ds_bai[1:] and da_canh_bao == ds_bai[1:]
+        assert pipeline._kho_vector.dem_vectors() == 2
+
+    def test_ghi_lo_loi_db_khong_nem(self, pipeline: LuongXuLy, monkeypatch):
+        bai_tho = BaiBaoTho(
+            tieu_de="MWG đóng cửa hàng",
+            url="https://test.com/mwg-loi-db",
+            nguon_tin="Test",
+            thoi_gian_xuat_ban=datetime.now(tz=timezone.utc),
+        )
+        bai_bao = pipeline.phan_tich_bai(bai_tho, "")[0]
+
+        def loi(_):
+            raise RuntimeError("DB mất kết nối")
+
+        monkeypatch.setattr(pipeline._kho_tin_tuc, "them_nhieu_bai_bao", loi)
+        assert pipeline.ghi_lo([bai_bao], ["x"])[0] == []
+
+        monkeypatch.setattr(pipeline._kho_tin_tuc, "loc_bai_moi", loi)
+        assert pipeline.ghi_lo([bai_bao], ["x"])[0] == []
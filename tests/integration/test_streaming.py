@@ -0,0 +1,96 @@
+"""Integration test cho pipeline dạng luồng."""
+
+from __future__ import annotations
+
+import os
+import uuid
+from datetime import datetime, timezone
+
+import httpx
+import pytest
+
+from news_ingestor.crawlers.base import BaseCrawler
+from news_ingestor.crawlers.scheduler import BoLichThuThap
+from news_ingestor.models.article import BaiBaoTho
+from news_ingestor.processing.pipeline import LuongXuLy
+from news_ingestor.processing.streaming import LuongXuLyDongChay
+from news_ingestor.storage.database import lay_quan_ly_db
+from news_ingestor.storage.repository import KhoTinTuc
+
+
+class CrawlerMau(BaseCrawler):
+    """Crawler giả: mỗi dòng text của trang là một tiêu đề."""
+
+    def __init__(self, ten: str, danh_sach_url: list[str]):
+        super().__init__(ten_nguon=ten, so_lan_thu_lai=1, do_tre_giua_request=0.0)
+        self._danh_sach_url = danh_sach_url
+        self._client = httpx.Client(
+            transport=httpx.MockTransport(
+                lambda req: httpx.Response(
+                    200, text=f"FPT lãi lớn {req.url.path}\nTin chung thị trường"
+                )
+            )
+        )
+
+    def danh_sach_trang(self) -> list[dict]:
+        return [{"ten": url, "url": url} for url in self._danh_sach_url]
+
+    def phan_tich_trang(self, noi_dung: str, trang: dict) -> list[BaiBaoTho]:
+        return [
+            BaiBaoTho(
+                tieu_de=dong,
+                noi_dung="Lợi nhuận tăng trưởng mạnh",
+                url=f"{trang['url']}/{i}",
+                nguon_tin=self.ten_nguon,
+                thoi_gian_xuat_ban=datetime.now(tz=timezone.utc),
+            )
+            for i, dong in enumerate(noi_dung.splitlines())
+        ]
+
+    def thu_thap(self) -> list[BaiBaoTho]:
+        return []
+
+
+@pytest.fixture
+def pipeline() -> LuongXuLy:
+    import news_ingestor.storage.database as db_module
+    db_module._quan_ly = None
+
+    db_name = f"test_stream_{uuid.uuid4().hex[:8]}.db"
+    db_url = f"sqlite:///./data/{db_name}"
+    db = lay_quan_ly_db(db_url)
+    db.khoi_tao_bang()
+
+    yield LuongXuLy(
+        kho_tin_tuc=KhoTinTuc(db_url),
+        kho_vector=None,
+        tao_embedding=False,
+        fetch_content=False,
+    )
+
+    db.dong_ket_noi()
+    db_module._quan_ly = None
+    try:
+        os.remove(f"./data/{db_name}")
+    except Exception:
+        pass
+
+
+class TestLuongXuLyDongChay:
+    def test_chu_ky_dong_chay_dedup_va_luu(self, pipeline: LuongXuLy):
+        dong_chay = LuongXuLyDongChay(
+            pipeline, so_worker_fetch=2, kich_thuoc_hang_doi=2, kich_thuoc_lo_ghi=3
+        )
+        scheduler = BoLichThuThap()
+        scheduler.dang_ky_crawler(CrawlerMau("A", [f"https://a.vn/m{i}" for i in range(3)]))
+        scheduler.dang_ky_crawler(CrawlerMau("B", ["https://b.vn/m9"]))
+        scheduler.dat_dong_chay(dong_chay)
+
+        ket_qua = scheduler.chay_mot_lan()
+
+        # 4 trang x 2 dòng, "Tin chung thị trường" trùng tiêu đề → chỉ giữ 1
+        assert len(ket_qua) == 5
+        assert pipeline._kho_tin_tuc.dem_bai_bao() == 5
+
+        # Chu kỳ sau: mọi bài đã có trong DB → không đưa vào pipeline
+        assert scheduler.chay_mot_lan() == []
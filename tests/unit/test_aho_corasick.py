@@ -0,0 +1,38 @@
+"""Unit tests cho automaton Aho-Corasick trên token."""
+
+from __future__ import annotations
+
+import pickle
+
+from news_ingestor.utils.aho_corasick import BoKhopDaMau
+
+
+def _tao_bo_khop() -> BoKhopDaMau:
+    bo = BoKhopDaMau()
+    bo.them(["hoa", "phat"], "HPG")
+    bo.them(["tap", "doan", "hoa", "phat"], "HPG")
+    bo.them(["phat", "trien"], "BID")
+    bo.them(["ngan", "hang"], "NGAN_HANG")
+    bo.them(["hang"], "HANG")
+    return bo.bien_dich()
+
+
+class TestBoKhopDaMau:
+    def test_tim_nhieu_mau_mot_lan(self):
+        bo = _tao_bo_khop()
+        tokens = "tap doan hoa phat va ngan hang dau tu phat trien".split()
+        assert bo.tim(tokens) == {"HPG", "NGAN_HANG", "HANG", "BID"}
+
+    def test_mau_chong_nhau_qua_lien_ket_that_bai(self):
+        bo = _tao_bo_khop()
+        # "hoa phat trien": sau khi khớp "hoa phat" phải chuyển sang "phat trien"
+        assert bo.tim("hoa phat trien".split()) == {"HPG", "BID"}
+
+    def test_ton_trong_ranh_gioi_tu(self):
+        bo = _tao_bo_khop()
+        assert bo.tim(["hoaphat", "phatt"]) == set()
+        assert bo.tim(["hoa", "xyz", "phat"]) == set()
+
+    def test_pickle_giu_nguyen_ket_qua(self):
+        bo = pickle.loads(pickle.dumps(_tao_bo_khop()))
+        assert bo.tim("ngan hang hoa phat".split()) == {"NGAN_HANG", "HANG", "HPG"}
@@ -0,0 +1,100 @@
+"""Unit tests cho engine thu thập đồng thời."""
+
+from __future__ import annotations
+
+import asyncio
+from datetime import datetime, timezone
+
+import httpx
+
+from news_ingestor.crawlers.async_engine import BoThuThapDongThoi
+from news_ingestor.crawlers.base import BaseCrawler
+from news_ingestor.crawlers.scheduler import BoLichThuThap
+from news_ingestor.models.article import BaiBaoTho
+
+
+class CrawlerMau(BaseCrawler):
+    """Crawler giả: mỗi trang trả về một dòng tiêu đề trên mỗi dòng text."""
+
+    def __init__(self, ten: str, danh_sach_url: list[str]):
+        super().__init__(ten_nguon=ten, so_lan_thu_lai=1, do_tre_giua_request=0.0)
+        self._danh_sach_url = danh_sach_url
+
+    def danh_sach_trang(self) -> list[dict]:
+        return [{"ten": url, "url": url} for url in self._danh_sach_url]
+
+    def phan_tich_trang(self, noi_dung: str, trang: dict) -> list[BaiBaoTho]:
+        return [
+            BaiBaoTho(
+                tieu_de=dong,
+                url=f"{trang['url']}/{i}",
+                nguon_tin=self.ten_nguon,
+                thoi_gian_xuat_ban=datetime(2026, 1, 1, tzinfo=timezone.utc),
+            )
+            for i, dong in enumerate(noi_dung.splitlines())
+        ]
+
+    def thu_thap(self) -> list[BaiBaoTho]:
+        return []
+
+
+def _tao_transport(dang_chay: dict[str, int], cao_nhat: dict[str, int]):
+    async def xu_ly(request: httpx.Request) -> httpx.Response:
+        host = request.url.host
+        dang_chay[host] = dang_chay.get(host, 0) + 1
+        cao_nhat[host] = max(cao_nhat.get(host, 0), dang_chay[host])
+        await asyncio.sleep(0.01)
+        dang_chay[host] -= 1
+        return httpx.Response(200, text=f"Tin {request.url.path} a\nTin {request.url.path} b")
+
+    return httpx.MockTransport(xu_ly)
+
+
+class TestBoThuThapDongThoi:
+    def test_giu_thu_tu_va_gioi_han_theo_host(self):
+        dang_chay: dict[str, int] = {}
+        cao_nhat: dict[str, int] = {}
+        engine = BoThuThapDongThoi(
+            so_ket_noi_toi_da=8,
+            so_ket_noi_moi_host=2,
+            transport=_tao_transport(dang_chay, cao_nhat),
+        )
+        crawlers = [
+            CrawlerMau("A", [f"https://a.vn/muc-{i}" for i in range(5)]),
+            CrawlerMau("B", [f"https://b.vn/muc-{i}" for i in range(3)]),
+        ]
+
+        ket_qua = engine.thu_thap(crawlers)
+
+        assert [len(ds) for ds in ket_qua] == [10, 6]
+        assert ket_qua[0][0].tieu_de == "Tin /muc-0 a"
+        assert ket_qua[0][-1].tieu_de == "Tin /muc-4 b"
+        assert cao_nhat["a.vn"] <= 2
+        assert cao_nhat["b.vn"] <= 2
+
+    def test_trang_loi_khong_anh_huong_trang_khac(self):
+        def xu_ly(request: httpx.Request) -> httpx.Response:
+            if request.url.path == "/hong":
+                return httpx.Response(500)
+            return httpx.Response(200, text="Tin tốt")
+
+        engine = BoThuThapDongThoi(transport=httpx.MockTransport(xu_ly))
+        crawler = CrawlerMau("A", ["https://a.vn/hong", "https://a.vn/tot"])
+
+        ket_qua = engine.thu_thap([crawler])
+
+        assert [b.tieu_de for b in ket_qua[0]] == ["Tin tốt"]
+
+    def test_scheduler_dong_thoi_dedup(self):
+        engine = BoThuThapDongThoi(
+            transport=httpx.MockTransport(lambda _req: httpx.Response(200, text="Tin trùng"))
+        )
+        scheduler = BoLichThuThap(bo_dong_thoi=engine)
+        scheduler.dang_ky_crawler(CrawlerMau("A", ["https://a.vn/1"]))
+        scheduler.dang_ky_crawler(CrawlerMau("B", ["https://b.vn/1"]))
+
+        ket_qua = scheduler.chay_mot_lan()
+
+        # Cùng tiêu đề → bị loại như chế độ tuần tự
+        assert len(ket_qua) == 1
+        assert ket_qua[0].nguon_tin == "A"
@@ -2,7 +2,10 @@
 
 from __future__ import annotations
 
-from news_ingestor.processing.cleaner import BoLamSach
+import random
+import re
+
+from news_ingestor.processing.cleaner import MAU_QUANG_CAO, BoLamSach
 
 
 class TestBoLamSach:
@@ -52,3 +55,41 @@ class TestBoLamSach:
         text = "A" * 600 + ". Phần dư."
         ket_qua = self.lam_sach.tom_tat(text, do_dai=500)
         assert len(ket_qua) <= 510  # Sai số nhỏ do cắt tại dấu chấm
+
+    def test_giai_ma_entity(self):
+        ket_qua = self.lam_sach.lam_sach("<p>FPT &amp; VIC&nbsp;t&#259;ng &#x1ea1;nh &foo;</p>")
+        assert ket_qua == "FPT & VIC tăng ạnh"
+
+    def test_quang_cao_gop_giong_tung_mau(self):
+        """Regex gộp cho cùng kết quả với chạy lần lượt từng mẫu, khi cả hai
+        cùng lặp đến lúc không còn gì để xóa (xóa một mẫu có thể tạo ra khớp mới)."""
+
+        def loai_tung_mau(text: str) -> str:
+            while True:
+                moi = text
+                for mau in MAU_QUANG_CAO:
+                    moi = re.sub(mau, "", moi)
+                if moi == text:
+                    return text
+                text = moi
+
+        assert self.lam_sach._loai_quang_cao("Giá quảng xem thêm: http://x cáo tăng") == (
+            "Giá  tăng"
+        )
+        manh = [
+            "FPT lãi lớn.", "Xem thêm: https://cafef.vn/a.chn", "Nguồn http://x.vn",
+            "Theo dõi chúng tôi trên Twitter", "Facebook", "YOUTUBE",
+            "Đăng ký để nhận tin mới", "Bạn đọc gửi bài", "QUẢNG CÁO", "banner 300x250",
+            "click here", "Click vào đây", "Tải app về máy xuống", "[Tag] [Khác]",
+            "VN-Index tăng 10 điểm", "[cafef]", "quảng", "cáo", "click",
+        ]
+        rng = random.Random(3)
+        for _ in range(500):
+            text = " ".join(rng.choices(manh, k=rng.randint(1, 8)))
+            assert self.lam_sach._loai_quang_cao(text) == loai_tung_mau(text)
+
+    def test_tom_tat_van_ban_da_lam_sach(self):
+        text = "Giá &lt;b&gt; tăng."
+        da_lam_sach = self.lam_sach.lam_sach(text)
+        assert da_lam_sach == "Giá <b> tăng."
+        assert self.lam_sach.tom_tat(da_lam_sach, da_lam_sach=True) == da_lam_sach
@@ -132,3 +132,26 @@ def test_evaluate_text(monkeypatch):
 
     assert result.exit_code == 0
     assert "Evaluation summary" in result.output
+
+
+def test_evaluate_impact_labels(monkeypatch, tmp_path):
+    runner = CliRunner()
+    duong_dan = tmp_path / "impact.csv"
+    duong_dan.write_text(
+        "tieu_de,noi_dung,ma_ck,impact_level\n"
+        "Giá thuê văn phòng tăng,Quỹ confederation mua cổ phần,,LOW\n"
+        "NHNN tăng lãi suất điều hành,Tỷ giá biến động,VCB;BID,HIGH\n",
+        encoding="utf-8",
+    )
+
+    repo_mock = Mock()
+    repo_mock.lay_tat_ca.return_value = []
+    monkeypatch.setattr("news_ingestor.storage.database.lay_quan_ly_db", lambda: Mock())
+    monkeypatch.setattr("news_ingestor.storage.repository.KhoTinTuc", lambda: repo_mock)
+
+    result = runner.invoke(
+        cli, ["evaluate", "--json-output", "--impact-labels", str(duong_dan)]
+    )
+
+    assert result.exit_code == 0
+    assert '"chenh_lech_accuracy": 0.5' in result.output
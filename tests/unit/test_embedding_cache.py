@@ -0,0 +1,97 @@
+"""Unit tests cho cache embedding memory-mapped."""
+
+from __future__ import annotations
+
+import numpy as np
+import pytest
+
+import news_ingestor.storage.embedding_cache as embedding_cache
+from config.settings import lay_cau_hinh_nlp
+from news_ingestor.processing.embeddings import BoTaoEmbeddings
+from news_ingestor.storage.embedding_cache import BoNhoDemEmbedding
+from news_ingestor.utils.metrics import lay_metrics
+
+
+def _dem(ten: str) -> int:
+    return lay_metrics().snapshot()["counters"].get(ten, 0)
+
+
+def _vector(n: int, d: int = 8, seed: int = 0) -> np.ndarray:
+    return np.random.default_rng(seed).standard_normal((n, d)).astype(np.float32)
+
+
+class TestBoNhoDemEmbedding:
+    def test_luu_va_tra_cuu(self, tmp_path):
+        cache = BoNhoDemEmbedding(tmp_path, "torch:mini", kich_thuoc=8)
+        ma_tran = _vector(3)
+        assert cache.luu_nhieu(["a", "b", "c"], ma_tran) == 3
+
+        truoc = _dem("embedding_cache_hits")
+        ket_qua = cache.lay_nhieu(["b", "x", "a"])
+        assert ket_qua[1] is None
+        np.testing.assert_array_equal(ket_qua[0], ma_tran[1])
+        np.testing.assert_array_equal(ket_qua[2], ma_tran[0])
+        assert _dem("embedding_cache_hits") == truoc + 2
+
+    def test_view_chi_doc_khong_chep(self, tmp_path):
+        cache = BoNhoDemEmbedding(tmp_path, "torch:mini", kich_thuoc=8)
+        cache.luu_nhieu(["a"], _vector(1))
+        view = cache.lay_nhieu(["a"])[0]
+        assert isinstance(view.base, np.memmap) or isinstance(view, np.memmap)
+        with pytest.raises(ValueError):
+            view[0] = 1.0
+
+    def test_khoa_chuan_hoa_khoang_trang(self, tmp_path):
+        cache = BoNhoDemEmbedding(tmp_path, "torch:mini", kich_thuoc=8)
+        cache.luu_nhieu(["Lãi  suất\ntăng"], _vector(1))
+        assert cache.lay_nhieu([" Lãi suất tăng "])[0] is not None
+        # Không ghi trùng
+        assert cache.luu_nhieu(["Lãi suất tăng"], _vector(1)) == 0
+
+    def test_mo_lai_va_noi_file(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(embedding_cache, "SO_HANG_MOI_KHOI", 4)
+        cache = BoNhoDemEmbedding(tmp_path, "torch:mini", kich_thuoc=8)
+        ma_tran = _vector(10)
+        for i in range(10):
+            cache.luu_nhieu([f"bai {i}"], ma_tran[i : i + 1])
+
+        # Process khác (instance mới) đọc lại chỉ mục và số chiều từ file
+        cache_moi = BoNhoDemEmbedding(tmp_path, "torch:mini")
+        assert len(cache_moi) == 10 and cache_moi.kich_thuoc == 8
+        da_co = cache_moi.lay_nhieu(["bai 9", "bai 0"])
+        np.testing.assert_array_equal(np.stack(da_co), ma_tran[[9, 0]])
+
+        # Ghi từ instance này, instance kia thấy khi tra cứu trượt
+        cache_moi.luu_nhieu(["bai 10"], _vector(1, seed=1))
+        assert cache.lay_nhieu(["bai 10"])[0] is not None
+
+    def test_phien_ban_tach_file(self, tmp_path):
+        BoNhoDemEmbedding(tmp_path, "torch:mini", kich_thuoc=8).luu_nhieu(["a"], _vector(1))
+        assert BoNhoDemEmbedding(tmp_path, "onnx-int8:mini", kich_thuoc=8).lay_nhieu(["a"]) == [
+            None
+        ]
+        with pytest.raises(FileNotFoundError):
+            BoNhoDemEmbedding(tmp_path, "torch:khac")
+
+    def test_sai_kich_thuoc(self, tmp_path):
+        BoNhoDemEmbedding(tmp_path, "torch:mini", kich_thuoc=8)
+        with pytest.raises(ValueError):
+            BoNhoDemEmbedding(tmp_path, "torch:mini", kich_thuoc=16)
+
+
+class TestBoTaoEmbeddingsDungCache:
+    def test_trung_het_khong_tai_model(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(lay_cau_hinh_nlp(), "duong_dan_cache_embedding", str(tmp_path))
+        monkeypatch.setattr(embedding_cache, "_bo_nho_dem", {})
+        bo_tao = BoTaoEmbeddings(ten_model="mini", backend="torch", dung_cache=True)
+        ma_tran = _vector(2)
+        BoNhoDemEmbedding(tmp_path, bo_tao.phien_ban, kich_thuoc=8).luu_nhieu(
+            ["tin a", "tin b"], ma_tran
+        )
+
+        def khong_duoc_tai():
+            raise AssertionError("không được tải model khi trúng cache")
+
+        monkeypatch.setattr(bo_tao, "_tai_model", khong_duoc_tai)
+        np.testing.assert_array_equal(bo_tao.tao_ma_tran(["tin b", "tin a"]), ma_tran[[1, 0]])
+        assert bo_tao.kich_thuoc_vector == 8
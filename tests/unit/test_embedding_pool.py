@@ -0,0 +1,126 @@
+"""Unit tests cho pool worker embedding (fork + shared memory)."""
+
+from __future__ import annotations
+
+import os
+import signal
+import sys
+
+import numpy as np
+import pytest
+
+from news_ingestor.processing.embedding_pool import BoEmbeddingDaTienTrinh, so_luong_moi_worker
+from news_ingestor.processing.embeddings import BoTaoEmbeddings
+
+pytestmark = pytest.mark.skipif(sys.platform == "win32", reason="cần start method fork")
+
+
+class _MoHinhGia:
+    """Vector = (độ dài văn bản, pid của tiến trình encode), chưa chuẩn hóa."""
+
+    def get_sentence_embedding_dimension(self) -> int:
+        return 2
+
+    def __init__(self, file_danh_dau=None):
+        # Văn bản "chết" làm worker thoát đột ngột; có file đánh dấu thì chỉ lần đầu
+        self._file_danh_dau = file_danh_dau
+
+    def encode(self, van_ban, normalize_embeddings=True, batch_size=32, show_progress_bar=False):
+        if any("lỗi" in v for v in van_ban):
+            raise ValueError("encode lỗi")
+        if any("chết" in v for v in van_ban) and os.getpid() != _PID_CHA:
+            if self._file_danh_dau is None or not self._file_danh_dau.exists():
+                if self._file_danh_dau is not None:
+                    self._file_danh_dau.touch()
+                os._exit(1)
+        return np.array([[len(v), os.getpid()] for v in van_ban], dtype=np.float32)
+
+
+_PID_CHA = os.getpid()
+
+
+@pytest.fixture
+def pool():
+    model = _MoHinhGia()
+    with BoEmbeddingDaTienTrinh(lambda: model, kich_thuoc=2, so_tien_trinh=2) as pool:
+        yield pool
+
+
+def test_encode_giu_thu_tu_va_chia_cho_cac_worker(pool):
+    ds_van_ban = ["x" * i for i in range(40)]
+    ma_tran = pool.encode(ds_van_ban)
+
+    assert ma_tran.dtype == np.float32 and ma_tran.shape == (40, 2)
+    assert ma_tran[:, 0].tolist() == list(range(40))
+    # Hai phần của lô chạy ở hai worker, không ở tiến trình cha
+    ds_pid = set(ma_tran[:, 1].astype(int).tolist())
+    assert os.getpid() not in ds_pid and len(ds_pid) == 2
+    assert pool.encode([]).shape == (0, 2)
+
+
+def test_loi_trong_worker_duoc_nem_lai(pool):
+    with pytest.raises(RuntimeError, match="encode lỗi"):
+        pool.encode(["bình thường", "lỗi"])
+    # Pool vẫn dùng được sau lỗi
+    assert pool.encode(["abc"])[0, 0] == 3
+
+
+def test_worker_bi_kill_duoc_fork_lai(pool):
+    pid_cu = pool._ds_tien_trinh[0].pid
+    os.kill(pid_cu, signal.SIGKILL)
+    pool._ds_tien_trinh[0].join(timeout=5)
+
+    ds_van_ban = ["x" * i for i in range(40)]
+    ma_tran = pool.encode(ds_van_ban)
+
+    assert ma_tran[:, 0].tolist() == list(range(40))
+    assert pool.con_hoat_dong and pool._ds_tien_trinh[0].pid != pid_cu
+    assert all(p.is_alive() for p in pool._ds_tien_trinh)
+
+
+def test_worker_chet_giua_lo_phan_do_duoc_lam_lai(tmp_path):
+    model = _MoHinhGia(file_danh_dau=tmp_path / "da_chet")
+    with BoEmbeddingDaTienTrinh(lambda: model, kich_thuoc=2, so_tien_trinh=2) as pool:
+        ds_van_ban = ["x" * i for i in range(30)] + ["chết"] + ["y" * i for i in range(9)]
+        ma_tran = pool.encode(ds_van_ban)
+
+        assert (tmp_path / "da_chet").exists()
+        assert ma_tran[:, 0].tolist() == [len(v) for v in ds_van_ban]
+        assert pool.con_hoat_dong
+
+
+def test_worker_chet_lien_tuc_thi_bo_tao_encode_tai_cho(monkeypatch):
+    bo_tao = BoTaoEmbeddings(backend="onnx")
+    monkeypatch.setattr(bo_tao, "_tai_model_onnx", _MoHinhGia)
+    monkeypatch.setattr(bo_tao, "tao_model_worker", lambda so_luong: _MoHinhGia())
+    bo_tao.dung_nhieu_tien_trinh(2)
+    pool = bo_tao._pool
+    try:
+        ma_tran = bo_tao.tao_ma_tran(["chết", "abc"])
+    finally:
+        bo_tao.dung_pool()
+
+    assert not pool.con_hoat_dong and bo_tao._pool is None
+    # Encode lại trong tiến trình cha
+    assert ma_tran[:, 0].tolist() == [4, 3]
+    assert ma_tran[:, 1].astype(int).tolist() == [os.getpid()] * 2
+
+
+def test_bo_tao_embeddings_encode_qua_pool(monkeypatch):
+    bo_tao = BoTaoEmbeddings(backend="onnx")
+    monkeypatch.setattr(bo_tao, "_tai_model_onnx", _MoHinhGia)
+    monkeypatch.setattr(bo_tao, "tao_model_worker", lambda so_luong: _MoHinhGia())
+
+    assert bo_tao.dung_nhieu_tien_trinh(0) is False
+    assert bo_tao.dung_nhieu_tien_trinh(2) is True
+    try:
+        ma_tran = bo_tao.tao_ma_tran(["ab", "abcd"])
+        assert ma_tran[:, 0].tolist() == [2, 4]
+        assert os.getpid() not in ma_tran[:, 1].astype(int).tolist()
+    finally:
+        bo_tao.dung_pool()
+
+
+def test_so_luong_moi_worker():
+    assert so_luong_moi_worker(4, so_luong=3) == 3
+    assert so_luong_moi_worker(10_000) == 1
@@ -0,0 +1,201 @@
+"""Unit tests cho bộ tạo embeddings (phần không cần tải model)."""
+
+from __future__ import annotations
+
+import re
+import threading
+import time
+import uuid
+
+import numpy as np
+import pytest
+
+from config.settings import lay_cau_hinh_nlp
+from news_ingestor.models.article import BaiBao
+from news_ingestor.processing.embeddings import BoTaoEmbeddings, chia_doan_theo_token
+from news_ingestor.processing.pipeline import LuongXuLy
+from news_ingestor.storage.vector_store import KhoVector
+from news_ingestor.utils.metrics import lay_metrics
+
+
+def _vi_tri(van_ban: str) -> list[tuple[int, int]]:
+    """Tokenizer giả: mỗi từ một token."""
+    return [(m.start(), m.end()) for m in re.finditer(r"\S+", van_ban)]
+
+
+class _MoHinhGia:
+    """Model giả: vector hằng, đủ giao diện encode của SentenceTransformer."""
+
+    def get_sentence_embedding_dimension(self) -> int:
+        return 4
+
+    def encode(self, van_ban, normalize_embeddings=True, batch_size=32, show_progress_bar=False):
+        if isinstance(van_ban, str):
+            return np.full(4, 0.5, dtype=np.float32)
+        return np.full((len(van_ban), 4), 0.5, dtype=np.float32)
+
+
+class _MoHinhDoan:
+    """Model giả có tokenizer (mỗi từ một token), vector theo số từ của đoạn."""
+
+    max_seq_length = 6
+
+    def __init__(self):
+        self.ds_lo: list[list[str]] = []
+
+    def get_sentence_embedding_dimension(self) -> int:
+        return 2
+
+    def vi_tri_token(self, ds_van_ban):
+        return [_vi_tri(v) for v in ds_van_ban]
+
+    def encode(self, van_ban, normalize_embeddings=True, batch_size=32, show_progress_bar=False):
+        self.ds_lo.append(list(van_ban))
+        ma_tran = np.array([[len(v.split()), 1.0] for v in van_ban], dtype=np.float32)
+        return ma_tran / np.linalg.norm(ma_tran, axis=1, keepdims=True)
+
+
+class TestChiaDoan:
+    def test_van_ban_ngan_giu_nguyen(self):
+        van_ban = "lãi suất tăng"
+        assert chia_doan_theo_token(van_ban, _vi_tri(van_ban), 8) == [van_ban]
+
+    def test_khong_cat_giua_tu(self):
+        # "suất" bị tokenizer tách thành hai token liền nhau
+        van_ban = "lãi suất tăng mạnh"
+        vi_tri = [(0, 3), (4, 6), (6, 8), (9, 13), (14, 18)]
+        assert chia_doan_theo_token(van_ban, vi_tri, 2) == ["lãi", "suất", "tăng mạnh"]
+
+    def test_chong_lap_va_gioi_han_so_doan(self):
+        van_ban = "w0 w1 w2 w3 w4 w5"
+        vi_tri = _vi_tri(van_ban)
+        assert chia_doan_theo_token(van_ban, vi_tri, 4, chong_lap=2) == [
+            "w0 w1 w2 w3",
+            "w2 w3 w4 w5",
+        ]
+        assert chia_doan_theo_token(van_ban, vi_tri, 2, so_doan_toi_da=2) == ["w0 w1", "w2 w3"]
+
+
+class TestCheDoDoan:
+    @pytest.fixture
+    def bo_tao(self, monkeypatch):
+        monkeypatch.setattr(lay_cau_hinh_nlp(), "chong_lap_doan_embedding", 0)
+        bo_tao = BoTaoEmbeddings(backend="onnx")
+        bo_tao._model = _MoHinhDoan()
+        return bo_tao
+
+    def test_truncate_mac_dinh(self, bo_tao):
+        assert bo_tao.che_do_doan == "truncate"
+        bo_tao.tao_nhieu_embedding(["a " * 400])
+        assert len(bo_tao._model.ds_lo[0][0]) == 512
+
+    def test_mean_mot_lan_encode_cho_ca_lo(self, bo_tao):
+        bo_tao._che_do_doan = "mean"
+        # max_seq_length 6 → tối đa 4 token mỗi đoạn
+        ma_tran = bo_tao.tao_ma_tran_tai_lieu(["a b c d e f", "x y"])
+
+        assert bo_tao._model.ds_lo == [["a b c d", "e f", "x y"]]
+        tong = np.array([4, 1]) / np.hypot(4, 1) + np.array([2, 1]) / np.hypot(2, 1)
+        np.testing.assert_allclose(ma_tran[0], tong / np.linalg.norm(tong), rtol=1e-5)
+        np.testing.assert_allclose(np.linalg.norm(ma_tran, axis=1), 1.0, rtol=1e-5)
+
+    def test_chunks_moi_doan_mot_diem(self, bo_tao):
+        bo_tao._che_do_doan = "chunks"
+        ds_bai = [
+            BaiBao(tieu_de=f"Bài {i}", url=f"https://x.vn/{i}", nguon_tin="X") for i in (1, 2)
+        ]
+        ds_van_ban = ["a b c d e f g h i", "x y"]
+        ds_vector_id = [str(uuid.uuid4()), str(uuid.uuid4())]
+
+        ds_vector, ds_metadata, ds_id = LuongXuLy.tao_diem_vector(
+            bo_tao, ds_bai, ds_van_ban, ds_vector_id
+        )
+
+        assert len(ds_vector) == len(ds_id) == 4
+        assert [(m["bai_bao_id"], m["doan"], m["so_doan"]) for m in ds_metadata] == [
+            (ds_bai[0].id, 0, 3),
+            (ds_bai[0].id, 1, 3),
+            (ds_bai[0].id, 2, 3),
+            (ds_bai[1].id, 0, 1),
+        ]
+        assert ds_id[0] == ds_vector_id[0] and ds_id[3] == ds_vector_id[1]
+        assert len(set(ds_id)) == 4
+        # Id đoạn cố định → reindex ghi đè đúng điểm cũ
+        assert LuongXuLy.tao_diem_vector(bo_tao, ds_bai, ds_van_ban, ds_vector_id)[2] == ds_id
+
+    def test_reindex_xoa_doan_cu(self, bo_tao):
+        bo_tao._che_do_doan = "chunks"
+        kho_vector = KhoVector()
+        bai, bai_khac = (
+            BaiBao(tieu_de=f"Bài {i}", url=f"https://x.vn/{i}", nguon_tin="X") for i in (1, 2)
+        )
+        vector_id, vector_id_khac = str(uuid.uuid4()), str(uuid.uuid4())
+
+        def ghi(van_ban: str) -> None:
+            diem = LuongXuLy.tao_diem_vector(bo_tao, [bai], [van_ban], [vector_id])
+            kho_vector.luu_nhieu_vector(*diem)
+            LuongXuLy.xoa_diem_cu(kho_vector, [bai], diem[2])
+
+        kho_vector.luu_nhieu_vector(
+            *LuongXuLy.tao_diem_vector(bo_tao, [bai_khac], ["p q r s t u v"], [vector_id_khac])
+        )
+        ghi("a b c d e f g h i")
+        assert len(kho_vector._in_memory) == 3 + 2
+
+        # Bài ngắn đi: chỉ còn một đoạn, hai đoạn cũ bị xóa
+        ghi("x y")
+        diem_bai = [d for d in kho_vector._in_memory if d["metadata"]["bai_bao_id"] == bai.id]
+        assert [(d["id"], d["metadata"]["so_doan"]) for d in diem_bai] == [(vector_id, 1)]
+
+        # Đổi sang một vector mỗi bài: không còn điểm nào mang "doan"
+        bo_tao._che_do_doan = "mean"
+        ghi("a b c d e f g h i")
+        diem_bai = [d for d in kho_vector._in_memory if d["metadata"]["bai_bao_id"] == bai.id]
+        assert [d["id"] for d in diem_bai] == [vector_id] and "doan" not in diem_bai[0]["metadata"]
+        # Điểm của bài khác không bị động tới
+        assert sum(d["metadata"]["bai_bao_id"] == bai_khac.id for d in kho_vector._in_memory) == 2
+
+
+class TestBackendOnnx:
+    def test_chua_xuat_model(self, tmp_path):
+        bo_tao = BoTaoEmbeddings(backend="onnx", thu_muc_onnx=str(tmp_path / "khong_co"))
+        assert bo_tao.backend == "onnx"
+        with pytest.raises(FileNotFoundError, match="export-onnx"):
+            bo_tao.tao_embedding("lãi suất")
+
+
+class TestKhoiDongNen:
+    def test_chi_tai_model_mot_lan(self, monkeypatch):
+        bo_tao = BoTaoEmbeddings(backend="onnx")
+        so_lan_tai = []
+        dang_tai = threading.Event()
+
+        def tai_cham():
+            so_lan_tai.append(1)
+            dang_tai.set()
+            time.sleep(0.05)
+            return _MoHinhGia()
+
+        monkeypatch.setattr(bo_tao, "_tai_model_onnx", tai_cham)
+        thread = bo_tao.khoi_dong_nen()
+        dang_tai.wait(timeout=5)
+
+        # Lời gọi đầu chờ đúng lần tải đang chạy trên thread nền
+        assert bo_tao.tao_nhieu_embedding(["lãi suất"]) == [[0.5] * 4]
+        thread.join(timeout=5)
+
+        assert len(so_lan_tai) == 1
+        assert bo_tao.kich_thuoc_vector == 4
+        gauges = lay_metrics().snapshot()["counters"]
+        assert {"embedding_load_ms", "embedding_warm_encode_ms"} <= set(gauges)
+
+    def test_loi_khoi_dong_nen_khong_nem(self, monkeypatch):
+        bo_tao = BoTaoEmbeddings(backend="onnx")
+
+        def loi():
+            raise RuntimeError("hỏng")
+
+        monkeypatch.setattr(bo_tao, "_tai_model_onnx", loi)
+        bo_tao.khoi_dong_nen().join(timeout=5)
+        with pytest.raises(RuntimeError):
+            bo_tao.tao_embedding("lãi suất")
@@ -4,6 +4,7 @@ from __future__ import annotations
 
 from news_ingestor.models.enums import DanhMuc
 from news_ingestor.processing.entity_extractor import BoTrichXuatThucThe
+from news_ingestor.utils.text_utils import VanBanChuanHoa
 
 
 class TestBoTrichXuatThucThe:
@@ -28,6 +29,15 @@ class TestBoTrichXuatThucThe:
         assert "FPT" in ket_qua
         assert "VIC" in ket_qua
 
+    def test_nhan_dien_khong_dau(self):
+        text = "Co phieu Hoa Phat va Vinamilk tang manh"
+        ket_qua = self.trich_xuat.trich_xuat_ma_ck(text)
+        assert ket_qua == ["HPG", "VNM"]
+
+    def test_ton_trong_ranh_gioi_tu(self):
+        # "FPTS" (Chứng khoán FPT) không phải mã FPT
+        assert self.trich_xuat.trich_xuat_ma_ck("Cổ phiếu FPTS tăng trần") == []
+
     def test_khong_co_ma_ck(self):
         text = "Thời tiết hôm nay đẹp"
         ket_qua = self.trich_xuat.trich_xuat_ma_ck(text)
@@ -52,3 +62,10 @@ class TestBoTrichXuatThucThe:
         assert "ma_chung_khoan" in ket_qua
         assert "danh_muc" in ket_qua
         assert "HPG" in ket_qua["ma_chung_khoan"]
+
+    def test_nhan_van_ban_chuan_hoa(self):
+        text = "Hòa Phát và VCB hưởng lợi khi lãi suất giảm"
+        assert self.trich_xuat.phan_tich(VanBanChuanHoa.tu_van_ban(text)) == (
+            self.trich_xuat.phan_tich(text)
+        )
+        assert self.trich_xuat.trich_xuat_ma_ck(VanBanChuanHoa.tu_van_ban("")) == []
@@ -7,7 +7,10 @@ from datetime import datetime, timedelta, timezone
 from news_ingestor.models.article import BaiBao
 from news_ingestor.models.enums import CamXuc
 from news_ingestor.utils.evaluation import (
+    danh_gia_cam_xuc,
     danh_gia_impact_classifier,
+    doc_mau_impact,
+    so_sanh_impact_classifier,
     tao_bao_cao_pipeline,
 )
 
@@ -31,6 +34,45 @@ class TestDanhGiaImpactClassifier:
         assert kq.confusion["LOW"]["MEDIUM"] == 1
 
 
+class TestSoSanhImpact:
+    def test_chenh_lech_accuracy(self):
+        nhan = ["HIGH", "LOW", "LOW", "MEDIUM"]
+        cu = [{"impact_level": m} for m in ("HIGH", "MEDIUM", "MEDIUM", "MEDIUM")]
+        moi = [{"impact_level": m} for m in ("HIGH", "LOW", "LOW", "LOW")]
+
+        kq = so_sanh_impact_classifier(cu, moi, nhan)
+
+        assert kq.cu.accuracy == 0.5
+        assert kq.moi.accuracy == 0.75
+        assert kq.chenh_lech_accuracy == 0.25
+
+    def test_doc_csv_gan_nhan(self, tmp_path):
+        duong_dan = tmp_path / "impact.csv"
+        duong_dan.write_text(
+            "tieu_de,noi_dung,ma_ck,impact_level\n"
+            "NHNN tăng lãi suất,,VCB;BID,high\n"
+            "Họp cổ đông,Thông báo,,LOW\n"
+            "Không nhãn,,,\n",
+            encoding="utf-8",
+        )
+
+        ds_mau = doc_mau_impact(duong_dan)
+
+        assert [m["impact_level"] for m in ds_mau] == ["HIGH", "LOW"]
+        assert ds_mau[0]["ma_ck"] == ["VCB", "BID"]
+        assert ds_mau[1]["ma_ck"] == []
+
+
+class TestDanhGiaCamXuc:
+    def test_accuracy_va_confusion(self):
+        du_doan = [{"nhan": CamXuc.TICH_CUC}, {"nhan": "NEUTRAL"}, {"nhan": "NEGATIVE"}]
+        kq = danh_gia_cam_xuc(du_doan, ["POSITIVE", "NEGATIVE", "NEGATIVE"])
+
+        assert kq.dung == 2
+        assert kq.accuracy == 0.6667
+        assert kq.confusion["NEGATIVE"]["NEUTRAL"] == 1
+
+
 class TestBaoCaoPipeline:
     def test_bao_cao_co_du_lieu(self):
         now = datetime.now(tz=timezone.utc)
@@ -82,3 +124,34 @@ class TestBaoCaoPipeline:
         assert bc.total_articles == 0
         assert bc.high_impact_ratio == 0.0
         assert bc.coverage["has_content_ratio"] == 0.0
+        assert bc.sentiment_model_accuracy is None
+
+    def test_do_khop_mo_hinh_cam_xuc_chi_tren_nhan_gemini(self):
+        now = datetime.now(tz=timezone.utc)
+        ds = [
+            BaiBao(
+                tieu_de=tieu_de,
+                url=f"https://example.com/{i}",
+                nguon_tin="CafeF",
+                thoi_gian_xuat_ban=now,
+                nhan_cam_xuc=nhan,
+                nguon_cam_xuc=nguon,
+            )
+            for i, (tieu_de, nhan, nguon) in enumerate(
+                [
+                    ("A", CamXuc.TICH_CUC, "gemini"),
+                    ("B", CamXuc.TIEU_CUC, "gemini"),
+                    ("C", CamXuc.TIEU_CUC, "keyword"),
+                ]
+            )
+        ]
+        da_goi: list[list[str]] = []
+
+        def du_doan(ds_van_ban: list[str]) -> list[dict]:
+            da_goi.append(ds_van_ban)
+            return [{"nhan": "POSITIVE"} for _ in ds_van_ban]
+
+        bc = tao_bao_cao_pipeline(ds, so_ngay=7, du_doan_cam_xuc=du_doan)
+
+        assert bc.sentiment_model_accuracy == 0.5
+        assert len(da_goi[0]) == 2
@@ -0,0 +1,225 @@
+"""Unit tests cho backend Gemini theo lô (dùng server giả lập cục bộ)."""
+
+from __future__ import annotations
+
+import json
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from news_ingestor.models.enums import CamXuc
+from news_ingestor.processing.gemini_batch import BoPhanTichGeminiLo, _NganSachToken
+from news_ingestor.processing.sentiment import BoPhanTichCamXuc
+from news_ingestor.storage.result_cache import BoNhoDemKetQua
+from news_ingestor.utils.metrics import lay_metrics
+
+
+class _ServerGemini:
+    """Server giả lập ``generateContent``: gán nhãn theo từ khóa trong từng bài."""
+
+    def __init__(self):
+        self.so_request = 0
+        self.so_bai: list[int] = []
+        self.dang_chay = 0
+        self.dong_thoi_toi_da = 0
+        self.do_tre = 0.0
+        self.ma_loi: int | None = None
+        self.bo_id: set[int] = set()
+        self.api_key: list[str] = []
+        self._lock = threading.Lock()
+
+        server = self
+
+        class _Handler(BaseHTTPRequestHandler):
+            def do_POST(self):  # noqa: N802
+                server._xu_ly(self)
+
+            def log_message(self, *args):
+                pass
+
+        self._httpd = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+        self.base_url = f"http://127.0.0.1:{self._httpd.server_address[1]}"
+        threading.Thread(target=self._httpd.serve_forever, daemon=True).start()
+
+    def _xu_ly(self, handler: BaseHTTPRequestHandler) -> None:
+        with self._lock:
+            self.so_request += 1
+            self.dang_chay += 1
+            self.dong_thoi_toi_da = max(self.dong_thoi_toi_da, self.dang_chay)
+        try:
+            do_dai = int(handler.headers["Content-Length"])
+            payload = json.loads(handler.rfile.read(do_dai))
+            self.api_key.append(handler.headers.get("x-goog-api-key", ""))
+            time.sleep(self.do_tre)
+
+            if self.ma_loi:
+                handler.send_response(self.ma_loi)
+                handler.send_header("Content-Length", "0")
+                handler.end_headers()
+                return
+
+            prompt = payload["contents"][0]["parts"][0]["text"]
+            ds_bai = re.split(r"\n### Bài (\d+)\n", prompt)[1:]
+            with self._lock:
+                self.so_bai.append(len(ds_bai) // 2)
+            ket_qua = []
+            for id_bai, noi_dung in zip(ds_bai[::2], ds_bai[1::2], strict=True):
+                if int(id_bai) in self.bo_id:
+                    continue
+                noi_dung = noi_dung.lower()
+                tieu_cuc = "thua lỗ" in noi_dung
+                ket_qua.append({
+                    "id": int(id_bai),
+                    "nhan": "NEGATIVE" if tieu_cuc else "POSITIVE",
+                    "diem": -0.8 if tieu_cuc else 0.6,
+                    "tin_don": "tin đồn" in noi_dung,
+                })
+
+            body = json.dumps({
+                "candidates": [{"content": {"parts": [{"text": json.dumps(ket_qua)}]}}],
+                "usageMetadata": {"totalTokenCount": 100 * len(ket_qua)},
+            }).encode("utf-8")
+            handler.send_response(200)
+            handler.send_header("Content-Type", "application/json")
+            handler.send_header("Content-Length", str(len(body)))
+            handler.end_headers()
+            handler.wfile.write(body)
+        except ConnectionError:
+            # Client đã ngắt (timeout)
+            pass
+        finally:
+            with self._lock:
+                self.dang_chay -= 1
+
+    def dong(self) -> None:
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+
+@pytest.fixture
+def server():
+    server = _ServerGemini()
+    yield server
+    server.dong()
+
+
+def _tao_backend(server: _ServerGemini, **kwargs) -> BoPhanTichGeminiLo:
+    cau_hinh = {
+        "kich_thuoc_lo": 10,
+        "so_request_dong_thoi": 4,
+        "request_moi_phut": 6000,
+        "timeout": 5.0,
+    }
+    cau_hinh.update(kwargs)
+    return BoPhanTichGeminiLo(api_key="test-key", base_url=server.base_url, **cau_hinh)
+
+
+class TestBoPhanTichGeminiLo:
+    def test_gop_nhieu_bai_moi_request(self, server):
+        backend = _tao_backend(server)
+        ds_text = [f"Bài {i}: công ty thua lỗ" if i % 2 else f"Bài {i}: lãi lớn" for i in range(25)]
+
+        ket_qua = backend.phan_tich_nhieu(ds_text)
+
+        assert server.so_request == 3
+        assert sorted(server.so_bai) == [5, 10, 10]
+        assert server.api_key == ["test-key"] * 3
+        assert [kq["nhan"] for kq in ket_qua] == [
+            CamXuc.TIEU_CUC if i % 2 else CamXuc.TICH_CUC for i in range(25)
+        ]
+
+    def test_bai_trung_chi_gui_mot_lan(self, server):
+        backend = _tao_backend(server)
+
+        ket_qua = backend.phan_tich_nhieu(
+            ["Tin đồn sáp nhập", "Lợi nhuận kỷ lục", "Tin đồn sáp nhập"]
+        )
+
+        assert server.so_bai == [2]
+        assert ket_qua[0] == ket_qua[2]
+        assert ket_qua[0]["tin_don"] is True
+        assert ket_qua[0] is not ket_qua[2]
+
+    def test_gioi_han_so_request_dong_thoi(self, server):
+        server.do_tre = 0.1
+        backend = _tao_backend(server, kich_thuoc_lo=1, so_request_dong_thoi=2)
+
+        backend.phan_tich_nhieu([f"Bài số {i}" for i in range(6)])
+
+        assert server.so_request == 6
+        assert server.dong_thoi_toi_da == 2
+
+    def test_loi_http_tra_ve_none(self, server):
+        server.ma_loi = 500
+        backend = _tao_backend(server)
+
+        assert backend.phan_tich_nhieu(["Bài A", "Bài B"]) == [None, None]
+        # Kết quả lỗi không được cache
+        server.ma_loi = None
+        assert backend.phan_tich_nhieu(["Bài A"])[0]["nhan"] == CamXuc.TICH_CUC
+
+    def test_timeout(self, server):
+        server.do_tre = 0.5
+        backend = _tao_backend(server, timeout=0.1)
+        assert backend.phan_tich_nhieu(["Bài chậm"]) == [None]
+
+    def test_ngan_sach_token(self):
+        dong_ho = [0.0]
+        ngan_sach = _NganSachToken(6000, dong_ho=lambda: dong_ho[0])
+
+        assert ngan_sach.dat_truoc(5000) == 0.0
+        # Còn 1000 token, tốc độ nạp 100 token/giây
+        assert ngan_sach.dat_truoc(3000) == pytest.approx(20.0)
+        dong_ho[0] = 20.0
+        ngan_sach.dieu_chinh(-1000)
+        assert ngan_sach.dat_truoc(1000) == 0.0
+
+
+class TestCamXucDungGeminiLo:
+    def test_fallback_keyword_khi_thieu_ket_qua(self, server):
+        server.bo_id = {2}
+        phan_tich = BoPhanTichCamXuc(gemini=_tao_backend(server))
+
+        ket_qua = phan_tich.phan_tich_nhieu(
+            ["Công ty lãi lớn", "Công ty thua lỗ, nguy cơ phá sản", ""]
+        )
+
+        assert server.so_request == 1
+        assert ket_qua[0]["diem"] == 0.6
+        # Bài 2 thiếu trong response → keyword-based
+        assert ket_qua[1]["nhan"] == CamXuc.TIEU_CUC
+        assert ket_qua[1]["diem"] != -0.8
+        # Văn bản rỗng không gửi lên Gemini
+        assert server.so_bai == [2]
+        assert ket_qua[2]["nhan"] == CamXuc.TRUNG_TINH
+
+    def test_cache_ket_qua_gemini(self, server):
+        bo_nho_dem = BoNhoDemKetQua(dung_db=False)
+        phan_tich = BoPhanTichCamXuc(gemini=_tao_backend(server), bo_nho_dem=bo_nho_dem)
+        metrics = lay_metrics()
+        truoc = metrics.snapshot()["counters"].get("result_cache_sentiment_hits", 0)
+
+        phan_tich.phan_tich_nhieu(["Tin đồn sáp nhập", "Lợi nhuận kỷ lục"])
+        ket_qua = phan_tich.phan_tich_nhieu(["Lợi nhuận kỷ lục", "Tin đồn sáp nhập", "Mới"])
+
+        assert server.so_bai == [2, 1]
+        assert ket_qua[1]["tin_don"] is True
+        assert metrics.snapshot()["counters"]["result_cache_sentiment_hits"] == truoc + 2
+
+    def test_khong_cache_ket_qua_fallback(self, server):
+        server.ma_loi = 500
+        phan_tich = BoPhanTichCamXuc(
+            gemini=_tao_backend(server), bo_nho_dem=BoNhoDemKetQua(dung_db=False)
+        )
+
+        assert phan_tich.phan_tich("Công ty lãi lớn")["nhan"] == CamXuc.TICH_CUC
+        server.ma_loi = None
+        assert phan_tich.phan_tich("Công ty lãi lớn")["diem"] == 0.6
+        assert server.so_request == 2
+
+    def test_phan_tich_mot_bai(self, server):
+        phan_tich = BoPhanTichCamXuc(gemini=_tao_backend(server))
+        assert phan_tich.phan_tich("Công ty thua lỗ")["diem"] == -0.8
@@ -0,0 +1,169 @@
+"""Unit tests cho tải lại nóng từ điển NLP."""
+
+from __future__ import annotations
+
+import json
+import os
+import threading
+
+import pytest
+
+from news_ingestor.processing.entity_extractor import BoTrichXuatThucThe
+from news_ingestor.processing.hot_reload import BoTaiLaiTuDien, doc_file_tu_dien
+from news_ingestor.processing.lexicon import BoTuDien, BoTuDienNGram
+from news_ingestor.utils.metrics import lay_metrics
+
+
+def _dem(ten: str) -> int:
+    return lay_metrics().snapshot()["counters"].get(ten, 0)
+
+
+def _ghi_json(path, du_lieu, mtime: int) -> None:
+    path.write_text(json.dumps(du_lieu, ensure_ascii=False), encoding="utf-8")
+    # Đặt mtime rõ ràng: hai lần ghi liên tiếp có thể trùng mtime trên một số FS
+    os.utime(path, ns=(mtime, mtime))
+
+
+@pytest.fixture
+def tickers(tmp_path):
+    with open("config/tickers.json", encoding="utf-8") as f:
+        du_lieu = json.load(f)
+    path = tmp_path / "tickers.json"
+    _ghi_json(path, du_lieu, 1_000_000_000)
+    return path, du_lieu
+
+
+@pytest.fixture
+def bo_tai_lai(tickers, tmp_path):
+    path, _ = tickers
+    bo_tu_dien = BoTuDien()
+    bo_tu_dien.dang_ky("tac_dong_cao", ["lãi suất"])
+    bo_tu_dien_ngram = BoTuDienNGram()
+    bo_tu_dien_ngram.dang_ky("tac_dong_cao", ["lãi suất"])
+    trich_xuat = BoTrichXuatThucThe(duong_dan_tickers=str(path), duong_dan_chi_muc="")
+    return BoTaiLaiTuDien(
+        trich_xuat,
+        duong_dan_tu_dien=str(tmp_path / "lexicons.json"),
+        bo_tu_dien=bo_tu_dien,
+        bo_tu_dien_ngram=bo_tu_dien_ngram,
+    )
+
+
+class TestCapNhatTuDien:
+    def test_hoan_doi_nhieu_tu_dien_mot_lan(self):
+        bo_tu_dien = BoTuDien()
+        bo_tu_dien.dang_ky("a", ["lãi suất"])
+        bo_tu_dien.dang_ky("b", ["tỷ giá"])
+        ban_cu = bo_tu_dien.bien_dich()
+
+        phien_ban = bo_tu_dien.cap_nhat({"a": ["lạm phát"], "c": ["thuế"]})
+
+        assert phien_ban == bo_tu_dien.phien_ban != ban_cu.dau_van_tay
+        ket_qua = bo_tu_dien.quet("Lạm phát, tỷ giá và thuế")
+        assert (ket_qua.dem("a"), ket_qua.dem("b"), ket_qua.dem("c")) == (1, 1, 1)
+        # Bản cũ không bị sửa tại chỗ (luồng đang quét vẫn dùng được)
+        assert "lai suat" in ban_cu.tu_dien["a"]
+
+    def test_quet_dong_thoi_khi_cap_nhat(self):
+        bo_tu_dien = BoTuDien()
+        bo_tu_dien.cap_nhat({"a": ["lãi suất"], "b": ["lãi suất"]})
+        loi: list[str] = []
+
+        def quet():
+            for _ in range(200):
+                ket_qua = bo_tu_dien.quet("lãi suất tăng")
+                # a và b luôn được đổi cùng nhau
+                if ket_qua.dem("a") != ket_qua.dem("b"):
+                    loi.append("lệch")
+
+        thread = threading.Thread(target=quet)
+        thread.start()
+        for i in range(50):
+            ds_tu = ["lãi suất"] if i % 2 else ["tỷ giá"]
+            bo_tu_dien.cap_nhat({"a": ds_tu, "b": ds_tu})
+        thread.join()
+        assert not loi
+
+
+class TestBoTaiLaiTuDien:
+    def test_lan_dau_khong_tai_lai_ma_ck(self, bo_tai_lai):
+        assert bo_tai_lai.kiem_tra() is False
+        assert bo_tai_lai.kiem_tra() is False
+
+    def test_tai_lai_khi_tickers_doi(self, bo_tai_lai, tickers):
+        path, du_lieu = tickers
+        bo_tai_lai.kiem_tra()
+        trich_xuat = bo_tai_lai._trich_xuat
+        phien_ban = bo_tai_lai.phien_ban
+        assert trich_xuat.trich_xuat_ma_ck("Cổ phiếu ABX tăng trần") == []
+
+        du_lieu["ma_chung_khoan"]["ABX"] = {"ten_cong_ty": "ABX", "tu_khoa": ["ABX"]}
+        _ghi_json(path, du_lieu, 2_000_000_000)
+        truoc = _dem("lexicon_reloads")
+
+        assert bo_tai_lai.kiem_tra() is True
+        assert trich_xuat.trich_xuat_ma_ck("Cổ phiếu ABX tăng trần") == ["ABX"]
+        assert bo_tai_lai.phien_ban != phien_ban
+        assert _dem("lexicon_reloads") == truoc + 1
+
+    def test_tai_lai_gop_ma_moi_vao_chi_muc(self, tickers, tmp_path):
+        from news_ingestor.processing.ticker_index import luu_chi_muc, xay_dung_chi_muc
+
+        path, du_lieu = tickers
+        duong_dan_chi_muc = tmp_path / "ticker_index.pkl"
+        bsr = {"ten_cong_ty": "Lọc hóa dầu Bình Sơn", "tu_khoa": ["Lọc hóa dầu Bình Sơn"]}
+        luu_chi_muc(xay_dung_chi_muc({"BSR": bsr}), duong_dan_chi_muc)
+        trich_xuat = BoTrichXuatThucThe(
+            duong_dan_tickers=str(path), duong_dan_chi_muc=str(duong_dan_chi_muc)
+        )
+        phien_ban = trich_xuat.phien_ban
+        assert trich_xuat.trich_xuat_ma_ck("Công ty Zeta Mới tăng vốn") == []
+
+        du_lieu["ma_chung_khoan"]["ZZZ"] = {"ten_cong_ty": "Zeta", "tu_khoa": ["Công ty Zeta Mới"]}
+        _ghi_json(path, du_lieu, 2_000_000_000)
+
+        assert trich_xuat.tai_lai() != phien_ban
+        assert trich_xuat.trich_xuat_ma_ck("Công ty Zeta Mới tăng vốn") == ["ZZZ"]
+        # Chỉ mục vẫn dùng được
+        assert trich_xuat.trich_xuat_ma_ck("Lọc hóa dầu Bình Sơn lãi lớn") == ["BSR"]
+
+    def test_file_loi_giu_ban_cu(self, bo_tai_lai, tickers):
+        path, _ = tickers
+        bo_tai_lai.kiem_tra()
+        phien_ban = bo_tai_lai.phien_ban
+        path.write_text("{hỏng", encoding="utf-8")
+        os.utime(path, ns=(3_000_000_000, 3_000_000_000))
+        truoc = _dem("lexicon_reload_errors")
+
+        assert bo_tai_lai.kiem_tra() is False
+        assert bo_tai_lai.phien_ban == phien_ban
+        assert bo_tai_lai._trich_xuat.trich_xuat_ma_ck("FPT báo lãi") == ["FPT"]
+        assert _dem("lexicon_reload_errors") == truoc + 1
+
+    def test_file_ghi_de_tu_dien(self, bo_tai_lai, tmp_path):
+        duong_dan = tmp_path / "lexicons.json"
+        _ghi_json(duong_dan, {"tac_dong_cao": ["tỷ giá"], "vi_mo": ["bỏ qua"]}, 1_000_000_000)
+
+        # Lần kiểm tra đầu áp dụng file ghi đè có sẵn
+        assert bo_tai_lai.kiem_tra() is True
+        assert bo_tai_lai._bo_tu_dien.tu_khoa("tac_dong_cao") == ["tỷ giá"]
+        assert bo_tai_lai._bo_tu_dien_ngram.tu_khoa("tac_dong_cao") == ["tỷ giá"]
+        assert bo_tai_lai._bo_tu_dien.tu_khoa("vi_mo") == []
+
+        # Bỏ khóa khỏi file → khôi phục mặc định
+        _ghi_json(duong_dan, {}, 2_000_000_000)
+        assert bo_tai_lai.kiem_tra() is True
+        assert bo_tai_lai._bo_tu_dien.tu_khoa("tac_dong_cao") == ["lãi suất"]
+        assert bo_tai_lai._bo_tu_dien_ngram.tu_khoa("tac_dong_cao") == ["lãi suất"]
+
+    def test_bat_dau_tat_khi_chu_ky_bang_0(self, bo_tai_lai):
+        assert bo_tai_lai.bat_dau(0) is False
+        assert bo_tai_lai.bat_dau(60) is True
+        bo_tai_lai.dung()
+
+
+def test_doc_file_tu_dien_sai_dinh_dang(tmp_path):
+    duong_dan = tmp_path / "lexicons.json"
+    duong_dan.write_text('{"a": "lãi suất"}', encoding="utf-8")
+    with pytest.raises(ValueError):
+        doc_file_tu_dien(duong_dan)
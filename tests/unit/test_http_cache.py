@@ -0,0 +1,168 @@
+"""Unit tests cho conditional GET (ETag / Last-Modified)."""
+
+from __future__ import annotations
+
+import os
+import uuid
+from datetime import datetime, timezone
+
+import httpx
+import pytest
+
+from news_ingestor.crawlers.base import BaseCrawler
+from news_ingestor.crawlers.scheduler import BoLichThuThap
+from news_ingestor.models.article import BaiBaoTho
+from news_ingestor.storage.database import QuanLyDatabase
+from news_ingestor.storage.http_cache import KhoValidatorHttp
+from news_ingestor.utils.metrics import lay_metrics
+
+
+class CrawlerMau(BaseCrawler):
+    def __init__(self, kho_validator: KhoValidatorHttp):
+        super().__init__(
+            ten_nguon="Mau",
+            so_lan_thu_lai=1,
+            do_tre_giua_request=0.0,
+            kho_validator=kho_validator,
+        )
+
+    def thu_thap(self) -> list[BaiBaoTho]:
+        return []
+
+
+class CrawlerTrang(CrawlerMau):
+    """Một trang nguồn; ``loi_phan_tich`` giả lập HTML/XML không phân tích được."""
+
+    loi_phan_tich = False
+
+    def danh_sach_trang(self) -> list[dict]:
+        return [{"url": "https://a.vn/rss", "ten": "a"}]
+
+    def phan_tich_trang(self, noi_dung: str, trang: dict) -> list[BaiBaoTho]:
+        if self.loi_phan_tich:
+            raise ValueError("feed hỏng")
+        return [
+            BaiBaoTho(
+                tieu_de="Tin A",
+                url="https://a.vn/tin-a",
+                nguon_tin="Mau",
+                thoi_gian_xuat_ban=datetime.now(tz=timezone.utc),
+            )
+        ]
+
+    def thu_thap(self) -> list[BaiBaoTho]:
+        return [bai for tin in self.thu_thap_theo_trang() for bai in tin]
+
+
+@pytest.fixture
+def db_url():
+    """SQLite tạm cho mỗi test."""
+    import news_ingestor.storage.database as db_module
+    db_module._quan_ly = None
+
+    db_name = f"test_{uuid.uuid4().hex[:8]}.db"
+    os.makedirs("./data", exist_ok=True)
+    url = f"sqlite:///./data/{db_name}"
+
+    db = QuanLyDatabase(database_url=url)
+    db_module._quan_ly = db
+    db.khoi_tao_bang()
+
+    yield url
+
+    db.dong_ket_noi()
+    db_module._quan_ly = None
+    try:
+        os.remove(f"./data/{db_name}")
+    except Exception:
+        pass
+
+
+def _transport(da_nhan: list[httpx.Request]) -> httpx.MockTransport:
+    def xu_ly(request: httpx.Request) -> httpx.Response:
+        da_nhan.append(request)
+        if request.headers.get("If-None-Match") == '"v1"':
+            return httpx.Response(304)
+        return httpx.Response(
+            200,
+            text="<rss/>",
+            headers={"ETag": '"v1"', "Last-Modified": "Wed, 01 Jan 2026 00:00:00 GMT"},
+        )
+
+    return httpx.MockTransport(xu_ly)
+
+
+class TestKhoValidatorHttp:
+    def test_gui_validator_va_bo_qua_304(self, db_url):
+        da_nhan: list[httpx.Request] = []
+        crawler = CrawlerMau(KhoValidatorHttp(db_url))
+        crawler._client = httpx.Client(transport=_transport(da_nhan))
+        metrics = lay_metrics()
+        hit_truoc = metrics.snapshot()["counters"].get("http_cache_hit", 0)
+
+        assert crawler.gui_request("https://a.vn/rss") == "<rss/>"
+        # Chưa phân tích trang: chưa ghi validator
+        assert crawler.xac_nhan_validator() == 0
+        assert crawler.gui_request("https://a.vn/rss") == "<rss/>"
+        crawler.danh_dau_da_phan_tich("https://a.vn/rss")
+        assert crawler.xac_nhan_validator() == 1
+        assert crawler.gui_request("https://a.vn/rss") is None
+
+        assert "If-None-Match" not in da_nhan[0].headers
+        assert "If-None-Match" not in da_nhan[1].headers
+        assert da_nhan[2].headers["If-None-Match"] == '"v1"'
+        assert da_nhan[2].headers["If-Modified-Since"] == "Wed, 01 Jan 2026 00:00:00 GMT"
+        assert metrics.snapshot()["counters"]["http_cache_hit"] == hit_truoc + 1
+
+    def test_phan_tich_loi_khong_luu_validator(self, db_url):
+        da_nhan: list[httpx.Request] = []
+        crawler = CrawlerTrang(KhoValidatorHttp(db_url))
+        crawler._client = httpx.Client(transport=_transport(da_nhan))
+        scheduler = BoLichThuThap(kho_validator=crawler._kho_validator)
+        scheduler.dang_ky_crawler(crawler)
+
+        crawler.loi_phan_tich = True
+        assert scheduler.chay_mot_lan() == []
+        crawler.loi_phan_tich = False
+        assert len(scheduler.chay_mot_lan()) == 1
+        assert scheduler.chay_mot_lan() == []
+
+        assert [r.headers.get("If-None-Match") for r in da_nhan] == [None, None, '"v1"']
+
+    def test_ban_giao_loi_khong_luu_validator(self, db_url):
+        da_nhan: list[httpx.Request] = []
+        crawler = CrawlerTrang(KhoValidatorHttp(db_url))
+        crawler._client = httpx.Client(transport=_transport(da_nhan))
+        scheduler = BoLichThuThap(kho_validator=crawler._kho_validator)
+        scheduler.dang_ky_crawler(crawler)
+
+        def callback_loi(ds_bai):
+            raise RuntimeError("DB lỗi")
+
+        def callback_bai_loi(ds_bai):
+            # Pipeline nuốt lỗi ghi lô nhưng đếm bài lỗi
+            lay_metrics().tang("pipeline_articles_failed", len(ds_bai))
+
+        scheduler.dat_callback(callback_loi)
+        scheduler.chay_mot_lan()
+        scheduler.dat_callback(callback_bai_loi)
+        scheduler.chay_mot_lan()
+        scheduler.dat_callback(lambda ds_bai: None)
+        scheduler.chay_mot_lan()
+        scheduler.chay_mot_lan()
+
+        assert [r.headers.get("If-None-Match") for r in da_nhan] == [None, None, None, '"v1"']
+
+    def test_validator_ben_vung_qua_khoi_dong_lai(self, db_url):
+        KhoValidatorHttp(db_url).cap_nhat("https://a.vn/rss", {"etag": '"v1"'})
+
+        kho_moi = KhoValidatorHttp(db_url)
+
+        assert kho_moi.lay_header("https://a.vn/rss") == {"If-None-Match": '"v1"'}
+        assert kho_moi.lay_header("https://a.vn/khac") == {}
+
+    def test_khong_co_validator_thi_khong_luu(self, db_url):
+        kho = KhoValidatorHttp(db_url)
+        kho.cap_nhat("https://a.vn/rss", {"content-type": "text/xml"})
+
+        assert kho.lay_header("https://a.vn/rss") == {}
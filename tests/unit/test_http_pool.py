@@ -0,0 +1,44 @@
+"""Unit tests cho registry kết nối HTTP dùng chung."""
+
+from __future__ import annotations
+
+import httpx
+
+from news_ingestor.processing.content_fetcher import ContentFetcher
+from news_ingestor.utils import http_pool
+from news_ingestor.utils.http_pool import BoQuanLyKetNoi
+
+
+class TestBoQuanLyKetNoi:
+    def test_client_duoc_dung_chung(self):
+        bo = BoQuanLyKetNoi(http2=False)
+        try:
+            assert bo.lay_client() is bo.lay_client()
+        finally:
+            bo.dong()
+
+    def test_host_cau_hinh_co_pool_rieng(self):
+        bo = BoQuanLyKetNoi(http2=False, gioi_han_host={"cafef.vn": 2})
+        try:
+            client = bo.lay_client()
+            transport_rieng = client._transport_for_url(httpx.URL("https://s.cafef.vn/a"))
+            transport_chung = client._transport_for_url(httpx.URL("https://example.com/"))
+            assert transport_rieng is not transport_chung
+            assert transport_rieng is client._transport_for_url(httpx.URL("https://cafef.vn/b"))
+        finally:
+            bo.dong()
+
+    def test_thieu_h2_thi_dung_http11(self, monkeypatch):
+        monkeypatch.setattr(http_pool.importlib.util, "find_spec", lambda _ten: None)
+        assert BoQuanLyKetNoi(http2=True).http2 is False
+
+    def test_thanh_phan_khong_dong_pool_chung(self, monkeypatch):
+        bo = BoQuanLyKetNoi(http2=False)
+        monkeypatch.setattr(http_pool, "_bo_ket_noi", bo)
+        try:
+            client = bo.lay_client()
+            with ContentFetcher() as fetcher:
+                assert fetcher._get_client() is client
+            assert not client.is_closed
+        finally:
+            bo.dong()
@@ -2,11 +2,14 @@
 
 from __future__ import annotations
 
+import pytest
+
 from news_ingestor.processing.impact_classifier import BoPhanLoaiTacDong
+from news_ingestor.utils.text_utils import VanBanChuanHoa
 
 
 class TestBoPhanLoaiTacDong:
-    """Tests cho classifier rule-based v1."""
+    """Tests cho classifier rule-based (mặc định v2: n-gram theo ranh giới từ)."""
 
     def setup_method(self):
         self.classifier = BoPhanLoaiTacDong()
@@ -40,3 +43,35 @@ class TestBoPhanLoaiTacDong:
         assert ket_qua["impact_level"] in {"MEDIUM", "HIGH"}
         assert ket_qua["impact_score"] >= 4
         assert "co_phieu" in ket_qua["impact_tags"]
+
+    def test_nhan_van_ban_chuan_hoa(self):
+        tieu_de = "NHNN điều chỉnh lãi suất điều hành"
+        noi_dung = "Tỷ giá và thị trường chứng khoán biến động mạnh."
+        assert self.classifier.phan_loai(
+            tieu_de, noi_dung, ["VCB"], van_ban=VanBanChuanHoa.tu_van_ban(f"{tieu_de} {noi_dung}")
+        ) == self.classifier.phan_loai(tieu_de, noi_dung, ["VCB"])
+
+    def test_khong_khop_chuoi_con_trong_tu_khac(self):
+        van_ban = VanBanChuanHoa.tu_van_ban(
+            "Giá thuê mặt bằng tăng, quỹ confederation mua thêm cổ phần"
+        )
+        v1 = BoPhanLoaiTacDong(che_do="v1").phan_loai("", "", [], van_ban=van_ban)
+        v2 = self.classifier.phan_loai("", "", [], van_ban=van_ban)
+
+        # v1: "thue" khớp trong "thuê", "fed" trong "confederation"
+        assert v1["impact_score"] == 6
+        assert "lai_suat" in v1["impact_tags"]
+        assert v2["impact_score"] == 0
+        assert v2["impact_tags"] == []
+
+    def test_van_ban_khong_dau_van_khop(self):
+        co_dau = self.classifier.phan_loai("Thuế xuất khẩu tăng", "", [])
+        khong_dau = self.classifier.phan_loai("Thue xuat khau tang", "", [])
+        assert khong_dau == co_dau
+        assert co_dau["impact_score"] == 6
+
+    def test_phien_ban_theo_che_do(self):
+        assert BoPhanLoaiTacDong(che_do="v1").phien_ban.startswith("v1:")
+        assert self.classifier.phien_ban.startswith("v2:")
+        with pytest.raises(ValueError):
+            BoPhanLoaiTacDong(che_do="v3")
@@ -0,0 +1,166 @@
+"""Unit tests cho registry từ điển từ khóa."""
+
+from __future__ import annotations
+
+import random
+
+from news_ingestor.processing.entity_extractor import BoTrichXuatThucThe
+from news_ingestor.processing.impact_classifier import BoPhanLoaiTacDong
+from news_ingestor.processing.lexicon import BoTuDien, BoTuDienNGram, lay_bo_tu_dien
+from news_ingestor.processing.sentiment import (
+    TU_TICH_CUC,
+    TU_TIEU_CUC,
+    TU_TIN_DON,
+    BoPhanTichCamXuc,
+)
+from news_ingestor.utils.metrics import lay_metrics
+from news_ingestor.utils.text_utils import VanBanChuanHoa
+
+
+class TestBoTuDien:
+    def setup_method(self):
+        self.bo_tu_dien = BoTuDien()
+        self.bo_tu_dien.dang_ky("vi_mo", ["Lãi suất", "lãi suất tăng", "tỷ giá", "Lãi Suất"])
+        self.bo_tu_dien.dang_ky("ngan_hang", ["ngân hàng", "tín dụng"])
+
+    def test_khop_khong_dau_va_chuoi_con(self):
+        ket_qua = self.bo_tu_dien.quet("LAI SUAT TANG manh, ngân hàng siết tín dụng")
+
+        # "lai suat" nằm trong "lai suat tang" vẫn được đếm
+        assert ket_qua.khop("vi_mo") == {"lai suat", "lai suat tang"}
+        # "Lãi suất" và "Lãi Suất" là hai mục trong từ điển gốc
+        assert ket_qua.dem("vi_mo") == 3
+        assert ket_qua.dem("ngan_hang") == 2
+        assert ket_qua.co("ngan_hang")
+        assert not self.bo_tu_dien.quet("tỷ lệ").co("vi_mo")
+        assert ket_qua.dem("khong_ton_tai") == 0
+
+    def test_quet_mot_lan_moi_van_ban(self):
+        van_ban = VanBanChuanHoa.tu_van_ban("Tỷ giá tăng")
+        metrics = lay_metrics()
+        truoc = metrics.snapshot()["counters"].get("lexicon_scans", 0)
+
+        assert self.bo_tu_dien.quet(van_ban) is self.bo_tu_dien.quet(van_ban)
+        assert metrics.snapshot()["counters"]["lexicon_scans"] == truoc + 1
+
+    def test_dang_ky_lai_bien_dich_lai(self):
+        van_ban = VanBanChuanHoa.tu_van_ban("Tỷ giá tăng")
+        assert self.bo_tu_dien.quet(van_ban).co("vi_mo")
+
+        self.bo_tu_dien.dang_ky("vi_mo", ["lạm phát"])
+        assert not self.bo_tu_dien.quet(van_ban).co("vi_mo")
+        assert "lexicon_compile_ms" in lay_metrics().snapshot()["counters"]
+
+    def test_tu_dien_rong(self):
+        assert BoTuDien().quet("bất kỳ").tu_khop == frozenset()
+        khop = BoTuDien().quet_nhieu(["bất kỳ", ""])
+        assert khop.dem("vi_mo").tolist() == [0, 0]
+
+    def test_quet_nhieu_giong_quet_tung_bai(self):
+        ds = ["LAI SUAT TANG manh", "", "ngân hàng siết tín dụng, tỷ giá", "Lãi suất"]
+        khop = self.bo_tu_dien.quet_nhieu(ds)
+
+        for ten in ("vi_mo", "ngan_hang", "khong_ton_tai"):
+            assert khop.dem(ten).tolist() == [self.bo_tu_dien.quet(t).dem(ten) for t in ds]
+            assert khop.co(ten).tolist() == [self.bo_tu_dien.quet(t).co(ten) for t in ds]
+
+
+class TestBoTuDienNGram:
+    def setup_method(self):
+        self.bo_tu_dien = BoTuDienNGram()
+        self.bo_tu_dien.dang_ky("vi_mo", ["Lãi suất", "thuế", "Fed", "giải ngân đầu tư công"])
+        self.bo_tu_dien.dang_ky("thi_truong", ["VN-Index", "M&A"])
+
+    def test_khop_theo_ranh_gioi_tu(self):
+        ket_qua = self.bo_tu_dien.quet("FED họp, thuế tăng; giải ngân đầu tư công chậm")
+        assert ket_qua.khop("vi_mo") == {"fed", "thuế", "giải ngân đầu tư công"}
+        assert not self.bo_tu_dien.quet("confederation thuê nhà").co("vi_mo")
+        assert not self.bo_tu_dien.quet("giải ngân đầu tư").co("vi_mo")
+
+    def test_khong_dau_va_ky_tu_noi(self):
+        assert self.bo_tu_dien.quet("LAI SUAT tang").khop("vi_mo") == {"lãi suất"}
+        assert self.bo_tu_dien.quet("vn-index, thương vụ M&A").dem("thi_truong") == 2
+
+    def test_quet_nhieu_va_metric_rieng(self):
+        truoc = lay_metrics().snapshot()["counters"].get("lexicon_ngram_scans", 0)
+        khop = self.bo_tu_dien.quet_nhieu(["thuế", "", "lãi suất và thuế"])
+        assert khop.dem("vi_mo").tolist() == [1, 0, 2]
+        assert lay_metrics().snapshot()["counters"]["lexicon_ngram_scans"] == truoc + 3
+
+
+def _sinh_bai(rng: random.Random, so_bai: int) -> list[VanBanChuanHoa]:
+    """Văn bản ngẫu nhiên trộn từ khóa cảm xúc / tác động / chủ đề và từ thường."""
+    tu_khoa = [
+        *TU_TICH_CUC,
+        *TU_TIEU_CUC,
+        *TU_TIN_DON,
+        *BoPhanLoaiTacDong.TU_KHOA_TAC_DONG_CAO,
+        *BoPhanLoaiTacDong.TU_KHOA_TAC_DONG_TRUNG_BINH,
+        "tín dụng",
+        "chung cư",
+    ]
+    thuong = ["công ty", "quý", "năm nay", "báo cáo", "cho biết", "FPT", "VCB"]
+    return [
+        VanBanChuanHoa.tu_van_ban(
+            " ".join(rng.choice(tu_khoa if rng.random() < 0.3 else thuong) for _ in range(12))
+        )
+        for _ in range(so_bai)
+    ]
+
+
+class TestChamDiemTheoLo:
+    """Đường chấm điểm cả lô (ma trận bài × từ khóa) phải trùng đường từng bài."""
+
+    def setup_method(self):
+        self.ds_van_ban = _sinh_bai(random.Random(7), 200)
+        self.ds_van_ban.append(VanBanChuanHoa.tu_van_ban("không có từ khóa nào"))
+
+    def test_cam_xuc(self):
+        cam_xuc = BoPhanTichCamXuc()
+        tung_bai = [cam_xuc.phan_tich(v) for v in self.ds_van_ban]
+        assert cam_xuc.phan_tich_nhieu(self.ds_van_ban) == tung_bai
+        assert {kq["nhan"] for kq in tung_bai} == {"POSITIVE", "NEGATIVE", "NEUTRAL"}
+
+    def test_tac_dong(self):
+        tac_dong = BoPhanLoaiTacDong()
+        rng = random.Random(3)
+        ds_ma_ck = [
+            rng.choice([None, [], ["FPT"], ["A", "B", "C", "D", "E", "F"]])
+            for _ in self.ds_van_ban
+        ]
+
+        tung_bai = [
+            tac_dong.phan_loai("", "", ma_ck, van_ban=v)
+            for v, ma_ck in zip(self.ds_van_ban, ds_ma_ck, strict=True)
+        ]
+        assert tac_dong.phan_loai_nhieu(self.ds_van_ban, ds_ma_ck) == tung_bai
+        assert {kq["impact_level"] for kq in tung_bai} == {"LOW", "MEDIUM", "HIGH"}
+
+    def test_danh_muc(self):
+        trich_xuat = BoTrichXuatThucThe(duong_dan_chi_muc="")
+        ds_ma_ck = [trich_xuat.trich_xuat_ma_ck(v) for v in self.ds_van_ban]
+
+        tung_bai = [
+            trich_xuat.phan_loai_danh_muc(v, ma_ck)
+            for v, ma_ck in zip(self.ds_van_ban, ds_ma_ck, strict=True)
+        ]
+        assert trich_xuat.phan_loai_danh_muc_nhieu(self.ds_van_ban, ds_ma_ck) == tung_bai
+        assert trich_xuat.phan_loai_danh_muc_nhieu([], []) == []
+
+
+class TestDungChungLanQuet:
+    def test_cam_xuc_tac_dong_danh_muc_chung_mot_lan_quet(self):
+        trich_xuat = BoTrichXuatThucThe(duong_dan_chi_muc="")
+        cam_xuc = BoPhanTichCamXuc()
+        tac_dong = BoPhanLoaiTacDong()
+        lay_bo_tu_dien().bien_dich()
+
+        van_ban = VanBanChuanHoa.tu_van_ban("NHNN giữ lãi suất, ngân hàng tăng trưởng tín dụng")
+        metrics = lay_metrics()
+        truoc = metrics.snapshot()["counters"].get("lexicon_scans", 0)
+
+        trich_xuat.phan_tich(van_ban)
+        cam_xuc.phan_tich(van_ban)
+        tac_dong.phan_loai("", "", [], van_ban=van_ban)
+
+        assert metrics.snapshot()["counters"]["lexicon_scans"] == truoc + 1
@@ -0,0 +1,65 @@
+"""Unit tests cho cache LRU vector truy vấn."""
+
+from __future__ import annotations
+
+import numpy as np
+import pytest
+
+from news_ingestor.storage.query_cache import BoNhoDemTruyVan
+from news_ingestor.utils.metrics import lay_metrics
+
+
+class _EmbeddingGia:
+    def __init__(self):
+        self.ds_goi: list[str] = []
+
+    def tao_ma_tran_tai_lieu(self, ds_van_ban: list[str]) -> np.ndarray:
+        self.ds_goi.extend(ds_van_ban)
+        if "lỗi" in ds_van_ban[0]:
+            raise RuntimeError("encode lỗi")
+        return np.array([[float(len(v)), 1.0] for v in ds_van_ban], dtype=np.float32)
+
+
+def _dem(ten: str) -> int:
+    return lay_metrics().snapshot()["counters"].get(ten, 0)
+
+
+def test_cau_hoi_lap_lai_khong_encode_lai():
+    embedding = _EmbeddingGia()
+    bo_nho_dem = BoNhoDemTruyVan(embedding, kich_thuoc=8)
+    trung, truot = _dem("query_cache_hits"), _dem("query_cache_misses")
+
+    vector = bo_nho_dem.lay_vector("lãi suất")
+    assert bo_nho_dem.lay_vector("  lãi   suất ") == vector == [8.0, 1.0]
+    # NFD và NFC là cùng một khóa
+    assert bo_nho_dem.lay_vector("lãi suất") == vector
+
+    assert embedding.ds_goi == ["lãi suất"]
+    assert (_dem("query_cache_hits") - trung, _dem("query_cache_misses") - truot) == (2, 1)
+
+
+def test_gioi_han_kich_thuoc_lru():
+    embedding = _EmbeddingGia()
+    bo_nho_dem = BoNhoDemTruyVan(embedding, kich_thuoc=2)
+    bo_nho_dem.lay_vector("a")
+    bo_nho_dem.lay_vector("b")
+    bo_nho_dem.lay_vector("a")  # "a" mới dùng → "b" bị đẩy ra trước
+    bo_nho_dem.lay_vector("c")
+
+    assert len(bo_nho_dem) == 2
+    bo_nho_dem.lay_vector("a")
+    bo_nho_dem.lay_vector("b")
+    assert embedding.ds_goi == ["a", "b", "c", "b"]
+
+
+def test_tat_cache_va_loi_khong_duoc_luu():
+    embedding = _EmbeddingGia()
+    tat = BoNhoDemTruyVan(embedding, kich_thuoc=0)
+    tat.lay_vector("tỷ giá")
+    tat.lay_vector("tỷ giá")
+    assert len(tat) == 0 and embedding.ds_goi == ["tỷ giá", "tỷ giá"]
+
+    bo_nho_dem = BoNhoDemTruyVan(embedding)
+    with pytest.raises(RuntimeError):
+        bo_nho_dem.lay_vector("lỗi")
+    assert len(bo_nho_dem) == 0
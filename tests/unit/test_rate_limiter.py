@@ -0,0 +1,62 @@
+"""Unit tests cho bộ giới hạn tốc độ token bucket theo host."""
+
+from __future__ import annotations
+
+import pytest
+
+from news_ingestor.utils.rate_limiter import BoGioiHanToc
+
+
+class DongHoGia:
+    def __init__(self):
+        self.bay_gio = 0.0
+
+    def __call__(self) -> float:
+        return self.bay_gio
+
+
+class TestBoGioiHanToc:
+    def setup_method(self):
+        self.dong_ho = DongHoGia()
+        self.bo = BoGioiHanToc(
+            cau_hinh_host={"cafef.vn": {"toc_do": 0.5, "burst": 2}},
+            dong_ho=self.dong_ho,
+        )
+
+    def test_burst_roi_cho_theo_toc_do(self):
+        assert self.bo._dat_truoc("https://cafef.vn/a", None) == 0.0
+        assert self.bo._dat_truoc("https://cafef.vn/b", None) == 0.0
+        # Hết burst: request thứ 3 phải chờ 1/0.5 = 2 giây, thứ 4 chờ 4 giây
+        assert self.bo._dat_truoc("https://cafef.vn/c", None) == pytest.approx(2.0)
+        assert self.bo._dat_truoc("https://cafef.vn/d", None) == pytest.approx(4.0)
+
+    def test_nap_lai_token_theo_thoi_gian(self):
+        self.bo._dat_truoc("https://cafef.vn/a", None)
+        self.bo._dat_truoc("https://cafef.vn/b", None)
+        self.dong_ho.bay_gio = 2.0
+        assert self.bo._dat_truoc("https://cafef.vn/c", None) == 0.0
+
+    def test_host_khac_khong_bi_chan(self):
+        for _ in range(5):
+            self.bo._dat_truoc("https://cafef.vn/a", None)
+        assert self.bo._dat_truoc("https://vnexpress.net/x", 0.0) == 0.0
+
+    def test_subdomain_dung_chung_bucket(self):
+        self.bo._dat_truoc("https://www.cafef.vn/a", None)
+        self.bo._dat_truoc("https://s.cafef.vn/b", None)
+        assert self.bo._dat_truoc("https://cafef.vn/c", None) > 0
+
+    def test_host_chua_cau_hinh_dung_khoang_cach_mac_dinh(self):
+        assert self.bo._dat_truoc("https://example.com/1", 1.5) == 0.0
+        assert self.bo._dat_truoc("https://example.com/2", 1.5) == pytest.approx(1.5)
+
+    def test_khoang_cach_mac_dinh_khac_nhau_khong_dung_chung_bucket(self):
+        # Crawler (2s) gọi trước không được ép ContentFetcher (0.8s) theo nhịp 2s
+        assert self.bo._dat_truoc("https://example.com/1", 2.0) == 0.0
+        assert self.bo._dat_truoc("https://example.com/2", 0.8) == 0.0
+        assert self.bo._dat_truoc("https://example.com/3", 0.8) == pytest.approx(0.8)
+        assert self.bo._dat_truoc("https://example.com/4", 2.0) == pytest.approx(2.0)
+
+    def test_cau_hinh_khong_hop_le(self):
+        with pytest.raises(ValueError):
+            self.bo.cau_hinh_host("example.com", toc_do=0)
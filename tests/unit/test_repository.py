@@ -72,6 +72,37 @@ class TestKhoTinTuc:
         ket_qua_2 = kho.luu_bai_bao(bai_bao_mau)  # Lưu lại lần 2
         assert ket_qua_2 is False  # Đã tồn tại
 
+    def test_tim_khoa_da_ton_tai(self, kho: KhoTinTuc, bai_bao_mau: BaiBao):
+        kho.luu_bai_bao(bai_bao_mau)
+
+        url_da_co, hash_da_co = kho.tim_khoa_da_ton_tai(
+            [bai_bao_mau.url_chuan_hoa, "https://example.com/khac"],
+            [bai_bao_mau.tieu_de_hash, "khong-ton-tai"],
+        )
+
+        assert url_da_co == {bai_bao_mau.url_chuan_hoa}
+        assert hash_da_co == {bai_bao_mau.tieu_de_hash}
+        assert kho.tim_khoa_da_ton_tai([], []) == (set(), set())
+
+    def test_luu_nhieu_bai_bao_mot_transaction(self, kho: KhoTinTuc, bai_bao_mau: BaiBao):
+        kho.luu_bai_bao(bai_bao_mau)
+        bai_moi = [
+            BaiBao(
+                id=str(uuid.uuid4()),
+                tieu_de=f"Tin lô số {i}",
+                url=f"https://example.com/lo-{i}",
+                nguon_tin="Test",
+                thoi_gian_xuat_ban=datetime.now(tz=timezone.utc),
+            )
+            for i in range(3)
+        ]
+        trung_trong_lo = bai_moi[0].model_copy(update={"id": str(uuid.uuid4())})
+
+        so_moi = kho.luu_nhieu_bai_bao([bai_bao_mau, *bai_moi, trung_trong_lo])
+
+        assert so_moi == 3
+        assert kho.dem_bai_bao() == 4
+
     def test_khong_trung_lap_theo_url_chuan_hoa(self, kho: KhoTinTuc):
         bai_1 = BaiBao(
             id=str(uuid.uuid4()),
@@ -116,6 +147,33 @@ class TestKhoTinTuc:
         assert len(ket_qua) >= 1
         assert any(b.tieu_de == bai_bao_mau.tieu_de for b in ket_qua)
 
+    def test_lap_theo_lo_va_cap_nhat_vector_id(self, kho: KhoTinTuc):
+        kho.luu_nhieu_bai_bao(
+            [
+                BaiBao(
+                    id=str(uuid.uuid4()),
+                    tieu_de=f"Tin số {i}",
+                    url=f"https://example.com/tin-{i}",
+                    nguon_tin="Test",
+                    thoi_gian_xuat_ban=datetime.now(tz=timezone.utc),
+                )
+                for i in range(5)
+            ]
+        )
+        ds_lo = list(kho.lap_theo_lo(kich_thuoc_lo=2))
+        assert [len(lo) for lo in ds_lo] == [2, 2, 1]
+        assert [len(lo) for lo in kho.lap_theo_lo(kich_thuoc_lo=2, gioi_han=3)] == [2, 1]
+
+        bai = ds_lo[0][0]
+        assert kho.cap_nhat_vector_id({bai.id: "vec-1"}) == 1
+        assert next(kho.lap_theo_lo(kich_thuoc_lo=1))[0].vector_id == "vec-1"
+
+    def test_luu_phien_ban_tu_dien(self, kho: KhoTinTuc, bai_bao_mau: BaiBao):
+        bai_bao_mau.phien_ban_tu_dien = "a1b2c3d4:e5f6a7b8:c9d0e1f2"
+        kho.luu_bai_bao(bai_bao_mau)
+        ket_qua = kho.tim_theo_ma_ck("FPT")
+        assert ket_qua[0].phien_ban_tu_dien == "a1b2c3d4:e5f6a7b8:c9d0e1f2"
+
     def test_lay_cam_xuc_thi_truong(self, kho: KhoTinTuc, bai_bao_mau: BaiBao):
         kho.luu_bai_bao(bai_bao_mau)
         thong_ke = kho.lay_cam_xuc_thi_truong(ma_ck="FPT", so_ngay=30)
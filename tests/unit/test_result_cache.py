@@ -0,0 +1,146 @@
+"""Unit tests cho cache kết quả phân tích hai tầng."""
+
+from __future__ import annotations
+
+import os
+import uuid
+
+import pytest
+
+from news_ingestor.models.enums import CamXuc
+from news_ingestor.processing.impact_classifier import BoPhanLoaiTacDong
+from news_ingestor.processing.lexicon import BoTuDien
+from news_ingestor.processing.sentiment import BoPhanTichCamXuc
+from news_ingestor.storage.database import QuanLyDatabase
+from news_ingestor.storage.result_cache import KICH_THUOC_LO_KHOA, BoNhoDemKetQua
+from news_ingestor.utils.metrics import lay_metrics
+from news_ingestor.utils.text_utils import VanBanChuanHoa
+
+
+@pytest.fixture
+def db_url():
+    """SQLite tạm cho mỗi test."""
+    import news_ingestor.storage.database as db_module
+    db_module._quan_ly = None
+
+    db_name = f"test_{uuid.uuid4().hex[:8]}.db"
+    os.makedirs("./data", exist_ok=True)
+    url = f"sqlite:///./data/{db_name}"
+
+    db = QuanLyDatabase(database_url=url)
+    db_module._quan_ly = db
+    db.khoi_tao_bang()
+
+    yield url
+
+    db.dong_ket_noi()
+    db_module._quan_ly = None
+    try:
+        os.remove(f"./data/{db_name}")
+    except Exception:
+        pass
+
+
+def _dem(ten: str) -> int:
+    return lay_metrics().snapshot()["counters"].get(ten, 0)
+
+
+class TestBoNhoDemKetQua:
+    def test_khoa_theo_phien_ban(self):
+        khoa = BoNhoDemKetQua.tao_khoa("sentiment", "v1", "Tin A")
+        assert khoa == BoNhoDemKetQua.tao_khoa("sentiment", "v1", "Tin A")
+        assert khoa != BoNhoDemKetQua.tao_khoa("sentiment", "v2", "Tin A")
+        assert khoa != BoNhoDemKetQua.tao_khoa("impact", "v1", "Tin A")
+
+    def test_tang_db_dung_lai_giua_cac_process(self, db_url):
+        BoNhoDemKetQua().luu_nhieu("sentiment", "v1", {"a": {"diem": 0.5}, "b": {"diem": -1.0}})
+        truoc = _dem("result_cache_hits_db")
+
+        # Cache mới (LRU rỗng) vẫn đọc được từ DB, một lần cho cả lô
+        cache_moi = BoNhoDemKetQua()
+        assert cache_moi.lay_nhieu("sentiment", ["a", "x", "b"]) == [
+            {"diem": 0.5},
+            None,
+            {"diem": -1.0},
+        ]
+        assert _dem("result_cache_hits_db") == truoc + 2
+
+        # Lần sau trúng LRU
+        truoc_lru = _dem("result_cache_hits_memory")
+        assert cache_moi.lay_nhieu("sentiment", ["a"]) == [{"diem": 0.5}]
+        assert _dem("result_cache_hits_memory") == truoc_lru + 1
+
+    def test_ghi_trung_khoa_khong_loi(self, db_url):
+        cache = BoNhoDemKetQua()
+        cache.luu_nhieu("impact", "v1", {"a": {"diem": 1}})
+        cache.luu_nhieu("impact", "v1", {"a": {"diem": 1}, "b": {"diem": 2}})
+        assert BoNhoDemKetQua().lay_nhieu("impact", ["a", "b"]) == [{"diem": 1}, {"diem": 2}]
+
+    def test_ghi_lo_lon_hon_kich_thuoc_lo_khoa(self, db_url):
+        so_khoa = KICH_THUOC_LO_KHOA * 2 + 5
+        cache = BoNhoDemKetQua(kich_thuoc_lru=0)
+        cache.luu_nhieu("impact", "v1", {f"k{i}": {"n": i} for i in range(10)})
+        truoc = _dem("result_cache_writes")
+
+        cache.luu_nhieu("impact", "v1", {f"k{i}": {"n": i} for i in range(so_khoa)})
+
+        assert _dem("result_cache_writes") == truoc + so_khoa - 10
+        ket_qua = BoNhoDemKetQua().lay_nhieu("impact", [f"k{i}" for i in range(so_khoa)])
+        assert ket_qua == [{"n": i} for i in range(so_khoa)]
+
+    def test_lru_day_muc_cu(self):
+        cache = BoNhoDemKetQua(kich_thuoc_lru=2, dung_db=False)
+        truoc = _dem("result_cache_evictions")
+
+        cache.luu_nhieu("impact", "v1", {"a": {"n": 1}, "b": {"n": 2}})
+        cache.lay_nhieu("impact", ["a"])
+        cache.luu_nhieu("impact", "v1", {"c": {"n": 3}})
+
+        assert cache.lay_nhieu("impact", ["a", "b", "c"]) == [{"n": 1}, None, {"n": 3}]
+        assert _dem("result_cache_evictions") == truoc + 1
+        assert cache.thong_ke()["kich_thuoc_lru"] == 2
+
+    def test_ket_qua_tra_ve_la_ban_sao(self):
+        cache = BoNhoDemKetQua(dung_db=False)
+        cache.luu_nhieu("impact", "v1", {"a": {"n": 1}})
+        cache.lay_nhieu("impact", ["a"])[0]["n"] = 99
+        assert cache.lay_nhieu("impact", ["a"]) == [{"n": 1}]
+
+
+class TestBoPhanTichDungCache:
+    def test_cam_xuc_doc_lai_tu_db(self, db_url):
+        text = "FPT báo lãi kỷ lục, lợi nhuận tăng trưởng mạnh"
+        ket_qua = BoPhanTichCamXuc(bo_nho_dem=BoNhoDemKetQua()).phan_tich(text)
+
+        truoc = _dem("result_cache_hits_db")
+        da_cache = BoPhanTichCamXuc(bo_nho_dem=BoNhoDemKetQua()).phan_tich(text)
+
+        assert da_cache == ket_qua
+        assert da_cache["nhan"] is CamXuc.TICH_CUC
+        assert _dem("result_cache_hits_db") == truoc + 1
+
+    def test_tac_dong_giong_khi_khong_cache(self, db_url):
+        ds_van_ban = [
+            VanBanChuanHoa.tu_van_ban("NHNN tăng lãi suất điều hành"),
+            VanBanChuanHoa.tu_van_ban("Giá xăng giảm nhẹ"),
+        ]
+        ds_ma_ck = [["VCB", "BID"], None]
+        khong_cache = BoPhanLoaiTacDong().phan_loai_nhieu(ds_van_ban, ds_ma_ck)
+
+        co_cache = BoPhanLoaiTacDong(bo_nho_dem=BoNhoDemKetQua())
+        assert co_cache.phan_loai_nhieu(ds_van_ban, ds_ma_ck) == khong_cache
+        assert co_cache.phan_loai_nhieu(ds_van_ban, ds_ma_ck) == khong_cache
+        # Số mã CK khác → khóa khác
+        assert co_cache.phan_loai_nhieu(ds_van_ban[:1], [None]) != khong_cache[:1]
+
+
+class TestPhienBanTuDien:
+    def test_doi_tu_khoa_doi_phien_ban(self):
+        bo_tu_dien = BoTuDien()
+        bo_tu_dien.dang_ky("a", ["lãi suất"])
+        phien_ban = bo_tu_dien.phien_ban
+
+        bo_tu_dien.dang_ky("a", ["lãi suất"])
+        assert bo_tu_dien.phien_ban == phien_ban
+        bo_tu_dien.dang_ky("a", ["tỷ giá"])
+        assert bo_tu_dien.phien_ban != phien_ban
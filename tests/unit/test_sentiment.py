@@ -4,6 +4,7 @@ from __future__ import annotations
 
 from news_ingestor.models.enums import CamXuc
 from news_ingestor.processing.sentiment import BoPhanTichCamXuc
+from news_ingestor.utils.text_utils import VanBanChuanHoa
 
 
 class TestBoPhanTichCamXuc:
@@ -58,3 +59,9 @@ class TestBoPhanTichCamXuc:
         text = "Lạm phát tăng cao, suy thoái kinh tế, thất nghiệp tăng"
         ket_qua = self.phan_tich.phan_tich(text)
         assert ket_qua["nhan"] == CamXuc.TIEU_CUC
+
+    def test_nhan_van_ban_chuan_hoa(self):
+        text = "Tin đồn: doanh nghiệp lãi lớn nhưng nợ xấu tăng"
+        assert self.phan_tich.phan_tich(VanBanChuanHoa.tu_van_ban(text)) == (
+            self.phan_tich.phan_tich(text)
+        )
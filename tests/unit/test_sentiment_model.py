@@ -0,0 +1,116 @@
+"""Unit tests cho mô hình cảm xúc cục bộ (n-gram băm + hồi quy logistic)."""
+
+from __future__ import annotations
+
+import random
+
+import numpy as np
+import pytest
+
+from news_ingestor.models.enums import CamXuc
+from news_ingestor.processing.sentiment import BoPhanTichCamXuc
+from news_ingestor.processing.sentiment_model import (
+    MoHinhCamXucCucBo,
+    huan_luyen,
+    tai_mo_hinh_neu_co,
+    trich_n_gram,
+    vector_hoa,
+)
+
+_TICH_CUC = ["lãi kỷ lục", "doanh thu tăng mạnh", "cổ tức cao", "vượt kế hoạch"]
+_TIEU_CUC = ["thua lỗ nặng", "nợ xấu tăng", "bị đình chỉ", "cổ phiếu lao dốc"]
+_TRUNG_TINH = ["họp đại hội cổ đông", "công bố lịch", "bổ nhiệm thành viên", "thông báo"]
+_MA = ["FPT", "VCB", "HPG", "MWG", "VNM"]
+
+
+def _du_lieu(so_mau: int, seed: int = 0) -> tuple[list[str], list[str]]:
+    rng = random.Random(seed)
+    ds_van_ban, ds_nhan = [], []
+    for _ in range(so_mau):
+        nhan, cum_tu = rng.choice(
+            [("POSITIVE", _TICH_CUC), ("NEGATIVE", _TIEU_CUC), ("NEUTRAL", _TRUNG_TINH)]
+        )
+        ds_van_ban.append(f"{rng.choice(_MA)} {rng.choice(cum_tu)} trong quý {rng.randint(1, 4)}")
+        ds_nhan.append(nhan)
+    return ds_van_ban, ds_nhan
+
+
+@pytest.fixture(scope="module")
+def mo_hinh() -> MoHinhCamXucCucBo:
+    ds_van_ban, ds_nhan = _du_lieu(300)
+    return huan_luyen(ds_van_ban, ds_nhan, so_chieu=1 << 12, so_vong=100)
+
+
+class TestDacTrung:
+    def test_n_gram_bo_so(self):
+        assert trich_n_gram("FPT lãi 2024") == ["fpt", "lãi", "fpt lãi"]
+
+    def test_vector_chuan_hoa_l2(self):
+        hang, _, gia_tri = vector_hoa(["lãi kỷ lục", "", "nợ xấu"], so_chieu=1 << 10)
+        assert set(hang.tolist()) == {0, 2}
+        for i in (0, 2):
+            assert np.isclose(np.sum(gia_tri[hang == i] ** 2), 1.0)
+
+
+class TestMoHinhCamXucCucBo:
+    def test_do_chinh_xac_tren_tap_giu_lai(self, mo_hinh):
+        ds_van_ban, ds_nhan = _du_lieu(100, seed=1)
+        ket_qua = mo_hinh.du_doan(ds_van_ban)
+        dung = sum(str(kq["nhan"]) == nhan for kq, nhan in zip(ket_qua, ds_nhan, strict=True))
+        assert dung / len(ds_nhan) >= 0.95
+
+    def test_du_doan_lo_bang_tung_bai(self, mo_hinh):
+        ds_van_ban, _ = _du_lieu(20, seed=2)
+        assert mo_hinh.du_doan(ds_van_ban) == [mo_hinh.du_doan([v])[0] for v in ds_van_ban]
+        assert mo_hinh.du_doan([]) == []
+
+    def test_luu_va_tai(self, mo_hinh, tmp_path):
+        duong_dan = tmp_path / "mo_hinh.npz"
+        mo_hinh.luu(duong_dan)
+
+        da_tai = MoHinhCamXucCucBo.tai(duong_dan)
+        assert da_tai.phien_ban == mo_hinh.phien_ban
+        ds_van_ban, _ = _du_lieu(10, seed=3)
+        assert da_tai.du_doan(ds_van_ban) == mo_hinh.du_doan(ds_van_ban)
+
+    def test_file_hong_bi_bo_qua(self, tmp_path):
+        duong_dan = tmp_path / "hong.npz"
+        np.savez(duong_dan, trong_so=np.zeros((8, 3)))
+        with pytest.raises(ValueError):
+            MoHinhCamXucCucBo.tai(duong_dan)
+        assert tai_mo_hinh_neu_co(duong_dan) is None
+        assert tai_mo_hinh_neu_co(tmp_path / "khong_co.npz") is None
+
+    @pytest.mark.parametrize("ti_le", [0.1, 0.5, 0.9])
+    def test_file_bi_cat_cut_bi_bo_qua(self, mo_hinh, tmp_path, ti_le):
+        duong_dan = tmp_path / "cat_cut.npz"
+        mo_hinh.luu(duong_dan)
+        du_lieu = duong_dan.read_bytes()
+        duong_dan.write_bytes(du_lieu[: int(len(du_lieu) * ti_le)])
+        with pytest.raises(ValueError):
+            MoHinhCamXucCucBo.tai(duong_dan)
+        assert tai_mo_hinh_neu_co(duong_dan) is None
+
+    def test_huan_luyen_sai_tham_so(self):
+        with pytest.raises(ValueError):
+            huan_luyen(["a"], [], so_chieu=8)
+        with pytest.raises(ValueError):
+            huan_luyen(["a"], ["POSITIVE"], so_chieu=10)
+
+
+class TestBackendCucBo:
+    def test_dung_mo_hinh_khi_khong_co_gemini(self, mo_hinh):
+        phan_tich = BoPhanTichCamXuc(mo_hinh=mo_hinh)
+        assert phan_tich.backend == "local"
+        assert phan_tich.phien_ban == f"local:{mo_hinh.phien_ban}"
+
+        ket_qua = phan_tich.phan_tich_nhieu(
+            ["VCB lãi kỷ lục trong quý 2", "Tin đồn HPG thua lỗ nặng"]
+        )
+        assert [kq["nhan"] for kq in ket_qua] == [CamXuc.TICH_CUC, CamXuc.TIEU_CUC]
+        assert all(kq["nguon"] == "local" for kq in ket_qua)
+        assert ket_qua[1]["tin_don"] is True
+
+    def test_van_ban_rong_van_la_trung_tinh(self, mo_hinh):
+        ket_qua = BoPhanTichCamXuc(mo_hinh=mo_hinh).phan_tich("")
+        assert ket_qua["nhan"] == CamXuc.TRUNG_TINH
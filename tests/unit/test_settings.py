@@ -32,6 +32,20 @@ class TestSettingsValidation:
         with pytest.raises(ValueError):
             CauHinhNLP(EMBEDDING_MODEL="")
 
+    def test_embedding_backend(self):
+        assert CauHinhNLP(EMBEDDING_BACKEND=" ONNX ").embedding_backend == "onnx"
+        with pytest.raises(ValueError):
+            CauHinhNLP(EMBEDDING_BACKEND="openvino")
+        with pytest.raises(ValueError):
+            CauHinhNLP(EMBEDDING_THREADS=-1)
+
+    def test_embedding_chunk_mode(self):
+        assert CauHinhNLP(EMBEDDING_CHUNK_MODE=" Mean ").che_do_doan_embedding == "mean"
+        with pytest.raises(ValueError):
+            CauHinhNLP(EMBEDDING_CHUNK_MODE="sentence")
+        with pytest.raises(ValueError):
+            CauHinhNLP(EMBEDDING_CHUNK_TOKENS=8)
+
     def test_crawler_ranges(self):
         with pytest.raises(ValueError):
             CauHinhCrawler(CRAWL_INTERVAL_MINUTES=0)
@@ -2,7 +2,16 @@
 
 from __future__ import annotations
 
-from news_ingestor.utils.text_utils import chuan_hoa_url, tao_hash_tieu_de
+import random
+import unicodedata
+
+from news_ingestor.utils.text_utils import (
+    VanBanChuanHoa,
+    bo_dau,
+    chuan_hoa_url,
+    chuan_hoa_van_ban,
+    tao_hash_tieu_de,
+)
 
 
 class TestTextUtilsDedup:
@@ -21,3 +30,43 @@ class TestTextUtilsDedup:
         h2 = tao_hash_tieu_de("  fpt báo lãi kỷ lục  ")
         assert h1 == h2
         assert len(h1) == 64
+
+
+class TestVanBanChuanHoa:
+    def test_cac_dang_chuan_hoa(self):
+        van_ban = VanBanChuanHoa.tu_van_ban("Đà Nẵng: FPT tăng trưởng")
+        assert van_ban.goc == "Đà Nẵng: FPT tăng trưởng"
+        assert van_ban.thuong == "đà nẵng: fpt tăng trưởng"
+        assert van_ban.khong_dau == "da nang: fpt tang truong"
+        assert van_ban.tokens == ("da", "nang", "fpt", "tang", "truong")
+
+    def test_khong_chuan_hoa_lai(self):
+        van_ban = VanBanChuanHoa.tu_van_ban("FPT")
+        assert chuan_hoa_van_ban(van_ban) is van_ban
+        assert chuan_hoa_van_ban("FPT") == van_ban
+
+
+def _bo_dau_nfkd(text: str) -> str:
+    """Cài đặt tham chiếu: NFKD rồi lọc từng ký tự tổ hợp."""
+    normalized = unicodedata.normalize("NFKD", text)
+    return "".join(ch for ch in normalized if not unicodedata.combining(ch))
+
+
+class TestBoDau:
+    def test_bo_dau_tieng_viet(self):
+        assert bo_dau("Đà Nẵng: Tập đoàn Hòa Phát") == "Da Nang: Tap doan Hoa Phat"
+        assert bo_dau("") == ""
+
+    def test_tuong_duong_nfkd(self):
+        # Phải giống NFKD + lọc ký tự tổ hợp (ngoài đ/Đ) trên kho văn bản ngẫu nhiên
+        rng = random.Random(2024)
+        bang_chu = (
+            "aăâbcdeêghiklmnoôơpqrstuưvxyAĂÂEÊOÔƠUƯ"
+            "àáảãạằắẳẵặầấẩẫậèéẻẽẹềếểễệìíỉĩịòóỏõọồốổỗộờớởỡợùúủũụừứửữựỳýỷỹỵ"
+            "ÀÁẢÃẠÈÉÌÍÒÓÙÚỲÝđĐ 0123456789.,;:-–—“”‘’…%€₫"
+            "\u0300\u0301\u0303\u0309\u0323\u00a0\ufb01\u2460\uff21\uff22\u6f22\ud55c"
+        )
+        for _ in range(2000):
+            text = "".join(rng.choices(bang_chu, k=rng.randint(0, 200)))
+            text += chr(rng.randrange(0x80, 0x10000))
+            assert bo_dau(text) == _bo_dau_nfkd(text.replace("đ", "d").replace("Đ", "D"))
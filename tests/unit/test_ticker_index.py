@@ -0,0 +1,110 @@
+"""Unit tests cho chỉ mục mã CK toàn thị trường."""
+
+from __future__ import annotations
+
+import pickle
+
+import pytest
+
+from news_ingestor.processing.entity_extractor import BoTrichXuatThucThe
+from news_ingestor.processing.ticker_index import (
+    doc_csv_niem_yet,
+    gop_tu_khoa,
+    luu_chi_muc,
+    sinh_bi_danh,
+    tai_chi_muc,
+    xay_dung_chi_muc,
+)
+
+CSV_NIEM_YET = (
+    "Symbol,Company_Name,Exchange,Aliases\n"
+    "HPG,Công ty Cổ phần Tập đoàn Hòa Phát,HOSE,Hòa Phát;Hoa Phat Group\n"
+    "SHS,Công ty Cổ phần Chứng khoán Sài Gòn - Hà Nội,hnx,\n"
+    "BSR,Công ty Cổ phần Lọc hóa dầu Bình Sơn,UPCOM,\n"
+    ",Dòng thiếu mã,HOSE,\n"
+)
+
+
+@pytest.fixture
+def duong_dan_csv(tmp_path):
+    path = tmp_path / "listings.csv"
+    path.write_text(CSV_NIEM_YET, encoding="utf-8")
+    return path
+
+
+class TestNhapDanhSachNiemYet:
+    def test_sinh_bi_danh_bo_tien_to_phap_ly(self):
+        assert sinh_bi_danh("Công ty Cổ phần  Lọc hóa dầu Bình Sơn") == [
+            "Công ty Cổ phần Lọc hóa dầu Bình Sơn",
+            "Lọc hóa dầu Bình Sơn",
+        ]
+        # Tên rút gọn quá ngắn không được dùng làm bí danh
+        assert sinh_bi_danh("Tập đoàn Masan") == ["Tập đoàn Masan"]
+
+    def test_doc_csv(self, duong_dan_csv):
+        ma_ck = doc_csv_niem_yet(duong_dan_csv)
+
+        assert sorted(ma_ck) == ["BSR", "HPG", "SHS"]
+        assert ma_ck["SHS"]["san"] == "HNX"
+        assert "Hòa Phát" in ma_ck["HPG"]["tu_khoa"]
+        assert "Tập đoàn Hòa Phát" in ma_ck["HPG"]["tu_khoa"]
+
+    def test_csv_thieu_cot_ma(self, tmp_path):
+        path = tmp_path / "sai.csv"
+        path.write_text("ten\nABC\n", encoding="utf-8")
+        with pytest.raises(ValueError):
+            doc_csv_niem_yet(path)
+
+    def test_gop_tu_khoa_giu_thu_cong(self):
+        goc = {"HPG": {"ten_cong_ty": "Hòa Phát", "tu_khoa": ["HPG", "Hòa Phát"]}}
+        bo_sung = {
+            "HPG": {"ten_cong_ty": "Tập đoàn Hòa Phát", "tu_khoa": ["Hòa Phát", "Hoa Phat"]},
+            "BSR": {"ten_cong_ty": "Bình Sơn", "tu_khoa": ["Bình Sơn"]},
+        }
+        ket_qua = gop_tu_khoa(goc, bo_sung)
+
+        assert ket_qua["HPG"]["ten_cong_ty"] == "Hòa Phát"
+        assert ket_qua["HPG"]["tu_khoa"] == ["HPG", "Hòa Phát", "Hoa Phat"]
+        assert ket_qua["BSR"]["tu_khoa"] == ["Bình Sơn"]
+        assert goc["HPG"]["tu_khoa"] == ["HPG", "Hòa Phát"]
+
+
+class TestChiMucMaCK:
+    def test_luu_va_tai_lai(self, duong_dan_csv, tmp_path):
+        chi_muc = xay_dung_chi_muc(doc_csv_niem_yet(duong_dan_csv))
+        duong_dan = tmp_path / "index" / "ticker_index.pkl"
+
+        assert luu_chi_muc(chi_muc, duong_dan) > 0
+        da_tai = tai_chi_muc(duong_dan)
+
+        assert da_tai.so_ma == 3
+        assert da_tai.bo_khop.tim("loc hoa dau binh son".split()) == {"BSR"}
+        assert "hoa phat group" in da_tai.bi_danh["HPG"]
+
+    def test_ma_khong_khop_chu_thuong(self, duong_dan_csv):
+        # Mã trùng từ thông dụng chỉ được bắt qua regex viết hoa
+        chi_muc = xay_dung_chi_muc(doc_csv_niem_yet(duong_dan_csv))
+        assert chi_muc.bo_khop.tim(["shs"]) == set()
+
+    def test_tu_choi_file_khong_phai_chi_muc(self, tmp_path):
+        duong_dan = tmp_path / "khac.pkl"
+        duong_dan.write_bytes(pickle.dumps({"a": 1}))
+        with pytest.raises(ValueError):
+            tai_chi_muc(duong_dan)
+
+    def test_bo_trich_xuat_nap_chi_muc(self, duong_dan_csv, tmp_path):
+        duong_dan = tmp_path / "ticker_index.pkl"
+        luu_chi_muc(xay_dung_chi_muc(doc_csv_niem_yet(duong_dan_csv)), duong_dan)
+
+        trich_xuat = BoTrichXuatThucThe(duong_dan_chi_muc=str(duong_dan))
+
+        assert trich_xuat.trich_xuat_ma_ck("Lọc hóa dầu Bình Sơn lãi lớn") == ["BSR"]
+        assert trich_xuat.trich_xuat_ma_ck("Cổ phiếu SHS tăng trần") == ["SHS"]
+        # Mã chỉ có trong tickers.json được gộp vào chỉ mục
+        assert trich_xuat.trich_xuat_ma_ck("Cổ phiếu FPT tăng trần") == ["FPT"]
+        assert trich_xuat.trich_xuat_ma_ck("Vinamilk chia cổ tức") == ["VNM"]
+        assert trich_xuat.trich_xuat_ma_ck("Cổ phiếu ABX tăng trần") == []
+
+    def test_thieu_file_chi_muc_dung_tickers_json(self, tmp_path):
+        trich_xuat = BoTrichXuatThucThe(duong_dan_chi_muc=str(tmp_path / "khong_co.pkl"))
+        assert trich_xuat.trich_xuat_ma_ck("FPT báo lãi kỷ lục") == ["FPT"]